@@ -283,7 +283,14 @@ def _set_epsilon(new_epsilon: T.Any) -> None:
     """
     global _epsilon  # noqa: PLW0603
 
-    if _have_used_epsilon and new_epsilon != _epsilon:
+    # Once used, a symbolic epsilon is replaced by the Symbol itself, so setting the same symbolic
+    # epsilon again is compared by name
+    if isinstance(new_epsilon, SymbolicEpsilon) and not isinstance(_epsilon, SymbolicEpsilon):
+        is_same_epsilon = str(_epsilon) == new_epsilon.name
+    else:
+        is_same_epsilon = new_epsilon == _epsilon
+
+    if _have_used_epsilon and not is_same_epsilon:
         raise AlreadyUsedEpsilon(
             f"Cannot set return value of epsilon to {new_epsilon} after it has already been "
             f"accessed with value {_epsilon}."
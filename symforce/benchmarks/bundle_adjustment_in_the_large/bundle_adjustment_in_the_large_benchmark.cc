@@ -0,0 +1,73 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+///
+/// Compares the direct, Schur complement, and PCG linear solvers on a problem from the Bundle
+/// Adjustment in the Large dataset.  Run with:
+///
+///     build/bin/benchmarks/bundle_adjustment_in_the_large_benchmark \
+///         symforce/examples/bundle_adjustment_in_the_large/data/ladybug/problem-49-7776-pre.txt
+///
+/// See symforce/examples/bundle_adjustment_in_the_large/download_dataset.py to download the
+/// datasets
+///
+
+#include <chrono>
+#include <string>
+#include <vector>
+
+#include <spdlog/spdlog.h>
+
+#include <symforce/examples/bundle_adjustment_in_the_large/bundle_adjustment_in_the_large.h>
+#include <symforce/opt/optimizer.h>
+
+using namespace bundle_adjustment_in_the_large;
+
+namespace {
+
+struct SolverConfig {
+  std::string name;
+  sym::linear_solver_type_t linear_solver_type;
+  sym::pcg_preconditioner_t pcg_preconditioner;
+};
+
+void RunBenchmark(const Problem& problem, const SolverConfig& config) {
+  auto params = sym::DefaultOptimizerParams();
+  params.lambda_update_type = sym::lambda_update_type_t::DYNAMIC;
+  params.linear_solver_type = config.linear_solver_type;
+  params.pcg_preconditioner = config.pcg_preconditioner;
+
+  sym::Valuesd optimized_values = problem.values;
+
+  const auto start = std::chrono::steady_clock::now();
+  sym::Optimizerd optimizer{params, problem.factors, "sym::Optimize", OptimizedKeys(problem)};
+  const auto stats = optimizer.Optimize(optimized_values);
+  const auto end = std::chrono::steady_clock::now();
+
+  const double seconds = std::chrono::duration<double>(end - start).count();
+  spdlog::info("{:>20}: {:8.3f} s, {:3} iterations, initial error {:.6e}, final error {:.6e}",
+               config.name, seconds, stats.iterations.size(), stats.iterations.front().new_error,
+               stats.iterations.at(stats.best_index).new_error);
+}
+
+}  // namespace
+
+int main(int argc, char** argv) {
+  SYM_ASSERT_EQ(argc, 2);
+
+  const Problem problem = ReadProblem(argv[1]);
+
+  const std::vector<SolverConfig> configs = {
+      {"Direct", sym::linear_solver_type_t::DIRECT, sym::pcg_preconditioner_t::BLOCK_JACOBI},
+      {"Schur", sym::linear_solver_type_t::SCHUR, sym::pcg_preconditioner_t::BLOCK_JACOBI},
+      {"PCG (Jacobi)", sym::linear_solver_type_t::PCG, sym::pcg_preconditioner_t::JACOBI},
+      {"PCG (block Jacobi)", sym::linear_solver_type_t::PCG,
+       sym::pcg_preconditioner_t::BLOCK_JACOBI},
+  };
+
+  for (const SolverConfig& config : configs) {
+    RunBenchmark(problem, config);
+  }
+}
@@ -0,0 +1,130 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+"""
+Benchmark for running independent cc_sym Optimizers concurrently from a Python thread pool
+
+Each optimization is of a chain of states connected by IMU factors, which are evaluated entirely in
+C++, so cc_sym.Optimizer.optimize releases the GIL and the optimizations run in parallel.  Reports
+the throughput for each number of threads, and the speedup over a single thread.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import argh
+import numpy as np
+
+import sym
+from symforce import cc_sym
+from symforce import logger
+from symforce import typing as T
+
+
+def build_imu_chain(
+    num_frames: int,
+) -> T.Tuple[T.List[cc_sym.Factor], cc_sym.Values, T.List[cc_sym.Key]]:
+    """
+    Build a chain of num_frames states connected by ImuFactors, and return the factors, the initial
+    values, and the optimized keys
+    """
+    rng = np.random.default_rng(42)
+
+    factors = []
+    values = cc_sym.Values()
+    keys = []
+    for i in range(num_frames):
+        values.set(cc_sym.Key("p", i), sym.Pose3())
+        values.set(cc_sym.Key("v", i), np.zeros((3, 1)))
+        keys.extend([cc_sym.Key("p", i), cc_sym.Key("v", i)])
+
+    for i in range(num_frames - 1):
+        integrator = cc_sym.ImuPreintegrator(accel_bias=np.zeros(3), gyro_bias=np.zeros(3))
+        for _ in range(20):
+            integrator.integrate_measurement(
+                measured_accel=np.array([0.0, 0.0, 9.81]) + rng.normal(scale=0.1, size=3),
+                measured_gyro=rng.normal(scale=0.01, size=3),
+                accel_cov=np.full(3, 1e-4),
+                gyro_cov=np.full(3, 1e-4),
+                dt=0.005,
+            )
+        factors.append(
+            cc_sym.ImuFactor(integrator).factor(
+                keys_to_func=[
+                    cc_sym.Key("p", i),
+                    cc_sym.Key("v", i),
+                    cc_sym.Key("p", i + 1),
+                    cc_sym.Key("v", i + 1),
+                    cc_sym.Key("a", i),
+                    cc_sym.Key("g", i),
+                    cc_sym.Key("G"),
+                    cc_sym.Key("e"),
+                ]
+            )
+        )
+        values.set(cc_sym.Key("a", i), np.zeros((3, 1)))
+        values.set(cc_sym.Key("g", i), np.zeros((3, 1)))
+        keys.extend([cc_sym.Key("a", i), cc_sym.Key("g", i)])
+
+    values.set(cc_sym.Key("G"), np.array([[0.0], [0.0], [-9.81]]))
+    values.set(cc_sym.Key("e"), sym.epsilon)
+
+    return factors, values, keys
+
+
+def run_optimizations(
+    num_threads: int,
+    num_optimizations: int,
+    factors: T.List[cc_sym.Factor],
+    values: cc_sym.Values,
+    keys: T.List[cc_sym.Key],
+    params: T.Any,
+) -> float:
+    """
+    Run num_optimizations independent optimizations of the problem on num_threads Python threads,
+    each with its own Optimizer, and return the wall time
+    """
+    optimizers = [cc_sym.Optimizer(params, factors, keys=keys) for _ in range(num_threads)]
+
+    def optimize_all(thread_index: int) -> None:
+        optimizer = optimizers[thread_index]
+        for _ in range(thread_index, num_optimizations, num_threads):
+            optimizer.optimize(cc_sym.Values(values))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(num_threads) as executor:
+        list(executor.map(optimize_all, range(num_threads)))
+    return time.perf_counter() - start
+
+
+@argh.arg("--max_threads", help="Largest number of threads to run with")
+@argh.arg("--num_optimizations", help="Number of optimizations to run for each number of threads")
+@argh.arg("--num_frames", help="Number of states in each problem")
+def main(max_threads: int = 8, num_optimizations: int = 64, num_frames: int = 200) -> None:
+    factors, values, keys = build_imu_chain(num_frames)
+
+    params = cc_sym.default_optimizer_params()
+    params.verbose = False
+    params.iterations = 10
+
+    # Warm up
+    run_optimizations(1, 1, factors, values, keys, params)
+
+    single_thread_time = None
+    num_threads = 1
+    while num_threads <= max_threads:
+        wall_time = run_optimizations(num_threads, num_optimizations, factors, values, keys, params)
+        if single_thread_time is None:
+            single_thread_time = wall_time
+        speedup = single_thread_time / wall_time
+        logger.info(
+            f"{num_threads:3d} threads: {num_optimizations / wall_time:8.1f} optimizations/s, "
+            f"speedup {speedup:5.2f}x, efficiency {100 * speedup / num_threads:5.1f}%"
+        )
+        num_threads *= 2
+
+
+if __name__ == "__main__":
+    main.__doc__ = __doc__
+    argh.dispatch_command(main)
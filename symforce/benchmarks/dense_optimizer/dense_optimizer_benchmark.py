@@ -0,0 +1,166 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+"""
+Benchmark comparing the sparse and dense Python Optimizer (dense=False and dense=True) on problems
+of increasing size
+
+For each problem and size, reports the tangent dimension and hessian density of the problem, the
+throughput of each optimizer, and which optimizer the Python Optimizer chooses automatically, to
+show where the crossover between the two is.
+"""
+
+import time
+from dataclasses import dataclass
+
+import argh
+import numpy as np
+
+import symforce
+
+symforce.set_epsilon_to_symbol()
+
+from symforce import logger
+from symforce import typing as T
+from symforce.opt._internal.dense_selection import hessian_density
+from symforce.opt._internal.dense_selection import use_dense_optimizer
+from symforce.opt.numeric_factor import NumericFactor
+from symforce.opt.optimizer import Optimizer
+from symforce.values import Values
+
+LinearizationTuple = T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+@dataclass
+class Problem:
+    """
+    A problem to optimize with the Python Optimizer
+    """
+
+    factors: T.Sequence[NumericFactor]
+    optimized_keys: T.List[str]
+    initial_values: Values
+
+    def optimizer(self, dense: bool) -> Optimizer:
+        return Optimizer(
+            factors=self.factors,
+            optimized_keys=self.optimized_keys,
+            params=Optimizer.Params(verbose=False),
+            dense=dense,
+        )
+
+
+def prior_linearization(x: np.ndarray, target: np.ndarray) -> LinearizationTuple:
+    residual = x - target
+    jacobian = np.eye(len(x))
+    return residual, jacobian, jacobian, residual
+
+
+def between_linearization(a: np.ndarray, b: np.ndarray, a_to_b: np.ndarray) -> LinearizationTuple:
+    residual = 10 * (b - a - a_to_b)
+    jacobian = 10 * np.hstack([-np.eye(len(a)), np.eye(len(a))])
+    return residual, jacobian, jacobian.T @ jacobian, jacobian.T @ residual
+
+
+def point_problem(num_points: int, dim: int, pairs: T.Iterable[T.Tuple[int, int]]) -> Problem:
+    """
+    A problem on points of the given dimension with a noisy prior on each point and a stiffer noisy
+    offset between each of the given pairs of points
+    """
+    rng = np.random.default_rng(42)
+    truth = rng.normal(scale=10.0, size=(num_points, dim))
+
+    initial_values = Values()
+    factors = []
+    for i in range(num_points):
+        initial_values[f"x{i}"] = np.zeros(dim)
+        initial_values[f"target{i}"] = truth[i] + rng.normal(scale=1.0, size=dim)
+        factors.append(NumericFactor([f"x{i}", f"target{i}"], [f"x{i}"], prior_linearization))
+    for i, j in pairs:
+        initial_values[f"offset{i}_{j}"] = truth[j] - truth[i] + rng.normal(scale=0.1, size=dim)
+        factors.append(
+            NumericFactor(
+                [f"x{i}", f"x{j}", f"offset{i}_{j}"], [f"x{i}", f"x{j}"], between_linearization
+            )
+        )
+
+    return Problem(
+        factors=factors,
+        optimized_keys=[f"x{i}" for i in range(num_points)],
+        initial_values=initial_values,
+    )
+
+
+def chain(num_points: int, dim: int) -> Problem:
+    """
+    A chain of points, with an offset between each consecutive pair, so the hessian is banded
+    """
+    return point_problem(num_points, dim, [(i, i + 1) for i in range(num_points - 1)])
+
+
+def fully_connected(num_points: int, dim: int) -> Problem:
+    """
+    Points with an offset between every pair, so the hessian is dense
+    """
+    return point_problem(
+        num_points, dim, [(i, j) for i in range(num_points) for j in range(i + 1, num_points)]
+    )
+
+
+PROBLEMS: T.Dict[str, T.Callable[[int, int], Problem]] = {
+    "chain": chain,
+    "fully_connected": fully_connected,
+}
+
+
+def optimizations_per_second(optimizer: Optimizer, initial_values: Values, repeat: int) -> float:
+    # Warm up, which also builds the linearizer and analyzes the sparsity pattern
+    optimizer.optimize(initial_values)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        optimizer.optimize(initial_values)
+    return repeat / (time.perf_counter() - start)
+
+
+@argh.arg("--problem", help="Only run this problem")
+@argh.arg("--sizes", nargs="+", type=int, help="Numbers of points to run each problem with")
+@argh.arg("--dim", help="Dimension of each point")
+@argh.arg("--repeat", help="Number of timed optimizations for each optimizer")
+def main(
+    problem: T.Optional[str] = None,
+    sizes: T.Sequence[int] = (2, 4, 8, 16, 32, 48, 64, 96),
+    dim: int = 3,
+    repeat: int = 20,
+) -> None:
+    for name, make_problem in PROBLEMS.items():
+        if problem is not None and name != problem:
+            continue
+
+        for size in sizes:
+            benchmark_problem = make_problem(size, dim)
+
+            tangent_dims = {key: dim for key in benchmark_problem.optimized_keys}
+            factor_optimized_keys = [factor.optimized_keys for factor in benchmark_problem.factors]
+            density = hessian_density(tangent_dims, factor_optimized_keys)
+            automatic = (
+                "dense" if use_dense_optimizer(tangent_dims, factor_optimized_keys) else "sparse"
+            )
+
+            sparse = optimizations_per_second(
+                benchmark_problem.optimizer(dense=False), benchmark_problem.initial_values, repeat
+            )
+            dense = optimizations_per_second(
+                benchmark_problem.optimizer(dense=True), benchmark_problem.initial_values, repeat
+            )
+            logger.info(
+                f"{name:<16} dim {dim * size:4d} density {density:5.3f}: "
+                f"sparse {sparse:9.2f} optimizations/s, dense {dense:9.2f} optimizations/s, "
+                f"dense/sparse {dense / sparse:5.2f}, automatic {automatic}"
+            )
+
+
+if __name__ == "__main__":
+    main.__doc__ = __doc__
+    argh.dispatch_command(main)
@@ -0,0 +1,215 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+///
+/// Compares the direct and Schur complement linear solvers on the bundle_adjustment example, for a
+/// few numbers of landmarks, and on synthetic problems with the camera model of Bundle Adjustment
+/// in the Large, with many cameras and many more 3D points, where the reduced camera system is
+/// small.  Run with:
+///
+///     build/bin/benchmarks/linear_solver_benchmark
+///
+
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <random>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include <spdlog/spdlog.h>
+
+#include <sym/pose3.h>
+#include <symforce/examples/bundle_adjustment/build_example_state.h>
+#include <symforce/examples/bundle_adjustment/run_bundle_adjustment.h>
+#include <symforce/examples/bundle_adjustment_in_the_large/bundle_adjustment_in_the_large.h>
+#include <symforce/examples/example_utils/bundle_adjustment_util.h>
+#include <symforce/opt/optimizer.h>
+
+namespace {
+
+struct Summary {
+  int num_solves{0};
+  int num_converged{0};
+  int num_iterations{0};
+  double seconds{0};
+};
+
+/**
+ * Solve the bundle_adjustment example with random initial values and noise for each seed
+ */
+Summary Solve(const bundle_adjustment::BundleAdjustmentProblemParams& problem_params,
+              const sym::optimizer_params_t& params, const int num_problems) {
+  using namespace bundle_adjustment;
+  const std::vector<sym::Factord> factors = BuildFactors(problem_params);
+
+  // Order the landmarks last, so the Schur complement solver eliminates them.  The direct solver
+  // computes its own ordering, so this doesn't affect it
+  const std::vector<sym::Key> keys =
+      sym::OrderKeysForSchurComplement(factors, ComputeKeysToOptimizeWithoutView0(factors));
+
+  Summary summary;
+  for (int seed = 0; seed < num_problems; seed++) {
+    std::mt19937 gen(seed);
+    sym::Valuesd values = BuildValues(gen, problem_params);
+
+    const auto start = std::chrono::steady_clock::now();
+    sym::Optimizerd optimizer(params, factors, "linear_solver_benchmark", keys,
+                              problem_params.epsilon);
+    const auto stats = optimizer.Optimize(values);
+    const auto end = std::chrono::steady_clock::now();
+
+    summary.num_solves++;
+    summary.seconds += std::chrono::duration<double>(end - start).count();
+    if (stats.status == sym::optimization_status_t::SUCCESS) {
+      summary.num_converged++;
+      summary.num_iterations += static_cast<int>(stats.iterations.size()) - 1;
+    }
+  }
+  return summary;
+}
+
+template <int N>
+Eigen::Matrix<double, N, 1> RandomNormal(std::mt19937& gen, const double sigma) {
+  std::normal_distribution<double> normal(0.0, sigma);
+  return Eigen::Matrix<double, N, 1>::NullaryExpr([&](Eigen::Index) { return normal(gen); });
+}
+
+/**
+ * A synthetic problem with the camera model of Bundle Adjustment in the Large.  The cameras are
+ * about 10 units from the points and look at them, each point is observed by
+ * observations_per_point random cameras with pixel noise, and the initial values are perturbed
+ * from the true ones.
+ */
+bundle_adjustment_in_the_large::Problem BuildBalProblem(const int num_cameras, const int num_points,
+                                                        const int observations_per_point,
+                                                        std::mt19937& gen) {
+  using namespace bundle_adjustment_in_the_large;
+  std::uniform_real_distribution<double> uniform(-2.0, 2.0);
+  std::uniform_int_distribution<int> random_camera(0, num_cameras - 1);
+
+  Problem problem;
+  problem.num_cameras = num_cameras;
+  problem.num_points = num_points;
+  problem.num_observations = num_points * observations_per_point;
+
+  const Eigen::Vector3d intrinsics(500.0, 1e-3, 1e-5);
+  std::vector<sym::Pose3d> cameras;
+  for (int i = 0; i < num_cameras; i++) {
+    // Points in front of the camera have negative z in the BAL camera model
+    Eigen::Vector3d position = RandomNormal<3>(gen, 0.5);
+    position.z() = -10.0;
+    cameras.emplace_back(sym::Rot3d::FromTangent(RandomNormal<3>(gen, 0.1)), position);
+
+    problem.values.Set(sym::Keys::CAM_T_WORLD.WithSuper(i),
+                       cameras.back().Retract(RandomNormal<6>(gen, 0.01)));
+    problem.values.Set(sym::Keys::INTRINSICS.WithSuper(i), intrinsics);
+  }
+
+  int observation = 0;
+  for (int j = 0; j < num_points; j++) {
+    const Eigen::Vector3d point(uniform(gen), uniform(gen), uniform(gen));
+    problem.values.Set(sym::Keys::POINT.WithSuper(j),
+                       Eigen::Vector3d(point + RandomNormal<3>(gen, 0.05)));
+
+    for (int k = 0; k < observations_per_point; k++) {
+      const int camera = random_camera(gen);
+
+      // The same projection as the SnavelyReprojectionFactor, plus noise
+      const Eigen::Vector3d point_cam = cameras[camera] * point;
+      const Eigen::Vector2d p = point_cam.head<2>() / -point_cam.z();
+      const double r =
+          1 + intrinsics[1] * p.squaredNorm() + intrinsics[2] * std::pow(p.squaredNorm(), 2);
+      problem.values.Set(sym::Keys::PIXEL.WithSuper(observation),
+                         Eigen::Vector2d(intrinsics[0] * r * p + RandomNormal<2>(gen, 0.5)));
+      problem.factors.push_back(MakeFactor(camera, j, observation));
+      observation++;
+    }
+  }
+
+  problem.values.Set(sym::Keys::EPSILON, sym::kDefaultEpsilond);
+  return problem;
+}
+
+/**
+ * Solve synthetic Bundle-Adjustment-in-the-Large problems with the cameras first and the points
+ * last, with a different random problem for each seed
+ */
+Summary SolveBal(const int num_cameras, const int num_points, const int observations_per_point,
+                 const sym::optimizer_params_t& params, const int num_problems) {
+  Summary summary;
+  for (int seed = 0; seed < num_problems; seed++) {
+    std::mt19937 gen(seed);
+    auto problem = BuildBalProblem(num_cameras, num_points, observations_per_point, gen);
+    const std::vector<sym::Key> keys = bundle_adjustment_in_the_large::OptimizedKeys(problem);
+
+    const auto start = std::chrono::steady_clock::now();
+    sym::Optimizerd optimizer(params, std::move(problem.factors), "linear_solver_benchmark",
+                              keys);
+    const auto stats = optimizer.Optimize(problem.values);
+    const auto end = std::chrono::steady_clock::now();
+
+    summary.num_solves++;
+    summary.seconds += std::chrono::duration<double>(end - start).count();
+    if (stats.status == sym::optimization_status_t::SUCCESS) {
+      summary.num_converged++;
+      summary.num_iterations += static_cast<int>(stats.iterations.size()) - 1;
+    }
+  }
+  return summary;
+}
+
+void Report(const std::string& problem_name, const std::string& solver_name,
+            const Summary& summary) {
+  const double num_converged = std::max(summary.num_converged, 1);
+  spdlog::info(
+      "{:>32} {:>8}: {:3}/{:3} converged, {:6.2f} iterations per converged solve, {:8.3f} ms per "
+      "solve",
+      problem_name, solver_name, summary.num_converged, summary.num_solves,
+      summary.num_iterations / num_converged, 1e3 * summary.seconds / summary.num_solves);
+}
+
+}  // namespace
+
+int main() {
+  sym::optimizer_params_t params = sym::example_utils::OptimizerParams();
+  params.verbose = false;
+
+  for (const int num_landmarks : {20, 100, 1000, 5000}) {
+    bundle_adjustment::BundleAdjustmentProblemParams problem_params;
+    problem_params.num_landmarks = num_landmarks;
+
+    // The landmarks are observed at distinct points of a 100px grid, so larger images are needed
+    // for more landmarks
+    while (problem_params.image_shape.prod() < 2 * 100 * 100 * num_landmarks) {
+      problem_params.image_shape *= 2;
+    }
+    const std::string problem_name = fmt::format("bundle_adjustment ({} landmarks)", num_landmarks);
+
+    params.linear_solver_type = sym::linear_solver_type_t::DIRECT;
+    Report(problem_name, "Direct", Solve(problem_params, params, 10));
+
+    params.linear_solver_type = sym::linear_solver_type_t::SCHUR;
+    Report(problem_name, "Schur", Solve(problem_params, params, 10));
+  }
+
+  // Many cameras and many more points, like the BAL problems, where the reduced camera system
+  // (9 dimensions per camera) is much smaller than the full system
+  for (const auto& [num_cameras, num_points] :
+       std::vector<std::pair<int, int>>{{20, 2000}, {50, 10000}, {200, 40000}}) {
+    const int observations_per_point = 8;
+    const std::string problem_name =
+        fmt::format("BAL-style ({} cameras, {} points)", num_cameras, num_points);
+
+    params.linear_solver_type = sym::linear_solver_type_t::DIRECT;
+    Report(problem_name, "Direct",
+           SolveBal(num_cameras, num_points, observations_per_point, params, 3));
+
+    params.linear_solver_type = sym::linear_solver_type_t::SCHUR;
+    Report(problem_name, "Schur",
+           SolveBal(num_cameras, num_points, observations_per_point, params, 3));
+  }
+}
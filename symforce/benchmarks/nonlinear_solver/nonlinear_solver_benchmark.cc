@@ -0,0 +1,135 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+///
+/// Compares the Levenberg-Marquardt and dogleg nonlinear solvers by the number of hessian
+/// factorizations per converged solve, on the robot_3d_localization and bundle_adjustment examples.
+/// Run with:
+///
+///     build/bin/benchmarks/nonlinear_solver_benchmark
+///
+
+#include <chrono>
+#include <random>
+#include <string>
+#include <vector>
+
+#include <spdlog/spdlog.h>
+
+#include <symforce/examples/bundle_adjustment/build_example_state.h>
+#include <symforce/examples/bundle_adjustment/run_bundle_adjustment.h>
+#include <symforce/examples/example_utils/bundle_adjustment_util.h>
+#include <symforce/examples/robot_3d_localization/common.h>
+#include <symforce/examples/robot_3d_localization/run_dynamic_size.h>
+#include <symforce/opt/dogleg_optimizer.h>
+#include <symforce/opt/optimizer.h>
+
+namespace {
+
+/**
+ * A problem to solve, with the keys to optimize (or empty to optimize all of the keys optimized by
+ * the factors)
+ */
+struct Problem {
+  sym::Valuesd values;
+  std::vector<sym::Factord> factors;
+  std::vector<sym::Key> keys;
+  double epsilon;
+};
+
+struct Summary {
+  int num_solves{0};
+  int num_converged{0};
+  int num_iterations{0};
+  int num_factorizations{0};
+  double seconds{0};
+};
+
+// Levenberg-Marquardt factorizes the damped hessian once per iteration
+int NumFactorizations(const sym::Optimizerd& /* optimizer */, const sym::Optimizerd::Stats& stats) {
+  return static_cast<int>(stats.iterations.size()) - 1;
+}
+
+int NumFactorizations(const sym::DoglegOptimizerd& optimizer,
+                      const sym::DoglegOptimizerd::Stats& /* stats */) {
+  return optimizer.NonlinearSolver().NumFactorizations();
+}
+
+template <typename OptimizerType>
+Summary Solve(const std::vector<Problem>& problems, const sym::optimizer_params_t& params) {
+  Summary summary;
+  for (const Problem& problem : problems) {
+    sym::Valuesd values = problem.values;
+
+    const auto start = std::chrono::steady_clock::now();
+    OptimizerType optimizer(params, problem.factors, "nonlinear_solver_benchmark", problem.keys,
+                            problem.epsilon);
+    const auto stats = optimizer.Optimize(values);
+    const auto end = std::chrono::steady_clock::now();
+
+    summary.num_solves++;
+    summary.seconds += std::chrono::duration<double>(end - start).count();
+    if (stats.status == sym::optimization_status_t::SUCCESS) {
+      summary.num_converged++;
+      summary.num_iterations += static_cast<int>(stats.iterations.size()) - 1;
+      summary.num_factorizations += NumFactorizations(optimizer, stats);
+    }
+  }
+  return summary;
+}
+
+void Report(const std::string& problem_name, const std::string& solver_name,
+            const Summary& summary) {
+  const double num_converged = std::max(summary.num_converged, 1);
+  spdlog::info(
+      "{:>24} {:>20}: {:3}/{:3} converged, {:6.2f} iterations and {:6.2f} factorizations per "
+      "converged solve, {:8.3f} ms per solve",
+      problem_name, solver_name, summary.num_converged, summary.num_solves,
+      summary.num_iterations / num_converged, summary.num_factorizations / num_converged,
+      1e3 * summary.seconds / summary.num_solves);
+}
+
+void Compare(const std::string& problem_name, const std::vector<Problem>& problems,
+             sym::optimizer_params_t params) {
+  params.verbose = false;
+  Report(problem_name, "Levenberg-Marquardt", Solve<sym::Optimizerd>(problems, params));
+  Report(problem_name, "Dogleg", Solve<sym::DoglegOptimizerd>(problems, params));
+}
+
+/**
+ * The robot_3d_localization example, from its initial values
+ */
+std::vector<Problem> Robot3dLocalizationProblems() {
+  using namespace robot_3d_localization;
+  return {{BuildValues<double>(kNumPoses, kNumLandmarks),
+           BuildDynamicFactors<double>(kNumPoses, kNumLandmarks),
+           {},
+           sym::kDefaultEpsilond}};
+}
+
+/**
+ * The bundle_adjustment example, with random initial values and noise for each seed
+ */
+std::vector<Problem> BundleAdjustmentProblems(const int num_problems) {
+  using namespace bundle_adjustment;
+  const BundleAdjustmentProblemParams params;
+  const std::vector<sym::Factord> factors = BuildFactors(params);
+  const std::vector<sym::Key> keys = ComputeKeysToOptimizeWithoutView0(factors);
+
+  std::vector<Problem> problems;
+  for (int seed = 0; seed < num_problems; seed++) {
+    std::mt19937 gen(seed);
+    problems.push_back({BuildValues(gen, params), factors, keys, params.epsilon});
+  }
+  return problems;
+}
+
+}  // namespace
+
+int main() {
+  Compare("robot_3d_localization", Robot3dLocalizationProblems(),
+          robot_3d_localization::RobotLocalizationOptimizerParams());
+  Compare("bundle_adjustment", BundleAdjustmentProblems(50), sym::example_utils::OptimizerParams());
+}
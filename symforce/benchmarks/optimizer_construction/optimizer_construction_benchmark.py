@@ -0,0 +1,105 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+"""
+Benchmark for constructing a Python Optimizer for a large pose graph from NumericFactors
+
+Reports the construction time and the peak memory of the process
+"""
+
+import resource
+import time
+
+import argh
+
+import symforce
+
+symforce.set_epsilon_to_symbol()
+
+import symforce.symbolic as sf
+from symforce import logger
+from symforce import typing as T
+from symforce.opt.factor import Factor
+from symforce.opt.numeric_factor import NumericFactor
+from symforce.opt.optimizer import Optimizer
+
+
+def prior_residual(pose: sf.Pose2, prior: sf.Pose2, epsilon: sf.Scalar) -> sf.V3:
+    return sf.V3(prior.local_coordinates(pose, epsilon=epsilon))
+
+
+def odometry_residual(a: sf.Pose2, b: sf.Pose2, a_T_b: sf.Pose2, epsilon: sf.Scalar) -> sf.V3:
+    return sf.V3(a_T_b.local_coordinates(a.inverse() * b, epsilon=epsilon))
+
+
+def build_numeric_factors(num_poses: int) -> T.List[NumericFactor]:
+    """
+    Build the factors for a chain of num_poses poses, with a prior on each pose and odometry between
+    each consecutive pair.  Each type of factor shares one generated linearization function.
+    """
+    prior_linearization = (
+        Factor(keys=["pose", "prior", "epsilon"], residual=prior_residual)
+        .to_numeric_factor(["pose"])
+        .linearization_function
+    )
+    odometry_linearization = (
+        Factor(keys=["a", "b", "a_T_b", "epsilon"], residual=odometry_residual)
+        .to_numeric_factor(["a", "b"])
+        .linearization_function
+    )
+
+    factors = []
+    for i in range(num_poses):
+        factors.append(
+            NumericFactor(
+                keys=[f"x{i}", f"prior{i}", "epsilon"],
+                optimized_keys=[f"x{i}"],
+                linearization_function=prior_linearization,
+            )
+        )
+        if i > 0:
+            factors.append(
+                NumericFactor(
+                    keys=[f"x{i - 1}", f"x{i}", f"odometry{i - 1}", "epsilon"],
+                    optimized_keys=[f"x{i - 1}", f"x{i}"],
+                    linearization_function=odometry_linearization,
+                )
+            )
+    return factors
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@argh.arg("--num_factors", help="Approximate total number of factors in the problem")
+def main(num_factors: int = 1_000_000) -> None:
+    num_poses = (num_factors + 1) // 2
+
+    start_rss = max_rss_mb()
+
+    start = time.perf_counter()
+    factors = build_numeric_factors(num_poses)
+    factors_time = time.perf_counter() - start
+    factors_rss = max_rss_mb()
+
+    start = time.perf_counter()
+    optimizer = Optimizer(factors=factors, params=Optimizer.Params(verbose=False))
+    construction_time = time.perf_counter() - start
+    construction_rss = max_rss_mb()
+
+    logger.info(
+        f"Built {len(factors)} NumericFactors over {len(optimizer.optimized_keys)} keys in "
+        f"{factors_time:.3f} s (peak RSS {factors_rss:.1f} MB)"
+    )
+    logger.info(
+        f"Constructed Optimizer in {construction_time:.3f} s "
+        f"(peak RSS {construction_rss:.1f} MB, +{construction_rss - start_rss:.1f} MB total)"
+    )
+
+
+if __name__ == "__main__":
+    main.__doc__ = __doc__
+    argh.dispatch_command(main)
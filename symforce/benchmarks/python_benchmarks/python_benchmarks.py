@@ -0,0 +1,471 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+"""
+Pure-Python benchmark suite for the SymForce Python API
+
+Times code generation, conversion of symbolic factors to numeric factors, Values operations,
+optimizations with factors evaluated in Python and in C++, and covariance computation.  Results are
+written to a JSON file, which can be kept as a baseline and compared against later runs to catch
+regressions.
+"""
+
+import functools
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import argh
+import numpy as np
+
+import symforce
+
+symforce.set_epsilon_to_symbol()
+
+import sym
+import symforce.symbolic as sf
+from symforce import cc_sym
+from symforce import codegen
+from symforce import logger
+from symforce import typing as T
+from symforce.benchmarks.concurrent_optimization.concurrent_optimization_benchmark import (
+    build_imu_chain,
+)
+from symforce.examples.bundle_adjustment_in_the_large.bundle_adjustment_in_the_large import (
+    snavely_reprojection_residual,
+)
+from symforce.examples.robot_2d_localization import robot_2d_localization
+from symforce.examples.robot_3d_localization import robot_3d_localization
+from symforce.opt._internal.generated_residual_cache import GeneratedResidualCache
+from symforce.opt.factor import Factor
+from symforce.opt.optimizer import Optimizer
+from symforce.opt.optimizer_params import OptimizerParams
+from symforce.values import Values
+
+# The version of the format of the results files
+RESULTS_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """
+    A benchmark in the suite
+
+    Attributes:
+        name: The name of the benchmark in the results
+        setup: Does any untimed setup for the benchmark, and returns the function to time
+        max_repeat: If given, the benchmark is timed at most this many times, for benchmarks which
+            are slow enough that a few runs are representative
+    """
+
+    name: str
+    setup: T.Callable[[], T.Callable[[], T.Any]]
+    max_repeat: T.Optional[int] = None
+
+
+def clear_generated_residual_cache() -> None:
+    """
+    Clear the cache of generated linearization functions, so factors are generated from scratch
+    """
+    Factor._generated_residual_cache = GeneratedResidualCache()  # noqa: SLF001
+
+
+# -----------------------------------------------------------------------------
+# Codegen
+# -----------------------------------------------------------------------------
+
+
+def setup_generate_function(config: codegen.CodegenConfig) -> T.Callable[[], None]:
+    def generate_function() -> None:
+        output_dir = Path(tempfile.mkdtemp(prefix="sf_python_benchmarks_"))
+        try:
+            codegen.Codegen.function(
+                robot_3d_localization.odometry_residual, config
+            ).with_linearization(which_args=["world_T_a", "world_T_b"]).generate_function(
+                output_dir=output_dir, skip_directory_nesting=True
+            )
+        finally:
+            shutil.rmtree(output_dir)
+
+    return generate_function
+
+
+# -----------------------------------------------------------------------------
+# Factors
+# -----------------------------------------------------------------------------
+
+
+def setup_to_numeric_factor(cached: bool) -> T.Callable[[], None]:
+    factor = Factor(
+        keys=["a", "b", "a_T_b", "sigmas", "epsilon"],
+        residual=robot_3d_localization.odometry_residual,
+    )
+
+    def to_numeric_factor() -> None:
+        if not cached:
+            clear_generated_residual_cache()
+        factor.to_numeric_factor(optimized_keys=["a", "b"])
+
+    # Fill the cache for the cached version
+    clear_generated_residual_cache()
+    factor.to_numeric_factor(optimized_keys=["a", "b"])
+
+    return to_numeric_factor
+
+
+# -----------------------------------------------------------------------------
+# Values
+# -----------------------------------------------------------------------------
+
+
+def build_pose_values(num_poses: int) -> Values:
+    rng = np.random.default_rng(42)
+    return Values(
+        poses=[
+            sym.Pose3.from_tangent(rng.normal(size=6), epsilon=sf.numeric_epsilon)
+            for _ in range(num_poses)
+        ],
+        points=[rng.normal(size=3) for _ in range(num_poses)],
+    )
+
+
+def setup_values_operation(operation: str, num_poses: int = 100) -> T.Callable[[], T.Any]:
+    values = build_pose_values(num_poses)
+    storage = values.to_storage()
+    delta = np.random.default_rng(0).normal(scale=0.1, size=values.tangent_dim()).tolist()
+    other = values.retract(delta, epsilon=sf.numeric_epsilon)
+
+    operations: T.Dict[str, T.Callable[[], T.Any]] = {
+        "build": lambda: build_pose_values(num_poses),
+        "to_storage": values.to_storage,
+        "from_storage": lambda: values.from_storage(storage),
+        "retract": lambda: values.retract(delta, epsilon=sf.numeric_epsilon),
+        "local_coordinates": lambda: values.local_coordinates(other, epsilon=sf.numeric_epsilon),
+        "copy": values.copy,
+    }
+    return operations[operation]
+
+
+# -----------------------------------------------------------------------------
+# Optimization
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class PythonProblem:
+    """
+    A problem with symbolic factors, which are evaluated in Python
+    """
+
+    factors: T.List[Factor]
+    optimized_keys: T.List[str]
+    initial_values: Values
+    params: OptimizerParams
+
+
+def robot_2d_localization_problem() -> PythonProblem:
+    initial_values, num_poses, num_landmarks = robot_2d_localization.build_initial_values()
+    return PythonProblem(
+        factors=list(robot_2d_localization.build_factors(num_poses, num_landmarks)),
+        optimized_keys=[f"poses[{i}]" for i in range(num_poses)],
+        initial_values=initial_values,
+        params=Optimizer.Params(verbose=False),
+    )
+
+
+def robot_3d_localization_problem() -> PythonProblem:
+    initial_values, num_landmarks = robot_3d_localization.build_values(
+        robot_3d_localization.NUM_POSES
+    )
+    return PythonProblem(
+        factors=list(
+            robot_3d_localization.build_factors(robot_3d_localization.NUM_POSES, num_landmarks)
+        ),
+        optimized_keys=[f"world_T_body[{i}]" for i in range(robot_3d_localization.NUM_POSES)],
+        initial_values=initial_values,
+        params=Optimizer.Params(
+            verbose=False, initial_lambda=1e4, lambda_down_factor=1 / 2.0, iterations=50
+        ),
+    )
+
+
+def bundle_adjustment_problem(num_cameras: int = 5, num_points: int = 40) -> PythonProblem:
+    """
+    A synthetic problem with the Bundle-Adjustment-in-the-Large camera model, with every point seen
+    by every camera, and noisy initial values
+    """
+    rng = np.random.default_rng(42)
+
+    cameras = [
+        sym.Pose3(
+            R=sym.Rot3.from_tangent(rng.normal(scale=0.1, size=3)),
+            t=np.array([0.0, 0.0, -10.0]) + rng.normal(scale=0.5, size=3),
+        )
+        for _ in range(num_cameras)
+    ]
+    points = [rng.uniform(low=-2, high=2, size=3) for _ in range(num_points)]
+    intrinsics = np.array([500.0, 1e-3, 1e-5])
+
+    initial_values = Values(
+        cam_T_world=[
+            camera.retract(rng.normal(scale=0.01, size=6), epsilon=sf.numeric_epsilon)
+            for camera in cameras
+        ],
+        intrinsics=[intrinsics for _ in range(num_cameras)],
+        point=[point + rng.normal(scale=0.05, size=3) for point in points],
+        pixel=[[np.zeros(2) for _ in range(num_points)] for _ in range(num_cameras)],
+        epsilon=sf.numeric_epsilon,
+    )
+
+    factors = []
+    for i, camera in enumerate(cameras):
+        for j, point in enumerate(points):
+            # The same projection as snavely_reprojection_residual, plus noise
+            point_cam = camera * point
+            p = point_cam[:2] / -point_cam[2]
+            r = 1 + intrinsics[1] * p.dot(p) + intrinsics[2] * p.dot(p) ** 2
+            initial_values["pixel"][i][j] = intrinsics[0] * r * p + rng.normal(scale=0.5, size=2)
+            factors.append(
+                Factor(
+                    residual=snavely_reprojection_residual,
+                    keys=[
+                        f"cam_T_world[{i}]",
+                        f"intrinsics[{i}]",
+                        f"point[{j}]",
+                        f"pixel[{i}][{j}]",
+                        "epsilon",
+                    ],
+                )
+            )
+
+    return PythonProblem(
+        factors=factors,
+        # Fix the first camera and the intrinsics to remove the gauge freedom
+        optimized_keys=[f"cam_T_world[{i}]" for i in range(1, num_cameras)]
+        + [f"point[{j}]" for j in range(num_points)],
+        initial_values=initial_values,
+        params=Optimizer.Params(verbose=False, iterations=50),
+    )
+
+
+PYTHON_PROBLEMS: T.Dict[str, T.Callable[[], PythonProblem]] = {
+    "robot_2d_localization": robot_2d_localization_problem,
+    "robot_3d_localization": robot_3d_localization_problem,
+    "bundle_adjustment": bundle_adjustment_problem,
+}
+
+
+def setup_python_optimize(problem_name: str) -> T.Callable[[], Optimizer.Result]:
+    problem = PYTHON_PROBLEMS[problem_name]()
+    optimizer = Optimizer(
+        factors=problem.factors, optimized_keys=problem.optimized_keys, params=problem.params
+    )
+    return lambda: optimizer.optimize(problem.initial_values)
+
+
+def setup_cc_optimize(num_frames: int = 200) -> T.Callable[[], T.Any]:
+    factors, values, keys = build_imu_chain(num_frames)
+
+    params = cc_sym.default_optimizer_params()
+    params.verbose = False
+    params.iterations = 10
+
+    optimizer = cc_sym.Optimizer(params, factors, keys=keys)
+    return lambda: optimizer.optimize(cc_sym.Values(values))
+
+
+def setup_compute_all_covariances(problem_name: str) -> T.Callable[[], T.Dict[str, np.ndarray]]:
+    problem = PYTHON_PROBLEMS[problem_name]()
+    optimizer = Optimizer(
+        factors=problem.factors, optimized_keys=problem.optimized_keys, params=problem.params
+    )
+    optimized_values = optimizer.optimize(problem.initial_values).optimized_values
+    return lambda: optimizer.compute_all_covariances(optimized_values)
+
+
+BENCHMARKS = [
+    Benchmark(
+        "codegen/generate_function/python",
+        lambda: setup_generate_function(codegen.PythonConfig()),
+        max_repeat=3,
+    ),
+    Benchmark(
+        "codegen/generate_function/cpp",
+        lambda: setup_generate_function(codegen.CppConfig()),
+        max_repeat=3,
+    ),
+    Benchmark(
+        "factor/to_numeric_factor", lambda: setup_to_numeric_factor(cached=False), max_repeat=3
+    ),
+    Benchmark("factor/to_numeric_factor/cached", lambda: setup_to_numeric_factor(cached=True)),
+    *(
+        Benchmark(f"values/{operation}", functools.partial(setup_values_operation, operation))
+        for operation in [
+            "build",
+            "to_storage",
+            "from_storage",
+            "retract",
+            "local_coordinates",
+            "copy",
+        ]
+    ),
+    *(
+        Benchmark(f"optimize/python_factors/{name}", functools.partial(setup_python_optimize, name))
+        for name in PYTHON_PROBLEMS
+    ),
+    Benchmark("optimize/cc_factors/imu_chain", setup_cc_optimize),
+    *(
+        Benchmark(
+            f"covariance/compute_all_covariances/{name}",
+            functools.partial(setup_compute_all_covariances, name),
+        )
+        for name in ["robot_3d_localization", "bundle_adjustment"]
+    ),
+]
+
+
+# -----------------------------------------------------------------------------
+# Running and comparing
+# -----------------------------------------------------------------------------
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int) -> T.Dict[str, T.Any]:
+    """
+    Time the benchmark repeat times (or max_repeat times, if smaller), after one untimed warmup run,
+    and return the stats in seconds
+    """
+    if benchmark.max_repeat is not None:
+        repeat = min(repeat, benchmark.max_repeat)
+
+    func = benchmark.setup()
+    func()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+def run_benchmarks(benchmark_filter: T.Optional[str], repeat: int) -> T.Dict[str, T.Any]:
+    """
+    Run the benchmarks whose names contain benchmark_filter (or all of them), and return the results
+    """
+    results = {}
+    for benchmark in BENCHMARKS:
+        if benchmark_filter is not None and benchmark_filter not in benchmark.name:
+            continue
+        results[benchmark.name] = time_benchmark(benchmark, repeat)
+        logger.info(
+            f"{benchmark.name:<60} median {1e3 * results[benchmark.name]['median']:10.3f} ms"
+        )
+
+    return {
+        "version": RESULTS_VERSION,
+        "metadata": {
+            "symforce_version": getattr(symforce, "__version__", None),
+            "symbolic_api": symforce.get_symbolic_api(),
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(
+    baseline: T.Mapping[str, T.Any], results: T.Mapping[str, T.Any], tolerance: float
+) -> T.List[str]:
+    """
+    Compare the median times of results to baseline, and return the names of the benchmarks which
+    are slower than the baseline by more than the tolerance (a fraction of the baseline time)
+    """
+    for name, contents in (("baseline", baseline), ("results", results)):
+        if contents.get("version") != RESULTS_VERSION:
+            raise ValueError(
+                f"Unsupported {name} version {contents.get('version')}, expected {RESULTS_VERSION}"
+            )
+
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        baseline_result = baseline["benchmarks"].get(name)
+        if baseline_result is None:
+            logger.info(f"{name:<60} (not in baseline)")
+            continue
+
+        ratio = result["median"] / baseline_result["median"]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        logger.info(
+            f"{name:<60} {1e3 * baseline_result['median']:10.3f} ms -> "
+            f"{1e3 * result['median']:10.3f} ms ({ratio:5.2f}x){'  REGRESSION' if regressed else ''}"
+        )
+
+    return regressions
+
+
+def load_results(path: str) -> T.Dict[str, T.Any]:
+    return json.loads(Path(path).read_text())
+
+
+@argh.arg("--out", help="Path to write the results JSON to")
+@argh.arg("--baseline", help="Path to a baseline results JSON to compare the results against")
+@argh.arg("--benchmark_filter", help="Only run the benchmarks whose names contain this string")
+@argh.arg("--repeat", help="Number of timed runs of each benchmark")
+@argh.arg("--tolerance", help="Allowed slowdown relative to the baseline, as a fraction")
+def run(
+    out: T.Optional[str] = None,
+    baseline: T.Optional[str] = None,
+    benchmark_filter: T.Optional[str] = None,
+    repeat: int = 10,
+    tolerance: float = 0.1,
+) -> None:
+    """
+    Run the benchmarks, optionally write the results to a JSON file, and optionally compare them to
+    a baseline, exiting with an error if any benchmark regressed
+    """
+    results = run_benchmarks(benchmark_filter, repeat)
+
+    if out is not None:
+        Path(out).write_text(json.dumps(results, indent=2) + "\n")
+
+    if baseline is not None and compare_results(load_results(baseline), results, tolerance):
+        sys.exit(1)
+
+
+@argh.arg("--tolerance", help="Allowed slowdown relative to the baseline, as a fraction")
+def compare(baseline: str, results: str, tolerance: float = 0.1) -> None:
+    """
+    Compare a results JSON file to a baseline, exiting with an error if any benchmark regressed
+    """
+    if compare_results(load_results(baseline), load_results(results), tolerance):
+        sys.exit(1)
+
+
+def list_benchmarks() -> None:
+    """
+    Print the names of the benchmarks
+    """
+    for benchmark in BENCHMARKS:
+        print(benchmark.name)
+
+
+if __name__ == "__main__":
+    argh.dispatch_commands([run, compare, list_benchmarks])
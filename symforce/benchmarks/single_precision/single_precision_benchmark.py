@@ -0,0 +1,209 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+"""
+Benchmark comparing the Python Optimizer in single precision (dtype=np.float32) to double precision
+
+For each problem, reports the throughput and number of iterations of each precision, and the final
+error of each evaluated in double precision, along with the largest difference between the
+optimized values of the two.
+"""
+
+import time
+from dataclasses import dataclass
+
+import argh
+import numpy as np
+
+import symforce
+
+symforce.set_epsilon_to_symbol()
+
+from symforce import logger
+from symforce import typing as T
+from symforce.benchmarks.python_benchmarks.python_benchmarks import bundle_adjustment_problem
+from symforce.opt.factor import Factor
+from symforce.opt.numeric_factor import NumericFactor
+from symforce.opt.optimizer import Optimizer
+from symforce.opt.optimizer_params import OptimizerParams
+from symforce.values import Values
+
+LinearizationTuple = T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+@dataclass
+class Problem:
+    """
+    A problem to optimize with the Python Optimizer
+
+    Attributes:
+        batch_factors: Whether to linearize factors sharing a linearization function together
+    """
+
+    factors: T.Sequence[T.Union[Factor, NumericFactor]]
+    optimized_keys: T.List[str]
+    initial_values: Values
+    params: OptimizerParams
+    batch_factors: bool
+
+    def optimizer(self, dtype: T.Any = np.float64) -> Optimizer:
+        return Optimizer(
+            factors=self.factors,
+            optimized_keys=self.optimized_keys,
+            params=self.params,
+            batch_factors=self.batch_factors,
+            dtype=dtype,
+        )
+
+
+def prior_linearization(x: np.ndarray, target: np.ndarray) -> LinearizationTuple:
+    residual = x - target
+    jacobian = np.eye(3)
+    return residual, jacobian, jacobian, residual
+
+
+def batched_prior_linearization(x: np.ndarray, target: np.ndarray) -> LinearizationTuple:
+    residual = x - target
+    jacobian = np.broadcast_to(np.eye(3), (len(x), 3, 3))
+    return residual, jacobian, jacobian, residual
+
+
+def between_linearization(a: np.ndarray, b: np.ndarray, a_to_b: np.ndarray) -> LinearizationTuple:
+    residual = 10 * (b - a - a_to_b)
+    jacobian = 10 * np.hstack([-np.eye(3), np.eye(3)])
+    return residual, jacobian, jacobian.T @ jacobian, jacobian.T @ residual
+
+
+def batched_between_linearization(
+    a: np.ndarray, b: np.ndarray, a_to_b: np.ndarray
+) -> LinearizationTuple:
+    residual = 10 * (b - a - a_to_b)
+    jacobian = 10 * np.hstack([-np.eye(3), np.eye(3)])
+    return (
+        residual,
+        np.broadcast_to(jacobian, (len(a), 3, 6)),
+        np.broadcast_to(jacobian.T @ jacobian, (len(a), 6, 6)),
+        residual @ jacobian,
+    )
+
+
+def bundle_adjustment(num_cameras: int = 10, num_points: int = 100) -> Problem:
+    """
+    The synthetic bundle adjustment problem from the Python benchmarks, whose factors are evaluated
+    in Python one at a time
+    """
+    problem = bundle_adjustment_problem(num_cameras, num_points)
+    return Problem(
+        factors=problem.factors,
+        optimized_keys=problem.optimized_keys,
+        initial_values=problem.initial_values,
+        params=problem.params,
+        batch_factors=False,
+    )
+
+
+def point_chain(num_points: int = 20000) -> Problem:
+    """
+    A long chain of 3D points with a noisy prior on each point and a stiffer noisy offset between
+    each consecutive pair, with factors linearized in batches by numpy, so most of the time is spent
+    in the C++ linear algebra
+    """
+    rng = np.random.default_rng(42)
+    truth = np.cumsum(rng.normal(size=(num_points, 3)), axis=0)
+
+    initial_values = Values()
+    factors = []
+    for i in range(num_points):
+        initial_values[f"x{i}"] = np.zeros(3)
+        initial_values[f"target{i}"] = truth[i] + rng.normal(scale=1.0, size=3)
+        factors.append(
+            NumericFactor(
+                [f"x{i}", f"target{i}"],
+                [f"x{i}"],
+                prior_linearization,
+                batched_prior_linearization,
+            )
+        )
+    for i in range(num_points - 1):
+        initial_values[f"offset{i}"] = truth[i + 1] - truth[i] + rng.normal(scale=0.1, size=3)
+        factors.append(
+            NumericFactor(
+                [f"x{i}", f"x{i + 1}", f"offset{i}"],
+                [f"x{i}", f"x{i + 1}"],
+                between_linearization,
+                batched_between_linearization,
+            )
+        )
+
+    return Problem(
+        factors=factors,
+        optimized_keys=[f"x{i}" for i in range(num_points)],
+        initial_values=initial_values,
+        params=Optimizer.Params(verbose=False),
+        batch_factors=True,
+    )
+
+
+PROBLEMS: T.Dict[str, T.Callable[[], Problem]] = {
+    "bundle_adjustment": bundle_adjustment,
+    "point_chain": point_chain,
+}
+
+
+def storage(value: T.Any) -> np.ndarray:
+    """
+    The storage of a numerical entry of a Values, in double precision
+    """
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float64).ravel()
+    return np.array(value.to_storage(), dtype=np.float64)
+
+
+def max_difference(a: Values, b: Values, keys: T.Sequence[str]) -> float:
+    """
+    The largest difference between the storage of the given keys in a and b
+    """
+    return max(float(np.max(np.abs(storage(a[key]) - storage(b[key])))) for key in keys)
+
+
+@argh.arg("--problem", help="Only run this problem")
+@argh.arg("--repeat", help="Number of timed optimizations for each precision")
+def main(problem: T.Optional[str] = None, repeat: int = 5) -> None:
+    for name, make_problem in PROBLEMS.items():
+        if problem is not None and name != problem:
+            continue
+
+        benchmark_problem = make_problem()
+
+        optimized_values = {}
+        for dtype in (np.float64, np.float32):
+            optimizer = benchmark_problem.optimizer(dtype)
+
+            # Warm up, which also builds the linearizer and analyzes the sparsity pattern
+            optimizer.optimize(benchmark_problem.initial_values)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                result = optimizer.optimize(benchmark_problem.initial_values)
+            seconds = (time.perf_counter() - start) / repeat
+            optimized_values[dtype] = result.optimized_values
+
+            # Evaluate the final error in double precision, so the two are comparable
+            error = benchmark_problem.optimizer().linearize(result.optimized_values).error()
+            logger.info(
+                f"{name:<20} {np.dtype(dtype).name:<8} {1 / seconds:8.2f} optimizations/s, "
+                f"{len(result.iterations):3d} iterations, final error {error:.9g}"
+            )
+
+        difference = max_difference(
+            optimized_values[np.float64],
+            optimized_values[np.float32],
+            benchmark_problem.optimized_keys,
+        )
+        logger.info(f"{name:<20} max difference of the optimized values {difference:.3g}")
+
+
+if __name__ == "__main__":
+    main.__doc__ = __doc__
+    argh.dispatch_command(main)
@@ -4,6 +4,7 @@
 # ----------------------------------------------------------------------------
 
 import sympy
+from sympy.printing.numpy import NumPyPrinter as _NumPyPrinter
 from sympy.printing.pycode import PythonCodePrinter as _PythonCodePrinter
 
 
@@ -60,3 +61,48 @@ class PythonCodePrinter(_PythonCodePrinter):
         return "{}[int({})]".format(
             expr.parent, self._print(expr.j + expr.i * expr.parent.shape[1])
         )
+
+
+class NumPyCodePrinter(_NumPyPrinter):
+    """
+    Symforce customized code printer for vectorized NumPy code, used by PythonConfig with
+    ``batched=True``.  Every symbol may be an ndarray of the same (or broadcastable) shape, so all
+    functions are printed as elementwise NumPy functions.
+    """
+
+    def _print_Max(self, expr: sympy.Max) -> str:
+        """
+        The default uses ``numpy.amax`` on a tuple of the arguments, which fails if some arguments
+        are arrays and some are scalars.
+        """
+        if len(expr.args) == 1:
+            return self._print(expr.args[0])
+        else:
+            return "numpy.maximum({}, {})".format(
+                self._print(expr.args[0]), self._print(sympy.Max(*expr.args[1:]))
+            )
+
+    def _print_Min(self, expr: sympy.Min) -> str:
+        """
+        The default uses ``numpy.amin`` on a tuple of the arguments, which fails if some arguments
+        are arrays and some are scalars.
+        """
+        if len(expr.args) == 1:
+            return self._print(expr.args[0])
+        else:
+            return "numpy.minimum({}, {})".format(
+                self._print(expr.args[0]), self._print(sympy.Min(*expr.args[1:]))
+            )
+
+    # NOTE(brad): See PythonCodePrinter._print_Heaviside for why this is type ignored
+    def _print_Heaviside(self, expr: "sympy.Heaviside") -> str:  # type: ignore[override]
+        """
+        Match PythonCodePrinter, which gives 1 at 0
+        """
+        return f"numpy.heaviside({self._print(expr.args[0])}, 1.0)"
+
+    def _print_SignNoZero(self, expr: sympy.Function) -> str:
+        return f"numpy.copysign(1.0, {self._print(expr.args[0])})"
+
+    def _print_CopysignNoZero(self, expr: sympy.Function) -> str:
+        return f"numpy.copysign({self._print(expr.args[0])}, {self._print(expr.args[1])})"
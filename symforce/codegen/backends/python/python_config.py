@@ -47,6 +47,15 @@ class PythonConfig(CodegenConfig):
                          automatically reshaping the input.
         return_2d_vectors: Return all matrices as 2d ndarrays if True. If False and a matrix has
                            either only 1 row or only 1 column, return as a 1d ndarray.
+        batched: Generate a vectorized function, which evaluates many sets of inputs at once.  Each
+                 input is an ndarray with leading batch dimensions followed by the shape of one
+                 input, e.g. N scalars as an array of shape (N,), N Rot3s as their storage in an
+                 array of shape (N, 4), or N 3x3 matrices as an array of shape (N, 3, 3).  The
+                 batch dimensions of the inputs are broadcast together, and each output has the
+                 broadcast batch dimensions followed by its own shape, with geo and cam outputs
+                 returned as arrays of their storage.  Only scalar, matrix, geo, and cam inputs
+                 and outputs are supported, and it cannot be combined with ``use_numba`` or
+                 sparse outputs.
     """
 
     doc_comment_line_prefix: str = ""
@@ -55,6 +64,7 @@ class PythonConfig(CodegenConfig):
     use_numba: bool = False
     reshape_vectors: bool = True
     return_2d_vectors: bool = False
+    batched: bool = False
 
     @classmethod
     def backend_name(cls) -> str:
@@ -71,13 +81,15 @@ class PythonConfig(CodegenConfig):
             ("function/__init__.py.jinja", "__init__.py"),
         ]
 
-    @staticmethod
-    def printer() -> CodePrinter:
+    def printer(self) -> CodePrinter:
+        if self.batched:
+            return python_code_printer.NumPyCodePrinter()
         return python_code_printer.PythonCodePrinter()
 
-    @staticmethod
-    def format_matrix_accessor(key: str, i: int, j: int, *, shape: T.Tuple[int, int]) -> str:
+    def format_matrix_accessor(self, key: str, i: int, j: int, *, shape: T.Tuple[int, int]) -> str:
         PythonConfig._assert_indices_in_bounds(i, j, shape)
+        if self.batched:
+            return f"{key}[..., {i}, {j}]"
         return f"{key}[{i}, {j}]"
 
     @staticmethod
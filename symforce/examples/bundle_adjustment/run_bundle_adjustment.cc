@@ -14,6 +14,7 @@
 #include <symforce/opt/optimizer.h>
 
 #include "./build_example_state.h"
+#include "./run_bundle_adjustment.h"
 
 namespace bundle_adjustment {
 
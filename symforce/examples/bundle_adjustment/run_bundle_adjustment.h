@@ -5,8 +5,26 @@
 
 #pragma once
 
+#include <vector>
+
+#include <symforce/opt/factor.h>
+#include <symforce/opt/key.h>
+
+#include "./build_example_state.h"
+
 namespace bundle_adjustment {
 
+/**
+ * Build the factors for the problem created by BuildValues with the same params
+ */
+std::vector<sym::Factord> BuildFactors(const BundleAdjustmentProblemParams& params);
+
+/**
+ * Compute the keys in the Values which are optimized (as opposed to fixed), which are all of the
+ * keys optimized by the factors except the pose of view 0
+ */
+std::vector<sym::Key> ComputeKeysToOptimizeWithoutView0(const std::vector<sym::Factord>& factors);
+
 void RunBundleAdjustment();
 
-}
+}  // namespace bundle_adjustment
@@ -0,0 +1,144 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <fstream>
+#include <string>
+#include <vector>
+
+#include <Eigen/Core>
+#include <spdlog/spdlog.h>
+
+#include <sym/pose3.h>
+#include <symforce/opt/factor.h>
+#include <symforce/opt/key.h>
+#include <symforce/opt/values.h>
+
+#include "./gen/keys.h"
+#include "./gen/snavely_reprojection_factor.h"
+
+namespace bundle_adjustment_in_the_large {
+
+/**
+ * Create a `sym::Factor` for the reprojection residual, attached to the given camera and point
+ * variables.  It's also attached to fixed entries in the Values for the pixel measurement and the
+ * constant EPSILON.
+ */
+inline sym::Factord MakeFactor(int camera, int point, int pixel) {
+  return sym::Factord::Hessian(sym::SnavelyReprojectionFactor<double>,
+                               /* all_keys = */
+                               {
+                                   sym::Keys::CAM_T_WORLD.WithSuper(camera),
+                                   sym::Keys::INTRINSICS.WithSuper(camera),
+                                   sym::Keys::POINT.WithSuper(point),
+                                   sym::Keys::PIXEL.WithSuper(pixel),
+                                   sym::Keys::EPSILON,
+                               },
+                               /* optimized_keys = */
+                               {
+                                   sym::Keys::CAM_T_WORLD.WithSuper(camera),
+                                   sym::Keys::INTRINSICS.WithSuper(camera),
+                                   sym::Keys::POINT.WithSuper(point),
+                               });
+}
+
+/**
+ * A struct to represent the problem definition
+ */
+struct Problem {
+  std::vector<sym::Factord> factors;
+  sym::Valuesd values;
+  int num_cameras;
+  int num_points;
+  int num_observations;
+};
+
+/**
+ * Read the problem description from the given path
+ *
+ * See https://grail.cs.washington.edu/projects/bal/ for file format description
+ */
+inline Problem ReadProblem(const std::string& filename) {
+  std::ifstream file(filename);
+
+  int num_cameras, num_points, num_observations;
+  file >> num_cameras;
+  file >> num_points;
+  file >> num_observations;
+
+  std::vector<sym::Factord> factors;
+  sym::Valuesd values;
+
+  for (int i = 0; i < num_observations; i++) {
+    int camera, point;
+    file >> camera;
+    file >> point;
+
+    double px, py;
+    file >> px;
+    file >> py;
+
+    factors.push_back(MakeFactor(camera, point, i));
+    values.Set(sym::Keys::PIXEL.WithSuper(i), Eigen::Vector2d(px, py));
+  }
+
+  for (int i = 0; i < num_cameras; i++) {
+    double rx, ry, rz, tx, ty, tz, f, k1, k2;
+    file >> rx;
+    file >> ry;
+    file >> rz;
+    file >> tx;
+    file >> ty;
+    file >> tz;
+    file >> f;
+    file >> k1;
+    file >> k2;
+
+    values.Set(sym::Keys::CAM_T_WORLD.WithSuper(i),
+               sym::Pose3d(sym::Rot3d::FromTangent(Eigen::Vector3d(rx, ry, rz)),
+                           Eigen::Vector3d(tx, ty, tz)));
+    values.Set(sym::Keys::INTRINSICS.WithSuper(i), Eigen::Vector3d(f, k1, k2));
+  }
+
+  for (int i = 0; i < num_points; i++) {
+    double x, y, z;
+    file >> x;
+    file >> y;
+    file >> z;
+
+    values.Set(sym::Keys::POINT.WithSuper(i), Eigen::Vector3d(x, y, z));
+  }
+
+  values.Set(sym::Keys::EPSILON, sym::kDefaultEpsilond);
+
+  spdlog::info("Created problem with {} cameras, {} points, {} observations", num_cameras,
+               num_points, num_observations);
+
+  return {std::move(factors), std::move(values), num_cameras, num_points, num_observations};
+}
+
+/**
+ * The optimized keys of the problem, with all of the cameras first and all of the points last.
+ *
+ * By default the optimizer orders keys by their first appearance in the factors, which interleaves
+ * the points with the cameras.  With the points last, linear_solver_type_t::SCHUR and PCG
+ * eliminate them with a Schur complement, and factorize or run conjugate gradients on the much
+ * smaller camera system.
+ */
+inline std::vector<sym::Key> OptimizedKeys(const Problem& problem) {
+  std::vector<sym::Key> keys;
+  keys.reserve(2 * problem.num_cameras + problem.num_points);
+  for (int i = 0; i < problem.num_cameras; i++) {
+    keys.push_back(sym::Keys::CAM_T_WORLD.WithSuper(i));
+    keys.push_back(sym::Keys::INTRINSICS.WithSuper(i));
+  }
+  for (int i = 0; i < problem.num_points; i++) {
+    keys.push_back(sym::Keys::POINT.WithSuper(i));
+  }
+  return keys;
+}
+
+}  // namespace bundle_adjustment_in_the_large
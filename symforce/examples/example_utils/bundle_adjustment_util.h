@@ -132,6 +132,11 @@ inline optimizer_params_t OptimizerParams() {
   params.keep_max_diagonal_damping = false;
   params.diagonal_damping_min = 1e-6;
   params.enable_bold_updates = false;
+  params.num_threads = 1;
+  params.linear_solver_type = sym::linear_solver_type_t::DIRECT;
+  params.dogleg_initial_radius = 100.0;
+  params.dogleg_min_radius = 1e-10;
+  params.dogleg_hessian_damping = 1e-9;
   return params;
 }
 
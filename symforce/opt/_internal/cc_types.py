@@ -0,0 +1,92 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from symforce import cc_sym
+from symforce import typing as T
+
+# The C++ types of either precision
+CcValues = T.Union[cc_sym.Values, cc_sym.Valuesf]
+CcLinearization = T.Union[
+    cc_sym.Linearization,
+    cc_sym.Linearizationf,
+    cc_sym.DenseLinearization,
+    cc_sym.DenseLinearizationf,
+]
+CcOptimizationStats = T.Union[
+    cc_sym.OptimizationStats,
+    cc_sym.OptimizationStatsf,
+    cc_sym.DenseOptimizationStats,
+    cc_sym.DenseOptimizationStatsf,
+]
+CcOptimizationIterationInfo = T.Union[
+    cc_sym.OptimizationIterationInfo,
+    cc_sym.OptimizationIterationInfof,
+    cc_sym.DenseOptimizationIterationInfo,
+    cc_sym.DenseOptimizationIterationInfof,
+]
+
+
+@dataclass(frozen=True)
+class CcTypes:
+    """
+    The ``cc_sym`` classes used to optimize in one floating point precision
+
+    Attributes:
+        values: The C++ Values class, ``cc_sym.Values`` or ``cc_sym.Valuesf``
+        factor: The C++ Factor class, ``cc_sym.Factor`` or ``cc_sym.Factorf``
+        optimizers: The C++ optimizer class for each nonlinear solver, by the name of the solver
+        dense_optimizer: The C++ optimizer class which linearizes into dense matrices, with the
+            Levenberg-Marquardt solver
+    """
+
+    values: T.Any
+    factor: T.Any
+    optimizers: T.Mapping[str, T.Any]
+    dense_optimizer: T.Any
+
+
+_CC_TYPES = {
+    np.dtype(np.float64): CcTypes(
+        values=cc_sym.Values,
+        factor=cc_sym.Factor,
+        optimizers={
+            "levenberg_marquardt": cc_sym.Optimizer,
+            "dogleg": cc_sym.DoglegOptimizer,
+        },
+        dense_optimizer=cc_sym.DenseOptimizer,
+    ),
+    np.dtype(np.float32): CcTypes(
+        values=cc_sym.Valuesf,
+        factor=cc_sym.Factorf,
+        optimizers={
+            "levenberg_marquardt": cc_sym.Optimizerf,
+            "dogleg": cc_sym.DoglegOptimizerf,
+        },
+        dense_optimizer=cc_sym.DenseOptimizerf,
+    ),
+}
+
+
+def cc_types(dtype: T.Any) -> CcTypes:
+    """
+    The ``cc_sym`` classes for the given dtype, which must be ``np.float64`` or ``np.float32`` (or
+    anything ``np.dtype`` converts to one of them)
+
+    Raises:
+        ValueError: If the dtype is not supported
+    """
+    try:
+        types = _CC_TYPES.get(np.dtype(dtype))
+    except TypeError:
+        types = None
+    if types is None:
+        raise ValueError(f"Unsupported dtype {dtype}, expected np.float64 or np.float32")
+    return types
@@ -0,0 +1,227 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import numbers
+
+import numpy as np
+
+from symforce import cc_sym
+from symforce import typing as T
+from symforce.opt._internal.cc_types import CcValues
+from symforce.opt._internal.cc_types import cc_types
+from symforce.values import Values
+
+
+class CcValuesLayout:
+    """
+    Precomputed mapping between the keys of a numerical Python
+    :class:`Values <symforce.values.values.Values>` and the data buffer of a ``cc_sym.Values``
+    holding the same entries, used to transfer whole Values between Python and C++ without a pybind
+    call per key.
+
+    The layout is built once from an example Values, by setting each entry into a template
+    ``cc_sym.Values`` in the order of ``values.keys_recursive()``.  The C++ Values then stores the
+    entries contiguously in that order, so its data buffer is the concatenation of the storage of
+    each entry.  Subsequent Values with the same keys are packed into a single numpy buffer, which
+    is copied into a copy of the template in one call, and results are read back from a view of the
+    C++ data buffer.
+
+    Args:
+        values: A numerical Values, e.g. from :meth:`Values.to_numerical
+            <symforce.values.values.Values.to_numerical>`
+        cc_keys: The C++ key for each key in ``values.keys_recursive()``, in the same order
+        dtype: The precision of the C++ Values, ``np.float64`` for a ``cc_sym.Values`` or
+            ``np.float32`` for a ``cc_sym.Valuesf``
+    """
+
+    def __init__(
+        self, values: Values, cc_keys: T.Sequence[cc_sym.Key], dtype: T.Any = np.float64
+    ) -> None:
+        items = values.items_recursive()
+        assert len(items) == len(cc_keys)
+
+        self.keys = [key for key, _ in items]
+        self._key_indices = {key: i for i, key in enumerate(self.keys)}
+
+        self.dtype = np.dtype(dtype)
+        self.template = cc_types(dtype).values()
+        for cc_key, (_, value) in zip(cc_keys, items):
+            self.template.set(cc_key, value)
+
+        # For each entry, the slice of the data buffer it occupies, and the shape of the array
+        # returned by cc_sym.Values.at for matrices (vectors are returned flattened)
+        self._entries: T.List[T.Tuple[int, int, T.Any, T.Optional[T.Tuple[int, ...]]]] = []
+        offset = 0
+        for _, value in items:
+            if isinstance(value, np.ndarray):
+                shape: T.Optional[T.Tuple[int, ...]] = (
+                    (value.size,) if value.ndim == 1 or 1 in value.shape else value.shape
+                )
+                dim = value.size
+                datatype: T.Any = np.ndarray
+            elif isinstance(value, numbers.Real):
+                shape = None
+                dim = 1
+                datatype = float
+            else:
+                shape = None
+                dim = value.storage_dim()
+                datatype = type(value)
+            self._entries.append((offset, offset + dim, datatype, shape))
+            offset += dim
+
+        self.storage_dim = offset
+
+        # The start of each entry in the data buffer, for finding which entries changed
+        self._starts: np.ndarray = np.array(
+            [start for start, _, _, _ in self._entries], dtype=np.intp
+        )
+
+        # Not an exact comparison, since the C++ types may renormalize their storage when set (e.g.
+        # the quaternion of a Rot3)
+        packed = self.pack(values)
+        assert packed is not None and np.allclose(packed, self.template.data_view()), (
+            "cc_sym.Values did not store the entries contiguously in insertion order"
+        )
+
+    def pack(self, values: Values) -> T.Optional[np.ndarray]:
+        """
+        Pack the storage of the numerical Values into a single buffer in the layout of the template,
+        or return None if values does not have the same keys and storage dimensions as the Values
+        used to build the layout.
+        """
+        items = values.items_recursive()
+        if len(items) != len(self.keys):
+            return None
+
+        storage: T.List[float] = []
+        for (key, value), layout_key in zip(items, self.keys):
+            if key != layout_key:
+                return None
+
+            storage.extend(self._storage(value))
+
+        if len(storage) != self.storage_dim:
+            return None
+
+        return np.array(storage, dtype=self.dtype)
+
+    @staticmethod
+    def _storage(value: T.Any) -> T.List[float]:
+        """
+        The storage of a single numerical entry, in the order it's stored in a cc_sym.Values
+        """
+        if isinstance(value, np.ndarray):
+            return value.ravel(order="F").tolist()
+        elif isinstance(value, numbers.Real):
+            return [float(value)]
+        else:
+            return value.to_storage()
+
+    def to_cc_values(self, values: Values) -> T.Optional[CcValues]:
+        """
+        Create a cc_sym.Values holding the numerical Values, or return None if values does not have
+        the same keys and storage dimensions as the Values used to build the layout.
+        """
+        packed = self.pack(values)
+        if packed is None:
+            return None
+
+        cc_values = type(self.template)(self.template)
+        cc_values.set_data(packed)
+        return cc_values
+
+    def from_cc_values(self, cc_values: CcValues) -> Values:
+        """
+        Read a Python Values back out of a cc_sym.Values with this layout, such as one created by
+        :meth:`to_cc_values` and then optimized.
+
+        Matrix entries are returned as numpy views of the data buffer of ``cc_values``.
+        """
+        data = cc_values.data_view()
+        assert data.size == self.storage_dim
+
+        data_list = data.tolist()
+        return Values(**{key: self._entry(data, data_list, i) for i, key in enumerate(self.keys)})
+
+    def _entry(self, data: np.ndarray, data_list: T.Sequence[float], i: int) -> T.Any:
+        """
+        Read entry i out of a data buffer with this layout, given as both an array and a sequence
+        """
+        start, end, datatype, shape = self._entries[i]
+        if datatype is float:
+            return data_list[start]
+        elif datatype is np.ndarray:
+            assert shape is not None
+            return data[start:end].reshape(shape, order="F")
+        else:
+            return datatype.from_storage(data_list[start:end])
+
+    def update_cc_values(self, cc_values: CcValues, entries: T.Mapping[str, T.Any]) -> None:
+        """
+        Overwrite the given entries of a cc_sym.Values with this layout in place, by writing their
+        storage into its data buffer
+
+        Raises:
+            KeyError: If one of the keys is not in the layout
+            ValueError: If the storage dimension of one of the entries doesn't match the layout
+        """
+        data = cc_values.data_view()
+        assert data.size == self.storage_dim
+
+        for key, value in entries.items():
+            start, end, _, _ = self._entries[self._key_indices[key]]
+            storage = self._storage(value)
+            if len(storage) != end - start:
+                raise ValueError(
+                    f"Entry {key} has storage dimension {len(storage)}, expected {end - start}"
+                )
+            data[start:end] = storage
+
+    def changed_entries(
+        self, before: np.ndarray, cc_values: CcValues
+    ) -> T.Tuple[T.Dict[str, T.Any], T.Dict[str, T.Any]]:
+        """
+        Find the entries of a cc_sym.Values with this layout whose storage differs from the data
+        buffer ``before``, e.g. a copy of its data buffer from before an optimization
+
+        The entries are returned as dicts from their flattened keys, like ``poses[3]``, since a
+        Values can't hold some elements of a list without the ones before them.  Matrix entries are
+        copies, so they don't change with ``before`` or with later updates to ``cc_values``.
+
+        Returns:
+            Dicts from the keys of the changed entries to their values, before and after
+        """
+        data = cc_values.data_view()
+        assert data.size == self.storage_dim and before.size == self.storage_dim
+
+        if self.storage_dim == 0:
+            return {}, {}
+
+        # Whether any of the storage of each entry changed
+        changed = np.flatnonzero(np.logical_or.reduceat(data != before, self._starts)).tolist()
+
+        before_entries = {}
+        after_entries = {}
+        for i in changed:
+            start, end, _, _ = self._entries[i]
+            before_entries[self.keys[i]] = self._entry_from_storage(i, before[start:end])
+            after_entries[self.keys[i]] = self._entry_from_storage(i, data[start:end])
+        return before_entries, after_entries
+
+    def _entry_from_storage(self, i: int, storage: np.ndarray) -> T.Any:
+        """
+        Read entry i out of its slice of a data buffer with this layout, copying matrix entries
+        """
+        _, _, datatype, shape = self._entries[i]
+        if datatype is float:
+            return float(storage[0])
+        elif datatype is np.ndarray:
+            assert shape is not None
+            return storage.reshape(shape, order="F").copy()
+        else:
+            return datatype.from_storage(storage.tolist())
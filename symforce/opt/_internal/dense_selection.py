@@ -0,0 +1,74 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+from symforce import typing as T
+
+# Problems with at most this many tangent dimensions are always optimized with dense matrices, since
+# for them the bookkeeping of the sparse linearizer and linear solver costs more than the dense
+# linear algebra.  See symforce/benchmarks/dense_optimizer for the crossover points.
+DENSE_ALWAYS_MAX_DIMENSION = 50
+
+# Problems with up to this many tangent dimensions are optimized with dense matrices if the lower
+# triangle of their hessian is at least DENSE_MIN_DENSITY full.  The chain in the benchmark breaks
+# even somewhere between 54 dimensions (density 0.45) and 72 dimensions (density 0.35), so this is
+# the density of the largest chain where dense was measured to be at least as fast.  Fully dense
+# problems are still slightly faster dense at 288 dimensions
+DENSE_MAX_DIMENSION = 300
+DENSE_MIN_DENSITY = 0.45
+
+
+def hessian_density(
+    tangent_dims: T.Mapping[str, int], factor_optimized_keys: T.Iterable[T.Sequence[str]]
+) -> float:
+    """
+    The fraction of the entries of the lower triangle of the hessian which are structurally nonzero
+
+    Args:
+        tangent_dims: The tangent dimension of each optimized key
+        factor_optimized_keys: The optimized keys of each factor
+    """
+    keys = list(tangent_dims)
+    key_index = {key: i for i, key in enumerate(keys)}
+
+    blocks = set()
+    for optimized_keys in factor_optimized_keys:
+        indices = sorted(key_index[key] for key in optimized_keys)
+        for col, col_index in enumerate(indices):
+            for row_index in indices[col:]:
+                blocks.add((row_index, col_index))
+
+    nonzeros = 0
+    for row_index, col_index in blocks:
+        if row_index == col_index:
+            dim = tangent_dims[keys[row_index]]
+            nonzeros += dim * (dim + 1) // 2
+        else:
+            nonzeros += tangent_dims[keys[row_index]] * tangent_dims[keys[col_index]]
+
+    dimension = sum(tangent_dims.values())
+    if dimension == 0:
+        return 1.0
+    return nonzeros / (dimension * (dimension + 1) // 2)
+
+
+def use_dense_optimizer(
+    tangent_dims: T.Mapping[str, int], factor_optimized_keys: T.Iterable[T.Sequence[str]]
+) -> bool:
+    """
+    Whether a problem is faster to optimize with dense matrices than with sparse ones, based on its
+    dimension and the density of its hessian
+
+    Args:
+        tangent_dims: The tangent dimension of each optimized key
+        factor_optimized_keys: The optimized keys of each factor
+    """
+    dimension = sum(tangent_dims.values())
+    if dimension <= DENSE_ALWAYS_MAX_DIMENSION:
+        return True
+    if dimension > DENSE_MAX_DIMENSION:
+        return False
+    return hessian_density(tangent_dims, factor_optimized_keys) >= DENSE_MIN_DENSITY
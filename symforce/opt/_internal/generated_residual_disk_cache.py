@@ -0,0 +1,220 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+import contextlib
+import dataclasses
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import symforce
+from symforce import logger
+from symforce import typing as T
+from symforce.codegen import codegen_util
+from symforce.codegen.similarity_index import SimilarityIndex
+
+
+class GeneratedResidualDiskCache:
+    """
+    Persistent, size-capped cache of generated python linearization functions, shared between
+    processes.
+
+    Where :class:`GeneratedResidualCache
+    <symforce.opt._internal.generated_residual_cache.GeneratedResidualCache>` only lives as long
+    as the process, this cache stores the generated source on disk, so that a fresh process which
+    builds the same factors can load the linearization functions directly instead of repeating
+    symbolic differentiation, CSE, and code generation.
+
+    Entries are keyed by a digest of the :class:`SimilarityIndex`, the optimized keys, the
+    namespace, and whether the linearization is sparse.  Unlike ``hash(SimilarityIndex)``, the
+    digest is stable across processes.
+
+    Layout of ``directory``::
+
+        entries/<digest>/metadata.json
+        entries/<digest>/python/symforce/<namespace>/<name>.py
+        tmp/
+        lock
+
+    New entries are written under ``tmp`` and then renamed into ``entries``, so readers never see a
+    partially written entry.  Loading takes a shared lock on ``lock``, and publishing and eviction
+    take an exclusive lock, so entries are never deleted while another process is importing them.
+    When the total size of ``entries`` exceeds ``max_size_bytes``, the least recently used entries
+    are evicted.
+
+    Args:
+        directory: The directory to store the cache in.  Created if it does not exist.
+        max_size_bytes: The maximum total size of the cached entries
+    """
+
+    METADATA_FILENAME = "metadata.json"
+
+    def __init__(self, directory: T.Openable, max_size_bytes: int = 256 * 1024 * 1024) -> None:
+        if max_size_bytes <= 0:
+            raise ValueError(f"max_size_bytes must be positive, got {max_size_bytes}")
+
+        self.directory = Path(directory)
+        self.max_size_bytes = max_size_bytes
+
+        self._entries_dir = self.directory / "entries"
+        self._tmp_dir = self.directory / "tmp"
+        self._entries_dir.mkdir(parents=True, exist_ok=True)
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.directory / "lock"
+        self._lock_path.touch(exist_ok=True)
+
+    @staticmethod
+    def key_digest(
+        index: SimilarityIndex,
+        optimized_keys: T.Iterable[str],
+        namespace: T.Optional[str],
+        sparse_linearization: bool,
+    ) -> str:
+        """
+        Returns a hex digest identifying the generated linearization function, which is stable
+        across processes.
+
+        In addition to the arguments, the digest includes the SymForce version and the symbolic
+        API, since either can change the generated code.
+        """
+        contents = repr(
+            (
+                getattr(symforce, "__version__", None),
+                symforce.get_symbolic_api(),
+                repr(index.inputs.index()),
+                [str(x) for x in index.inputs.to_storage()],
+                repr(index.outputs.index()),
+                [str(x) for x in index.outputs.to_storage()],
+                index.return_key,
+                index.sorted_sparse_matrices,
+                type(index.config).__qualname__,
+                dataclasses.asdict(index.config),
+                tuple(optimized_keys),
+                namespace,
+                sparse_linearization,
+            )
+        )
+        return hashlib.sha256(contents.encode("utf-8")).hexdigest()
+
+    @contextlib.contextmanager
+    def _locked(self, exclusive: bool) -> T.Iterator[None]:
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_residual(
+        self,
+        index: SimilarityIndex,
+        optimized_keys: T.Iterable[str],
+        namespace: T.Optional[str],
+        sparse_linearization: bool,
+    ) -> T.Optional[T.Callable]:
+        """
+        If a residual function has been stored using cache_residual with the given arguments (by
+        this or any other process), loads and returns it.
+
+        Otherwise, returns None.
+        """
+        entry_dir = self._entries_dir / self.key_digest(
+            index, optimized_keys, namespace, sparse_linearization
+        )
+
+        with self._locked(exclusive=False):
+            metadata_path = entry_dir / self.METADATA_FILENAME
+            try:
+                metadata = json.loads(metadata_path.read_text())
+                residual = codegen_util.load_generated_function(
+                    metadata["name"],
+                    entry_dir / "python" / "symforce" / metadata["namespace"],
+                )
+                # Mark as recently used
+                os.utime(metadata_path)
+            except (OSError, ValueError, KeyError, ImportError, AttributeError, SyntaxError) as ex:
+                if entry_dir.exists():
+                    logger.warning(f"Failed to load cached residual from {entry_dir}: {ex}")
+                return None
+
+        return residual
+
+    def cache_residual(
+        self,
+        index: SimilarityIndex,
+        optimized_keys: T.Iterable[str],
+        namespace: T.Optional[str],
+        sparse_linearization: bool,
+        output_dir: T.Openable,
+        generated_namespace: str,
+        name: str,
+    ) -> None:
+        """
+        Stores the residual function ``name`` generated into ``output_dir`` with namespace
+        ``generated_namespace`` (the directory structure created by
+        :meth:`Factor.generate <symforce.opt.factor.Factor.generate>`), so that it can be
+        retrieved with get_residual(index, optimized_keys, namespace, sparse_linearization).
+
+        Evicts least recently used entries if the cache is over its size limit afterwards.
+        """
+        digest = self.key_digest(index, optimized_keys, namespace, sparse_linearization)
+
+        staging_dir = self._tmp_dir / uuid.uuid4().hex
+        function_dir = Path("python") / "symforce" / generated_namespace
+        shutil.copytree(Path(output_dir) / function_dir, staging_dir / function_dir)
+        (staging_dir / self.METADATA_FILENAME).write_text(
+            json.dumps(dict(namespace=generated_namespace, name=name))
+        )
+
+        with self._locked(exclusive=True):
+            try:
+                staging_dir.rename(self._entries_dir / digest)
+            except OSError:
+                # Another process already stored this entry
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries until the total size is at most max_size_bytes.
+
+        Must be called with the exclusive lock held.
+        """
+        entries = []
+        total_size = 0
+        for entry_dir in self._entries_dir.iterdir():
+            try:
+                last_used = (entry_dir / self.METADATA_FILENAME).stat().st_mtime
+            except OSError:
+                last_used = 0.0
+            size = sum(f.stat().st_size for f in entry_dir.rglob("*") if f.is_file())
+            entries.append((last_used, size, entry_dir))
+            total_size += size
+
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            logger.debug(f"Evicting cached residual {entry_dir.name}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the cache
+        """
+        with self._locked(exclusive=True):
+            for entry_dir in self._entries_dir.iterdir():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of entries in the cache
+        """
+        return sum(1 for _ in self._entries_dir.iterdir())
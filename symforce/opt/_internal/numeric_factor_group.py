@@ -0,0 +1,328 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+from __future__ import annotations
+
+import numpy as np
+from scipy import sparse
+
+from lcmtypes.sym._index_entry_t import index_entry_t
+
+from symforce import cc_sym
+from symforce import typing as T
+from symforce.opt._internal.cc_types import CcValues
+from symforce.opt._internal.cc_types import cc_types
+from symforce.opt.numeric_factor import NumericFactor
+
+LinearizationTuple = T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class NumericFactorGroup:
+    """
+    A set of NumericFactors with the same linearization function, linearized together as a single
+    sparse C++ factor.
+
+    Instead of C++ calling into Python once per factor, the group is called once per linearization.
+    It gathers the arguments of all of its factors from the data buffer of the C++ Values into
+    stacked arrays, evaluates them with the ``batched_linearization_function`` of the factors (or
+    with ``linearization_function`` once per factor, if there is no batched version), and scatters
+    the results into the sparse jacobian and hessian of the group.
+
+    Use :func:`group_numeric_factors` to create groups from a list of factors.
+
+    Args:
+        factors: The factors in the group.  They must all have the same linearization functions,
+            the same number of keys, and their optimized keys at the same positions.
+    """
+
+    def __init__(self, factors: T.Sequence[NumericFactor]) -> None:
+        assert len(factors) > 0
+        self.factors = factors
+
+        first = factors[0]
+        self.linearization_function = first.linearization_function
+        self.batched_linearization_function = first.batched_linearization_function
+        self.num_keys = len(first.keys)
+        self.optimized_positions = [list(first.keys).index(key) for key in first.optimized_keys]
+        assert all(_group_key(factor) == _group_key(first) for factor in factors)
+
+        # The optimized keys of the C++ factor, in order of first appearance
+        self.optimized_keys = list(
+            dict.fromkeys(key for factor in factors for key in factor.optimized_keys)
+        )
+
+    def cc_factor(
+        self, cc_key_map: T.Mapping[str, cc_sym.Key], dtype: T.Any = np.float64
+    ) -> T.Union[cc_sym.Factor, cc_sym.Factorf]:
+        """
+        Create a single sparse C++ Factor for all of the factors in this group, for use with the
+        C++ Optimizer
+
+        Args:
+            cc_key_map: Mapping from Python keys (strings, like returned by
+                        :meth:`Values.keys_recursive <symforce.values.values.Values.keys_recursive>`
+                        ) to C++ keys
+            dtype: The precision of the C++ Factor, ``np.float64`` for a ``cc_sym.Factor`` or
+                ``np.float32`` for a ``cc_sym.Factorf``
+        Returns:
+            A C++ wrapped Factor object
+        """
+        layout: T.Optional[_NumericFactorGroupLayout] = None
+
+        def wrapped(values: CcValues, index_entries: T.List[index_entry_t]) -> LinearizationTuple:
+            nonlocal layout
+
+            # The C++ Optimizer requires that the layout of the Values does not change after the
+            # first linearization, but check the optimized keys (which we're given) to be safe
+            optimized_offsets = np.array([entry.offset for entry in index_entries])
+            if layout is None or not np.array_equal(optimized_offsets, layout.optimized_offsets):
+                layout = _NumericFactorGroupLayout(self, values, cc_key_map, optimized_offsets)
+
+            return layout.linearize(values.data_view())
+
+        return cc_types(dtype).factor(
+            wrapped, [cc_key_map[key] for key in self.optimized_keys], sparse=True
+        )
+
+
+def _group_key(factor: NumericFactor) -> T.Hashable:
+    return (
+        factor.linearization_function,
+        factor.batched_linearization_function,
+        len(factor.keys),
+        tuple(list(factor.keys).index(key) for key in factor.optimized_keys),
+    )
+
+
+def group_numeric_factors(
+    factors: T.Iterable[NumericFactor],
+) -> T.List[T.Union[NumericFactor, NumericFactorGroup]]:
+    """
+    Combine factors with the same linearization function (and structure of keys) into
+    NumericFactorGroups.
+
+    Factors which do not share their linearization function with any other factor, or which
+    use the same key for multiple arguments, are returned as is.
+    """
+    groups: T.Dict[T.Hashable, T.List[NumericFactor]] = {}
+    result: T.List[T.Union[NumericFactor, T.List[NumericFactor]]] = []
+    for factor in factors:
+        if len(set(factor.keys)) != len(factor.keys):
+            result.append(factor)
+            continue
+
+        key = _group_key(factor)
+        if key not in groups:
+            groups[key] = []
+            result.append(groups[key])
+        groups[key].append(factor)
+
+    return [
+        entry
+        if isinstance(entry, NumericFactor)
+        else entry[0]
+        if len(entry) == 1
+        else NumericFactorGroup(entry)
+        for entry in result
+    ]
+
+
+class _NumericFactorGroupLayout:
+    """
+    Where the arguments of each factor in a NumericFactorGroup are in the data buffer of the C++
+    Values, and where the linearization of each factor goes in the linearization of the group.
+
+    The sparsity pattern of the jacobian and hessian is computed on the first linearization, once
+    the residual dimension is known, and is the same for every call after that, as required by the
+    C++ Linearizer.
+    """
+
+    def __init__(
+        self,
+        group: NumericFactorGroup,
+        values: CcValues,
+        cc_key_map: T.Mapping[str, cc_sym.Key],
+        optimized_offsets: np.ndarray,
+    ) -> None:
+        self.group = group
+        self.optimized_offsets = optimized_offsets
+        self.num_factors = len(group.factors)
+
+        entries = values.items()
+
+        # For each argument, the indices of its storage for all factors in the data buffer, with
+        # shape (num_factors, storage_dim), and the type of the argument
+        self.gather_indices: T.List[np.ndarray] = []
+        self.arg_types: T.List[T.Any] = []
+        tangent_dims = []
+        for i in range(group.num_keys):
+            arg_entries = [entries[cc_key_map[factor.keys[i]]] for factor in group.factors]
+            offsets = np.array([entry.offset for entry in arg_entries])
+            self.gather_indices.append(
+                offsets[:, np.newaxis] + np.arange(arg_entries[0].storage_dim)
+            )
+            tangent_dims.append(arg_entries[0].tangent_dim)
+
+            example = values.at(arg_entries[0])
+            if isinstance(example, np.ndarray):
+                self.arg_types.append(example.shape)
+            elif isinstance(example, float):
+                self.arg_types.append(float)
+            else:
+                self.arg_types.append(type(example))
+
+        # The offset of each optimized key in the tangent space of the group
+        group_offsets = {}
+        self.tangent_dim = 0
+        for key in group.optimized_keys:
+            group_offsets[key] = self.tangent_dim
+            self.tangent_dim += entries[cc_key_map[key]].tangent_dim
+
+        # For each factor, the column in the group jacobian of each column of the factor jacobian
+        columns = []
+        for position in group.optimized_positions:
+            key_offsets = np.array(
+                [group_offsets[factor.keys[position]] for factor in group.factors]
+            )
+            columns.append(key_offsets[:, np.newaxis] + np.arange(tangent_dims[position]))
+        self.columns = np.concatenate(columns, axis=1)
+
+        self.residual_dim: T.Optional[int] = None
+
+    def _arguments(self, data: np.ndarray) -> T.List[np.ndarray]:
+        """
+        The batched arguments of the factors, as passed to batched_linearization_function
+        """
+        arguments = []
+        for gather_indices, arg_type in zip(self.gather_indices, self.arg_types):
+            storage = data[gather_indices]
+            if arg_type is float:
+                arguments.append(storage[:, 0])
+            elif isinstance(arg_type, tuple) and len(arg_type) == 2:
+                # Matrices are stored in column-major order
+                rows, cols = arg_type
+                arguments.append(storage.reshape(-1, cols, rows).transpose(0, 2, 1))
+            elif isinstance(arg_type, tuple):
+                arguments.append(storage.reshape((-1,) + arg_type))
+            else:
+                arguments.append(storage)
+        return arguments
+
+    def _evaluate(self, data: np.ndarray) -> LinearizationTuple:
+        """
+        Evaluate the linearizations of all the factors, stacked along the first axis
+        """
+        arguments = self._arguments(data)
+
+        if self.group.batched_linearization_function is not None:
+            return self.group.batched_linearization_function(*arguments)
+
+        per_factor_arguments = []
+        for argument, arg_type in zip(arguments, self.arg_types):
+            if arg_type is float:
+                per_factor_arguments.append(argument.tolist())
+            elif isinstance(arg_type, tuple):
+                per_factor_arguments.append(list(argument))
+            else:
+                per_factor_arguments.append([arg_type.from_storage(x) for x in argument.tolist()])
+
+        linearizations = [
+            self.group.linearization_function(*factor_arguments)
+            for factor_arguments in zip(*per_factor_arguments)
+        ]
+        residual, jacobian, hessian, rhs = (np.stack(x) for x in zip(*linearizations))
+        return residual, jacobian, hessian, rhs
+
+    def _compute_sparsity(self, residual_dim: int) -> None:
+        """
+        Compute the sparsity pattern of the group jacobian and hessian, and the permutations from
+        the stacked factor linearizations into their data arrays
+
+        The residual dimension is set last, since the group may be linearized from several threads
+        at once (taking turns holding the GIL), and other threads use the sparsity pattern as soon
+        as it matches.
+        """
+        factor_tangent_dim = self.columns.shape[1]
+
+        # Jacobian
+        rows = np.broadcast_to(
+            (np.arange(self.num_factors) * residual_dim)[:, np.newaxis, np.newaxis]
+            + np.arange(residual_dim)[np.newaxis, :, np.newaxis],
+            (self.num_factors, residual_dim, factor_tangent_dim),
+        ).ravel()
+        cols = np.broadcast_to(
+            self.columns[:, np.newaxis, :], (self.num_factors, residual_dim, factor_tangent_dim)
+        ).ravel()
+        self.jacobian_order = np.lexsort((rows, cols))
+        self.jacobian_indices = rows[self.jacobian_order]
+        self.jacobian_indptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(cols, minlength=self.tangent_dim)))
+        )
+
+        # Lower triangle of the hessian
+        local_rows, local_cols = np.tril_indices(factor_tangent_dim)
+        self.hessian_local_rows = local_rows
+        self.hessian_local_cols = local_cols
+        rows = self.columns[:, local_rows]
+        cols = self.columns[:, local_cols]
+        hessian_rows = np.maximum(rows, cols).ravel()
+        hessian_cols = np.minimum(rows, cols).ravel()
+        # Several factors may contribute to the same entry; sorting by column-major index gives the
+        # entries in CSC order
+        unique_entries, self.hessian_inverse = np.unique(
+            hessian_cols * self.tangent_dim + hessian_rows, return_inverse=True
+        )
+        self.hessian_nnz = len(unique_entries)
+        self.hessian_indices = unique_entries % self.tangent_dim
+        self.hessian_indptr = np.concatenate(
+            (
+                [0],
+                np.cumsum(
+                    np.bincount(unique_entries // self.tangent_dim, minlength=self.tangent_dim)
+                ),
+            )
+        )
+
+        self.residual_dim = residual_dim
+
+    def linearize(self, data: np.ndarray) -> LinearizationTuple:
+        """
+        Linearize all of the factors, given the data buffer of the C++ Values, and return the
+        residual, sparse jacobian, sparse lower triangle of the hessian, and rhs of the group
+        """
+        residual, jacobian, hessian, rhs = self._evaluate(data)
+        residual = np.asarray(residual).reshape(self.num_factors, -1)
+        residual_dim = residual.shape[1]
+        if self.residual_dim != residual_dim:
+            self._compute_sparsity(residual_dim)
+
+        factor_tangent_dim = self.columns.shape[1]
+        jacobian = np.asarray(jacobian).reshape(self.num_factors, residual_dim, factor_tangent_dim)
+        hessian = np.asarray(hessian).reshape(
+            self.num_factors, factor_tangent_dim, factor_tangent_dim
+        )
+        rhs = np.asarray(rhs).reshape(self.num_factors, factor_tangent_dim)
+
+        group_jacobian = sparse.csc_matrix(
+            (jacobian.ravel()[self.jacobian_order], self.jacobian_indices, self.jacobian_indptr),
+            shape=(self.num_factors * residual_dim, self.tangent_dim),
+        )
+        group_hessian = sparse.csc_matrix(
+            (
+                np.bincount(
+                    self.hessian_inverse.ravel(),
+                    weights=hessian[:, self.hessian_local_rows, self.hessian_local_cols].ravel(),
+                    minlength=self.hessian_nnz,
+                ),
+                self.hessian_indices,
+                self.hessian_indptr,
+            ),
+            shape=(self.tangent_dim, self.tangent_dim),
+        )
+        group_rhs = np.bincount(
+            self.columns.ravel(), weights=rhs.ravel(), minlength=self.tangent_dim
+        )
+
+        return residual.ravel(), group_jacobian, group_hessian, group_rhs
@@ -0,0 +1,36 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <atomic>
+
+namespace sym {
+
+/**
+ * A flag for cancelling an optimization from another thread
+ *
+ * Set on an Optimizer with Optimizer::SetCancellationToken().  Once Cancel() is called, the
+ * optimization stops after the iteration it's running, with status CANCELLED and the values set to
+ * the best values found so far, like when it runs out of iterations.  The token stays cancelled, so
+ * later optimizations with the same token stop after their first iteration - use a new token for
+ * each optimization which may be cancelled.
+ */
+class CancellationToken {
+ public:
+  // Request that the optimization stop.  Safe to call from any thread
+  void Cancel() {
+    cancelled_.store(true, std::memory_order_relaxed);
+  }
+
+  bool IsCancelled() const {
+    return cancelled_.load(std::memory_order_relaxed);
+  }
+
+ private:
+  std::atomic<bool> cancelled_{false};
+};
+
+}  // namespace sym
@@ -5,9 +5,11 @@
 
 #include "./dense_linearizer.h"
 
+#include <algorithm>
 #include <tuple>
 
 #include "./internal/linearizer_utils.h"
+#include "./internal/parallel_for.h"
 
 namespace sym {
 
@@ -15,13 +17,15 @@ template <typename Scalar>
 DenseLinearizer<Scalar>::DenseLinearizer(const std::string& name,
                                          const std::vector<Factor<Scalar>>& factors,
                                          const std::vector<Key>& key_order,
-                                         const bool include_jacobians, const bool debug_checks)
+                                         const bool include_jacobians, const bool debug_checks,
+                                         const int num_threads)
     : name_(name),
       factors_{&factors},
       state_index_{},
       is_initialized_{false},
       include_jacobians_{include_jacobians},
-      debug_checks_{debug_checks} {
+      debug_checks_{debug_checks},
+      num_threads_{std::max(num_threads, 1)} {
   if (key_order.empty()) {
     keys_ = ComputeKeysToOptimize(factors);
   } else {
@@ -45,6 +49,39 @@ const std::unordered_map<key_t, index_entry_t>& DenseLinearizer<ScalarType>::Sta
   return state_index_;
 }
 
+template <typename ScalarType>
+int DenseLinearizer<ScalarType>::NumThreads() const {
+  return num_threads_;
+}
+
+template <typename ScalarType>
+int DenseLinearizer<ScalarType>::NumFactorsSkipped() const {
+  return 0;
+}
+
+template <typename ScalarType>
+void DenseLinearizer<ScalarType>::AddKeys(const std::vector<Key>& keys) {
+  keys_.insert(keys_.end(), keys.begin(), keys.end());
+  ResetStructure();
+}
+
+template <typename ScalarType>
+void DenseLinearizer<ScalarType>::RemoveFactors(const std::vector<int>& /* indices */) {
+  ResetStructure();
+}
+
+template <typename ScalarType>
+void DenseLinearizer<ScalarType>::ResetStructure() {
+  is_initialized_ = false;
+  state_index_.clear();
+  linearized_dense_factors_ = {};
+  factor_ranges_.clear();
+  range_linearized_dense_factors_.clear();
+  range_linearizations_.clear();
+  factor_indices_.clear();
+  factor_keyoffsets_.clear();
+}
+
 template <typename Scalar>
 using LinearizedDenseFactor = typename DenseLinearizer<Scalar>::LinearizedDenseFactor;
 
@@ -146,8 +183,9 @@ void DenseLinearizer<Scalar>::InitialLinearization(const Values<Scalar>& values,
   // dimension is not known yet.
   linearization.rhs.resize(N);
   linearization.rhs.setZero();
+  // The strict upper triangle of the hessian is never written, so zero it once here
   linearization.hessian_lower.resize(N, N);
-  linearization.hessian_lower.template triangularView<Eigen::Lower>().setZero();
+  linearization.hessian_lower.setZero();
 
   // NOTE(brad): Currently we assume all factors are dense factors. The reason for this is that it
   // is simpler to only copy dense factors into a dense linearization, and want to get that version
@@ -219,6 +257,8 @@ void DenseLinearizer<Scalar>::InitialLinearization(const Values<Scalar>& values,
     CopyHessianFactorToCombined(factor_linearization, key_offsets, linearization /* mut */);
   }
   // Now that we know the full problem size, we can construct the residual and jacobian
+  residual_dim_ = static_cast<int>(combined_residual.size());
+  state_dim_ = N;
   linearization.residual =
       Eigen::Map<VectorX<Scalar>>(combined_residual.data(), combined_residual.size());
   if (include_jacobians_) {
@@ -242,45 +282,132 @@ void DenseLinearizer<Scalar>::InitialLinearization(const Values<Scalar>& values,
     }
   }
 
+  BuildFactorRanges(linearization);
+
+  is_initialized_ = true;
   linearization.SetInitialized();
 }
 
+template <typename Scalar>
+void DenseLinearizer<Scalar>::EnsureLinearizationHasCorrectSize(
+    DenseLinearization<Scalar>& linearization) const {
+  linearization.residual.resize(residual_dim_);
+  linearization.rhs.resize(state_dim_);
+  if (linearization.hessian_lower.rows() != state_dim_ ||
+      linearization.hessian_lower.cols() != state_dim_) {
+    linearization.hessian_lower.setZero(state_dim_, state_dim_);
+  }
+  if (include_jacobians_ && (linearization.jacobian.rows() != residual_dim_ ||
+                             linearization.jacobian.cols() != state_dim_)) {
+    linearization.jacobian.setZero(residual_dim_, state_dim_);
+  }
+}
+
+template <typename Scalar>
+void DenseLinearizer<Scalar>::BuildFactorRanges(const DenseLinearization<Scalar>& linearization) {
+  const int num_factors = static_cast<int>(factors_->size());
+  const int num_ranges = std::min(num_threads_, num_factors);
+
+  factor_ranges_.clear();
+  int residual_offset = 0;
+  int factor_i = 0;
+  for (int range_i = 0; range_i < num_ranges; range_i++) {
+    FactorRange range;
+    range.factor_begin = factor_i;
+    range.factor_end =
+        static_cast<int>(static_cast<int64_t>(num_factors) * (range_i + 1) / num_ranges);
+    range.residual_begin = residual_offset;
+    for (; factor_i < range.factor_end; factor_i++) {
+      residual_offset += linearized_dense_factors_.at(factor_i).residual.size();
+    }
+    factor_ranges_.push_back(range);
+  }
+
+  range_linearized_dense_factors_.clear();
+  range_linearizations_.clear();
+  for (int range_i = 1; range_i < num_ranges; range_i++) {
+    range_linearized_dense_factors_.push_back(linearized_dense_factors_);
+    range_linearizations_.emplace_back();
+    range_linearizations_.back().rhs.resize(linearization.rhs.size());
+    range_linearizations_.back().hessian_lower.resize(linearization.hessian_lower.rows(),
+                                                      linearization.hessian_lower.cols());
+  }
+}
+
+template <typename Scalar>
+void DenseLinearizer<Scalar>::RelinearizeFactorRange(
+    const Values<Scalar>& values, const FactorRange& range,
+    internal::LinearizedDenseFactorPool<Scalar>& linearized_dense_factors,
+    DenseLinearization<Scalar>& linearization, DenseLinearization<Scalar>& accumulator) {
+  int residual_offset = range.residual_begin;
+  for (int i = range.factor_begin; i < range.factor_end; i++) {
+    const auto& factor = (*factors_)[i];
+    auto& linearized_dense_factor = linearized_dense_factors.at(i);
+    factor.Linearize(values, linearized_dense_factor, &factor_indices_[i]);
+    if (debug_checks_) {
+      internal::CheckLinearizedFactor(name_, factor, values, linearized_dense_factor,
+                                      factor_indices_[i]);
+    }
+
+    const LinearizedDenseFactor& factor_linearization = linearized_dense_factors.at(i);
+    const std::vector<linearization_offsets_t>& key_offsets = factor_keyoffsets_[i];
+    const int residual_dim = factor_linearization.residual.size();
+
+    // Copy factor_linearization values into linearization
+    linearization.residual.segment(residual_offset, residual_dim) = factor_linearization.residual;
+    if (include_jacobians_) {
+      CopyJacobianFactorToCombined(factor_linearization.jacobian, key_offsets, residual_offset,
+                                   linearization /* mut */);
+    }
+    CopyRhsFactorToCombined(factor_linearization, key_offsets, accumulator /* mut */);
+    CopyHessianFactorToCombined(factor_linearization, key_offsets, accumulator /* mut */);
+
+    residual_offset += residual_dim;
+  }
+}
+
 template <typename ScalarType>
 void DenseLinearizer<ScalarType>::Relinearize(const Values<ScalarType>& values,
                                               DenseLinearization<ScalarType>& linearization) {
+  if (is_initialized_ && factor_keyoffsets_.size() != factors_->size()) {
+    // Factors were appended since the last linearization
+    ResetStructure();
+  }
+
   if (is_initialized_) {
+    EnsureLinearizationHasCorrectSize(linearization);
+
     // Set rhs & hessian_lower to 0 as they will be built additively
     linearization.rhs.setZero();
     linearization.hessian_lower.template triangularView<Eigen::Lower>().setZero();
     // The parts of linearization.jacobian that aren't being set are assumed to have already
-    // been set to 0 by InitialLinearization and to have not been mutated since.
-
-    int residual_offset = 0;
-    for (int i = 0; i < static_cast<int>(factors_->size()); i++) {
-      const auto& factor = (*factors_)[i];
-      auto& linearized_dense_factor = linearized_dense_factors_.at(i);
-      factor.Linearize(values, linearized_dense_factor, &factor_indices_[i]);
-      if (debug_checks_) {
-        internal::CheckLinearizedFactor(name_, factor, values, linearized_dense_factor,
-                                        factor_indices_.back());
-      }
-
-      const LinearizedDenseFactor& factor_linearization = linearized_dense_factors_.at(i);
-      const std::vector<linearization_offsets_t>& key_offsets = factor_keyoffsets_[i];
-      const int residual_dim = factor_linearization.residual.size();
-
-      // Copy factor_linearization values into linearization
-      linearization.residual.segment(residual_offset, residual_dim) = factor_linearization.residual;
-      if (include_jacobians_) {
-        CopyJacobianFactorToCombined(factor_linearization.jacobian, key_offsets, residual_offset,
-                                     linearization /* mut */);
+    // been set to 0 by InitialLinearization or EnsureLinearizationHasCorrectSize and to have not
+    // been mutated since.
+
+    const int num_ranges = static_cast<int>(factor_ranges_.size());
+    internal::ParallelFor(num_ranges, num_threads_, [&](const int range_i) {
+      if (range_i == 0) {
+        RelinearizeFactorRange(values, factor_ranges_[0], linearized_dense_factors_,
+                               linearization /* mut */, linearization /* mut */);
+      } else {
+        DenseLinearization<ScalarType>& accumulator = range_linearizations_[range_i - 1];
+        accumulator.rhs.setZero();
+        accumulator.hessian_lower.template triangularView<Eigen::Lower>().setZero();
+        RelinearizeFactorRange(values, factor_ranges_[range_i],
+                               range_linearized_dense_factors_[range_i - 1],
+                               linearization /* mut */, accumulator /* mut */);
       }
-      CopyRhsFactorToCombined(factor_linearization, key_offsets, linearization /* mut */);
-      CopyHessianFactorToCombined(factor_linearization, key_offsets, linearization /* mut */);
+    });
 
-      residual_offset += residual_dim;
+    // Sum the accumulators in order of the ranges, so that the result doesn't depend on scheduling
+    for (const DenseLinearization<ScalarType>& accumulator : range_linearizations_) {
+      linearization.rhs += accumulator.rhs;
+      linearization.hessian_lower.template triangularView<Eigen::Lower>() +=
+          accumulator.hessian_lower;
     }
 
+    linearization.SetInitialized();
+
   } else {
     InitialLinearization(values, linearization /* mut */);
   }
@@ -34,10 +34,12 @@ class DenseLinearizer {
    * @param include_jacobians: Relinearize only allocates and fills out the jacobian if true.
    * @param debug_checks: Whether to perform additional sanity checks for NaNs.  This uses
    *    additional compute but not additional memory except for logging.
+   * @param num_threads: Number of threads to evaluate factors on when relinearizing.  See the
+   *    documentation for the corresponding argument of Linearizer.
    */
   DenseLinearizer(const std::string& name, const std::vector<Factor<Scalar>>& factors,
                   const std::vector<Key>& key_order = {}, bool include_jacobians = false,
-                  bool debug_checks = false);
+                  bool debug_checks = false, int num_threads = 1);
 
   /**
    * Returns whether Relinearize() has already been called once.
@@ -61,20 +63,58 @@ class DenseLinearizer {
    */
   const std::unordered_map<key_t, index_entry_t>& StateIndex() const;
 
+  /**
+   * Number of threads factors are evaluated on when relinearizing
+   */
+  int NumThreads() const;
+
+  /**
+   * The number of factors which reused their previous linearization in the last call to
+   * Relinearize(), which is always 0 since every factor is evaluated
+   */
+  int NumFactorsSkipped() const;
+
   /**
    * Update linearization at a new evaluation point.
    * This is more efficient than reconstructing this object repeatedly. On the first call, it will
    * allocate memory and perform analysis needed for efficient repeated relinearization.
    *
    * On the first call to Relinearize, the matrices in linearization will be allocated and sized
-   * correctly. On subsequent calls, the matrices of linearization are expected to already be
-   * allocated and sized correctly.
+   * correctly. On subsequent calls, the matrices of linearization are reused if they are already
+   * sized correctly, and allocated otherwise.
    *
    * TODO(aaron): This should be const except that it can initialize the object
    */
   void Relinearize(const Values<Scalar>& values, DenseLinearization<Scalar>& linearization);
 
+  /**
+   * Add keys, which are not in the state vector yet, to the end of it
+   *
+   * Each new key must be optimized by at least one factor at the next call to Relinearize().  The
+   * dense linearization has no sparsity pattern to extend, so the next call to Relinearize() is
+   * treated as the first one, as it is after factors are appended to the vector of factors.
+   */
+  void AddKeys(const std::vector<Key>& keys);
+
+  /**
+   * Drop the structure computed for the factors at the given indices, which have just been erased
+   * from the vector of factors
+   *
+   * @param indices: Sorted indices of the removed factors, in the vector of factors before they
+   *    were erased
+   */
+  void RemoveFactors(const std::vector<int>& indices);
+
  private:
+  /**
+   * A contiguous range of factors, and the offset of the first one in the combined residual
+   */
+  struct FactorRange {
+    int factor_begin;
+    int factor_end;
+    int residual_begin;
+  };
+
   // The name of this linearizer to be used for printing debug information.
   std::string name_;
   const std::vector<Factor<Scalar>>* factors_;
@@ -84,6 +124,15 @@ class DenseLinearizer {
   bool is_initialized_;
   bool include_jacobians_;
   bool debug_checks_;
+  int num_threads_;
+
+  // For multithreaded relinearization, the factors evaluated by each thread.  The first range
+  // uses linearized_dense_factors_ and accumulates directly into the linearization, the others
+  // use the corresponding entries of the vectors below (which only have the rhs and hessian_lower
+  // allocated)
+  std::vector<FactorRange> factor_ranges_;
+  std::vector<internal::LinearizedDenseFactorPool<Scalar>> range_linearized_dense_factors_;
+  std::vector<DenseLinearization<Scalar>> range_linearizations_;
 
   // The index for each factor in the values. Cached the first time we linearize, to avoid repeated
   // unordered_map lookups
@@ -95,6 +144,17 @@ class DenseLinearizer {
   // the corresponding factor.
   std::vector<std::vector<linearization_offsets_t>> factor_keyoffsets_;
 
+  // The dimensions of the combined residual and of the state vector, computed by
+  // InitialLinearization
+  int residual_dim_{0};
+  int state_dim_{0};
+
+  /**
+   * Discard everything computed by InitialLinearization, so the next call to Relinearize()
+   * computes it again
+   */
+  void ResetStructure();
+
   /**
    * Evaluates the linearizations of the factors at values into linearization, caching all values
    * needed for relinearization along the way.
@@ -111,6 +171,29 @@ class DenseLinearizer {
    */
   void InitialLinearization(const Values<Scalar>& values,
                             DenseLinearization<Scalar>& linearization);
+
+  /**
+   * Allocate linearization if it isn't the size of the problem, e.g. if it isn't the linearization
+   * passed to InitialLinearization.  The entries which relinearizing doesn't write (the strict
+   * upper triangle of the hessian, and the blocks of the jacobian outside of the factors) are
+   * zeroed.
+   */
+  void EnsureLinearizationHasCorrectSize(DenseLinearization<Scalar>& linearization) const;
+
+  /**
+   * Split the factors into one FactorRange per thread, and allocate the buffers each thread
+   * accumulates into
+   */
+  void BuildFactorRanges(const DenseLinearization<Scalar>& linearization);
+
+  /**
+   * Evaluate the factors in range, writing their residuals and jacobians into linearization and
+   * adding their hessians and rhs into accumulator, which may be the same object
+   */
+  void RelinearizeFactorRange(const Values<Scalar>& values, const FactorRange& range,
+                              internal::LinearizedDenseFactorPool<Scalar>& linearized_dense_factors,
+                              DenseLinearization<Scalar>& linearization,
+                              DenseLinearization<Scalar>& accumulator);
 };
 
 }  // namespace sym
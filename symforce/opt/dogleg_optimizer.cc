@@ -0,0 +1,10 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include "./dogleg_optimizer.h"
+
+// Explicit instantiation
+template class sym::Optimizer<double, sym::DoglegSolver<double>>;
+template class sym::Optimizer<float, sym::DoglegSolver<float>>;
@@ -0,0 +1,28 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include "./dogleg_solver.h"
+#include "./optimizer.h"
+
+namespace sym {
+
+/**
+ * Optimizer which uses the dogleg trust-region method instead of Levenberg-Marquardt, see
+ * DoglegSolver.  Factorizes the hessian once per linearization, so rejected steps are cheap.
+ */
+template <typename Scalar>
+using DoglegOptimizer = Optimizer<Scalar, DoglegSolver<Scalar>>;
+
+// Shorthand instantiations
+using DoglegOptimizerd = DoglegOptimizer<double>;
+using DoglegOptimizerf = DoglegOptimizer<float>;
+
+}  // namespace sym
+
+// Explicit instantiation declaration
+extern template class sym::Optimizer<double, sym::DoglegSolver<double>>;
+extern template class sym::Optimizer<float, sym::DoglegSolver<float>>;
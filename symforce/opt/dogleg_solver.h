@@ -0,0 +1,204 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <Eigen/Core>
+#include <Eigen/SparseCore>
+
+#include <lcmtypes/sym/dogleg_solver_failure_reason_t.hpp>
+#include <lcmtypes/sym/optimization_stats_t.hpp>
+#include <lcmtypes/sym/optimizer_params_t.hpp>
+
+#include "./internal/levenberg_marquardt_state.h"
+#include "./linearization.h"
+#include "./optimization_stats.h"
+#include "./sparse_cholesky/sparse_cholesky_solver.h"
+#include "./tic_toc.h"
+#include "./values.h"
+
+namespace sym {
+
+/**
+ * Powell's dogleg trust-region solver for nonlinear least squares problems specified by a
+ * linearization function.  Can be used in place of LevenbergMarquardtSolver as the nonlinear solver
+ * of an Optimizer, see DoglegOptimizer in dogleg_optimizer.h.
+ *
+ * Levenberg-Marquardt adds lambda to the diagonal of the hessian, so it has to factorize the
+ * hessian again every time lambda changes, including after every rejected step.  The dogleg method
+ * instead restricts the step to a trust region around the current values, and picks the step along
+ * the path from the steepest descent (Cauchy) step to the Gauss-Newton step which minimizes the
+ * quadratic model inside the trust region:
+ *
+ *     g = J.T * b                  (the gradient, or rhs)
+ *     H = J.T * J
+ *
+ *     dx_gn = -inv(H) * g
+ *     dx_sd = -(g.T * g) / (g.T * H * g) * g
+ *
+ *     dx = dx_gn                                   if |dx_gn| <= radius
+ *          radius * dx_sd / |dx_sd|                if |dx_sd| >= radius
+ *          dx_sd + tau * (dx_gn - dx_sd)           otherwise, with tau such that |dx| == radius
+ *
+ * Both dx_gn and dx_sd only depend on the linearization, so the hessian is factorized once per
+ * linearization point, and rejected steps only shrink the radius and recompute dx from the same
+ * two vectors.  The radius is updated from the ratio between the actual and predicted reduction in
+ * error, like lambda for the DYNAMIC lambda_update_type.  This makes each rejected step much
+ * cheaper than for Levenberg-Marquardt on problems which are expensive to factorize.
+ *
+ * A small constant, `dogleg_hessian_damping`, is added to the diagonal of H before factorizing it,
+ * so the Gauss-Newton step exists for problems with unconstrained directions (such as a gauge
+ * freedom).  The remaining parameters are shared with LevenbergMarquardtSolver, the ones for
+ * lambda are ignored.  Only the DIRECT linear_solver_type is supported.
+ *
+ * This assumes the problem structure is the same for the lifetime of the object - if the problem
+ * structure changes, create a new DoglegSolver.
+ *
+ * Not thread safe! Create one per thread.
+ */
+template <typename ScalarType,
+          typename _LinearSolverType = sym::SparseCholeskySolver<Eigen::SparseMatrix<ScalarType>>,
+          typename _StateType =
+              internal::LevenbergMarquardtState<typename _LinearSolverType::MatrixType>>
+class DoglegSolver {
+ public:
+  using Scalar = ScalarType;
+  using LinearSolverType = _LinearSolverType;
+  using MatrixType = typename LinearSolverType::MatrixType;
+  using StateType = _StateType;
+  using LinearizationType = Linearization<MatrixType>;
+  using ValuesType = typename StateType::ValuesType;
+  using FailureReason = dogleg_solver_failure_reason_t;
+
+  // Function that evaluates the objective function and produces a quadratic approximation of
+  // it by linearizing a least-squares residual.
+  using LinearizeFunc = std::function<void(const ValuesType&, LinearizationType&)>;
+
+  DoglegSolver(const optimizer_params_t& p, const std::string& id, const Scalar epsilon)
+      : p_(p), id_(id), epsilon_(epsilon) {}
+
+  DoglegSolver(const optimizer_params_t& p, const std::string& id, const Scalar epsilon,
+               const LinearSolverType& linear_solver)
+      : p_(p), id_(id), epsilon_(epsilon), linear_solver_(linear_solver) {}
+
+  // Saves the index for the optimized keys, which can be use to retract the state blocks
+  // efficiently.
+  void SetIndex(const index_t& index) {
+    state_.SetIndex(index);
+  }
+
+  // Create an initial state to start a new optimization.
+  void Reset(const ValuesType& values) {
+    radius_ = p_.dogleg_initial_radius;
+    iteration_ = -1;
+    num_factorizations_ = 0;
+    ResetState(values);
+  }
+
+  // Analyze the sparsity pattern of the hessian again on the next iteration, such as if the problem
+  // was rebuilt.  Patterns which only grow, like when keys or factors are added to the linearizer,
+  // are detected automatically.
+  void ResetSparsityPattern() {
+    solver_analyzed_ = false;
+  }
+
+  // Sets the trust radius of the solver to the largest between its initial and current value.
+  void RelaxDampingToInitial() {
+    radius_ = std::max(radius_, static_cast<Scalar>(p_.dogleg_initial_radius));
+  }
+
+  // Reset the state values, such as if the cost function changes and linearizations are invalid.
+  // Resets the values for optimization, but doesn't reset the radius or the number of iterations.
+  void ResetState(const ValuesType& values) {
+    SYM_TIME_SCOPE("Dogleg<{}>::ResetState", id_);
+    have_steps_ = false;
+    state_.Reset(values);
+  }
+
+  const optimizer_params_t& Params() const {
+    return p_;
+  }
+
+  void UpdateParams(const optimizer_params_t& p);
+
+  const LinearSolverType& LinearSolver() const {
+    return linear_solver_;
+  }
+
+  LinearSolverType& LinearSolver() {
+    return linear_solver_;
+  }
+
+  // Run one iteration of the optimization. Returns the optimization status, which will be empty if
+  // the optimization should not exit yet.
+  std::optional<std::pair<optimization_status_t, FailureReason>> Iterate(
+      const LinearizeFunc& func, OptimizationStats<MatrixType>& stats);
+
+  const ValuesType& GetBestValues() const {
+    SYM_ASSERT(state_.BestIsValid());
+    return state_.Best().values;
+  }
+
+  const LinearizationType& GetBestLinearization() const {
+    SYM_ASSERT(state_.BestIsValid() && state_.Best().GetLinearization().IsInitialized());
+    return state_.Best().GetLinearization();
+  }
+
+  void ComputeCovariance(const MatrixType& hessian_lower, MatrixX<Scalar>& covariance);
+
+  // The current radius of the trust region
+  Scalar Radius() const {
+    return radius_;
+  }
+
+  // The number of times the hessian was factorized since the last call to Reset
+  int NumFactorizations() const {
+    return num_factorizations_;
+  }
+
+ private:
+  // Factorize the hessian at the initial state, and compute the Gauss-Newton and Cauchy steps
+  void ComputeSteps(OptimizationStats<MatrixType>& stats);
+
+  // Compute update_ for the current radius from the Gauss-Newton and Cauchy steps
+  void ComputeDoglegStep();
+
+  void PopulateIterationStats(optimization_iteration_t& iteration_stats, const StateType& state,
+                              Scalar new_error, Scalar new_error_linear, Scalar relative_reduction,
+                              Scalar gain_ratio) const;
+
+  optimizer_params_t p_;
+  std::string id_;
+
+  Scalar epsilon_;
+
+  // State blocks for the optimizer
+  StateType state_;
+
+  LinearSolverType linear_solver_{};
+  bool solver_analyzed_{false};
+  // The size and number of nonzeros of the hessian the linear solver analyzed
+  Eigen::Index analyzed_hessian_dim_{0};
+  Eigen::Index analyzed_hessian_nonzeros_{0};
+
+  // Current radius of the trust region
+  Scalar radius_;
+
+  int iteration_{-1};
+  int num_factorizations_{0};
+
+  // Whether gauss_newton_step_ and cauchy_step_ are computed at the initial state
+  bool have_steps_{false};
+  VectorX<Scalar> gauss_newton_step_;
+  VectorX<Scalar> cauchy_step_;
+
+  // Working storage to avoid reallocation
+  VectorX<Scalar> update_;
+  VectorX<Scalar> undamped_diagonal_;
+};
+
+}  // namespace sym
+
+#include "./dogleg_solver.tcc"
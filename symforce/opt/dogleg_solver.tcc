@@ -0,0 +1,337 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+
+#include <spdlog/spdlog.h>
+
+#include "./assert.h"
+#include "./dogleg_solver.h"
+#include "./tic_toc.h"
+#include "./util.h"
+
+namespace sym {
+
+// ----------------------------------------------------------------------------
+// Private methods
+// ----------------------------------------------------------------------------
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void DoglegSolver<ScalarType, LinearSolverType, StateType>::ComputeSteps(
+    OptimizationStats<MatrixType>& stats) {
+  MatrixType& hessian_lower = state_.Init().GetLinearization().hessian_lower;
+  const VectorX<Scalar>& rhs = state_.Init().GetLinearization().rhs;
+
+  // Analyze the sparsity pattern for efficient repeated factorization.  It is only analyzed again
+  // if the structure of the problem changed, which grows the hessian or its sparsity pattern.
+  if (!solver_analyzed_ || hessian_lower.rows() != analyzed_hessian_dim_ ||
+      hessian_lower.nonZeros() != analyzed_hessian_nonzeros_) {
+    SYM_TIME_SCOPE("Dogleg<{}>: AnalyzePattern", id_);
+    linear_solver_.AnalyzeSparsityPattern(hessian_lower);
+    solver_analyzed_ = true;
+    analyzed_hessian_dim_ = hessian_lower.rows();
+    analyzed_hessian_nonzeros_ = hessian_lower.nonZeros();
+  }
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: SparseFactorize", id_);
+    undamped_diagonal_ = hessian_lower.diagonal();
+    hessian_lower.diagonal().array() += static_cast<Scalar>(p_.dogleg_hessian_damping);
+    const bool success = linear_solver_.Factorize(hessian_lower);
+    hessian_lower.diagonal() = undamped_diagonal_;
+    SYM_ASSERT(success, "Internal Error: Damped hessian factorization failed");
+    num_factorizations_++;
+
+    // NOTE(aaron): This has to happen after the first factorize, since L_inner is not filled out
+    // by ComputeSymbolicSparsity.
+    if (p_.debug_stats && iteration_ == 0) {
+      stats.linear_solver_ordering = linear_solver_.Permutation().indices();
+      stats.cholesky_factor_sparsity = GetSparseStructure(linear_solver_.L());
+    }
+  }
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: SparseSolve", id_);
+    gauss_newton_step_ = -linear_solver_.Solve(rhs);
+  }
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: CauchyStep", id_);
+    // The minimum of the quadratic model along the gradient.  With H = J.T * J, the curvature is
+    // only zero if the gradient is zero
+    const Scalar gradient_squared_norm = rhs.squaredNorm();
+    const Scalar curvature = rhs.dot(hessian_lower.template selfadjointView<Eigen::Lower>() * rhs);
+    if (curvature > 0) {
+      cauchy_step_ = -(gradient_squared_norm / curvature) * rhs;
+    } else {
+      cauchy_step_ = VectorX<Scalar>::Zero(rhs.rows());
+    }
+  }
+
+  if (!gauss_newton_step_.array().isFinite().all()) {
+    spdlog::warn("Dogleg<{}> Non-finite Gauss-Newton step, using the Cauchy step instead", id_);
+    gauss_newton_step_ = cauchy_step_;
+  }
+
+  have_steps_ = true;
+}
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void DoglegSolver<ScalarType, LinearSolverType, StateType>::ComputeDoglegStep() {
+  SYM_TIME_SCOPE("Dogleg<{}>: DoglegStep", id_);
+
+  const Scalar gauss_newton_norm = gauss_newton_step_.norm();
+  if (gauss_newton_norm <= radius_) {
+    update_ = gauss_newton_step_;
+    return;
+  }
+
+  const Scalar cauchy_norm = cauchy_step_.norm();
+  if (cauchy_norm >= radius_) {
+    update_ = (radius_ / cauchy_norm) * cauchy_step_;
+    return;
+  }
+
+  // Solve |cauchy + tau * (gauss_newton - cauchy)| == radius for tau in [0, 1].  The quadratic has
+  // one negative and one positive root, since |cauchy| < radius
+  const VectorX<Scalar> difference = gauss_newton_step_ - cauchy_step_;
+  const Scalar a = difference.squaredNorm();
+  const Scalar b = cauchy_step_.dot(difference);
+  const Scalar c = Square(cauchy_norm) - Square(radius_);
+  const Scalar tau = (-b + std::sqrt(Square(b) - a * c)) / a;
+  update_ = cauchy_step_ + tau * difference;
+}
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void DoglegSolver<ScalarType, LinearSolverType, StateType>::PopulateIterationStats(
+    optimization_iteration_t& iteration_stats, const StateType& state, const Scalar new_error,
+    const Scalar new_error_linear, const Scalar relative_reduction, const Scalar gain_ratio) const {
+  SYM_TIME_SCOPE("Dogleg<{}>: IterationStats", id_);
+
+  iteration_stats.iteration = iteration_;
+  iteration_stats.current_lambda = radius_;
+
+  iteration_stats.new_error = new_error;
+  iteration_stats.new_error_linear = new_error_linear;
+  iteration_stats.relative_reduction = relative_reduction;
+  iteration_stats.update_norm = update_.norm();
+
+  if (p_.verbose) {
+    SYM_TIME_SCOPE("Dogleg<{}>: IterationStats - Print", id_);
+    spdlog::info(
+        "Dogleg<{}> [iter {:4d}] radius: {:.3e}, error prev/linear/new: {:.3e}/{:.3e}/{:.3e}, "
+        "rel reduction: {:.5e}, gain ratio: {:.5e}, factorizations: {}",
+        id_, iteration_stats.iteration, radius_, state.Init().Error(),
+        iteration_stats.new_error_linear, iteration_stats.new_error,
+        iteration_stats.relative_reduction, gain_ratio, num_factorizations_);
+  }
+
+  if (p_.debug_stats) {
+    iteration_stats.update = update_.template cast<double>();
+    iteration_stats.values = state.GetLcmType(state.New());
+    const VectorX<Scalar> residual_vec = state.New().GetLinearization().residual;
+    iteration_stats.residual = residual_vec.template cast<double>();
+    const MatrixX<Scalar> jacobian_vec = JacobianValues(state.New().GetLinearization().jacobian);
+    iteration_stats.jacobian_values = jacobian_vec.template cast<double>();
+  }
+}
+
+// ----------------------------------------------------------------------------
+// Public methods
+// ----------------------------------------------------------------------------
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void DoglegSolver<ScalarType, LinearSolverType, StateType>::UpdateParams(
+    const optimizer_params_t& p) {
+  if (p_.verbose) {
+    spdlog::info("Dogleg<{}>: UPDATING OPTIMIZER PARAMS", id_);
+  }
+  p_ = p;
+}
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+std::optional<std::pair<optimization_status_t, dogleg_solver_failure_reason_t>>
+DoglegSolver<ScalarType, LinearSolverType, StateType>::Iterate(
+    const LinearizeFunc& func, OptimizationStats<MatrixType>& stats) {
+  SYM_TIME_SCOPE("Dogleg<{}>::Iterate()", id_);
+
+  // new -> init
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: StateStep", id_);
+    state_.Step();
+    iteration_++;
+  }
+
+  if (!state_.Init().GetLinearization().IsInitialized()) {
+    SYM_TIME_SCOPE("Dogleg<{}>: EvaluateFirst", id_);
+    state_.Init().Relinearize(func);
+    state_.SetBestToInit();
+    have_steps_ = false;
+  }
+
+  // save the initial error state_ before optimizing
+  if (iteration_ == 0) {
+    SYM_TIME_SCOPE("Dogleg<{}>: FirstIterationStats", id_);
+    stats.iterations.emplace_back();
+    optimization_iteration_t& iteration_stats = stats.iterations.back();
+    iteration_stats.iteration = -1;
+    iteration_stats.new_error = state_.Init().Error();
+    iteration_stats.current_lambda = radius_;
+
+    if (p_.debug_stats) {
+      iteration_stats.values = state_.GetLcmType(state_.Init());
+      const VectorX<Scalar> residual_vec = state_.Init().GetLinearization().residual;
+      iteration_stats.residual = residual_vec.template cast<double>();
+      const MatrixX<Scalar> jacobian_vec =
+          JacobianValues(state_.Init().GetLinearization().jacobian);
+      iteration_stats.jacobian_values = jacobian_vec.template cast<double>();
+    }
+
+    if (!std::isfinite(state_.Init().Error())) {
+      spdlog::warn("Dogleg<{}> Encountered non-finite initial error: {}", id_,
+                   state_.Init().Error());
+      if (!p_.debug_checks) {
+        spdlog::warn("Dogleg<{}> Turn on debug_checks to see which factor is causing this", id_);
+      }
+      return {{optimization_status_t::FAILED, FailureReason::INITIAL_ERROR_NOT_FINITE}};
+    }
+  }
+
+  SYM_ASSERT(p_.linear_solver_type == linear_solver_type_t::DIRECT,
+             "DoglegSolver only supports the DIRECT linear_solver_type, got {}",
+             p_.linear_solver_type);
+
+  // The steps only depend on the linearization at the initial state, which only changes after an
+  // accepted step, so rejected steps don't factorize the hessian again
+  if (!have_steps_) {
+    ComputeSteps(stats);
+  }
+
+  ComputeDoglegStep();
+
+  if (p_.debug_checks && !update_.array().isFinite().all()) {
+    spdlog::warn("Dogleg<{}> Non-finite update: {}", id_, update_.transpose());
+  }
+
+  // The reduction in error predicted by the quadratic model, -(g.T * dx + 0.5 * dx.T * H * dx)
+  const Scalar predicted_reduction = [this] {
+    SYM_TIME_SCOPE("Dogleg<{}>: PredictedReduction", id_);
+    const LinearizationType& linearization = state_.Init().GetLinearization();
+    const VectorX<Scalar> hessian_update =
+        linearization.hessian_lower.template selfadjointView<Eigen::Lower>() * update_;
+    return -update_.dot(linearization.rhs + Scalar{0.5} * hessian_update);
+  }();
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: Update", id_);
+    state_.UpdateNewFromInit(update_, epsilon_);
+  }
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: Relinearize", id_);
+    state_.New().Relinearize(func);
+  }
+
+  const Scalar new_error = state_.New().Error();
+  const Scalar relative_reduction =
+      (state_.Init().Error() - new_error) / (state_.Init().Error() + epsilon_);
+  const Scalar new_error_linear = state_.Init().Error() - predicted_reduction;
+  const Scalar gain_ratio = predicted_reduction > 0
+                                ? (state_.Init().Error() - new_error) / predicted_reduction
+                                : Scalar{0};
+
+  stats.iterations.emplace_back();
+  optimization_iteration_t& iteration_stats = stats.iterations.back();
+  PopulateIterationStats(iteration_stats, state_, new_error, new_error_linear, relative_reduction,
+                         gain_ratio);
+
+  if (!std::isfinite(new_error)) {
+    spdlog::warn("Dogleg<{}> Encountered non-finite error: {}", id_, new_error);
+    if (!p_.debug_checks) {
+      spdlog::warn("Dogleg<{}> Turn on debug_checks to see which factor is causing this", id_);
+    }
+  }
+
+  std::optional<std::pair<optimization_status_t, FailureReason>> status{};
+
+  if (relative_reduction > -p_.early_exit_min_reduction / 10 &&
+      relative_reduction < p_.early_exit_min_reduction) {
+    // Early exit if the reduction in error is too small.
+    status = {optimization_status_t::SUCCESS, {}};
+  } else if (new_error < p_.early_exit_min_absolute_error) {
+    // Early exit if the absolute error is below the threshold.
+    status = {optimization_status_t::SUCCESS, {}};
+  }
+
+  {
+    SYM_TIME_SCOPE("Dogleg<{}>: accept_update bookkeeping", id_);
+    const bool accept_update = relative_reduction > 0;
+
+    // Grow the trust region if the model predicted the reduction well, and shrink it below the
+    // length of this step if it did not
+    const Scalar update_norm = update_.norm();
+    if (gain_ratio > Scalar{0.75}) {
+      radius_ = std::max(radius_, 3 * update_norm);
+    } else if (gain_ratio < Scalar{0.25}) {
+      radius_ = std::min(radius_, update_norm) / 2;
+    }
+
+    // If we didn't accept the update and the trust region is too small, just exit, unless we
+    // already converged (with a step of zero, the radius shrinks to zero)
+    if (!status && !accept_update && radius_ < p_.dogleg_min_radius) {
+      status = {optimization_status_t::FAILED, FailureReason::TRUST_REGION_RADIUS_OUT_OF_BOUNDS};
+    }
+
+    if (!accept_update) {
+      // swap state_ blocks so that the next iteration gets the same initial state_ as this one
+      state_.SwapNewAndInit();
+    } else {
+      have_steps_ = false;
+      if (state_.New().Error() <= state_.Best().Error()) {
+        state_.SetBestToNew();
+        stats.best_index = stats.iterations.size() - 1;
+      }
+      // Ensure that we are not going to modify the Best state_ block in the next iteration
+      state_.SetInitToNotBest();
+    }
+
+    // Finish populating iteration_stats
+    iteration_stats.update_angle_change = 0;
+    iteration_stats.update_accepted = accept_update;
+  }
+
+  return status;
+}
+
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void DoglegSolver<ScalarType, LinearSolverType, StateType>::ComputeCovariance(
+    const MatrixType& hessian_lower, MatrixX<Scalar>& covariance) {
+  SYM_TIME_SCOPE("Dogleg<{}>: ComputeCovariance()", id_);
+
+  if (!solver_analyzed_ || hessian_lower.rows() != analyzed_hessian_dim_ ||
+      hessian_lower.nonZeros() != analyzed_hessian_nonzeros_) {
+    linear_solver_.AnalyzeSparsityPattern(hessian_lower);
+    solver_analyzed_ = true;
+    analyzed_hessian_dim_ = hessian_lower.rows();
+    analyzed_hessian_nonzeros_ = hessian_lower.nonZeros();
+  }
+
+  const bool success = linear_solver_.Factorize(hessian_lower);
+  SYM_ASSERT(success, "Internal Error: hessian factorization failed");
+  covariance = MatrixX<Scalar>::Identity(hessian_lower.rows(), hessian_lower.rows());
+  linear_solver_.SolveInPlace(covariance);
+}
+
+// ----------------------------------------------------------------------------
+// Shorthand instantiations
+// ----------------------------------------------------------------------------
+
+using DoglegSolverd = DoglegSolver<double>;
+using DoglegSolverf = DoglegSolver<float>;
+
+}  // namespace sym
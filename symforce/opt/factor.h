@@ -5,7 +5,10 @@
 
 #pragma once
 
+#include <algorithm>
+#include <numeric>
 #include <ostream>
+#include <unordered_map>
 #include <unordered_set>
 
 #include <Eigen/SparseCore>
@@ -350,6 +353,75 @@ std::vector<Key> ComputeKeysToOptimize(const std::vector<Factor<Scalar>>& factor
   return ComputeKeysToOptimize(factors, &sym::Key::LexicalLessThan);
 }
 
+/**
+ * Reorder the keys so that a set of keys which are never optimized together by any of the factors
+ * comes last.  The blocks of the hessian for those keys are not coupled to each other, so they can
+ * be eliminated with a Schur complement, see linear_solver_type_t::SCHUR.
+ *
+ * The set is chosen greedily, starting from the keys optimized together with the fewest other
+ * keys, which for bundle adjustment picks the landmarks.  The keys are otherwise kept in order.
+ */
+template <typename Scalar>
+std::vector<Key> OrderKeysForSchurComplement(const std::vector<Factor<Scalar>>& factors,
+                                             const std::vector<Key>& keys) {
+  std::unordered_map<Key, size_t> key_indices;
+  for (size_t i = 0; i < keys.size(); i++) {
+    key_indices.emplace(keys[i], i);
+  }
+
+  // The other keys each key is optimized together with
+  std::vector<std::unordered_set<size_t>> neighbors(keys.size());
+  std::vector<size_t> factor_key_indices;
+  for (const Factor<Scalar>& factor : factors) {
+    factor_key_indices.clear();
+    for (const Key& key : factor.OptimizedKeys()) {
+      const auto it = key_indices.find(key);
+      if (it != key_indices.end()) {
+        factor_key_indices.push_back(it->second);
+      }
+    }
+    for (const size_t i : factor_key_indices) {
+      for (const size_t j : factor_key_indices) {
+        if (i != j) {
+          neighbors[i].insert(j);
+        }
+      }
+    }
+  }
+
+  std::vector<size_t> by_num_neighbors(keys.size());
+  std::iota(by_num_neighbors.begin(), by_num_neighbors.end(), 0);
+  std::stable_sort(by_num_neighbors.begin(), by_num_neighbors.end(),
+                   [&neighbors](const size_t a, const size_t b) {
+                     return neighbors[a].size() < neighbors[b].size();
+                   });
+
+  std::vector<bool> eliminated(keys.size(), false);
+  std::vector<bool> coupled(keys.size(), false);
+  for (const size_t i : by_num_neighbors) {
+    if (!coupled[i]) {
+      eliminated[i] = true;
+      for (const size_t j : neighbors[i]) {
+        coupled[j] = true;
+      }
+    }
+  }
+
+  std::vector<Key> ordered_keys;
+  ordered_keys.reserve(keys.size());
+  for (size_t i = 0; i < keys.size(); i++) {
+    if (!eliminated[i]) {
+      ordered_keys.push_back(keys[i]);
+    }
+  }
+  for (size_t i = 0; i < keys.size(); i++) {
+    if (eliminated[i]) {
+      ordered_keys.push_back(keys[i]);
+    }
+  }
+  return ordered_keys;
+}
+
 }  // namespace sym
 
 // Template method implementations
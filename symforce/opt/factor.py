@@ -20,6 +20,7 @@ from symforce.codegen import codegen_config
 from symforce.codegen.backends.python.python_config import PythonConfig
 from symforce.codegen.similarity_index import SimilarityIndex
 from symforce.opt._internal.generated_residual_cache import GeneratedResidualCache
+from symforce.opt._internal.generated_residual_disk_cache import GeneratedResidualDiskCache
 from symforce.opt.numeric_factor import NumericFactor
 from symforce.values import Values
 
@@ -51,6 +52,37 @@ class Factor:
     """
 
     _generated_residual_cache = GeneratedResidualCache()
+    _generated_residual_disk_cache: T.Optional[GeneratedResidualDiskCache] = None
+
+    @staticmethod
+    def enable_disk_cache(directory: T.Openable, max_size_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Enables a persistent on-disk cache of the linearization functions generated by
+        :meth:`to_numeric_factor`, shared by all processes which enable the cache with the same
+        directory.
+
+        With the cache enabled, a process which constructs a factor that has already been converted
+        to a :class:`.numeric_factor.NumericFactor` (by this or any other process) loads the
+        generated function from disk, instead of computing the linearization and generating code.
+        Only calls to :meth:`to_numeric_factor` with ``output_dir=None`` and no
+        ``custom_jacobian_func`` use the cache.
+
+        Args:
+            directory: The directory to store the cache in.  Created if it does not exist.
+            max_size_bytes: The maximum total size of the cache; least recently used entries are
+                evicted when it is exceeded
+        """
+        Factor._generated_residual_disk_cache = GeneratedResidualDiskCache(
+            directory, max_size_bytes
+        )
+
+    @staticmethod
+    def disable_disk_cache() -> None:
+        """
+        Disables the on-disk cache enabled by :meth:`enable_disk_cache`.  The contents of the cache
+        directory are left in place.
+        """
+        Factor._generated_residual_disk_cache = None
 
     @staticmethod
     def default_codegen_config() -> PythonConfig:
@@ -262,6 +294,29 @@ class Factor:
                 linearization_function=cached_residual,
             )
 
+        # The disk cache can't reproduce the side effects of generating into output_dir, and can't
+        # tell custom jacobian functions apart
+        disk_cache = (
+            Factor._generated_residual_disk_cache
+            if output_dir is None and self.custom_jacobian_func is None
+            else None
+        )
+        if disk_cache is not None:
+            disk_cache_key = (
+                similarity_index,
+                codegen_optimized_keys,
+                namespace,
+                sparse_linearization,
+            )
+            cached_residual = disk_cache.get_residual(*disk_cache_key)
+            if cached_residual is not None:
+                Factor._generated_residual_cache.cache_residual(*cache_key, cached_residual)
+                return NumericFactor(
+                    keys=self.keys,
+                    optimized_keys=optimized_keys,
+                    linearization_function=cached_residual,
+                )
+
         # NOTE(aaron): We do this after checking the cache, otherwise we'd get 0 cache hits.  I
         # _think_ this is correct, since the interface of to_numeric_factor doesn't specify the
         # namespace if the user passes None, so you want to get the same namespace as when it was
@@ -295,6 +350,14 @@ class Factor:
             *cache_key, numeric_factor.linearization_function
         )
 
+        if disk_cache is not None:
+            disk_cache.cache_residual(
+                *disk_cache_key,
+                output_dir=output_data["output_dir"],
+                generated_namespace=namespace,
+                name=output_data["name"],
+            )
+
         if output_dir is None and logger.level != logging.DEBUG:
             # We generated the function into a temp directory; delete it now that it's loaded.
             python_util.remove_if_exists(output_data["output_dir"])
@@ -0,0 +1,10 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include "./fixed_lag_smoother.h"
+
+// Explicit instantiation
+template class sym::FixedLagSmoother<double>;
+template class sym::FixedLagSmoother<float>;
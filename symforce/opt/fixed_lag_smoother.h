@@ -0,0 +1,153 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <deque>
+#include <memory>
+#include <optional>
+
+#include "./optimizer.h"
+
+namespace sym {
+
+/**
+ * Fixed-lag smoother for problems that grow over time, such as sliding-window VIO or localization
+ *
+ * Each call to Update() adds new keys and factors to the window and optimizes it.  Once the window
+ * holds more than `lag` updates, the keys added by the oldest update are marginalized: the factors
+ * touching them are linearized at the current estimate, the marginalized keys are eliminated from
+ * that linearization with a Schur complement, and the result replaces those factors as a single
+ * dense prior factor on the keys they shared with the rest of the window.  The cost of each update
+ * is therefore bounded by the size of the window, not by the length of the history.
+ *
+ * The prior is a linearization, and keeps its linearization point fixed.  Estimates of keys in the
+ * prior that move far from that point after marginalization make it less accurate.
+ *
+ * Example usage:
+ *
+ *     // Keep the keys from the last 10 updates
+ *     sym::FixedLagSmoother<double> smoother(params, 10);
+ *     for (const auto& measurement : measurements) {
+ *       sym::Valuesd new_values;
+ *       new_values.Set(sym::Key('x', measurement.index), initial_guess);
+ *       std::vector<sym::Factord> new_factors = ...;  // Factors touching the new keys
+ *       smoother.Update(new_values, new_factors);
+ *       const auto pose = smoother.Estimate().At<sym::Pose3d>(sym::Key('x', measurement.index));
+ *     }
+ *
+ * Not thread safe! Create one per thread.
+ */
+template <typename ScalarType>
+class FixedLagSmoother {
+ public:
+  using Scalar = ScalarType;
+  using OptimizerType = Optimizer<Scalar>;
+  using Stats = typename OptimizerType::Stats;
+
+  /**
+   * @param params: The params to use for the optimizer
+   * @param lag: The number of updates whose keys are kept in the window.  If 0, keys are only
+   *    marginalized by calling Marginalize()
+   * @param name: The name of this smoother to be used for printing debug information
+   * @param epsilon: Epsilon for numerical stability
+   */
+  FixedLagSmoother(const optimizer_params_t& params, int lag,
+                   const std::string& name = "sym::FixedLagSmoother",
+                   Scalar epsilon = kDefaultEpsilon<Scalar>);
+
+  /**
+   * Add new keys and factors to the window, optimize it, then marginalize the keys of the updates
+   * which have fallen out of the window
+   *
+   * @param new_values: Initial guesses for the keys added in this update, along with any new
+   *    constant inputs to the factors.  None of these keys may already be in the window
+   * @param new_factors: The new factors.  These may touch any keys in the window
+   * @param num_iterations: If < 0 (the default), uses the number of iterations specified by the
+   *    params at construction
+   *
+   * @returns The stats of optimizing the window, before marginalizing
+   */
+  Stats Update(const Values<Scalar>& new_values, const std::vector<Factor<Scalar>>& new_factors,
+               int num_iterations = -1);
+
+  /**
+   * Marginalize the given keys out of the window, at the current estimate
+   *
+   * The factors touching the keys are replaced by a single dense prior factor on the other keys
+   * they optimize.  Constant inputs to those factors that are no longer used by any factor are
+   * also removed.
+   *
+   * @param keys: Keys optimized by the factors in the window
+   */
+  void Marginalize(const std::vector<Key>& keys);
+
+  /**
+   * The current estimate of the keys in the window, including constant inputs to the factors
+   */
+  const Values<Scalar>& Estimate() const;
+
+  /**
+   * The factors in the window, including the prior factor from previous marginalizations, if there
+   * is one
+   */
+  const std::vector<Factor<Scalar>>& Factors() const;
+
+  /**
+   * The keys optimized by the factors in the window
+   */
+  std::vector<Key> Keys() const;
+
+  /**
+   * The number of updates whose keys are kept in the window
+   */
+  int Lag() const;
+
+  /**
+   * Update the optimizer params
+   */
+  void UpdateParams(const optimizer_params_t& params);
+
+  /**
+   * Get the params used by the optimizer
+   */
+  const optimizer_params_t& Params() const;
+
+ private:
+  /**
+   * Create a dense factor on `separator_keys` from the linearization of `factors` at the current
+   * estimate, with `marginalized_keys` eliminated by a Schur complement.  Returns the empty
+   * optional if the result does not constrain the separator keys at all.
+   */
+  std::optional<Factor<Scalar>> ComputeMarginalPrior(const std::vector<Factor<Scalar>>& factors,
+                                                     const std::vector<Key>& marginalized_keys,
+                                                     const std::vector<Key>& separator_keys) const;
+
+  optimizer_params_t params_;
+  int lag_;
+  std::string name_;
+  Scalar epsilon_;
+
+  Values<Scalar> values_;
+  std::vector<Factor<Scalar>> factors_;
+
+  /// For each update in the window, oldest first, the keys it added
+  std::deque<std::vector<Key>> update_keys_;
+
+  /// Rebuilt whenever the factors change
+  std::unique_ptr<OptimizerType> optimizer_;
+};
+
+// Shorthand instantiations
+using FixedLagSmootherd = FixedLagSmoother<double>;
+using FixedLagSmootherf = FixedLagSmoother<float>;
+
+}  // namespace sym
+
+#include "./fixed_lag_smoother.tcc"
+
+// Explicit instantiation declaration
+extern template class sym::FixedLagSmoother<double>;
+extern template class sym::FixedLagSmoother<float>;
@@ -0,0 +1,328 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <optional>
+#include <unordered_set>
+
+#include <Eigen/Cholesky>
+#include <Eigen/Eigenvalues>
+
+#include "./assert.h"
+#include "./dense_linearizer.h"
+#include "./fixed_lag_smoother.h"
+#include "./tic_toc.h"
+
+namespace sym {
+
+namespace internal {
+
+/**
+ * Create a dense factor on keys, whose residual is affine in the local coordinates of the keys
+ * around linearization_point:
+ *
+ *     residual = residual0 + jacobian0 * (values - linearization_point)
+ *
+ * The jacobian is held fixed at jacobian0, i.e. the derivative of the local coordinates with
+ * respect to values is taken to be the identity.
+ */
+template <typename Scalar>
+Factor<Scalar> LinearizedPriorFactor(const std::vector<Key>& keys,
+                                     const Values<Scalar>& linearization_point,
+                                     const VectorX<Scalar>& residual0,
+                                     const MatrixX<Scalar>& jacobian0, const Scalar epsilon) {
+  const index_t linearization_index = linearization_point.CreateIndex(keys);
+  const MatrixX<Scalar> hessian0 = jacobian0.transpose() * jacobian0;
+
+  return Factor<Scalar>(
+      typename Factor<Scalar>::DenseHessianFunc(
+          [linearization_point, linearization_index, residual0, jacobian0, hessian0, epsilon](
+              const Values<Scalar>& values, const std::vector<index_entry_t>& index_entries,
+              VectorX<Scalar>* const residual, MatrixX<Scalar>* const jacobian,
+              MatrixX<Scalar>* const hessian, VectorX<Scalar>* const rhs) {
+            index_t index;
+            index.entries = index_entries;
+            Values<Scalar> current = linearization_point;
+            current.Update(linearization_index, index, values);
+            const VectorX<Scalar> delta =
+                current.LocalCoordinates(linearization_point, linearization_index, epsilon);
+
+            const VectorX<Scalar> res = residual0 + jacobian0 * delta;
+            if (residual != nullptr) {
+              *residual = res;
+            }
+            if (jacobian != nullptr) {
+              *jacobian = jacobian0;
+            }
+            if (hessian != nullptr) {
+              *hessian = hessian0;
+            }
+            if (rhs != nullptr) {
+              *rhs = jacobian0.transpose() * res;
+            }
+          }),
+      keys);
+}
+
+}  // namespace internal
+
+// ----------------------------------------------------------------------------
+// Constructors
+// ----------------------------------------------------------------------------
+
+template <typename ScalarType>
+FixedLagSmoother<ScalarType>::FixedLagSmoother(const optimizer_params_t& params, const int lag,
+                                               const std::string& name, const Scalar epsilon)
+    : params_(params), lag_(lag), name_(name), epsilon_(epsilon) {
+  SYM_ASSERT(lag_ >= 0);
+}
+
+// ----------------------------------------------------------------------------
+// Public methods
+// ----------------------------------------------------------------------------
+
+template <typename ScalarType>
+typename FixedLagSmoother<ScalarType>::Stats FixedLagSmoother<ScalarType>::Update(
+    const Values<Scalar>& new_values, const std::vector<Factor<Scalar>>& new_factors,
+    const int num_iterations) {
+  SYM_TIME_SCOPE("FixedLagSmoother<{}>::Update", name_);
+
+  const std::vector<Key> new_keys = new_values.Keys();
+  for (const Key& key : new_keys) {
+    SYM_ASSERT(!values_.Has(key), "Key {} is already in the window", key);
+  }
+  values_.UpdateOrSet(new_values.CreateIndex(new_keys), new_values);
+  update_keys_.push_back(new_keys);
+
+  if (!new_factors.empty()) {
+    factors_.insert(factors_.end(), new_factors.begin(), new_factors.end());
+    optimizer_.reset();
+  }
+
+  Stats stats{};
+  if (!factors_.empty()) {
+    if (optimizer_ == nullptr) {
+      optimizer_ =
+          std::make_unique<OptimizerType>(params_, factors_, name_, std::vector<Key>{}, epsilon_);
+    }
+    optimizer_->Optimize(values_, num_iterations, /* populate_best_linearization */ false, stats);
+  }
+
+  while (lag_ > 0 && static_cast<int>(update_keys_.size()) > lag_) {
+    const std::vector<Key> oldest_keys = std::move(update_keys_.front());
+    update_keys_.pop_front();
+
+    std::unordered_set<Key> optimized_keys;
+    std::unordered_set<Key> used_keys;
+    for (const Factor<Scalar>& factor : factors_) {
+      optimized_keys.insert(factor.OptimizedKeys().begin(), factor.OptimizedKeys().end());
+      used_keys.insert(factor.AllKeys().begin(), factor.AllKeys().end());
+    }
+
+    std::vector<Key> keys_to_marginalize;
+    for (const Key& key : oldest_keys) {
+      if (optimized_keys.count(key) > 0) {
+        keys_to_marginalize.push_back(key);
+      } else if (used_keys.count(key) == 0) {
+        values_.Remove(key);
+      } else {
+        // A constant input still used by factors in the window, which stays until they are gone
+        update_keys_.front().push_back(key);
+      }
+    }
+
+    if (!keys_to_marginalize.empty()) {
+      Marginalize(keys_to_marginalize);
+    } else {
+      values_.Cleanup();
+    }
+  }
+
+  return stats;
+}
+
+template <typename ScalarType>
+void FixedLagSmoother<ScalarType>::Marginalize(const std::vector<Key>& keys) {
+  SYM_TIME_SCOPE("FixedLagSmoother<{}>::Marginalize", name_);
+
+  const std::unordered_set<Key> marginalized_keys(keys.begin(), keys.end());
+
+  // Split the factors into the ones touching the marginalized keys, which are replaced by the
+  // prior, and the ones which are kept
+  std::vector<Factor<Scalar>> marginalized_factors;
+  std::vector<Factor<Scalar>> kept_factors;
+  for (const Factor<Scalar>& factor : factors_) {
+    const bool touches_marginalized_keys =
+        std::any_of(factor.AllKeys().begin(), factor.AllKeys().end(),
+                    [&](const Key& key) { return marginalized_keys.count(key) > 0; });
+    if (touches_marginalized_keys) {
+      marginalized_factors.push_back(factor);
+    } else {
+      kept_factors.push_back(factor);
+    }
+  }
+
+  // The keys optimized by the marginalized factors that stay in the window, in order of first
+  // appearance
+  std::vector<Key> separator_keys;
+  std::unordered_set<Key> optimized_keys;
+  for (const Factor<Scalar>& factor : marginalized_factors) {
+    for (const Key& key : factor.OptimizedKeys()) {
+      if (optimized_keys.insert(key).second && marginalized_keys.count(key) == 0) {
+        separator_keys.push_back(key);
+      }
+    }
+  }
+
+  for (const Key& key : keys) {
+    SYM_ASSERT(optimized_keys.count(key) > 0,
+               "Cannot marginalize key {}, which is not optimized by any factor in the window",
+               key);
+  }
+
+  if (!separator_keys.empty()) {
+    std::optional<Factor<Scalar>> prior =
+        ComputeMarginalPrior(marginalized_factors, keys, separator_keys);
+    if (prior) {
+      kept_factors.push_back(std::move(*prior));
+    }
+  }
+
+  // Remove the marginalized keys, and the constant inputs which are no longer used
+  std::unordered_set<Key> used_keys;
+  for (const Factor<Scalar>& factor : kept_factors) {
+    used_keys.insert(factor.AllKeys().begin(), factor.AllKeys().end());
+  }
+
+  std::unordered_set<Key> removed_keys(keys.begin(), keys.end());
+  for (const Factor<Scalar>& factor : marginalized_factors) {
+    for (const Key& key : factor.AllKeys()) {
+      if (used_keys.count(key) == 0) {
+        removed_keys.insert(key);
+      }
+    }
+  }
+
+  for (const Key& key : removed_keys) {
+    values_.Remove(key);
+  }
+  values_.Cleanup();
+
+  for (std::vector<Key>& update_keys : update_keys_) {
+    update_keys.erase(std::remove_if(update_keys.begin(), update_keys.end(),
+                                     [&](const Key& key) { return removed_keys.count(key) > 0; }),
+                      update_keys.end());
+  }
+
+  factors_ = std::move(kept_factors);
+  optimizer_.reset();
+}
+
+template <typename ScalarType>
+const Values<ScalarType>& FixedLagSmoother<ScalarType>::Estimate() const {
+  return values_;
+}
+
+template <typename ScalarType>
+const std::vector<Factor<ScalarType>>& FixedLagSmoother<ScalarType>::Factors() const {
+  return factors_;
+}
+
+template <typename ScalarType>
+std::vector<Key> FixedLagSmoother<ScalarType>::Keys() const {
+  return ComputeKeysToOptimize(factors_);
+}
+
+template <typename ScalarType>
+int FixedLagSmoother<ScalarType>::Lag() const {
+  return lag_;
+}
+
+template <typename ScalarType>
+void FixedLagSmoother<ScalarType>::UpdateParams(const optimizer_params_t& params) {
+  params_ = params;
+  if (optimizer_ != nullptr) {
+    optimizer_->UpdateParams(params);
+  }
+}
+
+template <typename ScalarType>
+const optimizer_params_t& FixedLagSmoother<ScalarType>::Params() const {
+  return params_;
+}
+
+// ----------------------------------------------------------------------------
+// Private methods
+// ----------------------------------------------------------------------------
+
+template <typename ScalarType>
+std::optional<Factor<ScalarType>> FixedLagSmoother<ScalarType>::ComputeMarginalPrior(
+    const std::vector<Factor<Scalar>>& factors, const std::vector<Key>& marginalized_keys,
+    const std::vector<Key>& separator_keys) const {
+  std::vector<Key> key_order = marginalized_keys;
+  key_order.insert(key_order.end(), separator_keys.begin(), separator_keys.end());
+
+  DenseLinearizer<Scalar> linearizer(name_, factors, key_order);
+  DenseLinearization<Scalar> linearization;
+  linearizer.Relinearize(values_, linearization);
+
+  // The marginalized keys come first in the state vector
+  const int marginalized_dim = values_.CreateIndex(marginalized_keys).tangent_dim;
+  const int separator_dim = linearization.rhs.size() - marginalized_dim;
+
+  const MatrixX<Scalar> hessian =
+      linearization.hessian_lower.template selfadjointView<Eigen::Lower>();
+  const auto H_mm = hessian.topLeftCorner(marginalized_dim, marginalized_dim);
+  const auto H_sm = hessian.bottomLeftCorner(separator_dim, marginalized_dim);
+  const auto H_ss = hessian.bottomRightCorner(separator_dim, separator_dim);
+  const auto rhs_m = linearization.rhs.head(marginalized_dim);
+  const auto rhs_s = linearization.rhs.tail(separator_dim);
+
+  // Schur complement of the marginalized block.  The LDLT zeroes out directions in which H_mm is
+  // singular, i.e. marginalized directions which the factors don't constrain
+  const Eigen::LDLT<MatrixX<Scalar>> H_mm_ldlt(H_mm);
+  const MatrixX<Scalar> schur_hessian = H_ss - H_sm * H_mm_ldlt.solve(H_sm.transpose());
+  const VectorX<Scalar> schur_rhs = rhs_s - H_sm * H_mm_ldlt.solve(rhs_m);
+
+  // Factor the Schur complement into a square root form, with one residual per direction it
+  // constrains:
+  //
+  //     0.5 * |residual0 + jacobian0 * dx|^2 = 0.5 * dx^T S dx + dx^T rhs + const
+  const Eigen::SelfAdjointEigenSolver<MatrixX<Scalar>> eigen(schur_hessian);
+  const VectorX<Scalar>& eigenvalues = eigen.eigenvalues();
+  const Scalar threshold = std::max(eigenvalues.maxCoeff(), Scalar{0}) * separator_dim *
+                           Eigen::NumTraits<Scalar>::epsilon();
+
+  std::vector<int> kept_directions;
+  for (int i = 0; i < separator_dim; i++) {
+    if (eigenvalues[i] > threshold) {
+      kept_directions.push_back(i);
+    }
+  }
+
+  if (kept_directions.empty()) {
+    return {};
+  }
+
+  const int prior_dim = static_cast<int>(kept_directions.size());
+  VectorX<Scalar> residual0(prior_dim);
+  MatrixX<Scalar> jacobian0(prior_dim, separator_dim);
+  for (int i = 0; i < prior_dim; i++) {
+    const Scalar sqrt_eigenvalue = std::sqrt(eigenvalues[kept_directions[i]]);
+    const auto eigenvector = eigen.eigenvectors().col(kept_directions[i]);
+    jacobian0.row(i) = sqrt_eigenvalue * eigenvector.transpose();
+    residual0[i] = eigenvector.dot(schur_rhs) / sqrt_eigenvalue;
+  }
+
+  Values<Scalar> linearization_point;
+  linearization_point.UpdateOrSet(values_.CreateIndex(separator_keys), values_);
+
+  return internal::LinearizedPriorFactor(separator_keys, linearization_point, residual0, jacobian0,
+                                         epsilon_);
+}
+
+}  // namespace sym
@@ -136,7 +136,8 @@ class GncOptimizer : public BaseOptimizerType {
     const bool include_debug_jacobians = this->debug_stats_ && this->include_jacobians_;
     IterateToConvergenceImpl(values, this->nonlinear_solver_, this->linearize_func_, num_iterations,
                              populate_best_linearization, include_debug_jacobians, this->name_,
-                             stats);
+                             stats, this->iteration_callback_, this->cancellation_token_.get(),
+                             &this->linearizer_);
   }
 
   optimizer_gnc_params_t gnc_params_;
@@ -6,13 +6,16 @@
 #pragma once
 
 #include <unordered_map>
+#include <vector>
 
 #include <Eigen/SparseCore>
 
 #include <sym/util/typedefs.h>
 #include <symforce/opt/linearizer.h>
 
+#include "../sparse_cholesky/sparse_cholesky_solver.h"
 #include "../sparse_schur_solver.h"
+#include "./selected_inverse.h"
 
 namespace sym {
 namespace internal {
@@ -78,6 +81,98 @@ void ComputeCovarianceBlockWithSchurComplement(MatrixX<Scalar>& hessian_lower,
                          .block(0, 0, block_dim, block_dim);
 }
 
+/**
+ * A block of the covariance matrix, with the rows of one variable and the columns of another, given
+ * by their index entries in the problem
+ */
+struct CovarianceBlockIndex {
+  index_entry_t rows;
+  index_entry_t cols;
+};
+
+/**
+ * Computes the given blocks of the covariance matrix, without computing the full covariance
+ *
+ * Factorizes the hessian with `solver`, analyzing its sparsity pattern first if `analyze` is true,
+ * and computes only the entries of the covariance needed for the requested blocks with
+ * SelectedInverse.  Unlike ComputeCovarianceBlockWithSchurComplement, this puts no restrictions on
+ * the order or structure of the variables.
+ *
+ * The diagonal of the variables which aren't in any of the blocks is damped by epsilon, so if the
+ * variables in the blocks come first, the result is the same as from
+ * ComputeCovarianceBlockWithSchurComplement.
+ *
+ * Args:
+ *     hessian_lower: The lower triangular portion of the Hessian.  This will be modified in place
+ *     analyze: Whether the sparsity pattern of the hessian changed since the last call with
+ *         `solver`
+ *     solver: The solver used to factorize the hessian
+ *     blocks: The blocks of the covariance to compute
+ *     covariance_blocks: The vector in which the result is stored, with one matrix per block
+ */
+template <typename Scalar>
+void ComputeCovarianceBlocksWithSelectedInverse(
+    Eigen::SparseMatrix<Scalar>& hessian_lower, const bool analyze, const Scalar epsilon,
+    sym::SparseCholeskySolver<Eigen::SparseMatrix<Scalar>>& solver,
+    const std::vector<CovarianceBlockIndex>& blocks,
+    std::vector<sym::MatrixX<Scalar>>& covariance_blocks) {
+  // Damp the variables outside of the blocks, which are the ones marginalized out
+  VectorX<Scalar> damping = VectorX<Scalar>::Constant(hessian_lower.rows(), epsilon);
+  for (const auto& block : blocks) {
+    damping.segment(block.rows.offset, block.rows.tangent_dim).setZero();
+    damping.segment(block.cols.offset, block.cols.tangent_dim).setZero();
+  }
+  hessian_lower.diagonal().array() += damping.array();
+
+  if (analyze || !solver.IsInitialized()) {
+    solver.AnalyzeSparsityPattern(hessian_lower);
+  }
+  const bool success = solver.Factorize(hessian_lower);
+  SYM_ASSERT(success, "Internal Error: hessian factorization failed");
+
+  using StorageIndex = typename Eigen::SparseMatrix<Scalar>::StorageIndex;
+  SelectedInverse<Scalar, StorageIndex> selected_inverse;
+  for (const auto& block : blocks) {
+    selected_inverse.AddBlock(block.rows.offset, block.rows.tangent_dim, block.cols.offset,
+                              block.cols.tangent_dim);
+  }
+  selected_inverse.Compute(solver.L(), solver.D(), solver.Permutation());
+
+  covariance_blocks.resize(blocks.size());
+  for (size_t i = 0; i < blocks.size(); i++) {
+    covariance_blocks[i] =
+        selected_inverse.Block(blocks[i].rows.offset, blocks[i].rows.tangent_dim,
+                               blocks[i].cols.offset, blocks[i].cols.tangent_dim);
+  }
+}
+
+/**
+ * Computes the given blocks of the covariance matrix. This is the overload for dense matrices,
+ * which inverts the full hessian, damped by epsilon like the dense overload of
+ * ComputeCovarianceBlockWithSchurComplement.
+ *
+ * Args:
+ *     hessian_lower: The lower triangular portion of the Hessian.  This will be modified in place
+ */
+template <typename Scalar>
+void ComputeCovarianceBlocksWithSelectedInverse(
+    MatrixX<Scalar>& hessian_lower, const bool /* analyze */, const Scalar epsilon,
+    sym::SparseCholeskySolver<Eigen::SparseMatrix<Scalar>>& /* solver */,
+    const std::vector<CovarianceBlockIndex>& blocks,
+    std::vector<sym::MatrixX<Scalar>>& covariance_blocks) {
+  hessian_lower.diagonal().array() += epsilon;
+
+  const Eigen::LDLT<MatrixX<Scalar>> ldlt(hessian_lower);
+  const MatrixX<Scalar> covariance =
+      ldlt.solve(MatrixX<Scalar>::Identity(hessian_lower.rows(), hessian_lower.rows()));
+
+  covariance_blocks.resize(blocks.size());
+  for (size_t i = 0; i < blocks.size(); i++) {
+    covariance_blocks[i] = covariance.block(blocks[i].rows.offset, blocks[i].cols.offset,
+                                            blocks[i].rows.tangent_dim, blocks[i].cols.tangent_dim);
+  }
+}
+
 /**
  * Extract covariances for optimized variables individually from the full problem covariance.  For
  * each variable in `keys`, the returned matrix is the corresponding block from the diagonal of
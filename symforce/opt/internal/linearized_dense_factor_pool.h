@@ -103,6 +103,15 @@ class LinearizedDenseFactorPool {
     return unique_linearized_factors_.at(index_per_factor_.at(dense_index));
   }
 
+  /**
+   * Remove the dense factors with the given sorted indices, such that the following factors are
+   * indexed as if they had not been appended.  The linearizations of their shapes are kept, so
+   * the same SizeTracker can be used for appending more factors.
+   */
+  void Erase(const std::vector<int>& sorted_dense_indices) {
+    EraseIndices(index_per_factor_, sorted_dense_indices);
+  }
+
  private:
   // One LinearizedDenseFactor for each unique pair of res_dim and rhs_dim seen
   std::vector<LinearizedDenseFactor> unique_linearized_factors_;
@@ -95,6 +95,48 @@ CoordsToStorageMap CoordsToStorageOffset(const Eigen::SparseMatrix<Scalar>& mat)
   return coords_to_storage_offset;
 }
 
+/**
+ * Remove the elements at the given sorted indices from vec, keeping the order of the others
+ */
+template <typename T>
+void EraseIndices(std::vector<T>& vec, const std::vector<int>& sorted_indices) {
+  auto removed = sorted_indices.begin();
+  size_t kept = 0;
+  for (size_t i = 0; i < vec.size(); i++) {
+    if (removed != sorted_indices.end() && *removed == static_cast<int>(i)) {
+      ++removed;
+      continue;
+    }
+    if (kept != i) {
+      vec[kept] = std::move(vec[i]);
+    }
+    ++kept;
+  }
+  vec.erase(vec.begin() + kept, vec.end());
+}
+
+/**
+ * For each entry in the storage of mat, its storage offset in another sparse matrix with the same
+ * entries (and possibly more), given the CoordsToStorageMap of the other matrix.
+ *
+ * If row_map is given, the entry in row i of mat is in row (*row_map)[i] of the other matrix, or
+ * isn't in it at all if that is negative, in which case its offset is -1.
+ */
+template <typename Scalar>
+std::vector<int32_t> StorageOffsetMap(const Eigen::SparseMatrix<Scalar>& mat,
+                                      const CoordsToStorageMap& coords_to_storage_offset,
+                                      const std::vector<int32_t>* const row_map = nullptr) {
+  std::vector<int32_t> storage_offset_map;
+  storage_offset_map.reserve(mat.nonZeros());
+  for (int col = 0; col < mat.outerSize(); ++col) {
+    for (typename Eigen::SparseMatrix<Scalar>::InnerIterator it(mat, col); it; ++it) {
+      const int32_t row = row_map == nullptr ? it.row() : (*row_map)[it.row()];
+      storage_offset_map.push_back(row < 0 ? -1 : coords_to_storage_offset.at({row, it.col()}));
+    }
+  }
+  return storage_offset_map;
+}
+
 template <typename Scalar>
 void ComputeKeyHelperSparseColOffsets(
     const std::optional<CoordsToStorageMap>& jacobian_row_col_to_storage_offset,
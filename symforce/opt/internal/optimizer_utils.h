@@ -5,8 +5,13 @@
 
 #pragma once
 
+#include <chrono>
+#include <cstddef>
+#include <type_traits>
+
 #include <spdlog/spdlog.h>
 
+#include "../cancellation_token.h"
 #include "../optimization_stats.h"
 #include "../tic_toc.h"
 
@@ -30,20 +35,52 @@ void LogStatus(const std::string& name, const OptimizationStats& stats) {
 /**
  * Call nonlinear_solver.Iterate() on the given values (updating in place) until out of
  * iterations or converged
+ *
+ * If given, iteration_callback is called with an OptimizationIterationInfo after each iteration,
+ * and stops the optimization with status STOPPED_BY_CALLBACK if it returns true.  If given,
+ * cancellation_token is checked after each iteration, and stops the optimization with status
+ * CANCELLED once it's cancelled.  If given, the number of factors the linearizer skipped in the
+ * linearization for each iteration is recorded in its stats
  */
 template <typename ValuesType, typename NonlinearSolver, typename LinearizeFunc,
-          typename OptimizationStats>
+          typename OptimizationStats, typename IterationCallback = std::nullptr_t,
+          typename Linearizer = std::nullptr_t>
 void IterateToConvergenceImpl(ValuesType& values, NonlinearSolver& nonlinear_solver,
                               const LinearizeFunc& linearize_func, const int num_iterations,
                               const bool populate_best_linearization, const bool include_jacobians,
-                              const std::string& name, OptimizationStats& stats) {
+                              const std::string& name, OptimizationStats& stats,
+                              const IterationCallback& iteration_callback = nullptr,
+                              const CancellationToken* const cancellation_token = nullptr,
+                              const Linearizer* const linearizer = nullptr) {
   SYM_TIME_SCOPE("Optimizer<{}>::IterateToConvergence", name);
   SYM_ASSERT(num_iterations > 0, "num_iterations must be positive, got {}", num_iterations);
 
+  const auto start = std::chrono::steady_clock::now();
+
   // Iterate
   int i;
   for (i = 0; i < num_iterations; i++) {
+    const auto iteration_start = std::chrono::steady_clock::now();
     const auto maybe_status_and_failure_reason = nonlinear_solver.Iterate(linearize_func, stats);
+
+    if constexpr (!std::is_same_v<Linearizer, std::nullptr_t>) {
+      if (linearizer != nullptr) {
+        stats.iterations.back().num_factors_skipped = linearizer->NumFactorsSkipped();
+      }
+    }
+
+    bool stop = false;
+    if constexpr (!std::is_same_v<IterationCallback, std::nullptr_t>) {
+      if (iteration_callback) {
+        SYM_TIME_SCOPE("Optimizer<{}>::IterationCallback", name);
+        const auto now = std::chrono::steady_clock::now();
+        stop = iteration_callback(
+            {stats.iterations.back(), std::chrono::duration<double>(now - iteration_start).count(),
+             std::chrono::duration<double>(now - start).count(), nonlinear_solver.GetBestValues(),
+             nonlinear_solver.GetBestLinearization()});
+      }
+    }
+
     if (maybe_status_and_failure_reason) {
       const auto& [status, failure_reason] = maybe_status_and_failure_reason.value();
 
@@ -56,6 +93,18 @@ void IterateToConvergenceImpl(ValuesType& values, NonlinearSolver& nonlinear_sol
       stats.failure_reason = failure_reason.int_value();
       break;
     }
+
+    if (cancellation_token != nullptr && cancellation_token->IsCancelled()) {
+      stats.status = optimization_status_t::CANCELLED;
+      stats.failure_reason = {};
+      break;
+    }
+
+    if (stop) {
+      stats.status = optimization_status_t::STOPPED_BY_CALLBACK;
+      stats.failure_reason = {};
+      break;
+    }
   }
 
   if (i == num_iterations) {
@@ -86,11 +135,15 @@ void IterateToConvergenceImpl(ValuesType& values, NonlinearSolver& nonlinear_sol
  * Optimize the given values in-place
  */
 template <typename ValuesType, typename NonlinearSolver, typename LinearizeFunc,
-          typename OptimizationStats>
+          typename OptimizationStats, typename IterationCallback = std::nullptr_t,
+          typename Linearizer = std::nullptr_t>
 void OptimizeImpl(ValuesType& values, NonlinearSolver& nonlinear_solver,
                   const LinearizeFunc& linearize_func, int num_iterations,
                   const bool populate_best_linearization, const std::string& name,
-                  const bool include_jacobians, const bool verbose, OptimizationStats& stats) {
+                  const bool include_jacobians, const bool verbose, OptimizationStats& stats,
+                  const IterationCallback& iteration_callback = nullptr,
+                  const CancellationToken* const cancellation_token = nullptr,
+                  const Linearizer* const linearizer = nullptr) {
   SYM_TIME_SCOPE("Optimizer<{}>::Optimize", name);
 
   if (num_iterations < 0) {
@@ -101,7 +154,8 @@ void OptimizeImpl(ValuesType& values, NonlinearSolver& nonlinear_solver,
   nonlinear_solver.Reset(values);
   stats.Reset(num_iterations);
   IterateToConvergenceImpl(values, nonlinear_solver, linearize_func, num_iterations,
-                           populate_best_linearization, include_jacobians, name, stats);
+                           populate_best_linearization, include_jacobians, name, stats,
+                           iteration_callback, cancellation_token, linearizer);
 
   if (verbose) {
     LogStatus<OptimizationStats, NonlinearSolver>(name, stats);
@@ -0,0 +1,80 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <exception>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace sym {
+namespace internal {
+
+/**
+ * Call func(task_index) for every task_index in [0, num_tasks), using up to num_threads threads
+ * (including the calling thread), and return once all tasks have finished.
+ *
+ * Tasks are claimed by threads as they become free, so which thread runs a given task is not
+ * deterministic; callers that need deterministic results should make the result of each task
+ * depend only on its index.
+ *
+ * If a task throws, tasks which have not been started yet are skipped, and the first exception is
+ * rethrown on the calling thread.
+ */
+template <typename Func>
+void ParallelFor(const int num_tasks, const int num_threads, Func&& func) {
+  const int num_workers = std::min(num_tasks, num_threads);
+
+  if (num_workers <= 1) {
+    for (int i = 0; i < num_tasks; i++) {
+      func(i);
+    }
+    return;
+  }
+
+  std::atomic<int> next_task{0};
+  std::atomic<bool> failed{false};
+  std::exception_ptr exception;
+  std::mutex exception_mutex;
+
+  const auto work = [&]() {
+    while (!failed) {
+      const int task = next_task++;
+      if (task >= num_tasks) {
+        return;
+      }
+
+      try {
+        func(task);
+      } catch (...) {
+        std::lock_guard<std::mutex> lock(exception_mutex);
+        if (!failed) {
+          exception = std::current_exception();
+          failed = true;
+        }
+      }
+    }
+  };
+
+  std::vector<std::thread> threads;
+  threads.reserve(num_workers - 1);
+  for (int i = 0; i < num_workers - 1; i++) {
+    threads.emplace_back(work);
+  }
+  work();
+  for (auto& thread : threads) {
+    thread.join();
+  }
+
+  if (exception) {
+    std::rethrow_exception(exception);
+  }
+}
+
+}  // namespace internal
+}  // namespace sym
@@ -0,0 +1,50 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <numeric>
+#include <vector>
+
+#include "../assert.h"
+
+namespace sym {
+namespace internal {
+
+/**
+ * The number of trailing blocks of variables of the symmetric matrix A which can be eliminated with
+ * a Schur complement, i.e. the longest run of trailing blocks whose columns of the lower triangle
+ * have no entries below the block, so that the trailing part of A is block diagonal (like the
+ * landmarks in bundle adjustment, if they're after the cameras)
+ *
+ * Args:
+ *     A_lower: The lower triangle of A
+ *     block_dims: The dimensions of the blocks of variables of A, in order, which must add up to
+ *                 the dimension of A
+ */
+template <typename MatrixType>
+int NumUncoupledTrailingBlocks(const MatrixType& A_lower, const std::vector<int>& block_dims) {
+  SYM_ASSERT_EQ(std::accumulate(block_dims.begin(), block_dims.end(), 0), A_lower.cols());
+
+  int block_end = static_cast<int>(A_lower.cols());
+  int num_blocks = 0;
+  for (auto dim = block_dims.rbegin(); dim != block_dims.rend(); ++dim) {
+    const int block_start = block_end - *dim;
+    for (int col = block_start; col < block_end; col++) {
+      for (typename MatrixType::InnerIterator it(A_lower, col); it; ++it) {
+        if (it.row() >= block_end) {
+          return num_blocks;
+        }
+      }
+    }
+
+    num_blocks++;
+    block_end = block_start;
+  }
+  return num_blocks;
+}
+
+}  // namespace internal
+}  // namespace sym
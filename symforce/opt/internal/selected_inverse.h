@@ -0,0 +1,229 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <vector>
+
+#include <Eigen/Core>
+#include <Eigen/SparseCore>
+
+#include <sym/util/typedefs.h>
+
+#include "../assert.h"
+
+namespace sym {
+namespace internal {
+
+/**
+ * Computes selected entries of the inverse Z = inv(A) of a sparse symmetric matrix A from its
+ * factorization P * A * P^T = L * D * L^T, as computed by SparseCholeskySolver, without computing
+ * the rest of Z.
+ *
+ * Uses the Takahashi recurrences, in the permuted ordering:
+ *
+ *     Z(j, j) = 1 / D(j) - sum_{k in L(:, j)} L(k, j) * Z(k, j)
+ *     Z(i, j) = -sum_{k in L(:, j)} L(k, j) * Z(i, k)             for i > j
+ *
+ * Every entry on the right hand side is in a later column than Z(i, j) (or in the same column and
+ * off the diagonal), so the requested entries and the entries they depend on are computed column
+ * by column, from the last column to the first.  The dependencies of the entries within the
+ * sparsity pattern of L only reach the columns on the path to the root of the elimination tree, so
+ * for a good ordering only a small fraction of Z is computed for each requested block.
+ *
+ * Usage:
+ *
+ *     SelectedInverse<Scalar, StorageIndex> selected_inverse;
+ *     selected_inverse.AddBlock(row_offset, rows, col_offset, cols);
+ *     ...
+ *     selected_inverse.Compute(solver.L(), solver.D(), solver.Permutation());
+ *     selected_inverse.Block(row_offset, rows, col_offset, cols);
+ */
+template <typename Scalar, typename StorageIndex>
+class SelectedInverse {
+ public:
+  using CholMatrixType = Eigen::SparseMatrix<Scalar, Eigen::ColMajor, StorageIndex>;
+  using PermutationMatrixType =
+      Eigen::PermutationMatrix<Eigen::Dynamic, Eigen::Dynamic, StorageIndex>;
+
+  /**
+   * Request the block of Z with the given rows and columns, in the ordering of A.  Must be called
+   * before Compute()
+   */
+  void AddBlock(const Eigen::Index row_offset, const Eigen::Index rows,
+                const Eigen::Index col_offset, const Eigen::Index cols) {
+    requested_blocks_.push_back({row_offset, rows, col_offset, cols});
+  }
+
+  /**
+   * Compute the entries of Z needed for the requested blocks, from the factorization of A
+   *
+   * Args:
+   *     L: The unit lower triangular factor, with only the strictly lower triangle stored
+   *     D: The diagonal factor
+   *     permutation: The permutation P, or empty for the identity
+   */
+  void Compute(const CholMatrixType& L, const Eigen::Matrix<Scalar, Eigen::Dynamic, 1>& D,
+               const PermutationMatrixType& permutation);
+
+  /**
+   * The block of Z with the given rows and columns, in the ordering of A.  The block must have
+   * been requested with AddBlock() before the last call to Compute()
+   */
+  MatrixX<Scalar> Block(Eigen::Index row_offset, Eigen::Index rows, Eigen::Index col_offset,
+                        Eigen::Index cols) const;
+
+  /**
+   * The number of entries of Z computed by the last call to Compute()
+   */
+  size_t NumComputedEntries() const {
+    size_t num_entries = 0;
+    for (const auto& rows : rows_) {
+      num_entries += rows.size();
+    }
+    return num_entries;
+  }
+
+ private:
+  struct RequestedBlock {
+    Eigen::Index row_offset;
+    Eigen::Index rows;
+    Eigen::Index col_offset;
+    Eigen::Index cols;
+  };
+
+  StorageIndex Permuted(const Eigen::Index i) const {
+    return permutation_indices_.size() > 0 ? permutation_indices_[i] : static_cast<StorageIndex>(i);
+  }
+
+  // Add the entry (i, j) of Z, in the permuted ordering, to the entries to compute
+  void Request(const StorageIndex i, const StorageIndex j) {
+    if (i >= j) {
+      rows_[j].push_back(i);
+    } else {
+      rows_[i].push_back(j);
+    }
+  }
+
+  // The entry (i, j) of Z in the permuted ordering, which must have been computed already
+  Scalar At(const StorageIndex i, const StorageIndex j) const {
+    const StorageIndex row = std::max(i, j);
+    const StorageIndex col = std::min(i, j);
+    const auto& rows = rows_[col];
+    const auto it = std::lower_bound(rows.begin(), rows.end(), row);
+    SYM_ASSERT(it != rows.end() && *it == row);
+    return values_[col][it - rows.begin()];
+  }
+
+  std::vector<RequestedBlock> requested_blocks_;
+
+  Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1> permutation_indices_;
+
+  // The sorted rows of the entries to compute in each column of the lower triangle of Z, in the
+  // permuted ordering, and their values
+  std::vector<std::vector<StorageIndex>> rows_;
+  std::vector<std::vector<Scalar>> values_;
+};
+
+template <typename Scalar, typename StorageIndex>
+void SelectedInverse<Scalar, StorageIndex>::Compute(
+    const CholMatrixType& L, const Eigen::Matrix<Scalar, Eigen::Dynamic, 1>& D,
+    const PermutationMatrixType& permutation) {
+  const StorageIndex N = static_cast<StorageIndex>(L.cols());
+  SYM_ASSERT_EQ(D.size(), N);
+  SYM_ASSERT(permutation.size() == 0 || permutation.size() == N);
+
+  permutation_indices_ = permutation.indices();
+  rows_.assign(N, {});
+  values_.assign(N, {});
+
+  for (const RequestedBlock& block : requested_blocks_) {
+    SYM_ASSERT(block.row_offset >= 0 && block.row_offset + block.rows <= N);
+    SYM_ASSERT(block.col_offset >= 0 && block.col_offset + block.cols <= N);
+    for (Eigen::Index col = block.col_offset; col < block.col_offset + block.cols; col++) {
+      for (Eigen::Index row = block.row_offset; row < block.row_offset + block.rows; row++) {
+        Request(Permuted(row), Permuted(col));
+      }
+    }
+  }
+
+  // Add the dependencies of each column, which are all in later columns, so the requests for each
+  // column are complete by the time it's reached
+  for (StorageIndex j = 0; j < N; j++) {
+    auto& rows = rows_[j];
+    if (rows.empty()) {
+      continue;
+    }
+
+    // The diagonal depends on the entries of the same column in the pattern of L(:, j)
+    if (std::find(rows.begin(), rows.end(), j) != rows.end()) {
+      for (typename CholMatrixType::InnerIterator it(L, j); it; ++it) {
+        rows.push_back(it.index());
+      }
+    }
+
+    std::sort(rows.begin(), rows.end());
+    rows.erase(std::unique(rows.begin(), rows.end()), rows.end());
+
+    for (const StorageIndex i : rows) {
+      if (i == j) {
+        continue;
+      }
+      for (typename CholMatrixType::InnerIterator it(L, j); it; ++it) {
+        Request(i, it.index());
+      }
+    }
+  }
+
+  // Compute the entries from the last column to the first
+  for (StorageIndex j = N - 1; j >= 0; j--) {
+    const auto& rows = rows_[j];
+    auto& values = values_[j];
+    values.resize(rows.size());
+
+    Eigen::Index diagonal_index = -1;
+    for (size_t r = 0; r < rows.size(); r++) {
+      const StorageIndex i = rows[r];
+      if (i == j) {
+        diagonal_index = r;
+        continue;
+      }
+
+      Scalar value = 0;
+      for (typename CholMatrixType::InnerIterator it(L, j); it; ++it) {
+        value -= it.value() * At(i, it.index());
+      }
+      values[r] = value;
+    }
+
+    if (diagonal_index >= 0) {
+      Scalar value = Scalar{1} / D[j];
+      for (typename CholMatrixType::InnerIterator it(L, j); it; ++it) {
+        value -= it.value() * At(it.index(), j);
+      }
+      values[diagonal_index] = value;
+    }
+  }
+
+  requested_blocks_.clear();
+}
+
+template <typename Scalar, typename StorageIndex>
+MatrixX<Scalar> SelectedInverse<Scalar, StorageIndex>::Block(const Eigen::Index row_offset,
+                                                             const Eigen::Index rows,
+                                                             const Eigen::Index col_offset,
+                                                             const Eigen::Index cols) const {
+  MatrixX<Scalar> block(rows, cols);
+  for (Eigen::Index col = 0; col < cols; col++) {
+    for (Eigen::Index row = 0; row < rows; row++) {
+      block(row, col) = At(Permuted(row_offset + row), Permuted(col_offset + col));
+    }
+  }
+  return block;
+}
+
+}  // namespace internal
+}  // namespace sym
@@ -11,6 +11,8 @@
 #include <fmt/ostream.h>
 #include <spdlog/spdlog.h>
 
+#include "../assert.h"
+
 namespace sym {
 namespace internal {
 
@@ -22,6 +24,9 @@ namespace {
 TicTocManager g_tic_toc{};
 thread_local ThreadContext g_thread_ctx{};
 
+// The last recorder started on this thread, which isn't stopped yet
+thread_local TicTocRecorder* g_thread_recorder{nullptr};
+
 double ToSeconds(const Duration& duration) {
   return static_cast<double>(duration.count()) * Duration::period::num / Duration::period::den;
 }
@@ -37,6 +42,13 @@ void TicTocUpdate(const std::string& name, const Duration& duration) {
   g_thread_ctx.Update(name, duration);
 }
 
+void TicTocUpdate(const std::string& name, const TimePoint& start, const Duration& duration) {
+  g_thread_ctx.Update(name, duration);
+  if (g_thread_recorder != nullptr) {
+    g_thread_recorder->Update(name, start, duration);
+  }
+}
+
 // --------------------------------------------------------------------------------------------
 //                                          TicTocStats
 // --------------------------------------------------------------------------------------------
@@ -91,6 +103,46 @@ void ThreadContext::Update(const std::string& name, const Duration& duration) {
   block_map_[name].Update(duration);
 }
 
+// --------------------------------------------------------------------------------------------
+//                                    TicTocRecorder
+// --------------------------------------------------------------------------------------------
+
+TicTocRecorder::~TicTocRecorder() {
+  if (recording_) {
+    Stop();
+  }
+}
+
+void TicTocRecorder::Start() {
+  SYM_ASSERT(!recording_);
+  blocks_.clear();
+  timeline_.clear();
+  start_time_ = GetMonotonicTime();
+  previous_ = g_thread_recorder;
+  g_thread_recorder = this;
+  recording_ = true;
+}
+
+void TicTocRecorder::Stop() {
+  SYM_ASSERT(recording_);
+  SYM_ASSERT(g_thread_recorder == this);
+  g_thread_recorder = previous_;
+  previous_ = nullptr;
+  recording_ = false;
+}
+
+void TicTocRecorder::Update(const std::string& name, const TimePoint& start,
+                            const Duration& duration) {
+  // This intentionally default-constructs the block if it doesn't exist
+  blocks_[name].Update(duration);
+  if (record_timeline_) {
+    timeline_.push_back({name, ToSeconds(start - start_time_), ToSeconds(duration)});
+  }
+  if (previous_ != nullptr) {
+    previous_->Update(name, start, duration);
+  }
+}
+
 // --------------------------------------------------------------------------------------------
 //                                    TicTocManager
 // --------------------------------------------------------------------------------------------
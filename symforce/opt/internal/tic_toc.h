@@ -8,6 +8,7 @@
 #include <mutex>
 #include <string>
 #include <unordered_map>
+#include <vector>
 
 namespace sym {
 namespace internal {
@@ -18,13 +19,15 @@ using Duration = TimePoint::duration;
 
 TimePoint GetMonotonicTime();
 void TicTocUpdate(const std::string& name, const Duration& duration);
+// Also adds the call to the TicTocRecorders recording on this thread
+void TicTocUpdate(const std::string& name, const TimePoint& start, const Duration& duration);
 
 class ScopedTicToc {
  public:
   explicit ScopedTicToc(const std::string& name) : name_(name), start_(GetMonotonicTime()) {}
 
   ~ScopedTicToc() {
-    TicTocUpdate(name_, GetMonotonicTime() - start_);
+    TicTocUpdate(name_, start_, GetMonotonicTime() - start_);
   }
 
  private:
@@ -64,6 +67,73 @@ class ThreadContext {
   std::unordered_map<std::string, TicTocStats> block_map_;
 };
 
+// One call to a timed scope, with times in seconds since the TicTocRecorder started
+struct TicTocEvent {
+  std::string name;
+  double start;
+  double duration;
+};
+
+/**
+ * Records the tic tocs on one thread between calls to Start() and Stop(), separately from the
+ * global aggregate printed on exit, e.g. to get the timings for a single optimization:
+ *
+ *     TicTocRecorder recorder;
+ *     recorder.Start();
+ *     optimizer.Optimize(values);
+ *     recorder.Stop();
+ *     for (const auto& [name, stats] : recorder.Blocks()) { ... }
+ *
+ * Only scopes which end on the thread which called Start() are recorded, not those on threads
+ * spawned by it.  Recorders may be nested, in which case each scope is recorded by all of them, but
+ * must be stopped in the reverse order they were started.  Nothing is recorded if SymForce is built
+ * with custom tic tocs (SYMFORCE_TIC_TOC_HEADER).
+ */
+class TicTocRecorder {
+ public:
+  // If record_timeline is true, also records every call to each scope, see Timeline()
+  explicit TicTocRecorder(bool record_timeline = false) : record_timeline_(record_timeline) {}
+  ~TicTocRecorder();
+
+  TicTocRecorder(const TicTocRecorder&) = delete;
+  TicTocRecorder& operator=(const TicTocRecorder&) = delete;
+
+  // Start recording on the calling thread, clearing anything recorded before
+  void Start();
+
+  // Stop recording.  Must be called on the thread which called Start()
+  void Stop();
+
+  bool IsRecording() const {
+    return recording_;
+  }
+
+  // The stats of each scope which ended while recording
+  const std::unordered_map<std::string, TicTocStats>& Blocks() const {
+    return blocks_;
+  }
+
+  // Every call to a scope which ended while recording, in the order they ended, if
+  // record_timeline is true
+  const std::vector<TicTocEvent>& Timeline() const {
+    return timeline_;
+  }
+
+  // Add a call to the named scope, and pass it on to the recorder started before this one
+  void Update(const std::string& name, const TimePoint& start, const Duration& duration);
+
+ private:
+  bool record_timeline_;
+  bool recording_{false};
+  TimePoint start_time_{};
+
+  // The recorder which was recording on this thread when this one was started
+  TicTocRecorder* previous_{nullptr};
+
+  std::unordered_map<std::string, TicTocStats> blocks_;
+  std::vector<TicTocEvent> timeline_;
+};
+
 class TicTocManager {
  public:
   TicTocManager();
@@ -5,6 +5,9 @@
 
 #pragma once
 
+#include <type_traits>
+#include <variant>
+
 #include <Eigen/Core>
 #include <Eigen/SparseCore>
 
@@ -15,7 +18,9 @@
 #include "./internal/levenberg_marquardt_state.h"
 #include "./linearization.h"
 #include "./optimization_stats.h"
+#include "./pcg_solver.h"
 #include "./sparse_cholesky/sparse_cholesky_solver.h"
+#include "./sparse_schur_solver.h"
 #include "./tic_toc.h"
 #include "./values.h"
 
@@ -127,6 +132,12 @@ namespace sym {
  *   takes the form lambda * I, or lambda * diag(J.T * J), where lambda is another parameter updated
  *   by the solver at each iteration.  Configuration of how this term is computed can be found
  *   in the optimizer params.
+ *
+ *   For sparse problems, the linear system for each step can instead be solved iteratively with
+ *   PcgSolver, by setting `linear_solver_type` to PCG in the optimizer params.  If the trailing
+ *   keys are not coupled to each other, like the landmarks in bundle adjustment, they can instead
+ *   be eliminated exactly with SparseSchurSolver by setting `linear_solver_type` to SCHUR.  The
+ *   linear solver given to the constructor is still used for ComputeCovariance.
  */
 template <typename ScalarType,
           typename _LinearSolverType = sym::SparseCholeskySolver<Eigen::SparseMatrix<ScalarType>>,
@@ -142,6 +153,10 @@ class LevenbergMarquardtSolver {
   using ValuesType = typename StateType::ValuesType;
   using FailureReason = levenberg_marquardt_solver_failure_reason_t;
 
+  // Whether the hessian is sparse, which is required by linear_solver_type_t::PCG and SCHUR
+  static constexpr bool kIsSparse =
+      std::is_base_of<Eigen::SparseMatrixBase<MatrixType>, MatrixType>::value;
+
   // Function that evaluates the objective function and produces a quadratic approximation of
   // it by linearizing a least-squares residual.
   using LinearizeFunc = std::function<void(const ValuesType&, LinearizationType&)>;
@@ -157,6 +172,16 @@ class LevenbergMarquardtSolver {
   // efficiently.
   void SetIndex(const index_t& index) {
     state_.SetIndex(index);
+
+    if constexpr (kIsSparse) {
+      block_dims_.clear();
+      block_dims_.reserve(index.entries.size());
+      for (const index_entry_t& entry : index.entries) {
+        block_dims_.push_back(entry.tangent_dim);
+      }
+      pcg_solver_.SetBlockDims(block_dims_);
+      solver_analyzed_ = false;
+    }
   }
 
   // Create an initial state to start a new optimization.
@@ -167,6 +192,13 @@ class LevenbergMarquardtSolver {
     ResetState(values);
   }
 
+  // Analyze the sparsity pattern of the hessian again on the next iteration, such as if the problem
+  // was rebuilt.  Patterns which only grow, like when keys or factors are added to the linearizer,
+  // are detected automatically.
+  void ResetSparsityPattern() {
+    solver_analyzed_ = false;
+  }
+
   // Sets the trust radius of the solver to the largest between its initial and current value.
   void RelaxDampingToInitial() {
     current_lambda_ = std::min(current_lambda_, static_cast<Scalar>(p_.initial_lambda));
@@ -220,6 +252,9 @@ class LevenbergMarquardtSolver {
 
   void CheckHessianDiagonal(const MatrixType& hessian_lower_damped, Scalar lambda);
 
+  // Analyze the sparsity pattern of the hessian with the solver for p_.linear_solver_type
+  void AnalyzeSparsityPattern(const MatrixType& hessian_lower);
+
   void PopulateIterationStats(optimization_iteration_t& iteration_stats, const StateType& state,
                               Scalar new_error, Scalar new_error_linear, Scalar relative_reduction,
                               Scalar gain_ratio) const;
@@ -234,6 +269,20 @@ class LevenbergMarquardtSolver {
 
   LinearSolverType linear_solver_{};
   bool solver_analyzed_{false};
+  // The size and number of nonzeros of the hessian the linear solver analyzed
+  Eigen::Index analyzed_hessian_dim_{0};
+  Eigen::Index analyzed_hessian_nonzeros_{0};
+  // The linear solver type the pattern was analyzed for
+  linear_solver_type_t analyzed_linear_solver_type_{linear_solver_type_t::DIRECT};
+
+  // The tangent dimensions of the optimized keys, in order
+  std::vector<int> block_dims_;
+
+  // Used instead of linear_solver_ if p_.linear_solver_type is PCG
+  std::conditional_t<kIsSparse, PcgSolver<MatrixType>, std::monostate> pcg_solver_{};
+
+  // Used instead of linear_solver_ if p_.linear_solver_type is SCHUR
+  std::conditional_t<kIsSparse, SparseSchurSolver<MatrixType>, std::monostate> schur_solver_{};
 
   // Current elementwise max of the Hessian diagonal across all iterations, used for damping
   bool have_max_diagonal_{false};
@@ -5,10 +5,13 @@
 
 #pragma once
 
+#include <numeric>
+
 #include <fmt/ranges.h>
 #include <spdlog/spdlog.h>
 
 #include "./assert.h"
+#include "./internal/schur_complement_utils.h"
 #include "./levenberg_marquardt_solver.h"
 #include "./tic_toc.h"
 #include "./util.h"
@@ -89,6 +92,41 @@ void LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::CheckHes
   }
 }
 
+template <typename ScalarType, typename LinearSolverType, typename StateType>
+void LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::AnalyzeSparsityPattern(
+    const MatrixType& hessian_lower) {
+  SYM_TIME_SCOPE("LM<{}>: AnalyzePattern", id_);
+  if constexpr (kIsSparse) {
+    if (p_.linear_solver_type == linear_solver_type_t::PCG) {
+      pcg_solver_.AnalyzeSparsityPattern(hessian_lower);
+    } else if (p_.linear_solver_type == linear_solver_type_t::SCHUR) {
+      std::vector<int> block_dims = block_dims_;
+      if (std::accumulate(block_dims.begin(), block_dims.end(), 0) != hessian_lower.rows()) {
+        block_dims.assign(hessian_lower.rows(), 1);
+      }
+
+      // Eliminate the trailing blocks for which the trailing part of the hessian is block diagonal
+      const int num_C_blocks = internal::NumUncoupledTrailingBlocks(hessian_lower, block_dims);
+      const int C_dim = std::accumulate(block_dims.end() - num_C_blocks, block_dims.end(), 0);
+      schur_solver_.ComputeSymbolicSparsity(hessian_lower, C_dim);
+
+      if (p_.verbose) {
+        spdlog::info("LM<{}> Schur complement: eliminating {} of {} keys, reduced dim {}", id_,
+                     num_C_blocks, block_dims.size(), hessian_lower.rows() - C_dim);
+      }
+    } else {
+      linear_solver_.AnalyzeSparsityPattern(hessian_lower);
+    }
+  } else {
+    linear_solver_.AnalyzeSparsityPattern(hessian_lower);
+  }
+
+  solver_analyzed_ = true;
+  analyzed_linear_solver_type_ = p_.linear_solver_type;
+  analyzed_hessian_dim_ = hessian_lower.rows();
+  analyzed_hessian_nonzeros_ = hessian_lower.nonZeros();
+}
+
 template <typename ScalarType, typename LinearSolverType, typename StateType>
 void LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::PopulateIterationStats(
     optimization_iteration_t& iteration_stats, const StateType& state, const Scalar new_error,
@@ -101,6 +139,7 @@ void LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::Populate
   iteration_stats.new_error = new_error;
   iteration_stats.new_error_linear = new_error_linear;
   iteration_stats.relative_reduction = relative_reduction;
+  iteration_stats.update_norm = update_.norm();
 
   if (p_.verbose) {
     SYM_TIME_SCOPE("LM<{}>: IterationStats - Print", id_);
@@ -181,11 +220,21 @@ LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::Iterate(
     }
   }
 
-  // Analyze the sparsity pattern for efficient repeated factorization
-  if (!solver_analyzed_) {
-    SYM_TIME_SCOPE("LM<{}>: AnalyzePattern", id_);
-    linear_solver_.AnalyzeSparsityPattern(state_.Init().GetLinearization().hessian_lower);
-    solver_analyzed_ = true;
+  SYM_ASSERT(p_.linear_solver_type == linear_solver_type_t::DIRECT ||
+                 p_.linear_solver_type == linear_solver_type_t::PCG ||
+                 p_.linear_solver_type == linear_solver_type_t::SCHUR,
+             "Invalid linear_solver_type: {}", p_.linear_solver_type);
+  SYM_ASSERT(p_.linear_solver_type == linear_solver_type_t::DIRECT || kIsSparse,
+             "linear_solver_type {} requires a sparse hessian", p_.linear_solver_type);
+
+  // Analyze the sparsity pattern for efficient repeated factorization.  It is only analyzed again
+  // if the structure of the problem changed, which grows the hessian or its sparsity pattern, or
+  // if the linear solver type changed.
+  const MatrixType& hessian_lower = state_.Init().GetLinearization().hessian_lower;
+  if (!solver_analyzed_ || p_.linear_solver_type != analyzed_linear_solver_type_ ||
+      hessian_lower.rows() != analyzed_hessian_dim_ ||
+      hessian_lower.nonZeros() != analyzed_hessian_nonzeros_) {
+    AnalyzeSparsityPattern(hessian_lower);
   }
 
   DampHessian(state_.Init().GetLinearization().hessian_lower, have_max_diagonal_, max_diagonal_,
@@ -193,24 +242,62 @@ LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::Iterate(
 
   CheckHessianDiagonal(state_.Init().GetLinearization().hessian_lower, current_lambda_);
 
-  {
-    SYM_TIME_SCOPE("LM<{}>: SparseFactorize", id_);
-    const bool success = linear_solver_.Factorize(state_.Init().GetLinearization().hessian_lower);
-    // TODO(brad): Instead try recovering from this (ultimately by increasing lambda).
-    SYM_ASSERT(success, "Internal Error: Damped hessian factorization failed");
-
-    // NOTE(aaron): This has to happen after the first factorize, since L_inner is not filled out
-    // by ComputeSymbolicSparsity.  The linear_solver may return an empty result for either of
-    // these, so the only way to know we haven't filled it out yet is the iteration number.
-    if (p_.debug_stats && iteration_ == 0) {
-      stats.linear_solver_ordering = linear_solver_.Permutation().indices();
-      stats.cholesky_factor_sparsity = GetSparseStructure(linear_solver_.L());
+  if constexpr (kIsSparse) {
+    if (p_.linear_solver_type == linear_solver_type_t::PCG) {
+      pcg_solver_.SetParams(p_.pcg_preconditioner, p_.pcg_max_iterations,
+                            static_cast<Scalar>(p_.pcg_max_forcing));
+
+      {
+        SYM_TIME_SCOPE("LM<{}>: PcgFactorize", id_);
+        const bool success = pcg_solver_.Factorize(state_.Init().GetLinearization().hessian_lower);
+        SYM_ASSERT(success, "Internal Error: Damped hessian preconditioner computation failed");
+      }
+
+      {
+        SYM_TIME_SCOPE("LM<{}>: PcgSolve", id_);
+        update_ = -pcg_solver_.Solve(state_.Init().GetLinearization().rhs);
+      }
+
+      if (p_.verbose) {
+        spdlog::info("LM<{}> PCG: [reduced dim {}] iterations {}, relative residual {}", id_,
+                     pcg_solver_.ReducedDim(), pcg_solver_.LastIterations(),
+                     pcg_solver_.LastRelativeResidual());
+      }
+    } else if (p_.linear_solver_type == linear_solver_type_t::SCHUR) {
+      {
+        SYM_TIME_SCOPE("LM<{}>: SchurFactorize", id_);
+        const bool success =
+            schur_solver_.Factorize(state_.Init().GetLinearization().hessian_lower);
+        SYM_ASSERT(success, "Internal Error: Damped hessian Schur complement factorization failed");
+      }
+
+      {
+        SYM_TIME_SCOPE("LM<{}>: SchurSolve", id_);
+        update_ = -schur_solver_.Solve(state_.Init().GetLinearization().rhs);
+      }
     }
   }
 
-  {
-    SYM_TIME_SCOPE("LM<{}>: SparseSolve", id_);
-    update_ = -linear_solver_.Solve(state_.Init().GetLinearization().rhs);
+  if (p_.linear_solver_type == linear_solver_type_t::DIRECT) {
+    {
+      SYM_TIME_SCOPE("LM<{}>: SparseFactorize", id_);
+      const bool success = linear_solver_.Factorize(state_.Init().GetLinearization().hessian_lower);
+      // TODO(brad): Instead try recovering from this (ultimately by increasing lambda).
+      SYM_ASSERT(success, "Internal Error: Damped hessian factorization failed");
+
+      // NOTE(aaron): This has to happen after the first factorize, since L_inner is not filled out
+      // by ComputeSymbolicSparsity.  The linear_solver may return an empty result for either of
+      // these, so the only way to know we haven't filled it out yet is the iteration number.
+      if (p_.debug_stats && iteration_ == 0) {
+        stats.linear_solver_ordering = linear_solver_.Permutation().indices();
+        stats.cholesky_factor_sparsity = GetSparseStructure(linear_solver_.L());
+      }
+    }
+
+    {
+      SYM_TIME_SCOPE("LM<{}>: SparseSolve", id_);
+      update_ = -linear_solver_.Solve(state_.Init().GetLinearization().rhs);
+    }
   }
 
   {
@@ -343,6 +430,17 @@ void LevenbergMarquardtSolver<ScalarType, LinearSolverType, StateType>::ComputeC
     const MatrixType& hessian_lower, MatrixX<Scalar>& covariance) {
   SYM_TIME_SCOPE("LM<{}>: ComputeCovariance()", id_);
 
+  // The linear solver has not analyzed this pattern if the steps were solved with PCG or SCHUR
+  if (!solver_analyzed_ || analyzed_linear_solver_type_ != linear_solver_type_t::DIRECT ||
+      hessian_lower.rows() != analyzed_hessian_dim_ ||
+      hessian_lower.nonZeros() != analyzed_hessian_nonzeros_) {
+    linear_solver_.AnalyzeSparsityPattern(hessian_lower);
+    solver_analyzed_ = true;
+    analyzed_linear_solver_type_ = linear_solver_type_t::DIRECT;
+    analyzed_hessian_dim_ = hessian_lower.rows();
+    analyzed_hessian_nonzeros_ = hessian_lower.nonZeros();
+  }
+
   // TODO(hayk, aaron): This solver assumes a dense RHS, should add support for a sparse RHS
   const bool success = linear_solver_.Factorize(hessian_lower);
   // TODO(brad): Instead try recovering from this by damping?
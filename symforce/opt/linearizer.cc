@@ -5,10 +5,13 @@
 
 #include "./linearizer.h"
 
+#include <algorithm>
+#include <numeric>
 #include <optional>
 
 #include "./assert.h"
 #include "./internal/linearizer_utils.h"
+#include "./internal/parallel_for.h"
 #include "./tic_toc.h"
 #include "symforce/opt/factor.h"
 
@@ -22,11 +25,12 @@ template <typename ScalarType>
 Linearizer<ScalarType>::Linearizer(const std::string& name,
                                    const std::vector<Factor<Scalar>>& factors,
                                    const std::vector<Key>& key_order, const bool include_jacobians,
-                                   const bool debug_checks)
+                                   const bool debug_checks, const int num_threads)
     : name_(name),
       factors_(&factors),
       include_jacobians_(include_jacobians),
       debug_checks_(debug_checks),
+      num_threads_(std::max(num_threads, 1)),
       linearized_dense_factors_(),
       linearized_sparse_factors_() {
   if (key_order.empty()) {
@@ -45,70 +49,174 @@ Linearizer<ScalarType>::Linearizer(const std::string& name,
     }
   }
 
-  linearized_sparse_factors_.resize(num_sparse_factors);
+  linearized_sparse_factors_.reserve(num_sparse_factors);
   sparse_factor_update_helpers_.reserve(num_sparse_factors);
 
+  linearized_dense_factors_.reserve(num_dense_factors);
   dense_factor_update_helpers_.reserve(num_dense_factors);
 }
 
 template <typename ScalarType>
 void Linearizer<ScalarType>::Relinearize(const Values<Scalar>& values,
                                          SparseLinearization<Scalar>& linearization) {
-  if (IsInitialized()) {
-    SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::NonFirst()", name_);
+  if (!IsInitialized()) {
+    SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::First()", name_);
 
-    EnsureLinearizationHasCorrectSize(linearization);
+    BuildInitialLinearization(values);
 
-    // Zero out blocks that are built additively
-    linearization.rhs.setZero();
-    Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr(),
-                                linearization.hessian_lower.nonZeros())
-        .setZero();
+    linearization = init_linearization_;
+    num_factors_skipped_ = 0;
+    return;
+  }
 
-    // Evaluate the factors
-    size_t sparse_idx{0};
-    size_t dense_idx{0};
-    for (int i = 0; i < static_cast<int>(factors_->size()); i++) {
-      const auto& factor = (*factors_)[i];
+  if (HasNewFactorsOrKeys()) {
+    SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::Extend()", name_);
+    ExtendLinearization(values);
+    ResetLinearizationPoint();
+  }
 
-      if (factor.IsSparse()) {
-        auto& linearized_sparse_factor = linearized_sparse_factors_.at(sparse_idx);
-        // TODO: Only compute factor Jacobians when include_jacobians_ is true.
-        factor.Linearize(values, linearized_sparse_factor, &factor_indices_[i]);
-        if (debug_checks_) {
-          internal::CheckLinearizedFactor(name_, factor, values, linearized_sparse_factor,
-                                          factor_indices_[i]);
-        }
+  if (relinearization_threshold_ > 0) {
+    SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::UpdateLinearizationPoint()", name_);
+    UpdateLinearizationPoint(values);
+  }
 
-        UpdateFromLinearizedSparseFactorIntoSparse(
-            linearized_sparse_factor, sparse_factor_update_helpers_.at(sparse_idx), linearization);
+  SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::NonFirst()", name_);
 
-        ++sparse_idx;
-      } else {
-        // Use temporary with the right size to avoid allocating after initialization.
-        auto& linearized_dense_factor = linearized_dense_factors_.at(dense_idx);
-        // TODO: Only compute factor Jacobians when include_jacobians_ is true.
-        factor.Linearize(values, linearized_dense_factor, &factor_indices_[i]);
-        if (debug_checks_) {
-          internal::CheckLinearizedFactor(name_, factor, values, linearized_dense_factor,
-                                          factor_indices_[i]);
-        }
+  EnsureLinearizationHasCorrectSize(linearization);
 
-        UpdateFromLinearizedDenseFactorIntoSparse(
-            linearized_dense_factor, dense_factor_update_helpers_.at(dense_idx), linearization);
+  // Zero out blocks that are built additively
+  linearization.rhs.setZero();
+  Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr(),
+                              linearization.hessian_lower.nonZeros())
+      .setZero();
 
-        ++dense_idx;
+  // Evaluate the factors
+  if (factor_ranges_.size() > 1) {
+    num_factors_skipped_ = RelinearizeInParallel(values, linearization);
+  } else {
+    const FactorRange all_factors{0, static_cast<int>(factors_->size()), 0, 0};
+    num_factors_skipped_ =
+        RelinearizeFactorRange(values, all_factors, linearized_dense_factors_, linearization,
+                               linearization.hessian_lower.valuePtr(), linearization.rhs.data());
+  }
+
+  linearization.SetInitialized();
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::AddKeys(const std::vector<Key>& keys) {
+  keys_.insert(keys_.end(), keys.begin(), keys.end());
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::RemoveFactors(const std::vector<int>& indices) {
+  SYM_ASSERT(std::is_sorted(indices.begin(), indices.end()));
+  if (indices.empty()) {
+    return;
+  }
+
+  // Factors which are not part of the structure yet have nothing to remove
+  const int num_factors = static_cast<int>(factor_indices_.size());
+  SYM_ASSERT(factors_->size() + indices.size() >= factor_indices_.size());
+  const std::vector<int> removed_indices(
+      indices.begin(), std::lower_bound(indices.begin(), indices.end(), num_factors));
+  if (removed_indices.empty()) {
+    return;
+  }
+
+  ResetLinearizationPoint();
+
+  // Compact the per-factor structure, moving the residual slice of each remaining factor to its
+  // new offset.  row_map is the row in the new residual of each row of the old residual, or -1
+  const int32_t M = init_linearization_.residual.size();
+  std::vector<int32_t> row_map(M, -1);
+  VectorX<Scalar> residual(M);
+
+  std::vector<int> removed_sparse_indices;
+  std::vector<int> removed_dense_indices;
+  auto removed_iter = removed_indices.begin();
+  int32_t residual_offset = 0;
+  int sparse_idx = 0;
+  int dense_idx = 0;
+  const auto move_residual = [&](auto& helper) {
+    for (int i = 0; i < helper.residual_dim; i++) {
+      row_map[helper.combined_residual_offset + i] = residual_offset + i;
+    }
+    residual.segment(residual_offset, helper.residual_dim) =
+        init_linearization_.residual.segment(helper.combined_residual_offset, helper.residual_dim);
+    helper.combined_residual_offset = residual_offset;
+    residual_offset += helper.residual_dim;
+  };
+  for (int i = 0; i < num_factors; i++) {
+    const bool is_removed = removed_iter != removed_indices.end() && *removed_iter == i;
+    if (is_removed) {
+      ++removed_iter;
+    }
+
+    if (factor_is_sparse_[i]) {
+      if (is_removed) {
+        removed_sparse_indices.push_back(sparse_idx);
+      } else {
+        move_residual(sparse_factor_update_helpers_[sparse_idx]);
+      }
+      ++sparse_idx;
+    } else {
+      if (is_removed) {
+        removed_dense_indices.push_back(dense_idx);
+      } else {
+        move_residual(dense_factor_update_helpers_[dense_idx]);
       }
+      ++dense_idx;
     }
+  }
+  internal::EraseIndices(factor_indices_, removed_indices);
+  internal::EraseIndices(factor_is_sparse_, removed_indices);
+  internal::EraseIndices(sparse_factor_update_helpers_, removed_sparse_indices);
+  internal::EraseIndices(linearized_sparse_factors_, removed_sparse_indices);
+  internal::EraseIndices(dense_factor_update_helpers_, removed_dense_indices);
+  linearized_dense_factors_.Erase(removed_dense_indices);
 
-    linearization.SetInitialized();
-  } else {
-    SYM_TIME_SCOPE("Linearizer<{}>::Relinearize::First()", name_);
+  init_linearization_.residual = residual.head(residual_offset);
 
-    BuildInitialLinearization(values);
+  if (include_jacobians_) {
+    // Drop the rows of the removed factors from the jacobian, and move the others up
+    std::vector<Eigen::Triplet<Scalar>> jacobian_triplets;
+    jacobian_triplets.reserve(init_linearization_.jacobian.nonZeros());
+    for (int col = 0; col < init_linearization_.jacobian.outerSize(); ++col) {
+      for (typename Eigen::SparseMatrix<Scalar>::InnerIterator it(init_linearization_.jacobian,
+                                                                  col);
+           it; ++it) {
+        if (row_map[it.row()] >= 0) {
+          jacobian_triplets.emplace_back(row_map[it.row()], it.col(), it.value());
+        }
+      }
+    }
+    const typename SparseLinearization<Scalar>::Matrix old_jacobian =
+        std::move(init_linearization_.jacobian);
+    init_linearization_.jacobian.resize(residual_offset, old_jacobian.cols());
+    init_linearization_.jacobian.setFromTriplets(jacobian_triplets.begin(),
+                                                 jacobian_triplets.end());
 
-    linearization = init_linearization_;
+    const std::vector<int32_t> jacobian_storage_map = internal::StorageOffsetMap(
+        old_jacobian, internal::CoordsToStorageOffset(init_linearization_.jacobian), &row_map);
+    RemapStorageOffsets(&jacobian_storage_map, nullptr);
   }
+
+  BuildFactorRanges();
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::SetRelinearizationThreshold(const Scalar threshold,
+                                                         const Scalar epsilon) {
+  SYM_ASSERT_GE(threshold, 0);
+  relinearization_threshold_ = threshold;
+  relinearization_epsilon_ = epsilon;
+  ResetLinearizationPoint();
+}
+
+template <typename ScalarType>
+int Linearizer<ScalarType>::NumFactorsSkipped() const {
+  return num_factors_skipped_;
 }
 
 template <typename ScalarType>
@@ -133,18 +241,331 @@ const std::unordered_map<key_t, index_entry_t>& Linearizer<ScalarType>::StateInd
   return state_index_;
 }
 
+template <typename ScalarType>
+int Linearizer<ScalarType>::NumThreads() const {
+  return num_threads_;
+}
+
 // ----------------------------------------------------------------------------
 // Private Methods
 // ----------------------------------------------------------------------------
 
+template <typename ScalarType>
+int Linearizer<ScalarType>::RelinearizeFactorRange(
+    const Values<Scalar>& values, const FactorRange& range,
+    internal::LinearizedDenseFactorPool<Scalar>& linearized_dense_factors,
+    SparseLinearization<Scalar>& linearization, Scalar* const hessian_lower_values,
+    Scalar* const rhs) {
+  int num_factors_skipped = 0;
+  size_t sparse_idx = range.sparse_begin;
+  size_t dense_idx = range.dense_begin;
+  for (int i = range.factor_begin; i < range.factor_end; i++) {
+    const auto& factor = (*factors_)[i];
+
+    if (relinearization_threshold_ > 0 && !NeedsRelinearization(i)) {
+      if (factor.IsSparse()) {
+        const auto& factor_helper = sparse_factor_update_helpers_.at(sparse_idx);
+        const auto& linearized_sparse_factor = linearized_sparse_factors_.at(sparse_idx);
+        UpdateFromLinearizedSparseFactorIntoSparse(linearized_sparse_factor, factor_helper,
+                                                   linearization, hessian_lower_values, rhs);
+        UpdateFromFactorMotion(i, linearized_sparse_factor, factor_helper, linearization, rhs);
+        ++sparse_idx;
+      } else {
+        const auto& factor_helper = dense_factor_update_helpers_.at(dense_idx);
+        const auto& linearized_dense_factor = previous_linearized_dense_factors_.at(dense_idx);
+        UpdateFromLinearizedDenseFactorIntoSparse(linearized_dense_factor, factor_helper,
+                                                  linearization, hessian_lower_values, rhs);
+        UpdateFromFactorMotion(i, linearized_dense_factor, factor_helper, linearization, rhs);
+        ++dense_idx;
+      }
+
+      ++num_factors_skipped;
+      continue;
+    }
+
+    // The motion of the keys of the factor since the linearization point, if it's tracked, to
+    // record the point the factor is evaluated at
+    const auto save_linearization_motion = [&](const auto& factor_helper, const int dim) {
+      if (relinearization_threshold_ > 0) {
+        VectorX<Scalar>& motion = factor_linearization_motions_[i];
+        motion.resize(dim);
+        for (const auto& key_helper : factor_helper.key_helpers) {
+          motion.segment(key_helper.factor_offset, key_helper.tangent_dim) =
+              linearization_point_motion_.segment(key_helper.combined_offset,
+                                                  key_helper.tangent_dim);
+        }
+        factor_is_linearized_[i] = true;
+      }
+    };
+
+    if (factor.IsSparse()) {
+      auto& linearized_sparse_factor = linearized_sparse_factors_.at(sparse_idx);
+      // TODO: Only compute factor Jacobians when include_jacobians_ is true.
+      factor.Linearize(values, linearized_sparse_factor, &factor_indices_[i]);
+      if (debug_checks_) {
+        internal::CheckLinearizedFactor(name_, factor, values, linearized_sparse_factor,
+                                        factor_indices_[i]);
+      }
+
+      UpdateFromLinearizedSparseFactorIntoSparse(linearized_sparse_factor,
+                                                 sparse_factor_update_helpers_.at(sparse_idx),
+                                                 linearization, hessian_lower_values, rhs);
+      save_linearization_motion(sparse_factor_update_helpers_.at(sparse_idx),
+                                linearized_sparse_factor.rhs.size());
+
+      ++sparse_idx;
+    } else {
+      // Use temporary with the right size to avoid allocating after initialization.
+      auto& linearized_dense_factor = linearized_dense_factors.at(dense_idx);
+      // TODO: Only compute factor Jacobians when include_jacobians_ is true.
+      factor.Linearize(values, linearized_dense_factor, &factor_indices_[i]);
+      if (debug_checks_) {
+        internal::CheckLinearizedFactor(name_, factor, values, linearized_dense_factor,
+                                        factor_indices_[i]);
+      }
+
+      UpdateFromLinearizedDenseFactorIntoSparse(linearized_dense_factor,
+                                                dense_factor_update_helpers_.at(dense_idx),
+                                                linearization, hessian_lower_values, rhs);
+      if (relinearization_threshold_ > 0) {
+        previous_linearized_dense_factors_.at(dense_idx) = linearized_dense_factor;
+      }
+      save_linearization_motion(dense_factor_update_helpers_.at(dense_idx),
+                                linearized_dense_factor.rhs.size());
+
+      ++dense_idx;
+    }
+  }
+
+  return num_factors_skipped;
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::UpdateLinearizationPoint(const Values<Scalar>& values) {
+  if (linearization_point_.Data().size() != values.Data().size()) {
+    // Start tracking from values, with every factor evaluated
+    linearization_point_ = values;
+    linearization_point_state_index_ = values.CreateIndex(keys_);
+    linearization_point_other_entries_.clear();
+    for (const index_entry_t& entry : values.CreateIndex(/* sort_by_offset */ true).entries) {
+      if (state_index_.count(entry.key) == 0) {
+        linearization_point_other_entries_.push_back(entry);
+      }
+    }
+    linearization_point_motion_ =
+        VectorX<Scalar>::Zero(linearization_point_state_index_.tangent_dim);
+    relinearized_inputs_.assign(values.Data().size(), false);
+
+    const size_t num_factors = factors_->size();
+    factor_is_linearized_.assign(num_factors, false);
+    factor_linearization_motions_.resize(num_factors);
+    previous_linearized_dense_factors_.resize(dense_factor_update_helpers_.size());
+    return;
+  }
+
+  std::fill(relinearized_inputs_.begin(), relinearized_inputs_.end(), false);
+
+  // The motion of each key from its linearization point to values.  The local coordinates from
+  // values to the linearization point are exactly the negative of this
+  linearization_point_motion_ = -linearization_point_.LocalCoordinates(
+      values, linearization_point_state_index_, relinearization_epsilon_);
+
+  int32_t tangent_offset = 0;
+  for (const index_entry_t& entry : linearization_point_state_index_.entries) {
+    auto motion = linearization_point_motion_.segment(tangent_offset, entry.tangent_dim);
+    if (motion.size() > 0 && motion.cwiseAbs().maxCoeff() > relinearization_threshold_) {
+      std::copy_n(values.Data().begin() + entry.offset, entry.storage_dim,
+                  linearization_point_.Data().begin() + entry.offset);
+      motion.setZero();
+      relinearized_inputs_[entry.offset] = true;
+    }
+    tangent_offset += entry.tangent_dim;
+  }
+
+  for (const index_entry_t& entry : linearization_point_other_entries_) {
+    const auto storage = values.Data().begin() + entry.offset;
+    auto point_storage = linearization_point_.Data().begin() + entry.offset;
+    if (!std::equal(storage, storage + entry.storage_dim, point_storage)) {
+      std::copy_n(storage, entry.storage_dim, point_storage);
+      relinearized_inputs_[entry.offset] = true;
+    }
+  }
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::ResetLinearizationPoint() {
+  linearization_point_ = {};
+  linearization_point_state_index_ = {};
+  linearization_point_other_entries_.clear();
+  factor_is_linearized_.clear();
+  factor_linearization_motions_.clear();
+  previous_linearized_dense_factors_.clear();
+}
+
+template <typename ScalarType>
+bool Linearizer<ScalarType>::NeedsRelinearization(const int factor_i) const {
+  if (!factor_is_linearized_[factor_i]) {
+    return true;
+  }
+  return std::any_of(
+      factor_indices_[factor_i].begin(), factor_indices_[factor_i].end(),
+      [this](const index_entry_t& entry) { return relinearized_inputs_[entry.offset]; });
+}
+
+template <typename ScalarType>
+template <typename LinearizedFactor, typename FactorHelper>
+void Linearizer<ScalarType>::UpdateFromFactorMotion(const int factor_i,
+                                                    const LinearizedFactor& linearized_factor,
+                                                    const FactorHelper& factor_helper,
+                                                    SparseLinearization<Scalar>& linearization,
+                                                    Scalar* const rhs) const {
+  // The motion of the keys of the factor since it was evaluated
+  VectorX<Scalar> motion = -factor_linearization_motions_[factor_i];
+  for (const auto& key_helper : factor_helper.key_helpers) {
+    motion.segment(key_helper.factor_offset, key_helper.tangent_dim) +=
+        linearization_point_motion_.segment(key_helper.combined_offset, key_helper.tangent_dim);
+  }
+
+  // The residual changes by J * motion, so the rhs J^T * residual changes by H * motion
+  linearization.residual.segment(factor_helper.combined_residual_offset,
+                                 factor_helper.residual_dim) += linearized_factor.jacobian * motion;
+  const VectorX<Scalar> rhs_change =
+      linearized_factor.hessian.template selfadjointView<Eigen::Lower>() * motion;
+  for (const auto& key_helper : factor_helper.key_helpers) {
+    Eigen::Map<VectorX<Scalar>>(rhs + key_helper.combined_offset, key_helper.tangent_dim) +=
+        rhs_change.segment(key_helper.factor_offset, key_helper.tangent_dim);
+  }
+}
+
+template <typename ScalarType>
+int Linearizer<ScalarType>::RelinearizeInParallel(const Values<Scalar>& values,
+                                                  SparseLinearization<Scalar>& linearization) {
+  const int num_ranges = static_cast<int>(factor_ranges_.size());
+
+  // Each range writes its own slices of the residual and jacobian, and accumulates its hessian and
+  // rhs into its own buffers
+  std::vector<int> range_num_factors_skipped(num_ranges);
+  internal::ParallelFor(num_ranges, num_threads_, [&](const int range_i) {
+    if (range_i == 0) {
+      range_num_factors_skipped[0] = RelinearizeFactorRange(
+          values, factor_ranges_[0], linearized_dense_factors_, linearization,
+          linearization.hessian_lower.valuePtr(), linearization.rhs.data());
+    } else {
+      VectorX<Scalar>& hessian_lower_values = range_hessian_lower_values_[range_i - 1];
+      VectorX<Scalar>& rhs = range_rhs_[range_i - 1];
+      hessian_lower_values.setZero();
+      rhs.setZero();
+      range_num_factors_skipped[range_i] = RelinearizeFactorRange(
+          values, factor_ranges_[range_i], range_linearized_dense_factors_[range_i - 1],
+          linearization, hessian_lower_values.data(), rhs.data());
+    }
+  });
+
+  // Sum the buffers in order of the ranges, so that the result doesn't depend on scheduling.  The
+  // hessian is split into contiguous parts, which are summed in parallel.
+  const int64_t hessian_nnz = linearization.hessian_lower.nonZeros();
+  internal::ParallelFor(num_ranges, num_threads_, [&](const int part) {
+    const int64_t begin = hessian_nnz * part / num_ranges;
+    const int64_t size = hessian_nnz * (part + 1) / num_ranges - begin;
+    auto hessian_lower_values =
+        Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr() + begin, size);
+    for (const VectorX<Scalar>& range_hessian_lower_values : range_hessian_lower_values_) {
+      hessian_lower_values += range_hessian_lower_values.segment(begin, size);
+    }
+  });
+  for (const VectorX<Scalar>& range_rhs : range_rhs_) {
+    linearization.rhs += range_rhs;
+  }
+
+  return std::accumulate(range_num_factors_skipped.begin(), range_num_factors_skipped.end(), 0);
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::BuildFactorRanges() {
+  const int num_factors = static_cast<int>(factors_->size());
+  const int num_ranges = std::min(num_threads_, num_factors);
+
+  factor_ranges_.clear();
+  int sparse_idx = 0;
+  int dense_idx = 0;
+  int factor_i = 0;
+  for (int range_i = 0; range_i < num_ranges; range_i++) {
+    FactorRange range;
+    range.factor_begin = factor_i;
+    range.factor_end =
+        static_cast<int>(static_cast<int64_t>(num_factors) * (range_i + 1) / num_ranges);
+    range.sparse_begin = sparse_idx;
+    range.dense_begin = dense_idx;
+    for (; factor_i < range.factor_end; factor_i++) {
+      if ((*factors_)[factor_i].IsSparse()) {
+        ++sparse_idx;
+      } else {
+        ++dense_idx;
+      }
+    }
+    factor_ranges_.push_back(range);
+  }
+
+  if (num_ranges > 1) {
+    range_linearized_dense_factors_.assign(num_ranges - 1, linearized_dense_factors_);
+    range_hessian_lower_values_.assign(
+        num_ranges - 1, VectorX<Scalar>::Zero(init_linearization_.hessian_lower.nonZeros()));
+    range_rhs_.assign(num_ranges - 1, VectorX<Scalar>::Zero(init_linearization_.rhs.size()));
+  }
+}
+
 template <typename ScalarType>
 void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& values) {
-  // Compute state vector index
-  int32_t offset = 0;
-  for (const Key& key : keys_) {
-    auto entry = values.IndexEntryAt(key);
+  ExtendLinearization(values);
+
+  initialized_ = true;
+}
+
+template <typename ScalarType>
+bool Linearizer<ScalarType>::HasNewFactorsOrKeys() const {
+  return factor_indices_.size() != factors_->size() || state_index_.size() != keys_.size();
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::ResetStructure() {
+  factor_indices_.clear();
+  factor_is_sparse_.clear();
+  linearized_dense_factors_ = {};
+  dense_factor_size_tracker_.clear();
+  linearized_sparse_factors_.clear();
+  state_index_.clear();
+  dense_factor_update_helpers_.clear();
+  sparse_factor_update_helpers_.clear();
+  init_linearization_ = {};
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::ExtendLinearization(const Values<Scalar>& values) {
+  // The helpers of a factor only cover the keys it optimizes which were in the state when it was
+  // added, so new keys optimized by existing factors require rebuilding everything
+  if (!factor_indices_.empty() && state_index_.size() < keys_.size()) {
+    const std::unordered_set<Key> new_keys(keys_.begin() + state_index_.size(), keys_.end());
+    const auto optimizes_new_key = [&new_keys](const Factor<Scalar>& factor) {
+      return std::any_of(factor.OptimizedKeys().begin(), factor.OptimizedKeys().end(),
+                         [&new_keys](const Key& key) { return new_keys.count(key) > 0; });
+    };
+    if (std::any_of(factors_->begin(), factors_->begin() + factor_indices_.size(),
+                    optimizes_new_key)) {
+      ResetStructure();
+    }
+  }
+
+  const size_t num_old_factors = factor_indices_.size();
+  const size_t num_old_keys = state_index_.size();
+  const int32_t old_N = init_linearization_.rhs.size();
+  const int32_t old_M = init_linearization_.residual.size();
+
+  // Compute state vector index of the new keys, after the existing ones
+  int32_t offset = old_N;
+  for (auto key = keys_.begin() + num_old_keys; key != keys_.end(); ++key) {
+    auto entry = values.IndexEntryAt(*key);
     entry.offset = offset;
-    state_index_[key.GetLcmType()] = entry;
+    state_index_[key->GetLcmType()] = entry;
 
     offset += entry.tangent_dim;
   }
@@ -154,44 +575,59 @@ void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& val
   // Allocate final storage for the combined RHS since it is dense and has a known size before
   // linearizing factors. Allocate temporary storage for the residual because the combined residual
   // dimension is not known yet.
-  init_linearization_.rhs.resize(N);
-  init_linearization_.rhs.setZero();
+  init_linearization_.rhs.conservativeResize(N);
+  init_linearization_.rhs.tail(N - old_N).setZero();
 
   std::vector<Scalar> residual;
 
   std::vector<Eigen::Triplet<Scalar>> jacobian_triplets;
   std::vector<Eigen::Triplet<Scalar>> hessian_lower_triplets;
 
+  // Keep the existing entries
+  const auto append_triplets = [](const Eigen::SparseMatrix<Scalar>& matrix,
+                                  std::vector<Eigen::Triplet<Scalar>>& triplets) {
+    triplets.reserve(matrix.nonZeros());
+    for (int col = 0; col < matrix.outerSize(); ++col) {
+      for (typename Eigen::SparseMatrix<Scalar>::InnerIterator it(matrix, col); it; ++it) {
+        triplets.emplace_back(it.row(), it.col(), it.value());
+      }
+    }
+  };
+  if (include_jacobians_) {
+    append_triplets(init_linearization_.jacobian, jacobian_triplets);
+  }
+  append_triplets(init_linearization_.hessian_lower, hessian_lower_triplets);
+
   // Add triplets for the diagonal.  These can otherwise be symbolically 0 for parts of keys touched
   // only by sparse factors
-  hessian_lower_triplets.reserve(N);
-  for (int i = 0; i < N; i++) {
+  for (int i = old_N; i < N; i++) {
     hessian_lower_triplets.emplace_back(i, i, 0);
   }
 
-  int32_t combined_residual_offset = 0;
+  int32_t combined_residual_offset = old_M;
 
-  // Track these to make sure that all combined keys are touched by at least one factor.
+  // Track these to make sure that all new keys are touched by at least one factor.  Existing keys
+  // are already touched by existing factors.
   std::unordered_set<Key> keys_touched_by_factors;
 
-  linearized_dense_factors_.reserve(factors_->size() - linearized_sparse_factors_.size());
-  typename internal::LinearizedDenseFactorPool<Scalar>::SizeTracker dense_factor_size_tracker;
-
-  // Evaluate all factors, processing the dense ones in place and storing the sparse ones for
+  // Evaluate all new factors, processing the dense ones in place and storing the sparse ones for
   // later
   LinearizedDenseFactor linearized_dense_factor{};
-  size_t sparse_idx{0};
+  const size_t first_new_sparse = linearized_sparse_factors_.size();
+  const size_t first_new_dense = dense_factor_update_helpers_.size();
   factor_indices_.reserve(factors_->size());
-  for (const auto& factor : *factors_) {
+  for (auto factor_it = factors_->begin() + num_old_factors; factor_it != factors_->end();
+       ++factor_it) {
+    const auto& factor = *factor_it;
     factor_indices_.push_back(values.CreateIndex(factor.AllKeys()).entries);
+    factor_is_sparse_.push_back(factor.IsSparse());
 
     for (const auto& key : factor.OptimizedKeys()) {
       keys_touched_by_factors.insert(key);
     }
 
     if (factor.IsSparse()) {
-      LinearizedSparseFactor& linearized_factor = linearized_sparse_factors_.at(sparse_idx);
-      ++sparse_idx;
+      LinearizedSparseFactor& linearized_factor = linearized_sparse_factors_.emplace_back();
       factor.Linearize(values, linearized_factor, &factor_indices_.back());
       if (debug_checks_) {
         internal::CheckLinearizedFactor(name_, factor, values, linearized_factor,
@@ -229,7 +665,7 @@ void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& val
       // Make sure a temporary of the right dimension is kept for relinearizations
       linearized_dense_factors_.AppendFactorSize(linearized_dense_factor.residual.rows(),
                                                  linearized_dense_factor.rhs.rows(),
-                                                 dense_factor_size_tracker);
+                                                 dense_factor_size_tracker_);
 
       // Create dense factor helper
       auto [helper, dimension] = internal::ComputeFactorHelper<linearization_dense_factor_helper_t>(
@@ -257,28 +693,30 @@ void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& val
     }
   }
 
-  if (keys_.size() != keys_touched_by_factors.size()) {
-    for (const auto& key : keys_) {
-      if (keys_touched_by_factors.count(key) == 0) {
-        throw std::runtime_error(
-            fmt::format("Key {} is in the state vector but is not optimized by any factor.", key));
-      }
+  for (auto key = keys_.begin() + num_old_keys; key != keys_.end(); ++key) {
+    if (keys_touched_by_factors.count(*key) == 0) {
+      throw std::runtime_error(
+          fmt::format("Key {} is in the state vector but is not optimized by any factor.", *key));
     }
   }
 
-  SYM_ASSERT(static_cast<int32_t>(residual.size()) == combined_residual_offset);
+  SYM_ASSERT(static_cast<int32_t>(residual.size()) == combined_residual_offset - old_M);
 
   // Allocate storage of the rest of the combined linearization
   const int32_t M = combined_residual_offset;
-  init_linearization_.residual.resize(M);
+  init_linearization_.residual.conservativeResize(M);
+  const typename SparseLinearization<Scalar>::Matrix old_jacobian =
+      std::move(init_linearization_.jacobian);
   if (include_jacobians_) {
     init_linearization_.jacobian.resize(M, N);
   }
+  const typename SparseLinearization<Scalar>::Matrix old_hessian_lower =
+      std::move(init_linearization_.hessian_lower);
   init_linearization_.hessian_lower.resize(N, N);
 
   // Create the matrices
-  for (int i = 0; i < M; i++) {
-    init_linearization_.residual(i) = residual[i];
+  for (int i = old_M; i < M; i++) {
+    init_linearization_.residual(i) = residual[i - old_M];
   }
 
   if (include_jacobians_) {
@@ -320,14 +758,27 @@ void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& val
   const auto hessian_row_col_to_storage_offset =
       internal::CoordsToStorageOffset(init_linearization_.hessian_lower);
 
+  // Entries of the existing factors keep their coordinates, but move in storage wherever entries
+  // were inserted before them
+  if (num_old_factors > 0) {
+    std::vector<int32_t> jacobian_storage_map;
+    if (include_jacobians_) {
+      jacobian_storage_map =
+          internal::StorageOffsetMap(old_jacobian, *jacobian_row_col_to_storage_offset);
+    }
+    const std::vector<int32_t> hessian_storage_map =
+        internal::StorageOffsetMap(old_hessian_lower, hessian_row_col_to_storage_offset);
+    RemapStorageOffsets(include_jacobians_ ? &jacobian_storage_map : nullptr, &hessian_storage_map);
+  }
+
   // Use the hash map to mark sparse storage offsets for every row of each key block of each
-  // factor
-  for (auto& dense_factor_update_helper : dense_factor_update_helpers_) {
+  // new factor
+  for (size_t i = first_new_dense; i < dense_factor_update_helpers_.size(); ++i) {
     internal::ComputeKeyHelperSparseColOffsets<Scalar>(jacobian_row_col_to_storage_offset,
                                                        hessian_row_col_to_storage_offset,
-                                                       dense_factor_update_helper);
+                                                       dense_factor_update_helpers_[i]);
   }
-  for (int i = 0; i < static_cast<int>(linearized_sparse_factors_.size()); ++i) {
+  for (size_t i = first_new_sparse; i < linearized_sparse_factors_.size(); ++i) {
     const LinearizedSparseFactor& linearized_factor = linearized_sparse_factors_.at(i);
     linearization_sparse_factor_helper_t& factor_helper = sparse_factor_update_helpers_[i];
     internal::ComputeKeyHelperSparseMap<Scalar>(linearized_factor,
@@ -335,14 +786,40 @@ void Linearizer<ScalarType>::BuildInitialLinearization(const Values<Scalar>& val
                                                 hessian_row_col_to_storage_offset, factor_helper);
   }
 
-  initialized_ = true;
+  BuildFactorRanges();
+}
+
+template <typename ScalarType>
+void Linearizer<ScalarType>::RemapStorageOffsets(
+    const std::vector<int32_t>* const jacobian_storage_map,
+    const std::vector<int32_t>* const hessian_storage_map) {
+  const auto remap = [](const std::vector<int32_t>* const storage_map,
+                        std::vector<int32_t>& storage_offsets) {
+    if (storage_map != nullptr) {
+      for (int32_t& storage_offset : storage_offsets) {
+        storage_offset = (*storage_map)[storage_offset];
+      }
+    }
+  };
+
+  for (auto& factor_helper : dense_factor_update_helpers_) {
+    for (auto& key_helper : factor_helper.key_helpers) {
+      remap(jacobian_storage_map, key_helper.jacobian_storage_col_starts);
+      remap(hessian_storage_map, key_helper.hessian_storage_col_starts);
+    }
+  }
+  for (auto& factor_helper : sparse_factor_update_helpers_) {
+    remap(jacobian_storage_map, factor_helper.jacobian_index_map);
+    remap(hessian_storage_map, factor_helper.hessian_index_map);
+  }
 }
 
 template <typename ScalarType>
 void Linearizer<ScalarType>::UpdateFromLinearizedDenseFactorIntoSparse(
     const LinearizedDenseFactor& linearized_factor,
     const linearization_dense_factor_helper_t& factor_helper,
-    SparseLinearization<Scalar>& linearization) const {
+    SparseLinearization<Scalar>& linearization, Scalar* const hessian_lower_values,
+    Scalar* const rhs) const {
   // The residual dimension must be the same, even for factors that return VectorX.  If the residual
   // size changes, the optimizer must be re-created.
   SYM_ASSERT(factor_helper.residual_dim == linearized_factor.residual.size());
@@ -367,7 +844,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedDenseFactorIntoSparse(
     }
 
     // Add contribution from right-hand-side
-    linearization.rhs.segment(key_helper.combined_offset, key_helper.tangent_dim) +=
+    Eigen::Map<VectorX<Scalar>>(rhs + key_helper.combined_offset, key_helper.tangent_dim) +=
         linearized_factor.rhs.segment(key_helper.factor_offset, key_helper.tangent_dim);
 
     // Add contribution from diagonal hessian block, column by column
@@ -375,7 +852,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedDenseFactorIntoSparse(
     for (int col_block = 0; col_block < key_helper.tangent_dim; ++col_block) {
       const auto col_start = *col_start_iter;
       col_start_iter++;
-      Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr() + col_start,
+      Eigen::Map<VectorX<Scalar>>(hessian_lower_values + col_start,
                                   key_helper.tangent_dim - col_block) +=
           linearized_factor.hessian.block(key_helper.factor_offset + col_block,
                                           key_helper.factor_offset + col_block,
@@ -393,8 +870,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedDenseFactorIntoSparse(
         for (int32_t col_j = 0; col_j < static_cast<int32_t>(key_helper_j.tangent_dim); ++col_j) {
           const auto col_start = *col_start_iter;
           col_start_iter++;
-          Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr() + col_start,
-                                      key_helper.tangent_dim) +=
+          Eigen::Map<VectorX<Scalar>>(hessian_lower_values + col_start, key_helper.tangent_dim) +=
               linearized_factor.hessian.block(key_helper.factor_offset,
                                               key_helper_j.factor_offset + col_j,
                                               key_helper.tangent_dim, 1);
@@ -403,8 +879,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedDenseFactorIntoSparse(
         for (int32_t col_i = 0; col_i < static_cast<int32_t>(key_helper.tangent_dim); ++col_i) {
           const auto col_start = *col_start_iter;
           col_start_iter++;
-          Eigen::Map<VectorX<Scalar>>(linearization.hessian_lower.valuePtr() + col_start,
-                                      key_helper_j.tangent_dim) +=
+          Eigen::Map<VectorX<Scalar>>(hessian_lower_values + col_start, key_helper_j.tangent_dim) +=
               linearized_factor.hessian
                   .block(key_helper.factor_offset + col_i, key_helper_j.factor_offset, 1,
                          key_helper_j.tangent_dim)
@@ -419,7 +894,8 @@ template <typename ScalarType>
 void Linearizer<ScalarType>::UpdateFromLinearizedSparseFactorIntoSparse(
     const LinearizedSparseFactor& linearized_factor,
     const linearization_sparse_factor_helper_t& factor_helper,
-    SparseLinearization<Scalar>& linearization) const {
+    SparseLinearization<Scalar>& linearization, Scalar* const hessian_lower_values,
+    Scalar* const rhs) const {
   // The residual dimension must be the same, even for factors that return VectorX.  If the residual
   // size changes, the optimizer must be re-created.
   SYM_ASSERT(factor_helper.residual_dim == linearized_factor.residual.size());
@@ -432,7 +908,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedSparseFactorIntoSparse(
   for (int key_i = 0; key_i < static_cast<int>(factor_helper.key_helpers.size()); ++key_i) {
     const linearization_offsets_t& key_helper = factor_helper.key_helpers[key_i];
 
-    linearization.rhs.segment(key_helper.combined_offset, key_helper.tangent_dim) +=
+    Eigen::Map<VectorX<Scalar>>(rhs + key_helper.combined_offset, key_helper.tangent_dim) +=
         linearized_factor.rhs.segment(key_helper.factor_offset, key_helper.tangent_dim);
   }
 
@@ -450,7 +926,7 @@ void Linearizer<ScalarType>::UpdateFromLinearizedSparseFactorIntoSparse(
   SYM_ASSERT(factor_helper.hessian_index_map.size() ==
              static_cast<size_t>(linearized_factor.hessian.nonZeros()));
   for (int i = 0; i < static_cast<int>(factor_helper.hessian_index_map.size()); i++) {
-    linearization.hessian_lower.valuePtr()[factor_helper.hessian_index_map[i]] +=
+    hessian_lower_values[factor_helper.hessian_index_map[i]] +=
         linearized_factor.hessian.valuePtr()[i];
   }
 }
@@ -577,8 +1053,14 @@ void Linearizer<ScalarType>::UpdateFromSparseFactorIntoTripletLists(
 template <typename ScalarType>
 void Linearizer<ScalarType>::EnsureLinearizationHasCorrectSize(
     SparseLinearization<Scalar>& linearization) const {
-  if (linearization.residual.size() == 0) {
-    // Linearization has never been initialized
+  const bool has_current_structure =
+      linearization.residual.size() == init_linearization_.residual.size() &&
+      linearization.rhs.size() == init_linearization_.rhs.size() &&
+      linearization.hessian_lower.nonZeros() == init_linearization_.hessian_lower.nonZeros();
+  if (linearization.residual.size() == 0 || !has_current_structure) {
+    // Linearization has never been initialized, or was initialized before factors or keys were
+    // added or factors were removed.  The sparsity pattern only ever grows, so the number of
+    // nonzeros identifies it.
     // NOTE(aaron): This is independent of linearization.IsInitialized(), i.e. a Linearization can
     // have been initialized in the past and have the correct sizes/sparsity but have been reset
     SYM_ASSERT(init_linearization_.IsInitialized());
@@ -42,10 +42,17 @@ class Linearizer {
    *    provided, it is computed from all keys for all factors using a default ordering.
    * @param debug_checks: Whether to perform additional sanity checks for NaNs.  This uses
    *    additional compute but not additional memory except for logging.
+   * @param num_threads: Number of threads to evaluate factors on when relinearizing.  If greater
+   *    than 1, the factors are split into contiguous chunks, each of which is evaluated on its own
+   *    thread into its own hessian and rhs buffers, which are then summed in chunk order.  The
+   *    result is deterministic for a given number of threads, but may differ from single-threaded
+   *    linearization by floating point rounding.  Requires additional memory for one copy of the
+   *    hessian per thread.  The first linearization is always single-threaded.  Values less than
+   *    1 (e.g. from a zero-initialized optimizer_params_t) are treated as 1.
    */
   Linearizer(const std::string& name, const std::vector<Factor<Scalar>>& factors,
              const std::vector<Key>& key_order = {}, bool include_jacobians = false,
-             bool debug_checks = false);
+             bool debug_checks = false, int num_threads = 1);
 
   /**
    * Update linearization at a new evaluation point
@@ -53,10 +60,61 @@ class Linearizer {
    * This is more efficient than reconstructing this object repeatedly. On the first call, it will
    * allocate memory and perform analysis needed for efficient repeated relinearization.
    *
+   * Factors appended to the vector of factors since the last call, and keys added with AddKeys(),
+   * are added to the existing structure: only the new factors are indexed, and the sparsity
+   * pattern is extended with their entries.  If linearization doesn't have the sizes of the
+   * current structure, it is reallocated.
+   *
    * TODO(aaron): This should be const except that it can initialize the object
    */
   void Relinearize(const Values<Scalar>& values, SparseLinearization<Scalar>& linearization);
 
+  /**
+   * Add keys, which are not in the state vector yet, to the end of it
+   *
+   * The existing keys keep their offsets in the state vector.  Each new key must be optimized by at
+   * least one factor at the next call to Relinearize().  If a new key is optimized by a factor
+   * which has already been linearized, the whole structure is rebuilt on the next call to
+   * Relinearize(), since the helpers for that factor depend on which of its keys are optimized.
+   */
+  void AddKeys(const std::vector<Key>& keys);
+
+  /**
+   * Drop the structure computed for the factors at the given indices, which have just been erased
+   * from the vector of factors
+   *
+   * The combined residual (and jacobian) are compacted.  The hessian keeps its sparsity pattern,
+   * with the entries that were only touched by the removed factors left at zero, so that a linear
+   * solver does not need to analyze it again.  Every key must still be optimized by one of the
+   * remaining factors.
+   *
+   * @param indices: Sorted indices of the removed factors, in the vector of factors before they
+   *    were erased
+   */
+  void RemoveFactors(const std::vector<int>& indices);
+
+  /**
+   * Reuse the linearizations of factors whose inputs barely moved since they were last evaluated
+   *
+   * On each call to Relinearize(), each key in the state vector which moved by more than threshold
+   * in any coordinate of its tangent space since it was last relinearized is relinearized, as is
+   * any other input which changed at all.  The factors without any relinearized inputs are not
+   * evaluated, and reuse their previous linearization, with the residual and rhs updated to first
+   * order for the motion of their keys since then.  This is similar to the fluid relinearization of
+   * iSAM2.  A threshold of 0 (the default) evaluates every factor.
+   *
+   * Requires memory for a copy of the values and of each linearized dense factor.
+   *
+   * @param epsilon: Epsilon used to compute the motion of the keys in their tangent spaces
+   */
+  void SetRelinearizationThreshold(Scalar threshold, Scalar epsilon);
+
+  /**
+   * The number of factors which reused their previous linearization in the last call to
+   * Relinearize(), see SetRelinearizationThreshold()
+   */
+  int NumFactorsSkipped() const;
+
   /**
    * Whether this contains values, versus having not been evaluated yet
    */
@@ -75,24 +133,119 @@ class Linearizer {
   // for each key in Keys().
   const std::unordered_map<key_t, index_entry_t>& StateIndex() const;
 
+  /**
+   * Number of threads factors are evaluated on when relinearizing
+   */
+  int NumThreads() const;
+
  private:
+  /**
+   * A contiguous range of factors, along with the indices of its first sparse and dense factors
+   * among all sparse and dense factors respectively
+   */
+  struct FactorRange {
+    int factor_begin;
+    int factor_end;
+    int sparse_begin;
+    int dense_begin;
+  };
+
   /**
    * Allocate all factor storage and compute sparsity pattern. This does a lot of index
    * computation on the first linearization, such that repeated linearization can be fast.
    */
   void BuildInitialLinearization(const Values<Scalar>& values);
 
+  /**
+   * Add the factors and keys which are not part of the structure yet to it.  Existing entries of
+   * the jacobian and hessian keep their coordinates, but may move in sparse storage, so the
+   * storage offsets in the helpers of the existing factors are remapped.
+   */
+  void ExtendLinearization(const Values<Scalar>& values);
+
+  /**
+   * Whether there are factors or keys which are not part of the structure yet
+   */
+  bool HasNewFactorsOrKeys() const;
+
+  /**
+   * Discard all of the structure, as if no factors had been linearized yet
+   */
+  void ResetStructure();
+
+  /**
+   * Replace every jacobian and hessian storage offset in the factor helpers with its entry in the
+   * given maps, which are nullptr if the offsets didn't change
+   */
+  void RemapStorageOffsets(const std::vector<int32_t>* jacobian_storage_map,
+                           const std::vector<int32_t>* hessian_storage_map);
+
+  /**
+   * Split the factors into one FactorRange per thread, and allocate the buffers each thread
+   * accumulates into
+   */
+  void BuildFactorRanges();
+
+  /**
+   * Evaluate the factors in range, and update linearization from them.  The contributions to the
+   * hessian and rhs are added into hessian_lower_values and rhs, which are either the storage of
+   * linearization or per-thread buffers with the same layout.
+   *
+   * Returns the number of factors which reused their previous linearization instead of being
+   * evaluated
+   */
+  int RelinearizeFactorRange(const Values<Scalar>& values, const FactorRange& range,
+                             internal::LinearizedDenseFactorPool<Scalar>& linearized_dense_factors,
+                             SparseLinearization<Scalar>& linearization,
+                             Scalar* hessian_lower_values, Scalar* rhs);
+
+  /**
+   * Relinearize on num_threads_ threads, one FactorRange per thread
+   *
+   * Returns the number of factors which reused their previous linearization instead of being
+   * evaluated
+   */
+  int RelinearizeInParallel(const Values<Scalar>& values,
+                            SparseLinearization<Scalar>& linearization);
+
+  /**
+   * Move the linearization point of each input which moved by more than the relinearization
+   * threshold to values, and flag it in relinearized_inputs_
+   */
+  void UpdateLinearizationPoint(const Values<Scalar>& values);
+
+  /**
+   * Drop the linearization point and the previous linearizations of the factors, so every factor
+   * is evaluated on the next call to Relinearize()
+   */
+  void ResetLinearizationPoint();
+
+  /**
+   * Whether the factor at index factor_i must be evaluated, versus reusing its previous
+   * linearization
+   */
+  bool NeedsRelinearization(int factor_i) const;
+
+  /**
+   * Add the first order change in the residual and rhs of a factor which reused its previous
+   * linearization, for the motion of its keys since then
+   */
+  template <typename LinearizedFactor, typename FactorHelper>
+  void UpdateFromFactorMotion(int factor_i, const LinearizedFactor& linearized_factor,
+                              const FactorHelper& factor_helper,
+                              SparseLinearization<Scalar>& linearization, Scalar* rhs) const;
+
   /**
    * Update the sparse combined problem linearization from a single factor.
    */
   void UpdateFromLinearizedDenseFactorIntoSparse(
       const LinearizedDenseFactor& linearized_factor,
       const linearization_dense_factor_helper_t& factor_helper,
-      SparseLinearization<Scalar>& linearization) const;
+      SparseLinearization<Scalar>& linearization, Scalar* hessian_lower_values, Scalar* rhs) const;
   void UpdateFromLinearizedSparseFactorIntoSparse(
       const LinearizedSparseFactor& linearized_factor,
       const linearization_sparse_factor_helper_t& factor_helper,
-      SparseLinearization<Scalar>& linearization) const;
+      SparseLinearization<Scalar>& linearization, Scalar* hessian_lower_values, Scalar* rhs) const;
 
   /**
    * Update the combined residual and rhs, along with triplet lists for the sparse matrices, from a
@@ -130,10 +283,18 @@ class Linearizer {
 
   bool debug_checks_;
 
+  int num_threads_;
+
   // Linearized factors - stores individual factor residuals, jacobians, etc
   internal::LinearizedDenseFactorPool<Scalar> linearized_dense_factors_;  // one per Jacobian shape
   std::vector<LinearizedSparseFactor> linearized_sparse_factors_;         // one per sparse factor
 
+  // Tracks the shapes in linearized_dense_factors_, for adding factors to it later
+  typename internal::LinearizedDenseFactorPool<Scalar>::SizeTracker dense_factor_size_tracker_;
+
+  // Whether each factor in the structure is sparse, to find its helper when factors are removed
+  std::vector<bool> factor_is_sparse_;
+
   // Keys that form the state vector
   std::vector<Key> keys_;
 
@@ -148,6 +309,42 @@ class Linearizer {
   // LevenbergMarquardtState::StateBlocks (at most 3 times) and isn't touched on each subsequent
   // relinearization.
   SparseLinearization<Scalar> init_linearization_;
+
+  // Factors whose inputs moved less than this since they were last evaluated reuse their previous
+  // linearization, see SetRelinearizationThreshold()
+  Scalar relinearization_threshold_{0};
+  Scalar relinearization_epsilon_{0};
+  int num_factors_skipped_{0};
+
+  // The values each input was last relinearized at, with the index of the state vector keys and
+  // the entries of the other inputs into it
+  Values<Scalar> linearization_point_;
+  index_t linearization_point_state_index_;
+  std::vector<index_entry_t> linearization_point_other_entries_;
+
+  // The motion of the state vector since the linearization point, in the tangent space
+  VectorX<Scalar> linearization_point_motion_;
+
+  // Whether the input at each storage offset in the values was relinearized by the last call to
+  // UpdateLinearizationPoint()
+  std::vector<char> relinearized_inputs_;
+
+  // Whether each factor has been evaluated since the linearization point was reset, and the motion
+  // of its keys in the order of its linearization when it was last evaluated
+  std::vector<char> factor_is_linearized_;
+  std::vector<VectorX<Scalar>> factor_linearization_motions_;
+
+  // The last evaluated linearization of each dense factor.  Sparse factors keep theirs in
+  // linearized_sparse_factors_
+  std::vector<LinearizedDenseFactor> previous_linearized_dense_factors_;
+
+  // For multithreaded relinearization, the factors evaluated by each thread.  The first range uses
+  // linearized_dense_factors_ and accumulates directly into the linearization, the others use the
+  // corresponding entries of the vectors below
+  std::vector<FactorRange> factor_ranges_;
+  std::vector<internal::LinearizedDenseFactorPool<Scalar>> range_linearized_dense_factors_;
+  std::vector<VectorX<Scalar>> range_hessian_lower_values_;
+  std::vector<VectorX<Scalar>> range_rhs_;
 };
 
 /**
@@ -11,6 +11,8 @@ import numpy as np
 from symforce import cc_sym
 from symforce import typing as T
 from symforce.codegen import codegen_util
+from symforce.opt._internal.cc_types import CcValues
+from symforce.opt._internal.cc_types import cc_types
 from symforce.values import Values
 
 
@@ -24,6 +26,15 @@ class NumericFactor:
                 function computes the jacobian with respect to.
         linearization_function: A function that returns the residual, jacobian, hessian
             approximation, and right-hand-side used with the levenberg marquardt optimizer.
+        batched_linearization_function: Optional vectorized version of ``linearization_function``,
+            used when the :class:`Optimizer <symforce.opt.optimizer.Optimizer>` is constructed
+            with ``batch_factors=True`` to linearize all factors sharing ``linearization_function``
+            in one call.  Each argument has a leading batch dimension N: scalars are passed as
+            arrays of shape ``(N,)``, matrices as arrays of shape ``(N, *shape)``, and geometry
+            types as their storage, with shape ``(N, storage_dim)``.  It returns the residuals,
+            jacobians, hessians, and right-hand-sides of all N factors, with shapes ``(N, M)``,
+            ``(N, M, D)``, ``(N, D, D)``, and ``(N, D)`` respectively.  If not provided, batched
+            factors call ``linearization_function`` once per factor, from a single call out of C++.
     """
 
     def __init__(
@@ -33,10 +44,14 @@ class NumericFactor:
         linearization_function: T.Callable[
             ..., T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
         ],
+        batched_linearization_function: T.Optional[
+            T.Callable[..., T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]
+        ] = None,
     ) -> None:
         self.keys = keys
         self.optimized_keys = optimized_keys
         self.linearization_function = linearization_function
+        self.batched_linearization_function = batched_linearization_function
 
     @classmethod
     def from_file_python(
@@ -109,7 +124,9 @@ class NumericFactor:
 
         return residual, jacobian, hessian, rhs
 
-    def cc_factor(self, cc_key_map: T.Mapping[str, cc_sym.Key]) -> cc_sym.Factor:
+    def cc_factor(
+        self, cc_key_map: T.Mapping[str, cc_sym.Key], dtype: T.Any = np.float64
+    ) -> T.Union[cc_sym.Factor, cc_sym.Factorf]:
         """
         Create a C++ Factor from this symbolic Factor, for use with the C++ Optimizer
 
@@ -121,13 +138,15 @@ class NumericFactor:
             cc_key_map: Mapping from Python keys (strings, like returned by
                         :meth:`Values.keys_recursive <symforce.values.values.Values.keys_recursive>`
                         ) to C++ keys
+            dtype: The precision of the C++ Factor, ``np.float64`` for a ``cc_sym.Factor`` or
+                ``np.float32`` for a ``cc_sym.Factorf``
         Returns:
             A C++ wrapped Factor object
         """
 
         def wrapped(
-            values: cc_sym.Values, _: T.Any
+            values: CcValues, _: T.Any
         ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
             return self.linearization_function(*[values.at(cc_key_map[key]) for key in self.keys])
 
-        return cc_sym.Factor(wrapped, [cc_key_map[key] for key in self.optimized_keys])
+        return cc_types(dtype).factor(wrapped, [cc_key_map[key] for key in self.optimized_keys])
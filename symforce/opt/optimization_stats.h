@@ -93,6 +93,33 @@ struct OptimizationStats {
   }
 };
 
+/**
+ * Information about the latest iteration of an optimization, passed to the iteration callback of
+ * an Optimizer as the optimization runs
+ *
+ * Only holds references into the state of the nonlinear solver, so nothing is copied unless the
+ * callback copies it, and the references are only valid during the callback.  The entry for the
+ * iteration in OptimizationStats::iterations only contains the update, values, residual, and
+ * jacobian if debug_stats is true.
+ */
+template <typename ValuesType, typename LinearizationType>
+struct OptimizationIterationInfo {
+  /// The stats for this iteration, such as the error, lambda, and update norm
+  const optimization_iteration_t& iteration;
+
+  /// The wall time spent in this iteration, in seconds
+  double iteration_seconds;
+
+  /// The wall time spent in all of the iterations so far, in seconds
+  double total_seconds;
+
+  /// The best values found so far
+  const ValuesType& best_values;
+
+  /// The linearization at best_values
+  const LinearizationType& best_linearization;
+};
+
 // Shorthand instantiations
 template <typename Scalar>
 using SparseOptimizationStats = OptimizationStats<Eigen::SparseMatrix<Scalar>>;
@@ -28,6 +28,15 @@ sym::optimizer_params_t sym::DefaultOptimizerParams() {
   const double early_exit_min_reduction = 1e-6;
   const double early_exit_min_absolute_error = 0.0;
   const bool enable_bold_updates = false;
+  const int32_t num_threads = 1;
+  const linear_solver_type_t linear_solver_type = linear_solver_type_t::DIRECT;
+  const pcg_preconditioner_t pcg_preconditioner = pcg_preconditioner_t::BLOCK_JACOBI;
+  const int32_t pcg_max_iterations = 500;
+  const double pcg_max_forcing = 0.1;
+  const double dogleg_initial_radius = 100.0;
+  const double dogleg_min_radius = 1e-10;
+  const double dogleg_hessian_damping = 1e-9;
+  const double relinearization_threshold = 0.0;
 
   return sym::optimizer_params_t{
       verbose,
@@ -52,6 +61,15 @@ sym::optimizer_params_t sym::DefaultOptimizerParams() {
       early_exit_min_reduction,
       early_exit_min_absolute_error,
       enable_bold_updates,
+      num_threads,
+      linear_solver_type,
+      pcg_preconditioner,
+      pcg_max_iterations,
+      pcg_max_forcing,
+      dogleg_initial_radius,
+      dogleg_min_radius,
+      dogleg_hessian_damping,
+      relinearization_threshold,
   };
 }
 
@@ -7,6 +7,8 @@
 
 #include <sym/util/epsilon.h>
 
+#include "./cancellation_token.h"
+#include "./dense_cholesky_solver.h"
 #include "./factor.h"
 #include "./internal/linearizer_selector.h"
 #include "./levenberg_marquardt_solver.h"
@@ -78,6 +80,14 @@ class Optimizer {
   using MatrixType = typename NonlinearSolverType::MatrixType;
   using Stats = OptimizationStats<MatrixType>;
   using LinearizerType = internal::LinearizerSelector_t<MatrixType>;
+  using IterationInfo = OptimizationIterationInfo<typename NonlinearSolverType::ValuesType,
+                                                  Linearization<MatrixType>>;
+
+  /**
+   * Function called after each iteration of Optimize(), which returns true to stop the
+   * optimization early with status STOPPED_BY_CALLBACK, see SetIterationCallback()
+   */
+  using IterationCallback = std::function<bool(const IterationInfo&)>;
 
   /**
    * Base constructor
@@ -86,7 +96,7 @@ class Optimizer {
    * @param factors: The set of factors to include
    * @param name: The name of this optimizer to be used for printing debug information
    * @param keys: The set of keys to optimize.  If empty, will use all optimized keys touched by the
-   *    factors
+   *    factors, ordered with OrderKeysForSchurComplement if params.linear_solver_type is SCHUR
    * @param epsilon: Epsilon for numerical stability
    */
   Optimizer(const optimizer_params_t& params, std::vector<Factor<Scalar>> factors,
@@ -176,6 +186,14 @@ class Optimizer {
    */
   Linearization<MatrixType> Linearize(const Values<Scalar>& values);
 
+  /**
+   * Linearize the problem around the given values, into the given linearization
+   *
+   * Reuses the storage of `linearization` if it has the structure of this problem (e.g. if it was
+   * returned by a previous call to Linearize()), and allocates it otherwise.
+   */
+  void Linearize(const Values<Scalar>& values, Linearization<MatrixType>& linearization);
+
   /**
    * Get covariances for each optimized key at the given linearization
    *
@@ -194,13 +212,17 @@ class Optimizer {
    * This version is potentially much more efficient than computing the covariances for all keys in
    * the problem.
    *
-   * Currently requires that `keys` corresponds to a set of keys at the start of the list of keys
-   * for the full problem, and in the same order.  It uses the Schur complement trick, so will be
-   * most efficient if the hessian is of the following form, with C block diagonal:
+   * If `keys` corresponds to a set of keys at the start of the list of keys for the full problem,
+   * and in the same order, this uses the Schur complement trick, so will be most efficient if the
+   * hessian is of the following form, with C block diagonal:
    *
    *     A = ( B    E )
    *         ( E^T  C )
    *
+   * Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+   * covariance needed for their blocks are computed from the sparse Cholesky factorization of the
+   * hessian, see ComputeCrossCovariances.
+   *
    * Will reuse entries in `covariances_by_key`, allocating new entries so that the result contains
    * exactly the set of keys requested.  `covariances_by_key` must not contain any keys that are not
    * in `keys`.
@@ -209,6 +231,27 @@ class Optimizer {
                           const std::vector<Key>& keys,
                           std::unordered_map<Key, MatrixX<Scalar>>& covariances_by_key);
 
+  /**
+   * Get the cross-covariances between the given pairs of keys at the given linearization
+   *
+   * The cross-covariance for the pair (a, b) is the block of the full problem covariance with the
+   * rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys may be
+   * any of the optimized keys, in any order.
+   *
+   * Only the entries of the covariance needed for the requested blocks are computed, using the
+   * Takahashi recurrences on the sparse Cholesky factorization of the hessian (see
+   * internal::SelectedInverse), so this is much more efficient than ComputeFullCovariance for a
+   * small number of keys in a large problem.
+   *
+   * May not be called before either Optimize() or Linearize() has been called.
+   *
+   * @param cross_covariances A vector that will be filled out with the cross-covariance for each
+   *    pair in `key_pairs`, in the same order
+   */
+  void ComputeCrossCovariances(const Linearization<MatrixType>& linearization,
+                               const std::vector<std::pair<Key, Key>>& key_pairs,
+                               std::vector<MatrixX<Scalar>>& cross_covariances);
+
   /**
    * Get the full problem covariance at the given linearization
    *
@@ -225,6 +268,37 @@ class Optimizer {
   void ComputeFullCovariance(const Linearization<MatrixType>& linearization,
                              MatrixX<Scalar>& covariance);
 
+  /**
+   * Add factors to the problem
+   *
+   * The structure the linearizer has already computed for the existing factors is kept; on the
+   * next linearization only the new factors are indexed, and their entries are added to the
+   * sparsity pattern of the problem.  The linear solver only analyzes the sparsity pattern again
+   * if it changed.
+   *
+   * Keys optimized by the new factors which are not optimized yet stay constant, unless they are
+   * added with AddKeys().
+   */
+  void AddFactors(std::vector<Factor<Scalar>> factors);
+
+  /**
+   * Add keys, which are not in the state vector yet, to the end of it
+   *
+   * Each key must be optimized by at least one factor, and be in the values passed to the next
+   * call to Optimize() or Linearize().  The other entries of those values must keep the same
+   * layout as before.
+   */
+  void AddKeys(const std::vector<Key>& keys);
+
+  /**
+   * Remove the factors at the given indices into Factors()
+   *
+   * The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it again.
+   * Keys which are no longer optimized by any factor are removed from the state vector, in which
+   * case the linearizer is rebuilt, since the offsets of the other keys in the state change.
+   */
+  void RemoveFactors(std::vector<int> indices);
+
   /**
    * Get the optimized keys
    */
@@ -257,12 +331,77 @@ class Optimizer {
    */
   const optimizer_params_t& Params() const;
 
+  /**
+   * Set a function to call after each iteration of Optimize(), with the stats for the iteration
+   * and views of the best values and linearization so far, as the optimization runs
+   *
+   * This gives per-iteration information without setting debug_stats, which copies the values and
+   * linearization into the stats for every iteration.  If the callback returns true, the
+   * optimization stops with status STOPPED_BY_CALLBACK, and the values are set to the best values
+   * found so far.  Pass an empty function to remove the callback.
+   */
+  void SetIterationCallback(IterationCallback iteration_callback);
+
+  /**
+   * Set a token which cancels Optimize() from another thread, or remove it if null
+   *
+   * The token is checked after each iteration, and once it's cancelled the optimization stops with
+   * status CANCELLED, and the values are set to the best values found so far.  Only one
+   * optimization can run on an Optimizer at a time, this only lets it be stopped early.
+   */
+  void SetCancellationToken(std::shared_ptr<const CancellationToken> cancellation_token);
+
+  /**
+   * Use a precomputed ordering for the sparse linear solver instead of computing one, such as the
+   * ordering from LinearSolverOrdering() for a previous problem with the same structure.  Only
+   * supported by linear solvers with a SetOrdering method, like SparseCholeskySolver.
+   *
+   * @param ordering: The permutation of the columns of the hessian, in the format of
+   *    Stats::linear_solver_ordering, i.e. ordering[i] is the position of column i in the
+   *    factorization
+   */
+  void SetLinearSolverOrdering(const Eigen::VectorXi& ordering);
+
+  /**
+   * Order the columns of the hessian for the sparse linear solver with a constrained approximate
+   * minimum degree ordering (see ConstrainedAmdOrdering), which eliminates all of the keys in each
+   * group before the keys in the next group, e.g. the landmarks before the cameras for bundle
+   * adjustment.  Optimized keys which aren't in any of the groups are eliminated last.  Only
+   * supported by linear solvers with a SetOrdering method, like SparseCholeskySolver.
+   */
+  void SetLinearSolverOrderingGroups(std::vector<std::vector<Key>> key_groups);
+
+  /**
+   * The ordering computed by the sparse linear solver for the last hessian it analyzed, in the
+   * format of Stats::linear_solver_ordering, which can be passed to SetLinearSolverOrdering.  Empty
+   * if no hessian has been analyzed yet.
+   */
+  Eigen::VectorXi LinearSolverOrdering() const;
+
+  /**
+   * Move the given keys after the other optimized keys, so that linear_solver_type_t::SCHUR
+   * eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only the
+   * trailing keys which are not optimized together by any factor are eliminated, so the given keys
+   * should not be coupled to each other.
+   */
+  void SetSchurComplementKeys(const std::vector<Key>& keys);
+
  protected:
   /**
    * Build the `linearize_func` functor for the underlying nonlinear solver
    */
   typename NonlinearSolverType::LinearizeFunc BuildLinearizeFunc(bool check_derivatives);
 
+  /**
+   * Build the linearizer for the factors and keys, configured from params
+   */
+  LinearizerType BuildLinearizer(const optimizer_params_t& params) const;
+
+  /**
+   * The keys to optimize if none are given, see the constructor
+   */
+  std::vector<Key> ComputeDefaultKeys(const optimizer_params_t& params) const;
+
   bool IsInitialized() const;
 
   /**
@@ -300,10 +439,18 @@ class Optimizer {
    * Covariance matrix and damped Hessian, only used by ComputeCovariances() but cached here to save
    * reallocations. This may be the full problem covariance, or a subblock; it's always the full
    * problem Hessian
+   *
+   * The solver and the size and number of nonzeros of the hessian it analyzed are only used by
+   * ComputeCrossCovariances(), so the symbolic factorization is reused across calls
    */
   struct ComputeCovariancesStorage {
     sym::MatrixX<Scalar> covariance;
     MatrixType H_damped;
+
+    SparseCholeskySolver<Eigen::SparseMatrix<Scalar>> selected_inverse_solver;
+    Eigen::Index analyzed_hessian_dim{0};
+    Eigen::Index analyzed_hessian_nonzeros{0};
+    std::vector<MatrixX<Scalar>> covariance_blocks;
   };
 
   mutable ComputeCovariancesStorage compute_covariances_storage_;
@@ -311,6 +458,12 @@ class Optimizer {
   /// Functor for interfacing with the optimizer
   typename NonlinearSolverType::LinearizeFunc linearize_func_;
 
+  /// Called after each iteration, if not empty
+  IterationCallback iteration_callback_;
+
+  /// Checked after each iteration, if not null
+  std::shared_ptr<const CancellationToken> cancellation_token_;
+
   bool verbose_;
 };
 
@@ -318,6 +471,18 @@ class Optimizer {
 using Optimizerd = Optimizer<double>;
 using Optimizerf = Optimizer<float>;
 
+/**
+ * Optimizer which linearizes into dense matrices and solves with a dense Cholesky factorization.
+ * For small problems (tens of tangent dimensions) or problems whose hessian is mostly full, this
+ * is faster than the sparse Optimizer, which spends most of its time on sparse bookkeeping for
+ * them.  The linear solver orderings don't apply to it.
+ */
+template <typename Scalar>
+using DenseOptimizer =
+    Optimizer<Scalar, LevenbergMarquardtSolver<Scalar, DenseCholeskySolver<Scalar>>>;
+using DenseOptimizerd = DenseOptimizer<double>;
+using DenseOptimizerf = DenseOptimizer<float>;
+
 /**
  * Simple wrapper to make it one function call.
  */
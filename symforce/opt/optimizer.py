@@ -5,27 +5,48 @@
 
 from __future__ import annotations
 
+import asyncio
+import weakref
 from dataclasses import dataclass
 from functools import cached_property
 
 import numpy as np
 
+from lcmtypes.sym._dogleg_solver_failure_reason_t import dogleg_solver_failure_reason_t
 from lcmtypes.sym._index_entry_t import index_entry_t
 from lcmtypes.sym._levenberg_marquardt_solver_failure_reason_t import (
     levenberg_marquardt_solver_failure_reason_t,
 )
+from lcmtypes.sym._linear_solver_type_t import linear_solver_type_t
 from lcmtypes.sym._optimization_iteration_t import optimization_iteration_t
 from lcmtypes.sym._optimization_status_t import optimization_status_t
 from lcmtypes.sym._sparse_matrix_structure_t import sparse_matrix_structure_t
 from lcmtypes.sym._values_t import values_t
 
 from symforce import cc_sym
+from symforce import ops
 from symforce import typing as T
+from symforce.opt._internal.cc_types import CcLinearization
+from symforce.opt._internal.cc_types import CcOptimizationIterationInfo
+from symforce.opt._internal.cc_types import CcOptimizationStats
+from symforce.opt._internal.cc_types import CcValues
+from symforce.opt._internal.cc_types import cc_types
+from symforce.opt._internal.cc_values_layout import CcValuesLayout
+from symforce.opt._internal.dense_selection import use_dense_optimizer
+from symforce.opt._internal.numeric_factor_group import NumericFactorGroup
+from symforce.opt._internal.numeric_factor_group import group_numeric_factors
 from symforce.opt.factor import Factor
 from symforce.opt.numeric_factor import NumericFactor
 from symforce.opt.optimizer_params import OptimizerParams
+from symforce.opt.profiling import Profile
 from symforce.values import Values
 
+_T = T.TypeVar("_T")
+
+# The type of the initial and optimized values in an Optimizer.Result, which are a Values except for
+# Optimizer.optimize_state
+_ResultValuesT = T.TypeVar("_ResultValuesT")
+
 
 class Optimizer:
     """
@@ -82,23 +103,85 @@ class Optimizer:
             passed to the optimizer.
         params: Params for the optimizer.  Defaults are in `OptimizerParams`, except that `verbose`
             is `True` by default.
+        batch_factors: If True, NumericFactors which share a linearization function (for instance
+            symbolic factors with the same residual, which are converted to NumericFactors with a
+            single generated function) are linearized together, with one call from C++ into Python
+            per group instead of one per factor.  Each group evaluates the
+            ``batched_linearization_function`` of its factors if they have one.
+        symbolic_factorization_cache: If given, the symbolic factorization of the hessian (the
+            ordering and elimination tree used by the sparse linear solver) is looked up in this
+            cache, and added to it if not found.  Share one cache between optimizers created
+            repeatedly for problems with the same structure to only analyze it once.  The cache
+            doesn't record the ordering, so this can't be combined with
+            ``linear_solver_ordering``, ``ordering_key_groups``, or ``schur_complement_keys``.
+        solver: The nonlinear solver, either ``"levenberg_marquardt"`` (the default) or
+            ``"dogleg"``.  The dogleg solver is a trust-region method which factorizes the hessian
+            once per linearization, so steps which are rejected don't factorize it again, see
+            ``sym::DoglegSolver``.  The failure reasons of its results are
+            ``dogleg_solver_failure_reason_t``.
+        linear_solver_ordering: If given, the sparse linear solver uses this ordering of the
+            columns of the hessian instead of computing one, in the format of
+            :meth:`linear_solver_ordering`, e.g. an ordering saved from a previous run on a problem
+            with the same structure.  Only valid for problems with the same linearization layout.
+        ordering_key_groups: If given, the sparse linear solver uses a constrained approximate
+            minimum degree ordering, which eliminates all of the keys in each group before the keys
+            in the next group, e.g. ``[landmark_keys, camera_keys]`` for bundle adjustment.
+            Optimized keys which aren't in any group are eliminated last.  Can't be combined with
+            ``linear_solver_ordering``.
+        schur_complement_keys: If given, these keys are ordered after the other optimized keys, so
+            that if ``params.linear_solver_type`` is ``linear_solver_type_t.SCHUR`` they're
+            eliminated with a Schur complement, e.g. the landmarks for bundle adjustment.  They
+            should not be optimized together by any factor.  If not given, the keys to eliminate
+            are detected automatically with the SCHUR linear solver type.
+        dtype: The precision to optimize in, ``np.float64`` (the default) or ``np.float32``.  With
+            ``np.float32``, the C++ optimizer is ``cc_sym.Optimizerf``, which stores the values,
+            linearization, and factorization in single precision.  This halves the memory traffic of
+            each iteration, for large problems which tolerate the loss of precision.  Matrices in
+            the optimized values are then float32 arrays, and :meth:`linearize` returns a
+            ``CcLinearizationf``.
+        dense: Whether to linearize into dense matrices and solve with a dense Cholesky
+            factorization, with ``cc_sym.DenseOptimizer``.  This is faster than the sparse optimizer
+            for small problems (tens of tangent dimensions) and for problems whose hessian is mostly
+            full, where the sparse bookkeeping costs more than the linear algebra.  If ``"auto"``,
+            it's chosen from the dimension and density of the problem when the first Values is
+            passed to the optimizer, and :attr:`dense` is None until then.  The dense optimizer
+            only supports the Levenberg-Marquardt solver with the ``DIRECT`` linear solver type and
+            factors which are not sparse (so not ``batch_factors``), and none of the linear solver
+            orderings, the symbolic factorization cache, or ``relinearization_threshold``; if any of
+            those are used, ``"auto"`` chooses the sparse optimizer, and ``dense=True`` raises a
+            ``ValueError``.
+            With the dense optimizer, :meth:`linearize` returns a ``DenseLinearization``, whose
+            jacobian and hessian are dense arrays, and which doesn't have the CSC views and buffers
+            of the sparse linearization (e.g. ``hessian_lower_csc_view()``), so with ``"auto"``
+            the type of the linearization depends on the problem.
     """
 
     Params = OptimizerParams
     Status = optimization_status_t
     FailureReason = levenberg_marquardt_solver_failure_reason_t
 
+    # The failure reason type for each nonlinear solver.  The C++ optimizer for each solver is in
+    # the CcTypes of the dtype
+    _SOLVERS: T.Dict[str, T.Any] = {
+        "levenberg_marquardt": levenberg_marquardt_solver_failure_reason_t,
+        "dogleg": dogleg_solver_failure_reason_t,
+    }
+
     @dataclass
-    class Result:
+    class Result(T.Generic[_ResultValuesT]):
         """
         The result of an optimization, with additional stats and debug information
 
         Attributes:
             initial_values:
-                The initial guess used for this optimization
+                The initial guess used for this optimization.  For :meth:`Optimizer.optimize_state`,
+                a dict from the flattened keys of the entries which changed to their values before
+                the optimization
 
             optimized_values:
-                The best Values achieved during the optimization (Values with the smallest error)
+                The best Values achieved during the optimization (Values with the smallest error).
+                For :meth:`Optimizer.optimize_state`, a dict from the flattened keys of the entries
+                which changed to their optimized values
 
             iterations:
                 Per-iteration stats, if requested, like the error per iteration.  If debug stats are
@@ -129,14 +212,25 @@ class Optimizer:
 
             cholesky_factor_sparsity:
                 The sparsity pattern of the cholesky factor L, filled out if ``debug_stats=True``
+
+            profile:
+                The count, total, min and max time of each scope timed in the C++ code during this
+                optimization, like linearization and factorization, filled out if ``profile=True``
+                or ``profile_timeline=True``.  Also has the timeline of every call, which can be
+                exported as Chrome trace JSON, if ``profile_timeline=True``
         """
 
-        initial_values: Values
-        optimized_values: Values
+        initial_values: _ResultValuesT
+        optimized_values: _ResultValuesT
 
         # Private field holding the original stats - we expose fields of this through properties,
         # since some of the conversions out of this are expensive
-        _stats: cc_sym.OptimizationStats
+        _stats: CcOptimizationStats
+
+        # The failure reason enum of the nonlinear solver which produced this result
+        _failure_reason_type: T.Any = levenberg_marquardt_solver_failure_reason_t
+
+        profile: T.Optional[Profile] = None
 
         @cached_property
         def iterations(self) -> T.List[optimization_iteration_t]:
@@ -151,11 +245,13 @@ class Optimizer:
             return self._stats.status
 
         @cached_property
-        def failure_reason(self) -> levenberg_marquardt_solver_failure_reason_t:
-            return Optimizer.FailureReason(self._stats.failure_reason)
+        def failure_reason(
+            self,
+        ) -> T.Union[levenberg_marquardt_solver_failure_reason_t, dogleg_solver_failure_reason_t]:
+            return self._failure_reason_type(self._stats.failure_reason)
 
         @cached_property
-        def best_linearization(self) -> T.Optional[cc_sym.Linearization]:
+        def best_linearization(self) -> T.Optional[CcLinearization]:
             return self._stats.best_linearization
 
         @cached_property
@@ -176,12 +272,82 @@ class Optimizer:
             """
             return self.iterations[self.best_index].new_error
 
-    def __init__(
+    @dataclass
+    class IterationInfo:
+        """
+        Information about the latest iteration of an optimization, passed to the
+        ``iteration_callback`` of :meth:`Optimizer.optimize` as the optimization runs
+
+        The best values and linearization are only computed when requested, and only while the
+        callback runs.
+
+        Attributes:
+            iteration:
+                The stats for this iteration, such as the error, lambda, and update norm.  Only
+                contains the values and linearization if ``debug_stats=True``
+
+            iteration_seconds:
+                The wall time spent in this iteration, in seconds
+
+            total_seconds:
+                The wall time spent in all of the iterations so far, in seconds
+        """
+
+        iteration: optimization_iteration_t
+        iteration_seconds: float
+        total_seconds: float
+
+        # Private fields for reading the best values on demand
+        _cc_info: CcOptimizationIterationInfo
+        _to_values: T.Callable[[CcValues], Values]
+
+        def best_values(self) -> Values:
+            """
+            The best Values found so far
+            """
+            return self._to_values(self._cc_info.best_values())
+
+        def best_linearization(self) -> CcLinearization:
+            """
+            The linearization at the best Values found so far
+            """
+            return self._cc_info.best_linearization()
+
+    def __init__(  # noqa: PLR0913, PLR0915, PLR0917
         self,
         factors: T.Iterable[T.Union[Factor, NumericFactor]],
         optimized_keys: T.Optional[T.Sequence[str]] = None,
         params: T.Optional[OptimizerParams] = None,
+        batch_factors: bool = False,
+        symbolic_factorization_cache: T.Optional[cc_sym.SymbolicFactorizationCache] = None,
+        solver: str = "levenberg_marquardt",
+        linear_solver_ordering: T.Optional[np.ndarray] = None,
+        ordering_key_groups: T.Optional[T.Sequence[T.Sequence[str]]] = None,
+        schur_complement_keys: T.Optional[T.Sequence[str]] = None,
+        dtype: T.Any = np.float64,
+        dense: T.Union[bool, T.Literal["auto"]] = False,
     ):
+        if solver not in Optimizer._SOLVERS:
+            raise ValueError(
+                f"Unknown solver {solver}, expected one of {list(Optimizer._SOLVERS.keys())}"
+            )
+        self.solver = solver
+        self._failure_reason_type = Optimizer._SOLVERS[solver]
+
+        if symbolic_factorization_cache is not None and (
+            linear_solver_ordering is not None
+            or ordering_key_groups is not None
+            or schur_complement_keys is not None
+        ):
+            raise ValueError(
+                "symbolic_factorization_cache can't be combined with linear_solver_ordering, "
+                "ordering_key_groups, or schur_complement_keys, since the cache doesn't record "
+                "the ordering"
+            )
+
+        self._cc_types = cc_types(dtype)
+        self.dtype = np.dtype(dtype)
+
         if optimized_keys is None:
             # This will be filled with the optimized keys of the numeric factors
             self.optimized_keys = []
@@ -193,7 +359,7 @@ class Optimizer:
 
         optimized_keys_set = set(self.optimized_keys)
 
-        numeric_factors = []
+        numeric_factors: T.List[NumericFactor] = []
         for factor in factors:
             if isinstance(factor, Factor):
                 if optimized_keys is None:
@@ -213,11 +379,10 @@ class Optimizer:
                 numeric_factors.append(factor.to_numeric_factor(factor_opt_keys))
             else:
                 # Add unique keys to optimized keys
-                self.optimized_keys.extend(
-                    opt_key
-                    for opt_key in factor.optimized_keys
-                    if opt_key not in self.optimized_keys
-                )
+                for opt_key in factor.optimized_keys:
+                    if opt_key not in optimized_keys_set:
+                        optimized_keys_set.add(opt_key)
+                        self.optimized_keys.append(opt_key)
                 numeric_factors.append(factor)
 
         # Set default params if none given
@@ -228,6 +393,13 @@ class Optimizer:
 
         self._initialized = False
 
+        # Locks held on the event loop while optimize_async or linearize_async runs, so only one of
+        # them runs on this optimizer at a time.  asyncio locks can't be shared between event loops,
+        # so there's one per loop
+        self._async_locks: T.MutableMapping[asyncio.AbstractEventLoop, asyncio.Lock] = (
+            weakref.WeakKeyDictionary()
+        )
+
         # Create a mapping from python identifier string keys to fixed-size C++ Key objects
         # Initialize the keys map with the optimized keys, which are needed to construct the factors
         # This works because the factors maintain a reference to this, so everything is fine as long
@@ -242,39 +414,324 @@ class Optimizer:
         # why we can't just pull the keys out of `_cc_keys_map`, which is constructed out-of-order.
         self.values_keys_ordered: T.Optional[T.List[str]] = None
 
-        # Construct the C++ optimizer
-        self._cc_optimizer = cc_sym.Optimizer(
-            self.params.to_lcm(),
-            [factor.cc_factor(self._cc_keys_map) for factor in numeric_factors],
+        # Precomputed layout for transferring Values with the same structure as the first Values
+        # passed to the optimizer to and from C++ in bulk.  Built in `_initialize`.
+        self._cc_values_layout: T.Optional[CcValuesLayout] = None
+
+        # The persistent C++ Values optimized in place by `optimize_state`, with the layout of
+        # `_cc_values_layout`.  Set by `set_state`.
+        self._state: T.Optional[CcValues] = None
+
+        self._batch_factors = batch_factors
+        factors_to_wrap: T.Sequence[T.Union[NumericFactor, NumericFactorGroup]] = numeric_factors
+        if batch_factors:
+            factors_to_wrap = group_numeric_factors(numeric_factors)
+
+        cc_factors = [
+            factor.cc_factor(self._cc_keys_map, dtype=self.dtype) for factor in factors_to_wrap
+        ]
+
+        self.dense = self._check_dense(
+            dense,
+            any(cc_factor.is_sparse() for cc_factor in cc_factors),
+            symbolic_factorization_cache=symbolic_factorization_cache,
+            linear_solver_ordering=linear_solver_ordering,
+            ordering_key_groups=ordering_key_groups,
+            schur_complement_keys=schur_complement_keys,
+        )
+
+        # The optimized keys of each factor, to choose whether to use the dense optimizer in
+        # `_initialize`, and to track the optimized keys as factors are added and removed
+        self._factor_optimized_keys = [factor.optimized_keys for factor in numeric_factors]
+
+        # Construct the C++ optimizer.  If `dense` is "auto", this is the sparse optimizer, which is
+        # replaced with the dense optimizer in `_initialize` if that's chosen
+        if self.dense:
+            self._cc_optimizer = self._cc_types.dense_optimizer(self.params.to_lcm(), cc_factors)
+        else:
+            self._cc_optimizer = self._cc_types.optimizers[solver](self.params.to_lcm(), cc_factors)
+        if symbolic_factorization_cache is not None:
+            self._cc_optimizer.set_symbolic_factorization_cache(symbolic_factorization_cache)
+
+        self._set_linear_solver_ordering(linear_solver_ordering, ordering_key_groups)
+
+        if schur_complement_keys is not None:
+            self._set_schur_complement_keys(schur_complement_keys)
+
+    def _check_dense(
+        self,
+        dense: T.Union[bool, T.Literal["auto"]],
+        has_sparse_factors: bool,
+        **sparse_only_args: T.Any,
+    ) -> T.Optional[bool]:
+        """
+        Check whether the dense optimizer supports this problem, from the constructor arguments
+
+        Returns:
+            Whether to use the dense optimizer, or None if it's chosen in `_initialize`
+
+        Raises:
+            ValueError: If ``dense`` is True but the dense optimizer doesn't support the problem,
+                or if ``dense`` is not a bool or ``"auto"``
+        """
+        if not (isinstance(dense, bool) or dense == "auto"):
+            raise ValueError(f'Expected dense to be True, False, or "auto", got {dense!r}')
+
+        unsupported = [name for name, value in sparse_only_args.items() if value is not None]
+        if self.solver != "levenberg_marquardt":
+            unsupported.append(f"the {self.solver} solver")
+        if self.params.linear_solver_type != linear_solver_type_t.DIRECT:
+            unsupported.append(f"linear solver type {self.params.linear_solver_type.name}")
+        if self.params.relinearization_threshold > 0:
+            unsupported.append("relinearization_threshold")
+        if has_sparse_factors:
+            unsupported.append("sparse factors (e.g. from batch_factors)")
+
+        if not unsupported:
+            return None if dense == "auto" else bool(dense)
+        if dense != "auto" and dense:
+            raise ValueError(f"The dense optimizer does not support {', '.join(unsupported)}")
+        return False
+
+    def _set_linear_solver_ordering(
+        self,
+        linear_solver_ordering: T.Optional[np.ndarray],
+        ordering_key_groups: T.Optional[T.Sequence[T.Sequence[str]]],
+    ) -> None:
+        """
+        Set the ordering of the sparse linear solver from the constructor arguments, if given
+        """
+        if linear_solver_ordering is not None and ordering_key_groups is not None:
+            raise ValueError("Pass at most one of linear_solver_ordering and ordering_key_groups")
+        if linear_solver_ordering is not None:
+            ordering = np.asarray(linear_solver_ordering)
+            if ordering.ndim != 1 or not np.array_equal(
+                np.sort(ordering), np.arange(len(ordering))
+            ):
+                raise ValueError("linear_solver_ordering must be a permutation of the columns")
+            self._cc_optimizer.set_linear_solver_ordering(ordering.astype(np.int32))
+        if ordering_key_groups is not None:
+            grouped_keys = [key for group in ordering_key_groups for key in group]
+            not_optimized = set(grouped_keys) - set(self.optimized_keys)
+            if not_optimized:
+                raise ValueError(f"Keys in ordering_key_groups are not optimized: {not_optimized}")
+            if len(grouped_keys) != len(set(grouped_keys)):
+                raise ValueError("Keys may only be in one of the ordering_key_groups")
+            self._cc_optimizer.set_linear_solver_ordering_groups(
+                [[self._cc_keys_map[key] for key in group] for group in ordering_key_groups]
+            )
+
+    def _set_schur_complement_keys(self, schur_complement_keys: T.Sequence[str]) -> None:
+        """
+        Order the given keys last for the Schur complement, from the constructor argument
+        """
+        not_optimized = set(schur_complement_keys) - set(self.optimized_keys)
+        if not_optimized:
+            raise ValueError(f"Keys in schur_complement_keys are not optimized: {not_optimized}")
+        self._cc_optimizer.set_schur_complement_keys(
+            [self._cc_keys_map[key] for key in schur_complement_keys]
         )
 
     def _initialize(self, values: Values) -> None:
+        self.values_keys_ordered = values.keys_recursive()
+
         # Add unoptimized keys into the keys map
-        for i, key in enumerate(values.keys_recursive()):
+        for key in self.values_keys_ordered:
             if key not in self._cc_keys_map:
-                # Give these a different name (`v`) so we don't have to deal with numbering
-                self._cc_keys_map[key] = cc_sym.Key("v", i)
-
-        self.values_keys_ordered = list(values.keys_recursive())
+                # Give these a different name (`v`) so we don't have to deal with numbering.  The
+                # map only grows, so its size is an index which hasn't been used yet, even if this
+                # is called again after the problem changed.
+                self._cc_keys_map[key] = cc_sym.Key("v", len(self._cc_keys_map))
+
+        if self.dense is None:
+            self._choose_dense(values)
+
+        # The bulk transfer only covers the keys in values, so it requires that all of the optimized
+        # keys are present.  Otherwise `_cc_values` falls back to setting each key, which raises
+        # for the missing optimized key.
+        if len(self._cc_keys_map) == len(self.values_keys_ordered):
+            self._cc_values_layout = CcValuesLayout(
+                values,
+                [self._cc_keys_map[key] for key in self.values_keys_ordered],
+                dtype=self.dtype,
+            )
 
         self._initialized = True
 
-    def _cc_values(self, values: Values) -> cc_sym.Values:
+    def _choose_dense(self, values: Values) -> None:
         """
-        Create a cc_sym.Values from the given Python Values
+        Choose whether to use the dense optimizer from the dimension and density of the problem at
+        values, and replace the sparse optimizer built by the constructor if it's chosen
+
+        Anything set on the C++ optimizer before this is called would be lost, so this is called
+        before the C++ optimizer is used.
+        """
+        tangent_dims = {
+            key: ops.LieGroupOps.tangent_dim(values[key])
+            for key in self.optimized_keys
+            if key in values
+        }
+
+        # If an optimized key is missing, the sparse optimizer raises the error for it
+        self.dense = len(tangent_dims) == len(self.optimized_keys) and use_dense_optimizer(
+            tangent_dims, self._factor_optimized_keys
+        )
+        if self.dense:
+            self._cc_optimizer = self._cc_types.dense_optimizer(
+                self.params.to_lcm(), self._cc_optimizer.factors()
+            )
+
+    def _cc_values(self, values: Values) -> CcValues:
+        """
+        Create a C++ Values from the given Python Values
 
         This uses the stored cc_keys_map, which will be initialized if it does not exist yet.
         """
+        return self._cc_values_and_layout(values)[0]
+
+    def _cc_values_and_layout(
+        self, values: Values
+    ) -> T.Tuple[CcValues, T.Optional[CcValuesLayout]]:
+        """
+        Create a C++ Values from the given Python Values, along with the layout of the result if
+        it was transferred in bulk (which requires that values has the same structure as the first
+        Values passed to this optimizer).
+        """
         values = values.to_numerical()
 
         if not self._initialized:
             self._initialize(values)
 
-        cc_values = cc_sym.Values()
+        if self._cc_values_layout is not None:
+            packed_values = self._cc_values_layout.to_cc_values(values)
+            if packed_values is not None:
+                return packed_values, self._cc_values_layout
+
+        cc_values: CcValues = self._cc_types.values()
         for key, cc_key in self._cc_keys_map.items():
             cc_values.set(cc_key, values[key])
 
-        return cc_values
+        return cc_values, None
+
+    def add_factors(
+        self,
+        factors: T.Iterable[T.Union[Factor, NumericFactor]],
+        optimized_keys: T.Optional[T.Sequence[str]] = None,
+    ) -> None:
+        """
+        Add factors to the problem, without rebuilding the optimizer
+
+        Only the new factors are indexed on the next linearization, see
+        ``cc_sym.Optimizer.add_factors``.  The next Values passed to the optimizer may have new
+        keys used by the new factors, and sets the structure for the bulk transfer of later Values.
+        The persistent state, if there is one, is cleared, so call :meth:`set_state` again.
+
+        Args:
+            factors: Factor or NumericFactor objects, as passed to the constructor.  Symbolic
+                Factors are linearized with respect to their keys which are already optimized or in
+                ``optimized_keys``.
+            optimized_keys: New keys to optimize, which are added with :meth:`add_keys` after the
+                factors.  Other keys optimized by the new NumericFactors which are not optimized yet
+                stay constant, unless they are added with :meth:`add_keys`.
+        """
+        new_optimized_keys = list(optimized_keys) if optimized_keys is not None else []
+        linearized_keys = set(self.optimized_keys) | set(new_optimized_keys)
+
+        numeric_factors: T.List[NumericFactor] = []
+        for factor in factors:
+            if isinstance(factor, Factor):
+                factor_opt_keys = [key for key in factor.keys if key in linearized_keys]
+                if not factor_opt_keys:
+                    raise ValueError(
+                        f"Factor {factor.name} has no arguments (keys: {factor.keys}) in the "
+                        + f"optimized keys ({sorted(linearized_keys)})."
+                    )
+                numeric_factors.append(factor.to_numeric_factor(factor_opt_keys))
+            else:
+                numeric_factors.append(factor)
+
+        if self.dense is None:
+            # The dense optimizer would be built from all of the factors and optimize all of their
+            # keys, so it can't be chosen once the problem has changed
+            self.dense = False
+
+        # The factors look up their optimized keys when they're created, and the other keys when
+        # they're linearized, which `_initialize` adds
+        for factor in numeric_factors:
+            for key in factor.optimized_keys:
+                if key not in self._cc_keys_map:
+                    cc_key = cc_sym.Key("x", len(self._cc_keys_map))
+                    self._cc_keys_map[key] = cc_key
+                    self._py_keys_from_cc_keys_map[cc_key] = key
+
+        factors_to_wrap: T.Sequence[T.Union[NumericFactor, NumericFactorGroup]] = numeric_factors
+        if self._batch_factors:
+            factors_to_wrap = group_numeric_factors(numeric_factors)
+
+        self._cc_optimizer.add_factors(
+            [factor.cc_factor(self._cc_keys_map, dtype=self.dtype) for factor in factors_to_wrap]
+        )
+        self._factor_optimized_keys.extend(factor.optimized_keys for factor in numeric_factors)
+
+        # The next Values may have new keys, so the layout is built again from it
+        self._initialized = False
+        self.values_keys_ordered = None
+        self._cc_values_layout = None
+        self._state = None
+
+        if new_optimized_keys:
+            self.add_keys(new_optimized_keys)
+
+    def add_keys(self, keys: T.Sequence[str]) -> None:
+        """
+        Add keys which are optimized by some of the factors, but aren't optimized yet, to the end of
+        the state vector
+
+        Each key must be in the Values passed to the optimizer, see ``cc_sym.Optimizer.add_keys``.
+
+        Raises:
+            ValueError: If one of the keys is already optimized, or isn't optimized by any factor
+        """
+        factor_optimized_keys = {
+            key for factor_keys in self._factor_optimized_keys for key in factor_keys
+        }
+        for key in keys:
+            if key in self.optimized_keys:
+                raise ValueError(f"Key {key} is already optimized")
+            if key not in factor_optimized_keys:
+                raise ValueError(f"Key {key} is not optimized by any factor")
+
+        self._cc_optimizer.add_keys([self._cc_keys_map[key] for key in keys])
+        self.optimized_keys.extend(keys)
+        for key in keys:
+            self._py_keys_from_cc_keys_map[self._cc_keys_map[key]] = key
+
+    def remove_factors(self, indices: T.Sequence[int]) -> None:
+        """
+        Remove the factors at the given indices, in the order the factors were passed to the
+        constructor and :meth:`add_factors`
+
+        Keys which are no longer optimized by any factor are removed from :attr:`optimized_keys`,
+        and stay in the Values passed to the optimizer as constants, see
+        ``cc_sym.Optimizer.remove_factors``.
+
+        Raises:
+            ValueError: If the optimizer was created with ``batch_factors``, where the C++ factors
+                don't correspond to the factors passed to the optimizer
+        """
+        if self._batch_factors:
+            raise ValueError("remove_factors is not supported with batch_factors")
+
+        self._cc_optimizer.remove_factors(list(indices))
+
+        removed = set(indices)
+        self._factor_optimized_keys = [
+            keys for i, keys in enumerate(self._factor_optimized_keys) if i not in removed
+        ]
+        factor_optimized_keys = {
+            key for factor_keys in self._factor_optimized_keys for key in factor_keys
+        }
+        self.optimized_keys = [key for key in self.optimized_keys if key in factor_optimized_keys]
 
     def compute_all_covariances(self, optimized_value: Values) -> T.Dict[str, np.ndarray]:
         """
@@ -286,9 +743,8 @@ class Optimizer:
         Returns:
             A dict of {optimized_key: numerical covariance matrix}
         """
-        cc_covariance_dict = self._cc_optimizer.compute_all_covariances(
-            linearization=self.linearize(optimized_value)
-        )
+        linearization = self.linearize(optimized_value)
+        cc_covariance_dict = self._cc_optimizer.compute_all_covariances(linearization=linearization)
         return {self._py_keys_from_cc_keys_map[k]: v for k, v in cc_covariance_dict.items()}
 
     def compute_covariances(
@@ -300,13 +756,16 @@ class Optimizer:
         This version is potentially much more efficient than computing the covariances for all
         keys in the problem.
 
-        Currently requires that `keys` corresponds to a set of keys at the start of the list of keys
-        for the full problem, and in the same order.  It uses the Schur complement trick, so will be
-        most efficient if the hessian is of the following form, with C block diagonal::
+        If ``keys`` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
 
             A = ( B    E )
                 ( E^T  C )
 
+        Otherwise, ``keys`` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see :meth:`compute_cross_covariances`.
+
         Args:
             optimized_value: A value containing the linearization point to compute the covariance matrix about
             keys: The subset of keys to compute covariances for
@@ -314,12 +773,40 @@ class Optimizer:
         Returns:
             A dict of {optimized_key: numerical covariance matrix}
         """
+        linearization = self.linearize(optimized_value)
         cc_covariance_dict = self._cc_optimizer.compute_covariances(
-            linearization=self.linearize(optimized_value),
+            linearization=linearization,
             keys=[self._cc_keys_map[key] for key in keys],
         )
         return {self._py_keys_from_cc_keys_map[k]: v for k, v in cc_covariance_dict.items()}
 
+    def compute_cross_covariances(
+        self, optimized_value: Values, key_pairs: T.Sequence[T.Tuple[str, str]]
+    ) -> T.List[np.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair ``(a, b)`` is the block of the full problem covariance
+        with the rows of ``a`` and the columns of ``b``, so the pair ``(a, a)`` gives the
+        covariance of ``a``.  The keys may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        :meth:`compute_full_covariance` for a small number of keys in a large problem.
+
+        Args:
+            optimized_value: A value containing the linearization point to compute the covariance matrix about
+            key_pairs: The pairs of keys to compute cross-covariances for
+
+        Returns:
+            A list with the numerical cross-covariance matrix for each pair in ``key_pairs``
+        """
+        linearization = self.linearize(optimized_value)
+        return self._cc_optimizer.compute_cross_covariances(
+            linearization=linearization,
+            key_pairs=[(self._cc_keys_map[a], self._cc_keys_map[b]) for a, b in key_pairs],
+        )
+
     def compute_full_covariance(self, optimized_value: Values) -> np.ndarray:
         """
         Get the full problem covariance at the given linearization
@@ -332,15 +819,33 @@ class Optimizer:
 
         May not be called before either optimize or linearize has been called.
         """
-        return self._cc_optimizer.compute_full_covariance(self.linearize(optimized_value))
+        linearization = self.linearize(optimized_value)
+        return self._cc_optimizer.compute_full_covariance(linearization)
 
-    def optimize(self, initial_guess: Values, **kwargs: T.Any) -> Optimizer.Result:
+    def optimize(
+        self,
+        initial_guess: Values,
+        iteration_callback: T.Optional[
+            T.Callable[[Optimizer.IterationInfo], T.Optional[bool]]
+        ] = None,
+        profile: bool = False,
+        profile_timeline: bool = False,
+        **kwargs: T.Any,
+    ) -> Optimizer.Result[Values]:
         """
         Optimize from the given initial guess, and return the optimized Values and stats
 
         Args:
             initial_guess: A Values containing the initial guess, should contain at least all the
                 keys required by the ``factors`` passed to the constructor
+            iteration_callback: If given, called after each iteration with an
+                :class:`Optimizer.IterationInfo`, which gives per-iteration information without
+                setting ``debug_stats``.  If it returns True, the optimization stops with status
+                ``STOPPED_BY_CALLBACK``
+            profile: If True, record the time spent in each scope timed in the C++ code during this
+                optimization in ``result.profile``
+            profile_timeline: If True, also record every call to each timed scope, to be exported
+                with :meth:`Profile.write_chrome_trace <.profiling.Profile.write_chrome_trace>`
             num_iterations: If < 0 (the default), uses the number of iterations specified by the
                 params at construction
             populate_best_linearization: If true, the linearization at the best values will be
@@ -350,29 +855,388 @@ class Optimizer:
             The optimization results, with additional stats and debug information.  See the
             :class:`Optimizer.Result` documentation for more information
         """
-        cc_values = self._cc_values(initial_guess)
+        cc_values, cc_values_layout = self._cc_values_and_layout(initial_guess)
+
+        stats, result_profile = self._optimize_cc_values(
+            cc_values,
+            lambda best_cc_values: self._optimized_values(
+                initial_guess, best_cc_values, cc_values_layout
+            ),
+            iteration_callback=iteration_callback,
+            profile=profile,
+            profile_timeline=profile_timeline,
+            **kwargs,
+        )
+
+        return Optimizer.Result(
+            initial_values=initial_guess,
+            optimized_values=self._optimized_values(initial_guess, cc_values, cc_values_layout),
+            _stats=stats,
+            _failure_reason_type=self._failure_reason_type,
+            profile=result_profile,
+        )
+
+    def _optimize_cc_values(
+        self,
+        cc_values: CcValues,
+        to_values: T.Callable[[CcValues], Values],
+        iteration_callback: T.Optional[T.Callable[[Optimizer.IterationInfo], T.Optional[bool]]],
+        profile: bool,
+        profile_timeline: bool,
+        **kwargs: T.Any,
+    ) -> T.Tuple[CcOptimizationStats, T.Optional[Profile]]:
+        """
+        Optimize the C++ Values in place, and return the stats and the profile if requested
+
+        ``to_values`` converts C++ Values with the structure of ``cc_values`` to Python, for the
+        best values passed to the iteration callback.
+        """
+        if iteration_callback is not None:
+
+            def cc_iteration_callback(cc_info: CcOptimizationIterationInfo) -> bool:
+                return bool(
+                    iteration_callback(
+                        Optimizer.IterationInfo(
+                            iteration=cc_info.iteration,
+                            iteration_seconds=cc_info.iteration_seconds,
+                            total_seconds=cc_info.total_seconds,
+                            _cc_info=cc_info,
+                            _to_values=to_values,
+                        )
+                    )
+                )
+
+            self._cc_optimizer.set_iteration_callback(cc_iteration_callback)
+
+        recorder = None
+        if profile or profile_timeline:
+            recorder = cc_sym.TicTocRecorder(record_timeline=profile_timeline)
+            recorder.start()
 
         try:
             stats = self._cc_optimizer.optimize(cc_values, **kwargs)
         except ZeroDivisionError as ex:
             raise ZeroDivisionError("ERROR: Division by zero - check your use of epsilon!") from ex
+        finally:
+            if recorder is not None:
+                recorder.stop()
+            if iteration_callback is not None:
+                self._cc_optimizer.set_iteration_callback(None)
+
+        return stats, (
+            Profile.from_recorder(recorder, record_timeline=profile_timeline)
+            if recorder is not None
+            else None
+        )
+
+    def optimize_many(
+        self, initial_guesses: T.Sequence[Values], num_threads: int = 0, **kwargs: T.Any
+    ) -> T.List[Optimizer.Result[Values]]:
+        """
+        Optimize each of the given initial guesses independently, in parallel on a native thread
+        pool, and return the optimized Values and stats for each
+
+        This gives the same results as calling :meth:`optimize` on each initial guess, but the
+        problems are solved by C++ threads in a single call, each of which reuses the setup and
+        symbolic factorization of its own copy of the optimizer for every problem it solves.  The
+        initial guesses should all have the same structure, e.g. the same keys and types, and
+        factors which are evaluated in Python take turns holding the GIL.
+
+        Args:
+            initial_guesses: The initial guesses to optimize from, each of which should contain at
+                least all the keys required by the ``factors`` passed to the constructor
+            num_threads: The maximum number of threads to use.  If 0 (the default), uses one per
+                core
+            num_iterations: If < 0 (the default), uses the number of iterations specified by the
+                params at construction
+            populate_best_linearization: If true, the linearization at the best values will be
+                filled out in the stats
+
+        Returns:
+            The optimization results for each initial guess, in the same order
+        """
+        cc_values_and_layouts = [
+            self._cc_values_and_layout(initial_guess) for initial_guess in initial_guesses
+        ]
+
+        try:
+            stats = self._cc_optimizer.optimize_many(
+                [cc_values for cc_values, _ in cc_values_and_layouts],
+                num_threads=num_threads,
+                **kwargs,
+            )
+        except ZeroDivisionError as ex:
+            raise ZeroDivisionError("ERROR: Division by zero - check your use of epsilon!") from ex
+
+        return [
+            Optimizer.Result(
+                initial_values=initial_guess,
+                optimized_values=self._optimized_values(initial_guess, cc_values, cc_values_layout),
+                _stats=result_stats,
+                _failure_reason_type=self._failure_reason_type,
+            )
+            for initial_guess, (cc_values, cc_values_layout), result_stats in zip(
+                initial_guesses, cc_values_and_layouts, stats
+            )
+        ]
 
-        optimized_values = Values(
+    def _optimized_values(
+        self,
+        initial_guess: Values,
+        cc_values: CcValues,
+        cc_values_layout: T.Optional[CcValuesLayout],
+    ) -> Values:
+        """
+        Read the optimized Values for the given initial guess back out of the C++ Values
+        """
+        if cc_values_layout is not None:
+            return cc_values_layout.from_cc_values(cc_values)
+
+        return Values(
             **{
                 key: cc_values.at(self._cc_keys_map[key])
                 for key in initial_guess.dataclasses_to_values().keys_recursive()
             }
         )
 
+    def set_state(self, values: Values) -> None:
+        """
+        Set the persistent state optimized by :meth:`optimize_state`
+
+        The state is kept in C++ between calls, so successive optimizations of Values which only
+        differ in a few keys can update just those keys with :meth:`update_state` instead of
+        transferring the whole Values for each call to :meth:`optimize`.
+
+        Args:
+            values: A Values containing at least all the keys required by the ``factors`` passed to
+                the constructor, with the same structure as the first Values passed to this
+                optimizer if there was one
+
+        Raises:
+            ValueError: If values doesn't have the same keys and storage dimensions as the first
+                Values passed to this optimizer
+        """
+        values = values.to_numerical()
+
+        if not self._initialized:
+            self._initialize(values)
+
+        cc_values = None
+        if self._cc_values_layout is not None:
+            cc_values = self._cc_values_layout.to_cc_values(values)
+        if cc_values is None:
+            raise ValueError(
+                "The state must have the same keys and storage dimensions as the first Values "
+                f"passed to this optimizer, which had keys {self.values_keys_ordered}"
+            )
+        self._state = cc_values
+
+    def update_state(
+        self,
+        values: T.Union[Values, T.Mapping[str, T.Any]],
+        keys: T.Optional[T.Iterable[str]] = None,
+    ) -> None:
+        """
+        Overwrite entries of the persistent state set by :meth:`set_state` in place
+
+        The cost is proportional to the number of entries written, not to the size of the state.
+
+        Args:
+            values: The new values of the changed keys, either a Values or a mapping from the
+                (flattened) keys of the state to numerical values
+            keys: If given, only these keys are read from ``values`` and written, e.g. a set of the
+                keys which changed since the last call.  Otherwise all the entries of ``values``
+                are written
+
+        Raises:
+            KeyError: If one of the keys is not in the state
+            ValueError: If the storage dimension of one of the entries doesn't match the state
+        """
+        if self._state is None:
+            raise ValueError("No state has been set, call set_state first")
+        assert self._cc_values_layout is not None
+
+        if isinstance(values, Values):
+            values = values.to_numerical()
+
+        entries: T.Mapping[str, T.Any]
+        if keys is not None:
+            entries = {key: values[key] for key in keys}
+        elif isinstance(values, Values):
+            entries = dict(values.items_recursive())
+        else:
+            entries = values
+
+        self._cc_values_layout.update_cc_values(self._state, entries)
+
+    def state_values(self) -> Values:
+        """
+        The current persistent state, as a Python Values
+
+        Matrix entries are returned as numpy views of the state, so they are updated by later calls
+        to :meth:`update_state` and :meth:`optimize_state`; copy them to keep them.
+        """
+        if self._state is None:
+            raise ValueError("No state has been set, call set_state first")
+        assert self._cc_values_layout is not None
+
+        return self._cc_values_layout.from_cc_values(self._state)
+
+    def optimize_state(
+        self,
+        iteration_callback: T.Optional[
+            T.Callable[[Optimizer.IterationInfo], T.Optional[bool]]
+        ] = None,
+        profile: bool = False,
+        profile_timeline: bool = False,
+        **kwargs: T.Any,
+    ) -> Optimizer.Result[T.Dict[str, T.Any]]:
+        """
+        Optimize the persistent state set by :meth:`set_state` in place, and return the entries
+        which changed and the stats
+
+        The state is left at the optimized values, so it's the initial guess for the next call
+        unless it's updated with :meth:`update_state` in between.
+
+        Takes the same arguments as :meth:`optimize`.
+
+        Returns:
+            The optimization results.  Unlike :meth:`optimize`, ``result.initial_values`` and
+            ``result.optimized_values`` are dicts from the flattened keys of the state, like
+            ``poses[3]``, which only contain the entries which were changed by the optimization,
+            before and after it.  They can be passed directly to :meth:`update_state`
+        """
+        if self._state is None:
+            raise ValueError("No state has been set, call set_state first")
+        cc_values_layout = self._cc_values_layout
+        assert cc_values_layout is not None
+
+        before = self._state.data_view().copy()
+
+        stats, result_profile = self._optimize_cc_values(
+            self._state,
+            cc_values_layout.from_cc_values,
+            iteration_callback=iteration_callback,
+            profile=profile,
+            profile_timeline=profile_timeline,
+            **kwargs,
+        )
+
+        initial_values, optimized_values = cc_values_layout.changed_entries(before, self._state)
+
         return Optimizer.Result(
-            initial_values=initial_guess, optimized_values=optimized_values, _stats=stats
+            initial_values=initial_values,
+            optimized_values=optimized_values,
+            _stats=stats,
+            _failure_reason_type=self._failure_reason_type,
+            profile=result_profile,
         )
 
-    def linearize(self, values: Values) -> cc_sym.Linearization:
+    def linearize(
+        self, values: Values, linearization: T.Optional[CcLinearization] = None
+    ) -> CcLinearization:
         """
         Compute and return the linearization at the given Values
+
+        Args:
+            values: The values to linearize at
+            linearization: If given, a linearization previously returned by this method, which is
+                relinearized in place and returned.  Its storage is reused if the structure of the
+                problem hasn't changed, so views of its arrays (e.g. from
+                ``hessian_lower_csc_view()``) see the new linearization without copying.
+
+        Returns:
+            The linearization, a ``cc_sym.DenseLinearization`` with the dense optimizer and a sparse
+            ``cc_sym.Linearization`` otherwise (or their float32 versions), so check its type
+            before using the sparse-only methods like ``hessian_lower_csc_view()``
+        """
+        cc_values = self._cc_values(values)
+        if linearization is None:
+            return self._cc_optimizer.linearize(cc_values)
+        self._cc_optimizer.linearize(cc_values, linearization)
+        return linearization
+
+    async def _run_in_executor(
+        self,
+        func: T.Callable[[], _T],
+        cancellation_token: T.Optional[cc_sym.CancellationToken] = None,
+    ) -> _T:
+        """
+        Run func on a worker thread of the event loop's default executor, holding the async lock of
+        this optimizer on the event loop until it returns
+
+        If the awaiting task is cancelled, the cancellation_token is cancelled and the lock is held
+        until func returns, since the worker thread can't be interrupted.
+        """
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            future = loop.run_in_executor(None, func)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if cancellation_token is not None:
+                    cancellation_token.cancel()
+                await asyncio.wait([future])
+                raise
+
+    async def optimize_async(
+        self,
+        initial_guess: Values,
+        iteration_callback: T.Optional[
+            T.Callable[[Optimizer.IterationInfo], T.Optional[bool]]
+        ] = None,
+        **kwargs: T.Any,
+    ) -> Optimizer.Result[Values]:
+        """
+        Like :meth:`optimize`, but runs the optimization on a worker thread of the event loop's
+        default executor, so awaiting it doesn't block the event loop
+
+        The GIL is released while the C++ optimizer runs, and only reacquired while factors
+        evaluated in Python are linearized and while the iteration_callback runs.  The async
+        methods of one Optimizer called from the same event loop run one at a time, so use separate
+        Optimizers for optimizations which should run in parallel, and don't call the synchronous
+        methods while an async one is running.
+
+        If the awaiting task is cancelled, the optimization stops after its current iteration, or
+        doesn't start if it's still waiting for another call on this Optimizer, and
+        :class:`asyncio.CancelledError` is raised.
+
+        Args:
+            initial_guess: A Values containing the initial guess
+            iteration_callback: If given, called on the worker thread after each iteration, see
+                :meth:`optimize`
+            kwargs: The other arguments to :meth:`optimize`
+
+        Returns:
+            The optimization results, see :meth:`optimize`
         """
-        return self._cc_optimizer.linearize(self._cc_values(values))
+        cancellation_token = cc_sym.CancellationToken()
+
+        def optimize() -> Optimizer.Result[Values]:
+            # Initializing may replace the C++ optimizer, so it's done before setting the token
+            if not self._initialized:
+                self._initialize(initial_guess.to_numerical())
+
+            self._cc_optimizer.set_cancellation_token(cancellation_token)
+            try:
+                return self.optimize(initial_guess, iteration_callback=iteration_callback, **kwargs)
+            finally:
+                self._cc_optimizer.set_cancellation_token(None)
+
+        return await self._run_in_executor(optimize, cancellation_token)
+
+    async def linearize_async(
+        self, values: Values, linearization: T.Optional[CcLinearization] = None
+    ) -> CcLinearization:
+        """
+        Like :meth:`linearize`, but runs on a worker thread of the event loop's default executor, so
+        awaiting it doesn't block the event loop.  See :meth:`optimize_async`
+
+        A linearization can't be stopped once it starts, so if the awaiting task is cancelled it
+        still runs to completion unless it hasn't started yet.
+        """
+        return await self._run_in_executor(lambda: self.linearize(values, linearization))
 
     def load_iteration_values(self, values_msg: values_t) -> Values:
         """
@@ -389,6 +1253,21 @@ class Optimizer:
 
         return py_values
 
+    def linear_solver_ordering(self) -> np.ndarray:
+        """
+        The ordering of the columns of the hessian computed by the sparse linear solver, where
+        ``ordering[i]`` is the position of column ``i`` in the factorization.  This is an array of
+        integers which can be saved (e.g. with ``np.save``) and passed as the
+        ``linear_solver_ordering`` of a later optimizer for a problem with the same structure, so it
+        doesn't compute the ordering again.
+
+        Empty until the hessian is first factorized, e.g. by :meth:`optimize`, and always empty
+        with the dense optimizer.
+        """
+        if self.dense:
+            return np.zeros(0, dtype=np.int32)
+        return self._cc_optimizer.linear_solver_ordering()
+
     def linearization_index(self) -> T.Dict[str, index_entry_t]:
         """
         Get the index mapping keys to their positions in the linearized state vector.  Useful for
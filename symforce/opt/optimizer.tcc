@@ -5,11 +5,18 @@
 
 #pragma once
 
+#include <algorithm>
+#include <unordered_set>
+
+#include <fmt/ostream.h>
+
 #include "./assert.h"
 #include "./internal/covariance_utils.h"
 #include "./internal/derivative_checker.h"
+#include "./internal/linearizer_utils.h"
 #include "./internal/optimizer_utils.h"
 #include "./optimizer.h"
+#include "./sparse_cholesky/orderings.h"
 
 namespace sym {
 
@@ -28,9 +35,9 @@ Optimizer<ScalarType, NonlinearSolverType>::Optimizer(const optimizer_params_t&
       epsilon_(epsilon),
       debug_stats_(params.debug_stats),
       include_jacobians_(params.include_jacobians),
-      keys_(keys.empty() ? ComputeKeysToOptimize(factors_) : std::move(keys)),
+      keys_(keys.empty() ? ComputeDefaultKeys(params) : std::move(keys)),
       index_(),
-      linearizer_(name_, factors_, keys_, params.include_jacobians, params.debug_checks),
+      linearizer_(BuildLinearizer(params)),
       linearize_func_(BuildLinearizeFunc(params.check_derivatives)),
       verbose_(params.verbose) {
   SYM_ASSERT(factors_.size() > 0);
@@ -51,9 +58,9 @@ Optimizer<ScalarType, NonlinearSolverType>::Optimizer(
       epsilon_(epsilon),
       debug_stats_(params.debug_stats),
       include_jacobians_(params.include_jacobians),
-      keys_(keys.empty() ? ComputeKeysToOptimize(factors_) : std::move(keys)),
+      keys_(keys.empty() ? ComputeDefaultKeys(params) : std::move(keys)),
       index_(),
-      linearizer_(name_, factors_, keys_, params.include_jacobians),
+      linearizer_(BuildLinearizer(params)),
       linearize_func_(BuildLinearizeFunc(params.check_derivatives)),
       verbose_(params.verbose) {
   SYM_ASSERT(factors_.size() > 0);
@@ -86,7 +93,8 @@ void Optimizer<ScalarType, NonlinearSolverType>::Optimize(Values<Scalar>& values
   // Call the static helper function to run the optimization
   const bool include_debug_jacobians = debug_stats_ && include_jacobians_;
   OptimizeImpl(values, nonlinear_solver_, linearize_func_, num_iterations,
-               populate_best_linearization, name_, include_debug_jacobians, verbose_, stats);
+               populate_best_linearization, name_, include_debug_jacobians, verbose_, stats,
+               iteration_callback_, cancellation_token_.get(), &linearizer_);
 }
 
 template <typename ScalarType, typename NonlinearSolverType>
@@ -103,13 +111,18 @@ void Optimizer<ScalarType, NonlinearSolverType>::Optimize(Values<Scalar>& values
 template <typename ScalarType, typename NonlinearSolverType>
 Linearization<typename NonlinearSolverType::MatrixType>
 Optimizer<ScalarType, NonlinearSolverType>::Linearize(const Values<Scalar>& values) {
-  Initialize(values);
-
   Linearization<MatrixType> linearization;
-  linearize_func_(values, linearization);
+  Linearize(values, linearization);
   return linearization;
 }
 
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::Linearize(
+    const Values<Scalar>& values, Linearization<MatrixType>& linearization) {
+  Initialize(values);
+  linearize_func_(values, linearization);
+}
+
 template <typename ScalarType, typename NonlinearSolverType>
 void Optimizer<ScalarType, NonlinearSolverType>::ComputeAllCovariances(
     const Linearization<MatrixType>& linearization,
@@ -179,7 +192,23 @@ void Optimizer<ScalarType, NonlinearSolverType>::ComputeCovariances(
     const Linearization<MatrixType>& linearization, const std::vector<Key>& keys,
     std::unordered_map<Key, MatrixX<Scalar>>& covariances_by_key) {
   const bool same_order = internal::CheckKeyOrderMatchesLinearizerKeysStart(linearizer_, keys);
-  SYM_ASSERT(same_order);
+  if (!same_order) {
+    std::vector<std::pair<Key, Key>> key_pairs;
+    key_pairs.reserve(keys.size());
+    for (const Key& key : keys) {
+      key_pairs.emplace_back(key, key);
+    }
+
+    ComputeCrossCovariances(linearization, key_pairs,
+                            compute_covariances_storage_.covariance_blocks);
+
+    covariances_by_key.clear();
+    for (size_t i = 0; i < keys.size(); i++) {
+      covariances_by_key[keys[i]] = std::move(compute_covariances_storage_.covariance_blocks[i]);
+    }
+    return;
+  }
+
   const size_t block_dim = internal::ComputeBlockDimension(linearizer_, keys);
 
   // Copy into modifiable storage
@@ -192,6 +221,45 @@ void Optimizer<ScalarType, NonlinearSolverType>::ComputeCovariances(
                                   covariances_by_key);
 }
 
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::ComputeCrossCovariances(
+    const Linearization<MatrixType>& linearization,
+    const std::vector<std::pair<Key, Key>>& key_pairs,
+    std::vector<MatrixX<Scalar>>& cross_covariances) {
+  SYM_ASSERT(IsInitialized());
+
+  const auto& state_index = linearizer_.StateIndex();
+  const auto index_entry = [&state_index](const Key& key) {
+    const auto it = state_index.find(key.GetLcmType());
+    if (it == state_index.end()) {
+      throw std::runtime_error(
+          fmt::format("Tried to compute the covariance of key {} which is not optimized", key));
+    }
+    return it->second;
+  };
+
+  std::vector<internal::CovarianceBlockIndex> blocks;
+  blocks.reserve(key_pairs.size());
+  for (const auto& key_pair : key_pairs) {
+    blocks.push_back({index_entry(key_pair.first), index_entry(key_pair.second)});
+  }
+
+  // Only analyze the sparsity pattern again if the problem changed
+  auto& storage = compute_covariances_storage_;
+  const auto& hessian_lower = linearization.hessian_lower;
+  const bool analyze = hessian_lower.rows() != storage.analyzed_hessian_dim ||
+                       hessian_lower.nonZeros() != storage.analyzed_hessian_nonzeros;
+  storage.analyzed_hessian_dim = hessian_lower.rows();
+  storage.analyzed_hessian_nonzeros = hessian_lower.nonZeros();
+
+  // Copy into modifiable storage
+  storage.H_damped = hessian_lower;
+
+  internal::ComputeCovarianceBlocksWithSelectedInverse(storage.H_damped, analyze, epsilon_,
+                                                       storage.selected_inverse_solver, blocks,
+                                                       cross_covariances);
+}
+
 template <typename ScalarType, typename NonlinearSolverType>
 void Optimizer<ScalarType, NonlinearSolverType>::ComputeFullCovariance(
     const Linearization<MatrixType>& linearization, MatrixX<Scalar>& covariance) {
@@ -199,6 +267,52 @@ void Optimizer<ScalarType, NonlinearSolverType>::ComputeFullCovariance(
   nonlinear_solver_.ComputeCovariance(linearization.hessian_lower, covariance);
 }
 
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::AddFactors(std::vector<Factor<Scalar>> factors) {
+  factors_.insert(factors_.end(), std::make_move_iterator(factors.begin()),
+                  std::make_move_iterator(factors.end()));
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::AddKeys(const std::vector<Key>& keys) {
+  keys_.insert(keys_.end(), keys.begin(), keys.end());
+  linearizer_.AddKeys(keys);
+
+  // Recomputed from the next values
+  index_ = {};
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::RemoveFactors(std::vector<int> indices) {
+  std::sort(indices.begin(), indices.end());
+  indices.erase(std::unique(indices.begin(), indices.end()), indices.end());
+  if (indices.empty()) {
+    return;
+  }
+  SYM_ASSERT(indices.front() >= 0 && indices.back() < static_cast<int>(factors_.size()));
+  SYM_ASSERT(indices.size() < factors_.size(), "Cannot remove all of the factors");
+
+  internal::EraseIndices(factors_, indices);
+
+  std::unordered_set<Key> optimized_keys;
+  for (const auto& factor : factors_) {
+    optimized_keys.insert(factor.OptimizedKeys().begin(), factor.OptimizedKeys().end());
+  }
+  const auto is_unoptimized = [&optimized_keys](const Key& key) {
+    return optimized_keys.count(key) == 0;
+  };
+  if (std::none_of(keys_.begin(), keys_.end(), is_unoptimized)) {
+    linearizer_.RemoveFactors(indices);
+    return;
+  }
+
+  keys_.erase(std::remove_if(keys_.begin(), keys_.end(), is_unoptimized), keys_.end());
+  const optimizer_params_t& params = nonlinear_solver_.Params();
+  linearizer_ = BuildLinearizer(params);
+  nonlinear_solver_.ResetSparsityPattern();
+  index_ = {};
+}
+
 template <typename ScalarType, typename NonlinearSolverType>
 const std::vector<Key>& Optimizer<ScalarType, NonlinearSolverType>::Keys() const {
   return keys_;
@@ -241,6 +355,94 @@ const optimizer_params_t& Optimizer<ScalarType, NonlinearSolverType>::Params() c
   return nonlinear_solver_.Params();
 }
 
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::SetIterationCallback(
+    IterationCallback iteration_callback) {
+  iteration_callback_ = std::move(iteration_callback);
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::SetCancellationToken(
+    std::shared_ptr<const CancellationToken> cancellation_token) {
+  cancellation_token_ = std::move(cancellation_token);
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::SetLinearSolverOrdering(
+    const Eigen::VectorXi& ordering) {
+  using StorageIndex = typename MatrixType::StorageIndex;
+  nonlinear_solver_.LinearSolver().SetOrdering(
+      FixedOrdering<StorageIndex>(ordering.template cast<StorageIndex>()));
+  nonlinear_solver_.ResetSparsityPattern();
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::SetLinearSolverOrderingGroups(
+    std::vector<std::vector<Key>> key_groups) {
+  using StorageIndex = typename MatrixType::StorageIndex;
+  using PermutationMatrixType =
+      typename NonlinearSolverType::LinearSolverType::PermutationMatrixType;
+
+  // The columns of the keys are only known once the linearizer is initialized, which happens
+  // before the hessian is analyzed
+  nonlinear_solver_.LinearSolver().SetOrdering([this, key_groups = std::move(key_groups)](
+                                                   const MatrixType& A,
+                                                   PermutationMatrixType& inv_permutation) {
+    const StorageIndex ungrouped = static_cast<StorageIndex>(key_groups.size());
+    std::vector<StorageIndex> column_groups(A.cols(), ungrouped);
+    const auto& state_index = linearizer_.StateIndex();
+    for (size_t group = 0; group < key_groups.size(); group++) {
+      for (const Key& key : key_groups[group]) {
+        const auto it = state_index.find(key.GetLcmType());
+        if (it == state_index.end()) {
+          throw std::runtime_error(
+              fmt::format("Key {} in the linear solver ordering groups is not optimized", key));
+        }
+        const auto begin = column_groups.begin() + it->second.offset;
+        const auto end = begin + it->second.tangent_dim;
+        SYM_ASSERT(std::all_of(begin, end, [&](const StorageIndex g) { return g == ungrouped; }),
+                   "Key {} is in more than one linear solver ordering group", key);
+        std::fill(begin, end, static_cast<StorageIndex>(group));
+      }
+    }
+    ConstrainedAmdOrdering<StorageIndex>(std::move(column_groups))(A, inv_permutation);
+  });
+  nonlinear_solver_.ResetSparsityPattern();
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+Eigen::VectorXi Optimizer<ScalarType, NonlinearSolverType>::LinearSolverOrdering() const {
+  const auto& linear_solver = nonlinear_solver_.LinearSolver();
+  if (!linear_solver.IsInitialized()) {
+    return {};
+  }
+
+  // An empty permutation is the identity
+  if (linear_solver.Permutation().size() == 0) {
+    return Eigen::VectorXi::LinSpaced(linear_solver.L().cols(), 0,
+                                      static_cast<int>(linear_solver.L().cols()) - 1);
+  }
+  return linear_solver.Permutation().indices().template cast<int>();
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+void Optimizer<ScalarType, NonlinearSolverType>::SetSchurComplementKeys(
+    const std::vector<Key>& keys) {
+  const std::unordered_set<Key> optimized_keys(keys_.begin(), keys_.end());
+  for (const Key& key : keys) {
+    SYM_ASSERT(optimized_keys.count(key) > 0,
+               "Key {} in the Schur complement keys is not optimized", key);
+  }
+
+  const std::unordered_set<Key> key_set(keys.begin(), keys.end());
+
+  std::stable_partition(keys_.begin(), keys_.end(),
+                        [&key_set](const Key& key) { return key_set.count(key) == 0; });
+  linearizer_ = BuildLinearizer(nonlinear_solver_.Params());
+  nonlinear_solver_.ResetSparsityPattern();
+  index_ = {};
+}
+
 // ----------------------------------------------------------------------------
 // Protected methods
 // ----------------------------------------------------------------------------
@@ -263,6 +465,36 @@ Optimizer<ScalarType, NonlinearSolverType>::BuildLinearizeFunc(const bool check_
   };
 }
 
+template <typename ScalarType, typename NonlinearSolverType>
+std::vector<Key> Optimizer<ScalarType, NonlinearSolverType>::ComputeDefaultKeys(
+    const optimizer_params_t& params) const {
+  std::vector<Key> keys = ComputeKeysToOptimize(factors_);
+  if (params.linear_solver_type == linear_solver_type_t::SCHUR) {
+    return OrderKeysForSchurComplement(factors_, keys);
+  }
+  return keys;
+}
+
+template <typename ScalarType, typename NonlinearSolverType>
+typename Optimizer<ScalarType, NonlinearSolverType>::LinearizerType
+Optimizer<ScalarType, NonlinearSolverType>::BuildLinearizer(
+    const optimizer_params_t& params) const {
+  LinearizerType linearizer(name_, factors_, keys_, params.include_jacobians, params.debug_checks,
+                            params.num_threads);
+
+  if (params.relinearization_threshold > 0) {
+    SYM_ASSERT(!params.check_derivatives,
+               "relinearization_threshold is not supported together with check_derivatives");
+    if constexpr (std::is_same_v<LinearizerType, sym::Linearizer<Scalar>>) {
+      linearizer.SetRelinearizationThreshold(params.relinearization_threshold, epsilon_);
+    } else {
+      SYM_ASSERT(false, "relinearization_threshold is only supported by the sparse Linearizer");
+    }
+  }
+
+  return linearizer;
+}
+
 template <typename ScalarType, typename NonlinearSolverType>
 void Optimizer<ScalarType, NonlinearSolverType>::Initialize(const Values<Scalar>& values) {
   if (!IsInitialized()) {
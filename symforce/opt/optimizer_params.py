@@ -9,7 +9,9 @@ import dataclasses
 from dataclasses import dataclass
 
 from lcmtypes.sym._lambda_update_type_t import lambda_update_type_t
+from lcmtypes.sym._linear_solver_type_t import linear_solver_type_t
 from lcmtypes.sym._optimizer_params_t import optimizer_params_t
+from lcmtypes.sym._pcg_preconditioner_t import pcg_preconditioner_t
 
 
 @dataclass
@@ -43,6 +45,15 @@ class OptimizerParams:
     early_exit_min_reduction: float = 1e-6
     early_exit_min_absolute_error: float = 0.0
     enable_bold_updates: bool = False
+    num_threads: int = 1
+    linear_solver_type: linear_solver_type_t = linear_solver_type_t.DIRECT
+    pcg_preconditioner: pcg_preconditioner_t = pcg_preconditioner_t.BLOCK_JACOBI
+    pcg_max_iterations: int = 500
+    pcg_max_forcing: float = 0.1
+    dogleg_initial_radius: float = 100.0
+    dogleg_min_radius: float = 1e-10
+    dogleg_hessian_damping: float = 1e-9
+    relinearization_threshold: float = 0.0
 
     def to_lcm(self) -> optimizer_params_t:
         return optimizer_params_t(**dataclasses.asdict(self))
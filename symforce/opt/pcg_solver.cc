@@ -0,0 +1,10 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include "./pcg_solver.h"
+
+// Explicit instantiation
+template class sym::PcgSolver<Eigen::SparseMatrix<double>>;
+template class sym::PcgSolver<Eigen::SparseMatrix<float>>;
@@ -0,0 +1,183 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <vector>
+
+#include <Eigen/Core>
+#include <Eigen/SparseCore>
+
+#include <lcmtypes/sym/pcg_preconditioner_t.hpp>
+
+namespace sym {
+
+/**
+ * An iterative solver for `A x = b`, where A is a sparse positive definite matrix, using
+ * preconditioned conjugate gradients (PCG) on a reduced system
+ *
+ * For very large problems, such as bundle adjustment with millions of observations, the fill-in of
+ * a sparse factorization can take much more memory and time than the matrix itself.  This solver
+ * never factorizes A, so only needs memory proportional to its number of nonzeros.
+ *
+ * The variables of A are split into blocks (the keys of the problem), see SetBlockDims.  The
+ * longest run of trailing blocks which are not coupled to each other (i.e. for which the trailing
+ * part of A is block diagonal, like the landmarks in bundle adjustment if they're after the
+ * cameras) is eliminated with a Schur complement, as in SparseSchurSolver:
+ *
+ *     A = ( B    E )
+ *         ( E^T  C )
+ *
+ *     S = B - E C^{-1} E^T
+ *
+ * Conjugate gradients is run on the reduced system `S y = v - E C^{-1} w`, computing products with
+ * S from B, E, and the blocks of C^{-1} without forming S, and z is recovered from y.  If no
+ * blocks can be eliminated, it runs on A.
+ *
+ * The preconditioner is either the inverse of the diagonal of S (Jacobi), or the inverse of each
+ * block of S on the diagonal (block Jacobi).
+ *
+ * Conjugate gradients stops after max_iterations, or once the norm of the residual has been reduced
+ * by the forcing term `min(max_forcing, sqrt(|b|))`.  When solving for the steps of a nonlinear
+ * optimization, where b is the gradient, this gives an inexact Newton method: steps far from the
+ * minimum are cheap, and become more exact as the gradient goes to zero.
+ *
+ * Satisfies the interface for the linear solver of LevenbergMarquardtSolver, but it's usually
+ * selected with `optimizer_params_t::linear_solver_type` instead.
+ */
+template <typename _MatrixType>
+class PcgSolver {
+ public:
+  using MatrixType = _MatrixType;
+  using Scalar = typename MatrixType::Scalar;
+  using StorageIndex = typename MatrixType::StorageIndex;
+
+  static_assert(static_cast<int>(MatrixType::Options) == Eigen::ColMajor,
+                "Matrix must be column major");
+
+  using MatrixX = Eigen::Matrix<Scalar, Eigen::Dynamic, Eigen::Dynamic>;
+  using VectorX = Eigen::Matrix<Scalar, Eigen::Dynamic, 1>;
+  using RhsType = VectorX;
+
+  /**
+   * @param preconditioner: The preconditioner for conjugate gradients
+   * @param max_iterations: The maximum number of conjugate gradient iterations per solve
+   * @param max_forcing: The largest factor by which the residual must be reduced, see above
+   */
+  explicit PcgSolver(pcg_preconditioner_t preconditioner = pcg_preconditioner_t::BLOCK_JACOBI,
+                     int max_iterations = 500, Scalar max_forcing = 0.1);
+
+  /// Update the preconditioner and stopping criteria
+  void SetParams(pcg_preconditioner_t preconditioner, int max_iterations, Scalar max_forcing);
+
+  /**
+   * Set the dimensions of the blocks of variables in A, in order.  These are the units which can be
+   * eliminated, and the blocks of the block Jacobi preconditioner.  Must be called before
+   * AnalyzeSparsityPattern to have an effect.  If not set, or if they don't add up to the dimension
+   * of A, each variable is its own block.
+   */
+  void SetBlockDims(std::vector<int> block_dims);
+
+  /**
+   * Find the blocks to eliminate from the sparsity pattern of A, which should be lower triangular
+   */
+  void AnalyzeSparsityPattern(const MatrixType& A);
+
+  /**
+   * Compute the blocks of C^{-1} and the preconditioner for A, which must have the sparsity pattern
+   * which was analyzed.  Returns false if a block of C or of the preconditioner was not positive
+   * definite.
+   */
+  bool Factorize(const MatrixType& A);
+
+  /// Returns x for A x = b, where b is a dense vector
+  template <typename Rhs>
+  RhsType Solve(const Eigen::MatrixBase<Rhs>& b) const;
+
+  /// Solves in place for x in A x = b, where b is a dense vector
+  template <typename Rhs>
+  void SolveInPlace(Eigen::MatrixBase<Rhs>& b) const {
+    b = Solve(b);
+  }
+
+  /// The dimension of the reduced system conjugate gradients is run on
+  int ReducedDim() const {
+    return B_dim_;
+  }
+
+  /// The number of conjugate gradient iterations of the last call to Solve
+  int LastIterations() const {
+    return last_iterations_;
+  }
+
+  /// The norm of the residual of the reduced system after the last call to Solve, relative to the
+  /// norm of its right hand side
+  Scalar LastRelativeResidual() const {
+    return last_relative_residual_;
+  }
+
+  /// Defined to satisfy the linear solver interface; there is no factorization, so this is empty
+  MatrixType L() const {
+    return {};
+  }
+
+  /// Defined to satisfy the linear solver interface; there is no factorization, so this is empty
+  MatrixType D() const {
+    return {};
+  }
+
+  /// Defined to satisfy the linear solver interface; there is no ordering, so this is empty
+  Eigen::PermutationMatrix<Eigen::Dynamic> Permutation() const {
+    return {};
+  }
+
+ private:
+  struct Block {
+    int start;
+    int dim;
+  };
+
+  /// Returns S x, computed as B x - E (C^{-1} (E^T x))
+  VectorX ReducedProduct(const VectorX& x) const;
+
+  /// Returns C^{-1} x
+  VectorX ApplyCInverse(const VectorX& x) const;
+
+  /// Returns M^{-1} x, for the preconditioner M
+  VectorX ApplyPreconditioner(const VectorX& x) const;
+
+  pcg_preconditioner_t preconditioner_;
+  int max_iterations_;
+  Scalar max_forcing_;
+
+  std::vector<int> block_dims_;
+
+  // Computed by AnalyzeSparsityPattern
+  int total_dim_{0};
+  int B_dim_{0};
+  std::vector<Block> B_blocks_;
+  std::vector<Block> C_blocks_;
+
+  // Computed by Factorize
+  MatrixType B_lower_;
+  MatrixType E_;
+  MatrixType E_transpose_;
+  // The inverse of each block of C, and of each block of the preconditioner (which are 1x1 for
+  // Jacobi), stacked vertically in the same rows as the block
+  MatrixX C_inv_blocks_;
+  MatrixX preconditioner_inv_blocks_;
+  std::vector<Block> preconditioner_blocks_;
+
+  mutable int last_iterations_{0};
+  mutable Scalar last_relative_residual_{0};
+};
+
+}  // namespace sym
+
+#include "./pcg_solver.tcc"
+
+// Explicit instantiation declaration
+extern template class sym::PcgSolver<Eigen::SparseMatrix<double>>;
+extern template class sym::PcgSolver<Eigen::SparseMatrix<float>>;
@@ -0,0 +1,287 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <cmath>
+#include <numeric>
+
+#include <Eigen/Cholesky>
+
+#include "./assert.h"
+#include "./internal/schur_complement_utils.h"
+#include "./pcg_solver.h"
+
+namespace sym {
+
+template <typename _MatrixType>
+PcgSolver<_MatrixType>::PcgSolver(const pcg_preconditioner_t preconditioner,
+                                  const int max_iterations, const Scalar max_forcing) {
+  SetParams(preconditioner, max_iterations, max_forcing);
+}
+
+template <typename _MatrixType>
+void PcgSolver<_MatrixType>::SetParams(const pcg_preconditioner_t preconditioner,
+                                       const int max_iterations, const Scalar max_forcing) {
+  SYM_ASSERT(preconditioner == pcg_preconditioner_t::JACOBI ||
+                 preconditioner == pcg_preconditioner_t::BLOCK_JACOBI,
+             "Invalid PCG preconditioner");
+  SYM_ASSERT(max_iterations > 0);
+  SYM_ASSERT(max_forcing > 0);
+  preconditioner_ = preconditioner;
+  max_iterations_ = max_iterations;
+  max_forcing_ = max_forcing;
+}
+
+template <typename _MatrixType>
+void PcgSolver<_MatrixType>::SetBlockDims(std::vector<int> block_dims) {
+  block_dims_ = std::move(block_dims);
+}
+
+template <typename _MatrixType>
+void PcgSolver<_MatrixType>::AnalyzeSparsityPattern(const MatrixType& A) {
+  SYM_ASSERT(A.rows() == A.cols());
+  total_dim_ = A.rows();
+
+  std::vector<int> block_dims = block_dims_;
+  if (std::accumulate(block_dims.begin(), block_dims.end(), 0) != total_dim_) {
+    block_dims.assign(total_dim_, 1);
+  }
+
+  std::vector<Block> blocks;
+  int start = 0;
+  for (const int dim : block_dims) {
+    blocks.push_back({start, dim});
+    start += dim;
+  }
+
+  // Eliminate the trailing blocks for which the trailing part of A is block diagonal
+  const size_t num_B_blocks = blocks.size() - internal::NumUncoupledTrailingBlocks(A, block_dims);
+
+  B_blocks_.assign(blocks.begin(), blocks.begin() + num_B_blocks);
+  C_blocks_.assign(blocks.begin() + num_B_blocks, blocks.end());
+  B_dim_ = C_blocks_.empty() ? total_dim_ : C_blocks_.front().start;
+}
+
+template <typename _MatrixType>
+bool PcgSolver<_MatrixType>::Factorize(const MatrixType& A) {
+  SYM_ASSERT(A.rows() == total_dim_ && A.cols() == total_dim_,
+             "AnalyzeSparsityPattern must be called before Factorize");
+  const int C_dim = total_dim_ - B_dim_;
+
+  B_lower_ = A.topLeftCorner(B_dim_, B_dim_);
+  E_transpose_ = A.bottomLeftCorner(C_dim, B_dim_);
+  E_ = E_transpose_.transpose();
+
+  // Invert the blocks of C
+  int max_C_block_dim = 0;
+  for (const Block& block : C_blocks_) {
+    max_C_block_dim = std::max(max_C_block_dim, block.dim);
+  }
+  C_inv_blocks_.resize(C_dim, max_C_block_dim);
+  for (const Block& block : C_blocks_) {
+    const MatrixX dense_block = A.block(block.start, block.start, block.dim, block.dim);
+    const Eigen::LLT<MatrixX> llt(dense_block.template selfadjointView<Eigen::Lower>());
+    if (llt.info() != Eigen::Success) {
+      return false;
+    }
+    C_inv_blocks_.block(block.start - B_dim_, 0, block.dim, block.dim) =
+        llt.solve(MatrixX::Identity(block.dim, block.dim));
+  }
+
+  // The blocks of the preconditioner, and the block containing each row of B
+  preconditioner_blocks_.clear();
+  if (preconditioner_ == pcg_preconditioner_t::BLOCK_JACOBI) {
+    preconditioner_blocks_ = B_blocks_;
+  } else {
+    for (int i = 0; i < B_dim_; i++) {
+      preconditioner_blocks_.push_back({i, 1});
+    }
+  }
+  int max_preconditioner_block_dim = 0;
+  std::vector<int> preconditioner_block_of_row(B_dim_);
+  for (size_t i = 0; i < preconditioner_blocks_.size(); i++) {
+    const Block& block = preconditioner_blocks_[i];
+    max_preconditioner_block_dim = std::max(max_preconditioner_block_dim, block.dim);
+    std::fill_n(preconditioner_block_of_row.begin() + block.start, block.dim, i);
+  }
+
+  // The blocks of B on the diagonal
+  preconditioner_inv_blocks_.resize(B_dim_, max_preconditioner_block_dim);
+  for (const Block& block : preconditioner_blocks_) {
+    const MatrixX dense_block = B_lower_.block(block.start, block.start, block.dim, block.dim);
+    preconditioner_inv_blocks_.block(block.start, 0, block.dim, block.dim) =
+        dense_block.template selfadjointView<Eigen::Lower>();
+  }
+
+  // Subtract the blocks of E C^{-1} E^T on the diagonal.  For each block of C, F is the dense
+  // submatrix of its columns of E on the rows where they have any nonzeros
+  std::vector<int> rows;
+  std::vector<int> row_positions(B_dim_, -1);
+  MatrixX F;
+  for (const Block& block : C_blocks_) {
+    const int C_start = block.start - B_dim_;
+
+    rows.clear();
+    for (int col = C_start; col < C_start + block.dim; col++) {
+      for (typename MatrixType::InnerIterator it(E_, col); it; ++it) {
+        if (row_positions[it.row()] == -1) {
+          row_positions[it.row()] = 0;
+          rows.push_back(it.row());
+        }
+      }
+    }
+    std::sort(rows.begin(), rows.end());
+    for (size_t i = 0; i < rows.size(); i++) {
+      row_positions[rows[i]] = i;
+    }
+
+    F.setZero(rows.size(), block.dim);
+    for (int col = C_start; col < C_start + block.dim; col++) {
+      for (typename MatrixType::InnerIterator it(E_, col); it; ++it) {
+        F(row_positions[it.row()], col - C_start) = it.value();
+      }
+    }
+    const MatrixX G = F * C_inv_blocks_.block(C_start, 0, block.dim, block.dim);
+
+    // Rows in the same preconditioner block are contiguous in rows, since it's sorted
+    size_t group_start = 0;
+    while (group_start < rows.size()) {
+      const Block& preconditioner_block =
+          preconditioner_blocks_[preconditioner_block_of_row[rows[group_start]]];
+      size_t group_end = group_start;
+      while (group_end < rows.size() &&
+             rows[group_end] < preconditioner_block.start + preconditioner_block.dim) {
+        group_end++;
+      }
+
+      for (size_t i = group_start; i < group_end; i++) {
+        for (size_t j = group_start; j < group_end; j++) {
+          preconditioner_inv_blocks_(rows[i], rows[j] - preconditioner_block.start) -=
+              G.row(i).dot(F.row(j));
+        }
+      }
+
+      group_start = group_end;
+    }
+
+    for (const int row : rows) {
+      row_positions[row] = -1;
+    }
+  }
+
+  // Invert the blocks of the preconditioner.  If a block is not numerically positive definite, use
+  // the inverse of its diagonal instead
+  for (const Block& block : preconditioner_blocks_) {
+    auto dense_block = preconditioner_inv_blocks_.block(block.start, 0, block.dim, block.dim);
+    const Eigen::LLT<MatrixX> llt(dense_block);
+    if (llt.info() == Eigen::Success) {
+      dense_block = llt.solve(MatrixX::Identity(block.dim, block.dim));
+    } else {
+      const VectorX diagonal = dense_block.diagonal();
+      dense_block.setZero();
+      for (int i = 0; i < block.dim; i++) {
+        dense_block(i, i) = diagonal(i) > 0 ? 1 / diagonal(i) : 1;
+      }
+    }
+  }
+
+  return true;
+}
+
+template <typename _MatrixType>
+template <typename Rhs>
+typename PcgSolver<_MatrixType>::RhsType PcgSolver<_MatrixType>::Solve(
+    const Eigen::MatrixBase<Rhs>& b) const {
+  SYM_ASSERT(b.rows() == total_dim_ && b.cols() == 1);
+  const int C_dim = total_dim_ - B_dim_;
+  const auto b_vector = b.col(0);
+
+  // The right hand side of the reduced system, v - E C^{-1} w
+  VectorX residual = b_vector.head(B_dim_);
+  if (C_dim > 0) {
+    residual -= E_ * ApplyCInverse(b_vector.tail(C_dim));
+  }
+
+  const Scalar rhs_norm = residual.norm();
+  const Scalar tolerance = std::min(max_forcing_, std::sqrt(b_vector.norm())) * rhs_norm;
+
+  VectorX y = VectorX::Zero(B_dim_);
+  Scalar residual_norm = rhs_norm;
+  int iterations = 0;
+  if (rhs_norm > 0) {
+    VectorX z = ApplyPreconditioner(residual);
+    VectorX direction = z;
+    Scalar residual_dot_z = residual.dot(z);
+    while (iterations < max_iterations_ && residual_norm > tolerance) {
+      const VectorX S_direction = ReducedProduct(direction);
+      const Scalar curvature = direction.dot(S_direction);
+      if (!(curvature > 0)) {
+        // S is not numerically positive definite along this direction, so stop with the current
+        // estimate
+        break;
+      }
+
+      const Scalar alpha = residual_dot_z / curvature;
+      y += alpha * direction;
+      residual -= alpha * S_direction;
+      residual_norm = residual.norm();
+      iterations++;
+
+      z = ApplyPreconditioner(residual);
+      const Scalar new_residual_dot_z = residual.dot(z);
+      direction = z + (new_residual_dot_z / residual_dot_z) * direction;
+      residual_dot_z = new_residual_dot_z;
+    }
+  }
+
+  last_iterations_ = iterations;
+  last_relative_residual_ = rhs_norm > 0 ? residual_norm / rhs_norm : Scalar{0};
+
+  // Recover z = C^{-1} (w - E^T y)
+  VectorX x(total_dim_);
+  x.head(B_dim_) = y;
+  if (C_dim > 0) {
+    x.tail(C_dim) = ApplyCInverse(b_vector.tail(C_dim) - E_transpose_ * y);
+  }
+  return x;
+}
+
+template <typename _MatrixType>
+typename PcgSolver<_MatrixType>::VectorX PcgSolver<_MatrixType>::ReducedProduct(
+    const VectorX& x) const {
+  VectorX result = B_lower_.template selfadjointView<Eigen::Lower>() * x;
+  if (!C_blocks_.empty()) {
+    result -= E_ * ApplyCInverse(E_transpose_ * x);
+  }
+  return result;
+}
+
+template <typename _MatrixType>
+typename PcgSolver<_MatrixType>::VectorX PcgSolver<_MatrixType>::ApplyCInverse(
+    const VectorX& x) const {
+  VectorX result(x.rows());
+  for (const Block& block : C_blocks_) {
+    const int C_start = block.start - B_dim_;
+    result.segment(C_start, block.dim).noalias() =
+        C_inv_blocks_.block(C_start, 0, block.dim, block.dim) * x.segment(C_start, block.dim);
+  }
+  return result;
+}
+
+template <typename _MatrixType>
+typename PcgSolver<_MatrixType>::VectorX PcgSolver<_MatrixType>::ApplyPreconditioner(
+    const VectorX& x) const {
+  VectorX result(x.rows());
+  for (const Block& block : preconditioner_blocks_) {
+    result.segment(block.start, block.dim).noalias() =
+        preconditioner_inv_blocks_.block(block.start, 0, block.dim, block.dim) *
+        x.segment(block.start, block.dim);
+  }
+  return result;
+}
+
+}  // namespace sym
@@ -0,0 +1,137 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+"""
+Structured timings of the scopes timed with ``SYM_TIME_SCOPE`` in the C++ code, like linearization,
+factorization, and updates, recorded for a single call, e.g. with ``Optimizer.optimize(...,
+profile=True)``
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from symforce import cc_sym
+from symforce import typing as T
+
+
+@dataclass(frozen=True)
+class ScopeTiming:
+    """
+    Accumulated timings of the calls to a timed scope
+
+    Attributes:
+        count: The number of calls
+        total: The total time of all the calls, in seconds
+        min: The shortest time of a call, in seconds
+        max: The longest time of a call, in seconds
+    """
+
+    count: int
+    total: float
+    min: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        """
+        The mean time of a call, in seconds
+        """
+        return self.total / self.count if self.count > 0 else 0.0
+
+
+@dataclass(frozen=True)
+class TimelineEvent:
+    """
+    One call to a timed scope
+
+    Attributes:
+        name: The name of the scope
+        start: The start of the call, in seconds since the recording started
+        duration: The duration of the call, in seconds
+    """
+
+    name: str
+    start: float
+    duration: float
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    The timed scopes which ran during a call
+
+    Only includes the scopes which ran on the calling thread.  Empty if SymForce was built with
+    custom tic tocs (``SYMFORCE_CUSTOM_TIC_TOCS``).
+
+    Attributes:
+        scopes: The timings of each scope, by name
+        timeline: Every call to a scope in the order they started, if a timeline was requested
+    """
+
+    scopes: T.Dict[str, ScopeTiming]
+    timeline: T.Optional[T.List[TimelineEvent]] = None
+
+    @staticmethod
+    def from_recorder(recorder: cc_sym.TicTocRecorder, record_timeline: bool) -> Profile:
+        """
+        Read the profile out of a stopped recorder
+        """
+        scopes = {
+            name: ScopeTiming(
+                count=stats.count,
+                total=stats.total_time,
+                min=stats.min_time,
+                max=stats.max_time,
+            )
+            for name, stats in recorder.blocks().items()
+        }
+
+        timeline = None
+        if record_timeline:
+            timeline = sorted(
+                (
+                    TimelineEvent(name=event.name, start=event.start, duration=event.duration)
+                    for event in recorder.timeline()
+                ),
+                key=lambda event: event.start,
+            )
+
+        return Profile(scopes=scopes, timeline=timeline)
+
+    def to_chrome_trace(self) -> T.Dict[str, T.Any]:
+        """
+        The timeline in the Chrome trace event format, which can be written to JSON and opened in
+        ``chrome://tracing`` or https://ui.perfetto.dev
+
+        Raises:
+            ValueError: If there is no timeline
+        """
+        if self.timeline is None:
+            raise ValueError("The profile has no timeline, record it with profile_timeline=True")
+
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "cat": "symforce",
+                    "ph": "X",
+                    "ts": event.start * 1e6,
+                    "dur": event.duration * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                }
+                for event in self.timeline
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: T.Openable) -> None:
+        """
+        Write the timeline to the given path as Chrome trace JSON, see :meth:`to_chrome_trace`
+        """
+        Path(path).write_text(json.dumps(self.to_chrome_trace()))
@@ -0,0 +1,189 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the MPL2 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <algorithm>
+#include <numeric>
+#include <utility>
+#include <vector>
+
+#include <Eigen/Core>
+#include <Eigen/OrderingMethods>
+#include <Eigen/SparseCore>
+
+#include "../assert.h"
+
+namespace sym {
+
+/**
+ * Orderings for SparseCholeskySolver, in addition to the ones provided by Eigen.
+ *
+ * Like Eigen's orderings, these are functors which take the full (selfadjoint) matrix A and fill
+ * out the inverse permutation to use, i.e. the columns of A in the order they are eliminated.
+ */
+
+/**
+ * An ordering computed ahead of time, e.g. from SparseCholeskySolver::Permutation() on a previous
+ * run, so that the ordering isn't computed again.  Only valid for matrices of the same dimension.
+ */
+template <typename _StorageIndex>
+class FixedOrdering {
+ public:
+  using StorageIndex = _StorageIndex;
+  using PermutationMatrixType =
+      Eigen::PermutationMatrix<Eigen::Dynamic, Eigen::Dynamic, StorageIndex>;
+
+  /**
+   * @param permutation: The permutation P of the columns, as returned by
+   *    SparseCholeskySolver::Permutation(), i.e. permutation[i] is the position of column i in the
+   *    factorization
+   */
+  explicit FixedOrdering(const Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1>& permutation) {
+    std::vector<bool> seen(permutation.size(), false);
+    for (Eigen::Index i = 0; i < permutation.size(); i++) {
+      SYM_ASSERT(
+          permutation[i] >= 0 && permutation[i] < permutation.size() && !seen[permutation[i]],
+          "The ordering is not a permutation, column {} is mapped to {}", i, permutation[i]);
+      seen[permutation[i]] = true;
+    }
+    inv_permutation_ = PermutationMatrixType(permutation).inverse();
+  }
+
+  template <typename MatrixType>
+  void operator()(const MatrixType& A, PermutationMatrixType& inv_permutation) const {
+    SYM_ASSERT_EQ(inv_permutation_.size(), A.cols(),
+                  "The fixed ordering is for a matrix of a different dimension");
+    inv_permutation = inv_permutation_;
+  }
+
+ private:
+  PermutationMatrixType inv_permutation_;
+};
+
+/**
+ * A constrained approximate minimum degree ordering: the columns are assigned to groups, and all of
+ * the columns of a group are eliminated before the columns of the next group.  Within each group,
+ * the columns are ordered by Eigen::AMDOrdering on the graph left after eliminating the previous
+ * groups.
+ *
+ * For example, eliminating the landmarks of a bundle adjustment problem before the cameras leaves
+ * the reduced camera system, like a Schur complement.
+ */
+template <typename _StorageIndex>
+class ConstrainedAmdOrdering {
+ public:
+  using StorageIndex = _StorageIndex;
+  using PermutationMatrixType =
+      Eigen::PermutationMatrix<Eigen::Dynamic, Eigen::Dynamic, StorageIndex>;
+
+  /**
+   * @param column_groups: The group of each column.  Groups are eliminated in increasing order,
+   *    and need not be contiguous
+   */
+  explicit ConstrainedAmdOrdering(std::vector<StorageIndex> column_groups)
+      : column_groups_(std::move(column_groups)) {}
+
+  template <typename MatrixType>
+  void operator()(const MatrixType& A, PermutationMatrixType& inv_permutation) const;
+
+ private:
+  // The root of i in the union-find forest, with path halving
+  static StorageIndex FindRoot(std::vector<StorageIndex>& roots, StorageIndex i) {
+    while (roots[i] != i) {
+      roots[i] = roots[roots[i]];
+      i = roots[i];
+    }
+    return i;
+  }
+
+  std::vector<StorageIndex> column_groups_;
+};
+
+template <typename StorageIndex>
+template <typename MatrixType>
+void ConstrainedAmdOrdering<StorageIndex>::operator()(
+    const MatrixType& A, PermutationMatrixType& inv_permutation) const {
+  using Scalar = typename MatrixType::Scalar;
+  using GroupMatrixType = Eigen::SparseMatrix<Scalar, Eigen::ColMajor, StorageIndex>;
+
+  const StorageIndex N = static_cast<StorageIndex>(A.cols());
+  SYM_ASSERT_EQ(static_cast<StorageIndex>(column_groups_.size()), N,
+                "The ordering groups are for a matrix of a different dimension");
+
+  std::vector<StorageIndex> groups = column_groups_;
+  std::sort(groups.begin(), groups.end());
+  groups.erase(std::unique(groups.begin(), groups.end()), groups.end());
+
+  // The position of each column within its group
+  std::vector<StorageIndex> local_index(N);
+
+  // The connected components of the columns eliminated so far, in a union-find forest
+  std::vector<StorageIndex> roots(N);
+  std::iota(roots.begin(), roots.end(), 0);
+  std::vector<bool> eliminated(N, false);
+
+  inv_permutation.resize(N);
+  StorageIndex num_ordered = 0;
+  for (const StorageIndex group : groups) {
+    std::vector<StorageIndex> columns;
+    for (StorageIndex col = 0; col < N; col++) {
+      if (column_groups_[col] == group) {
+        local_index[col] = static_cast<StorageIndex>(columns.size());
+        columns.push_back(col);
+      }
+    }
+    const StorageIndex group_size = static_cast<StorageIndex>(columns.size());
+
+    // The graph of this group after eliminating the previous groups has an edge between two of
+    // its columns if they are connected in A directly or through a component of eliminated columns
+    std::vector<Eigen::Triplet<Scalar, StorageIndex>> edges;
+    std::vector<std::vector<StorageIndex>> component_neighbors(N);
+    for (const StorageIndex col : columns) {
+      for (typename MatrixType::InnerIterator it(A, col); it; ++it) {
+        const StorageIndex row = static_cast<StorageIndex>(it.index());
+        if (eliminated[row]) {
+          component_neighbors[FindRoot(roots, row)].push_back(local_index[col]);
+        } else if (column_groups_[row] == group) {
+          edges.emplace_back(local_index[row], local_index[col], Scalar{1});
+        }
+      }
+    }
+    for (auto& neighbors : component_neighbors) {
+      std::sort(neighbors.begin(), neighbors.end());
+      neighbors.erase(std::unique(neighbors.begin(), neighbors.end()), neighbors.end());
+      for (const StorageIndex i : neighbors) {
+        for (const StorageIndex j : neighbors) {
+          edges.emplace_back(i, j, Scalar{1});
+        }
+      }
+    }
+
+    GroupMatrixType group_graph(group_size, group_size);
+    group_graph.setFromTriplets(edges.begin(), edges.end());
+
+    PermutationMatrixType group_inv_permutation;
+    Eigen::AMDOrdering<StorageIndex>()(group_graph, group_inv_permutation);
+    for (StorageIndex i = 0; i < group_size; i++) {
+      inv_permutation.indices()[num_ordered + i] = columns[group_inv_permutation.indices()[i]];
+    }
+    num_ordered += group_size;
+
+    // Merge the columns of this group into the components of eliminated columns
+    for (const StorageIndex col : columns) {
+      eliminated[col] = true;
+    }
+    for (const StorageIndex col : columns) {
+      for (typename MatrixType::InnerIterator it(A, col); it; ++it) {
+        const StorageIndex row = static_cast<StorageIndex>(it.index());
+        if (eliminated[row]) {
+          roots[FindRoot(roots, row)] = FindRoot(roots, col);
+        }
+      }
+    }
+  }
+}
+
+}  // namespace sym
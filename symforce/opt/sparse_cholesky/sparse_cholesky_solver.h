@@ -6,9 +6,12 @@
 #pragma once
 
 #include "../assert.h"
+#include "./symbolic_factorization_cache.h"
 
 // Needed for Metis
 #include <iostream>
+#include <memory>
+#include <utility>
 
 #include <Eigen/Core>
 #include <Eigen/MetisSupport>
@@ -41,6 +44,7 @@ class SparseCholeskySolver {
   using PermutationMatrixType =
       Eigen::PermutationMatrix<Eigen::Dynamic, Eigen::Dynamic, StorageIndex>;
   using Ordering = std::function<void(const MatrixType&, PermutationMatrixType&)>;
+  using SymbolicFactorizationCacheType = SymbolicFactorizationCache<StorageIndex>;
 
  public:
   /**
@@ -87,6 +91,8 @@ class SparseCholeskySolver {
   void ComputePermutationMatrix(const MatrixType& A);
 
   /// Compute symbolic sparsity pattern for A and store internally.
+  /// If this solver has a symbolic factorization cache, the result is looked up there first, and
+  /// added to it if it was not found.
   void ComputeSymbolicSparsity(const MatrixType& A);
 
   /// Decompose A into A = L * D * L^T and store internally.
@@ -123,12 +129,39 @@ class SparseCholeskySolver {
     return inv_permutation_;
   }
 
+  /**
+   * Use the given ordering the next time the symbolic sparsity is computed, with the same signature
+   * as the ordering passed to the constructor
+   */
+  void SetOrdering(Ordering ordering) {
+    ordering_ = std::move(ordering);
+  }
+
+  /**
+   * Share the symbolic factorizations computed by this solver with the other solvers using the same
+   * cache, and reuse theirs for matrices with the same sparsity pattern.  The other solvers must
+   * use the same ordering as this one.  Pass nullptr to stop using a cache.
+   */
+  void SetSymbolicFactorizationCache(std::shared_ptr<SymbolicFactorizationCacheType> cache) {
+    symbolic_factorization_cache_ = std::move(cache);
+  }
+
+  const std::shared_ptr<SymbolicFactorizationCacheType>& GetSymbolicFactorizationCache() const {
+    return symbolic_factorization_cache_;
+  }
+
   void AnalyzeSparsityPattern(const Eigen::SparseMatrix<Scalar>& matrix) {
     // Make sure the diagonal is nonzero for analysis
     this->ComputeSymbolicSparsity(matrix.template triangularView<Eigen::UnitLower>());
   }
 
  protected:
+  /// Compute the elimination tree and the number of nonzeros in each column of L from A_permuted_
+  void ComputeEliminationTree();
+
+  /// Allocate the memory for factorizing a matrix of dimension N, using nnz_per_col_
+  void AllocateFactorization(Eigen::Index N);
+
   // Whether we have computed a symbolic sparsity and
   // are ready to factorize/solve.
   bool is_initialized_;
@@ -155,6 +188,9 @@ class SparseCholeskySolver {
   Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1> parent_;
   Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1> nnz_per_col_;
 
+  // Optional cache of symbolic factorizations shared with other solvers
+  std::shared_ptr<SymbolicFactorizationCacheType> symbolic_factorization_cache_;
+
   // Internal storage for factorization helpers
   CholMatrixType A_permuted_;
   Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1> visited_;
@@ -27,6 +27,30 @@ template <typename MatrixType, int UpLo>
 void SparseCholeskySolver<MatrixType, UpLo>::ComputeSymbolicSparsity(const MatrixType& A) {
   SYM_ASSERT(A.rows() == A.cols());
 
+  typename SymbolicFactorizationCacheType::Pattern pattern;
+  if (symbolic_factorization_cache_ != nullptr) {
+    pattern = SymbolicFactorizationCacheType::PatternOf(A, UpLo);
+    const auto cached = symbolic_factorization_cache_->Find(pattern);
+    if (cached != nullptr) {
+      inv_permutation_ = cached->inv_permutation;
+      if (inv_permutation_.size() != 0) {
+        permutation_ = inv_permutation_.inverse();
+      } else {
+        permutation_.resize(0);
+      }
+      parent_ = cached->parent;
+      nnz_per_col_ = cached->nnz_per_col;
+
+      // Factorize twists A into A_permuted_ itself
+      A_permuted_.resize(A.cols(), A.cols());
+      visited_.resize(A.cols());
+      visited_.setConstant(-1);
+
+      AllocateFactorization(A.cols());
+      return;
+    }
+  }
+
   // Update permutation matrix
   ComputePermutationMatrix(A);
 
@@ -40,6 +64,22 @@ void SparseCholeskySolver<MatrixType, UpLo>::ComputeSymbolicSparsity(const Matri
     A_permuted_.template selfadjointView<Eigen::Upper>() = A.template selfadjointView<UpLo>();
   }
 
+  ComputeEliminationTree();
+  AllocateFactorization(N);
+
+  if (symbolic_factorization_cache_ != nullptr) {
+    auto entry = std::make_shared<typename SymbolicFactorizationCacheType::Entry>();
+    entry->inv_permutation = inv_permutation_;
+    entry->parent = parent_;
+    entry->nnz_per_col = nnz_per_col_;
+    symbolic_factorization_cache_->Insert(std::move(pattern), std::move(entry));
+  }
+}
+
+template <typename MatrixType, int UpLo>
+void SparseCholeskySolver<MatrixType, UpLo>::ComputeEliminationTree() {
+  const Eigen::Index N = A_permuted_.cols();
+
   // Everything not visited
   visited_.resize(N);
   visited_.setConstant(-1);
@@ -87,6 +127,11 @@ void SparseCholeskySolver<MatrixType, UpLo>::ComputeSymbolicSparsity(const Matri
       }
     }
   }
+}
+
+template <typename MatrixType, int UpLo>
+void SparseCholeskySolver<MatrixType, UpLo>::AllocateFactorization(const Eigen::Index N) {
+  SYM_ASSERT(nnz_per_col_.size() == N);
 
   // Allocate memory for cholesky factorization using nonzero counts
   L_.resize(N, N);
@@ -0,0 +1,205 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the MPL2 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <cstddef>
+#include <list>
+#include <memory>
+#include <mutex>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+#include <Eigen/Core>
+#include <Eigen/SparseCore>
+
+#include "../assert.h"
+#include "../internal/hash_combine.h"
+
+namespace sym {
+
+/**
+ * A bounded cache of the symbolic factorizations computed by SparseCholeskySolver, keyed by the
+ * sparsity pattern of the analyzed matrix, with least-recently-used eviction.
+ *
+ * Computing the ordering and elimination tree for a matrix is often more expensive than
+ * factorizing it, and problems created repeatedly with the same structure (e.g. one per frame)
+ * produce the same result every time.  Solvers which share a cache (see
+ * SparseCholeskySolver::SetSymbolicFactorizationCache) look up the pattern of each matrix they
+ * analyze, and only compute the symbolic factorization if it isn't in the cache.
+ *
+ * All of the solvers sharing a cache must use the same ordering, since the ordering is not part of
+ * the key.
+ *
+ * Thread safe, so the same cache can be shared by solvers running on different threads.
+ */
+template <typename _StorageIndex>
+class SymbolicFactorizationCache {
+ public:
+  using StorageIndex = _StorageIndex;
+  using IndexVector = Eigen::Matrix<StorageIndex, Eigen::Dynamic, 1>;
+  using PermutationMatrixType =
+      Eigen::PermutationMatrix<Eigen::Dynamic, Eigen::Dynamic, StorageIndex>;
+
+  /**
+   * The result of the symbolic analysis of a matrix by SparseCholeskySolver
+   */
+  struct Entry {
+    // The inverse permutation computed by the ordering, which may be empty for the identity
+    PermutationMatrixType inv_permutation;
+
+    // The elimination tree, and the number of nonzeros in each column of L
+    IndexVector parent;
+    IndexVector nnz_per_col;
+  };
+
+  /**
+   * The sparsity pattern of an analyzed matrix, in compressed column form
+   */
+  struct Pattern {
+    int uplo;
+    Eigen::Index dim;
+    std::vector<StorageIndex> outer;
+    std::vector<StorageIndex> inner;
+
+    bool operator==(const Pattern& other) const {
+      return uplo == other.uplo && dim == other.dim && outer == other.outer && inner == other.inner;
+    }
+  };
+
+  /**
+   * @param capacity: The maximum number of symbolic factorizations to keep.  Must be positive
+   */
+  explicit SymbolicFactorizationCache(const size_t capacity = 16) : capacity_(capacity) {
+    SYM_ASSERT(capacity > 0);
+  }
+
+  /**
+   * The sparsity pattern of A, as a key for the cache
+   *
+   * @param uplo: The triangle of A used by the solver
+   */
+  template <typename MatrixType>
+  static Pattern PatternOf(const MatrixType& A, const int uplo) {
+    Pattern pattern{uplo, A.cols(), {}, {}};
+    pattern.outer.reserve(A.cols() + 1);
+    pattern.inner.reserve(A.nonZeros());
+    pattern.outer.push_back(0);
+    for (Eigen::Index col = 0; col < A.outerSize(); ++col) {
+      for (typename MatrixType::InnerIterator it(A, col); it; ++it) {
+        pattern.inner.push_back(static_cast<StorageIndex>(it.index()));
+      }
+      pattern.outer.push_back(static_cast<StorageIndex>(pattern.inner.size()));
+    }
+    return pattern;
+  }
+
+  /**
+   * Get the symbolic factorization for the given pattern, and mark it as the most recently used,
+   * or return nullptr if it is not in the cache
+   */
+  std::shared_ptr<const Entry> Find(const Pattern& pattern) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    const auto it = index_.find(&pattern);
+    if (it == index_.end()) {
+      misses_++;
+      return nullptr;
+    }
+
+    hits_++;
+    entries_.splice(entries_.begin(), entries_, it->second);
+    return it->second->second;
+  }
+
+  /**
+   * Add the symbolic factorization for the given pattern as the most recently used, evicting the
+   * least recently used one if the cache is full
+   */
+  void Insert(Pattern pattern, std::shared_ptr<const Entry> entry) {
+    std::lock_guard<std::mutex> lock(mutex_);
+    const auto it = index_.find(&pattern);
+    if (it != index_.end()) {
+      it->second->second = std::move(entry);
+      entries_.splice(entries_.begin(), entries_, it->second);
+      return;
+    }
+
+    entries_.emplace_front(std::move(pattern), std::move(entry));
+    index_.emplace(&entries_.front().first, entries_.begin());
+    if (entries_.size() > capacity_) {
+      index_.erase(&entries_.back().first);
+      entries_.pop_back();
+    }
+  }
+
+  /// Remove all of the entries
+  void Clear() {
+    std::lock_guard<std::mutex> lock(mutex_);
+    index_.clear();
+    entries_.clear();
+  }
+
+  /// The number of entries in the cache
+  size_t Size() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return entries_.size();
+  }
+
+  /// The maximum number of entries in the cache
+  size_t Capacity() const {
+    return capacity_;
+  }
+
+  /// The number of calls to Find which found the pattern
+  size_t Hits() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return hits_;
+  }
+
+  /// The number of calls to Find which did not find the pattern
+  size_t Misses() const {
+    std::lock_guard<std::mutex> lock(mutex_);
+    return misses_;
+  }
+
+ private:
+  // The index points to the patterns stored in entries_, to avoid storing them twice
+  struct PatternPtrHash {
+    std::size_t operator()(const Pattern* const pattern) const {
+      std::size_t ret = 0;
+      internal::hash_combine(ret, pattern->uplo, pattern->dim);
+      for (const StorageIndex outer : pattern->outer) {
+        internal::hash_combine(ret, outer);
+      }
+      for (const StorageIndex inner : pattern->inner) {
+        internal::hash_combine(ret, inner);
+      }
+      return ret;
+    }
+  };
+
+  struct PatternPtrEqual {
+    bool operator()(const Pattern* const a, const Pattern* const b) const {
+      return *a == *b;
+    }
+  };
+
+  using EntryList = std::list<std::pair<Pattern, std::shared_ptr<const Entry>>>;
+
+  size_t capacity_;
+
+  mutable std::mutex mutex_;
+
+  // Most recently used first
+  EntryList entries_;
+  std::unordered_map<const Pattern*, typename EntryList::iterator, PatternPtrHash, PatternPtrEqual>
+      index_;
+
+  size_t hits_{0};
+  size_t misses_{0};
+};
+
+}  // namespace sym
@@ -8,6 +8,7 @@
 // Required by MetisSupport
 #include <iostream>
 
+#include <Eigen/Cholesky>
 #include <Eigen/Core>
 #include <Eigen/MetisSupport>
 #include <Eigen/SparseCore>
@@ -82,12 +83,13 @@ class SparseSchurSolver {
   }
 
   // Analyzes A and precomputes/allocates some things (some additional initialization is also done
-  // on the first call to Factorize)
+  // on the first call to Factorize).  Can be called again if the sparsity pattern of A changes.
   //
   // `A` should be lower triangular
   void ComputeSymbolicSparsity(const MatrixType& A, int C_dim);
 
-  void Factorize(const MatrixType& A);
+  // Returns true if the blocks of C and the Schur complement S were factorized successfully
+  bool Factorize(const MatrixType& A);
 
   // Solve A x = rhs, return x
   // Requires a call to Factorize(A) first
@@ -106,6 +108,9 @@ class SparseSchurSolver {
  private:
   bool is_initialized_;
 
+  // Whether S_solver_ has analyzed the sparsity pattern of S for the current pattern of A
+  bool S_sparsity_computed_{false};
+
   // Data that depends only on the structure of A, not on the values
   struct SparsityInformation {
     // Information about a single block on the diagonal of C
@@ -127,6 +132,11 @@ class SparseSchurSolver {
     Eigen::SparseMatrix<Scalar> C_inv_lower;
     Eigen::SparseMatrix<Scalar> E_transpose;
     Eigen::SparseMatrix<Scalar> S_lower;
+
+    // Working storage for inverting the blocks of C, reused between blocks of the same size
+    MatrixX dense_block;
+    Eigen::LLT<MatrixX> dense_block_llt;
+    MatrixX dense_block_inv;
   };
 
   SparsityInformation sparsity_information_;
@@ -20,6 +20,7 @@ void SparseSchurSolver<_MatrixType>::ComputeSymbolicSparsity(const MatrixType& A
   sparsity_information_.total_dim_ = A.rows();
   sparsity_information_.B_dim_ = sparsity_information_.total_dim_ - C_dim;
   sparsity_information_.C_dim_ = C_dim;
+  sparsity_information_.C_blocks_.clear();
 
   // Iterate over blocks along the diagonal of C
   bool currently_in_block = false;
@@ -94,21 +95,31 @@ void SparseSchurSolver<_MatrixType>::ComputeSymbolicSparsity(const MatrixType& A
   Eigen::SparseMatrix<Scalar>& C_inv_lower = factorization_data_.C_inv_lower;
   C_inv_lower = Eigen::SparseMatrix<Scalar>(C_dim, C_dim);
   C_inv_lower.setFromTriplets(triplets.begin(), triplets.end());
+
+  is_initialized_ = true;
+  S_sparsity_computed_ = false;
 }
 
 // TODO(aaron): Record conditioning information here, and have a way for the user to get it
 template <typename _MatrixType>
-void SparseSchurSolver<_MatrixType>::Factorize(const MatrixType& A) {
+bool SparseSchurSolver<_MatrixType>::Factorize(const MatrixType& A) {
   // Compute C_inv
   // NOTE(aaron): Doing this with dense block-wise inversions is faster than a full sparse inversion
   Eigen::SparseMatrix<Scalar>& C_inv_lower = factorization_data_.C_inv_lower;
+  MatrixX& dense_block = factorization_data_.dense_block;
+  Eigen::LLT<MatrixX>& dense_block_llt = factorization_data_.dense_block_llt;
+  MatrixX& dense_block_inv = factorization_data_.dense_block_inv;
   for (const typename SparsityInformation::CBlock& block : sparsity_information_.C_blocks_) {
-    const MatrixX dense_block = A.block(block.start_idx, block.start_idx, block.dim, block.dim);
+    // The LLT only reads the lower triangle
+    dense_block = A.block(block.start_idx, block.start_idx, block.dim, block.dim);
 
     // TODO(aaron): Check conditioning explicitly here
-    const MatrixX dense_block_inv =
-        dense_block.template selfadjointView<Eigen::Lower>().llt().solve(
-            MatrixX::Identity(block.dim, block.dim));
+    dense_block_llt.compute(dense_block);
+    if (dense_block_llt.info() != Eigen::Success) {
+      return false;
+    }
+    dense_block_inv.setIdentity(block.dim, block.dim);
+    dense_block_llt.solveInPlace(dense_block_inv);
 
     for (int block_col = 0; block_col < block.dim; block_col++) {
       const int col_size = block.dim - block_col;
@@ -130,11 +141,17 @@ void SparseSchurSolver<_MatrixType>::Factorize(const MatrixType& A) {
        E_transpose.transpose() * C_inv_lower.template selfadjointView<Eigen::Lower>() * E_transpose)
           .template selfadjointView<Eigen::Lower>();
 
-  if (!S_solver_.IsInitialized()) {
+  // Everything was eliminated, so there is nothing left to factorize
+  if (sparsity_information_.B_dim_ == 0) {
+    return true;
+  }
+
+  if (!S_sparsity_computed_) {
     S_solver_.ComputeSymbolicSparsity(S_lower);
+    S_sparsity_computed_ = true;
   }
 
-  S_solver_.Factorize(S_lower);
+  return S_solver_.Factorize(S_lower);
 }
 
 template <typename _MatrixType>
@@ -152,7 +169,7 @@ SparseSchurSolver<_MatrixType>::Solve(const Eigen::MatrixBase<RhsType>& rhs) con
 
   const MatrixX schur_rhs = v - E * C_inv * w;
 
-  const MatrixX y = S_solver_.Solve(schur_rhs);
+  const MatrixX y = sparsity_information_.B_dim_ == 0 ? schur_rhs : S_solver_.Solve(schur_rhs);
   const MatrixX z = C_inv * (w - E_transpose * y);
 
   MatrixX yz(y.rows() + z.rows(), y.cols());
@@ -128,6 +128,11 @@ const typename Values<Scalar>::ArrayType& Values<Scalar>::Data() const {
   return data_;
 }
 
+template <typename Scalar>
+typename Values<Scalar>::ArrayType& Values<Scalar>::Data() {
+  return data_;
+}
+
 template <typename Scalar>
 template <typename NewScalar>
 Values<NewScalar> Values<Scalar>::Cast() const {
@@ -131,6 +131,14 @@ class Values {
    */
   const ArrayType& Data() const;
 
+  /**
+   * Mutable raw data buffer, for reading or writing all stored values at once.
+   *
+   * The size of the buffer must not be changed.  Pointers into it will be INVALIDATED if a key is
+   * added, or if Cleanup() or RemoveAll() is called.
+   */
+  ArrayType& Data();
+
   /**
    * Cast to another Scalar type (returns a copy)
    */
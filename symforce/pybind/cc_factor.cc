@@ -16,6 +16,7 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <sym/util/type_ops.h>
 #include <symforce/opt/factor.h>
 #include <symforce/opt/key.h>
 #include <symforce/opt/values.h>
@@ -28,39 +29,46 @@ namespace py = pybind11;
 namespace sym {
 
 //================================================================================================//
-//---------------------------- Helpers for wrapping sym::Factord ---------------------------------//
+//------------------------ Helpers for wrapping sym::Factor<Scalar> ------------------------------//
 //================================================================================================//
 
 namespace {
 
+// NOTE: The Values is passed to Python as a pointer, so that pybind11 wraps a reference to it
+// instead of copying the entire Values for each call to each factor
+template <typename Scalar>
 using PyHessianFunc =
-    std::function<py::tuple(const sym::Valuesd&, const std::vector<index_entry_t>&)>;
+    std::function<py::tuple(const sym::Values<Scalar>*, const std::vector<index_entry_t>&)>;
 
 /**
- * If Matrix is Eigen::SparseMatrix<double> and matrix is not a scipy.sparse.csc_matrix, or
- * if Matrix is any other type and matrix is a scipy.sparse.csc_matrix, throws a value error.
+ * If Matrix is a sparse matrix and matrix is not a scipy.sparse.csc_matrix, or if Matrix is a
+ * dense matrix and matrix is a scipy.sparse.csc_matrix, throws a value error.
  */
 template <typename Matrix>
 void ThrowIfSparsityMismatch(const py::object& matrix) {
-  if (std::strcmp(Py_TYPE(matrix.ptr())->tp_name, "csc_matrix") == 0) {
-    throw py::value_error("Non-sparse matrix expected, scipy.sparse.csc_matrix found instead.");
-  }
-}
-template <>
-void ThrowIfSparsityMismatch<Eigen::SparseMatrix<double>>(const py::object& matrix) {
-  if (!py::isinstance(matrix, py::module_::import("scipy.sparse").attr("csc_matrix"))) {
-    throw py::value_error(
-        fmt::format("scipy.sparse.csc_matrix expected, found {} instead.", py::type::of(matrix)));
+  if constexpr (kIsSparseEigenType<Matrix>) {
+    if (!py::isinstance(matrix, py::module_::import("scipy.sparse").attr("csc_matrix"))) {
+      throw py::value_error(
+          fmt::format("scipy.sparse.csc_matrix expected, found {} instead.", py::type::of(matrix)));
+    }
+  } else {
+    if (std::strcmp(Py_TYPE(matrix.ptr())->tp_name, "csc_matrix") == 0) {
+      throw py::value_error("Non-sparse matrix expected, scipy.sparse.csc_matrix found instead.");
+    }
   }
 }
 
 template <typename Matrix>
-auto WrapPyHessianFunc(PyHessianFunc&& hessian_func) {
-  using Vec = Eigen::VectorXd;
+auto WrapPyHessianFunc(PyHessianFunc<typename Matrix::Scalar>&& hessian_func) {
+  using Scalar = typename Matrix::Scalar;
+  using Vec = VectorX<Scalar>;
   return [hessian_func = std::move(hessian_func)](
-             const sym::Valuesd& values, const std::vector<index_entry_t>& keys,
+             const sym::Values<Scalar>& values, const std::vector<index_entry_t>& keys,
              Vec* const residual, Matrix* const jacobian, Matrix* const hessian, Vec* const rhs) {
-    const py::tuple out_tuple = hessian_func(values, keys);
+    // The GIL is released while optimizing, and the linearizer may call this from a thread other
+    // than the one which called into C++
+    py::gil_scoped_acquire gil;
+    const py::tuple out_tuple = hessian_func(&values, keys);
     if (residual != nullptr) {
       *residual = py::cast<Vec>(out_tuple[0]);
     }
@@ -78,29 +86,36 @@ auto WrapPyHessianFunc(PyHessianFunc&& hessian_func) {
   };
 }
 
-template <typename... Keys>
-sym::Factord MakeHessianFactor(PyHessianFunc hessian_func, const std::vector<Keys>&... keys,
-                               bool sparse) {
+template <typename Scalar, typename... Keys>
+sym::Factor<Scalar> MakeHessianFactor(PyHessianFunc<Scalar> hessian_func,
+                                      const std::vector<Keys>&... keys, bool sparse) {
   if (sparse) {
-    return sym::Factord(WrapPyHessianFunc<Eigen::SparseMatrix<double>>(std::move(hessian_func)),
-                        keys...);
+    return sym::Factor<Scalar>(
+        WrapPyHessianFunc<Eigen::SparseMatrix<Scalar>>(std::move(hessian_func)), keys...);
   } else {
-    return sym::Factord(WrapPyHessianFunc<Eigen::MatrixXd>(std::move(hessian_func)), keys...);
+    return sym::Factor<Scalar>(WrapPyHessianFunc<MatrixX<Scalar>>(std::move(hessian_func)),
+                               keys...);
   }
 }
 
+template <typename Scalar>
 using PyJacobianFunc =
-    std::function<py::tuple(const sym::Valuesd&, const std::vector<index_entry_t>&)>;
+    std::function<py::tuple(const sym::Values<Scalar>*, const std::vector<index_entry_t>&)>;
 
 template <typename Matrix>
-sym::Factord::JacobianFunc<Matrix> WrapPyJacobianFunc(PyJacobianFunc&& jacobian_func) {
-  return sym::Factord::JacobianFunc<Matrix>(
+typename sym::Factor<typename Matrix::Scalar>::template JacobianFunc<Matrix> WrapPyJacobianFunc(
+    PyJacobianFunc<typename Matrix::Scalar>&& jacobian_func) {
+  using Scalar = typename Matrix::Scalar;
+  return typename sym::Factor<Scalar>::template JacobianFunc<Matrix>(
       [jacobian_func = std::move(jacobian_func)](
-          const sym::Valuesd& values, const std::vector<index_entry_t>& keys,
-          Eigen::VectorXd* const residual, Matrix* const jacobian) {
-        const py::tuple out_tuple = jacobian_func(values, keys);
+          const sym::Values<Scalar>& values, const std::vector<index_entry_t>& keys,
+          VectorX<Scalar>* const residual, Matrix* const jacobian) {
+        // The GIL is released while optimizing, and the linearizer may call this from a thread
+        // other than the one which called into C++
+        py::gil_scoped_acquire gil;
+        const py::tuple out_tuple = jacobian_func(&values, keys);
         if (residual != nullptr) {
-          *residual = py::cast<Eigen::VectorXd>(out_tuple[0]);
+          *residual = py::cast<VectorX<Scalar>>(out_tuple[0]);
         }
         if (jacobian != nullptr) {
           ThrowIfSparsityMismatch<Matrix>(out_tuple[1]);
@@ -109,14 +124,15 @@ sym::Factord::JacobianFunc<Matrix> WrapPyJacobianFunc(PyJacobianFunc&& jacobian_
       });
 }
 
-template <typename... Keys>
-sym::Factord MakeJacobianFactor(PyJacobianFunc jacobian_func, const std::vector<Keys>&... keys,
-                                bool sparse) {
+template <typename Scalar, typename... Keys>
+sym::Factor<Scalar> MakeJacobianFactor(PyJacobianFunc<Scalar> jacobian_func,
+                                       const std::vector<Keys>&... keys, bool sparse) {
   if (sparse) {
-    return sym::Factord(WrapPyJacobianFunc<Eigen::SparseMatrix<double>>(std::move(jacobian_func)),
-                        keys...);
+    return sym::Factor<Scalar>(
+        WrapPyJacobianFunc<Eigen::SparseMatrix<Scalar>>(std::move(jacobian_func)), keys...);
   } else {
-    return sym::Factord(WrapPyJacobianFunc<Eigen::MatrixXd>(std::move(jacobian_func)), keys...);
+    return sym::Factor<Scalar>(WrapPyJacobianFunc<MatrixX<Scalar>>(std::move(jacobian_func)),
+                               keys...);
   }
 }
 
@@ -126,15 +142,16 @@ sym::Factord MakeJacobianFactor(PyJacobianFunc jacobian_func, const std::vector<
 //-------------------------------- The Public Factor Wrapper -------------------------------------//
 //================================================================================================//
 
-void AddFactorWrapper(pybind11::module_ module) {
-  py::class_<sym::Factord>(module, "Factor", R"(
-      A residual term for optimization.
+/**
+ * Add the Python class for Factor<Scalar>, with the given name and docstring
+ */
+template <typename Scalar>
+void AddFactorClass(pybind11::module_ module, const char* const name, const char* const doc) {
+  using FactorT = sym::Factor<Scalar>;
 
-      Created from a function and a set of Keys that act as inputs. Given a Values as an evaluation
-      point, generates a linear approximation to the residual function.
-  )")
+  py::class_<FactorT>(module, name, doc)
       // TODO(brad): Add wrapper of the constructor from SparseHessianFunc
-      .def(py::init(&MakeHessianFactor<sym::Key>), py::arg("hessian_func"), py::arg("keys"),
+      .def(py::init(&MakeHessianFactor<Scalar, sym::Key>), py::arg("hessian_func"), py::arg("keys"),
            py::arg("sparse") = false, R"(
            Create directly from a hessian functor. This is the lowest-level constructor.
 
@@ -145,7 +162,7 @@ void AddFactorWrapper(pybind11::module_ module) {
            Precondition:
              The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
            )")
-      .def(py::init(&MakeHessianFactor<sym::Key, sym::Key>), py::arg("hessian_func"),
+      .def(py::init(&MakeHessianFactor<Scalar, sym::Key, sym::Key>), py::arg("hessian_func"),
            py::arg("keys_to_func"), py::arg("keys_to_optimize"), py::arg("sparse") = false,
            R"(
            Create directly from a hessian functor. This is the lowest-level constructor.
@@ -158,9 +175,9 @@ void AddFactorWrapper(pybind11::module_ module) {
            Precondition:
              The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
            )")
-      .def("is_sparse", &sym::Factord::IsSparse,
+      .def("is_sparse", &FactorT::IsSparse,
            "Does this factor use a sparse jacobian/hessian matrix?")
-      .def_static("jacobian", &MakeJacobianFactor<sym::Key>, py::arg("jacobian_func"),
+      .def_static("jacobian", &MakeJacobianFactor<Scalar, sym::Key>, py::arg("jacobian_func"),
                   py::arg("keys"), py::arg("sparse") = false, R"(
            Create from a function that computes the jacobian. The hessian will be computed using the
            Gauss Newton approximation::
@@ -175,8 +192,9 @@ void AddFactorWrapper(pybind11::module_ module) {
            Precondition:
              The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
            )")
-      .def_static("jacobian", &MakeJacobianFactor<sym::Key, sym::Key>, py::arg("jacobian_func"),
-                  py::arg("keys_to_func"), py::arg("keys_to_optimize"), py::arg("sparse") = false,
+      .def_static("jacobian", &MakeJacobianFactor<Scalar, sym::Key, sym::Key>,
+                  py::arg("jacobian_func"), py::arg("keys_to_func"), py::arg("keys_to_optimize"),
+                  py::arg("sparse") = false,
                   R"(
            Create from a function that computes the jacobian. The hessian will be computed using the
            Gauss Newton approximation::
@@ -194,15 +212,15 @@ void AddFactorWrapper(pybind11::module_ module) {
            )")
       .def(
           "linearize",
-          [](const sym::Factord& factor, const sym::Valuesd& values) {
+          [](const FactorT& factor, const sym::Values<Scalar>& values) {
             if (factor.IsSparse()) {
-              Eigen::VectorXd residual;
-              Eigen::SparseMatrix<double> jacobian;
+              VectorX<Scalar> residual;
+              Eigen::SparseMatrix<Scalar> jacobian;
               factor.Linearize(values, &residual, &jacobian);
               return py::make_tuple(residual, jacobian);
             } else {
-              Eigen::VectorXd residual;
-              Eigen::MatrixXd jacobian;
+              VectorX<Scalar> residual;
+              MatrixX<Scalar> jacobian;
               factor.Linearize(values, &residual, &jacobian);
               return py::make_tuple(residual, jacobian);
             }
@@ -211,7 +229,7 @@ void AddFactorWrapper(pybind11::module_ module) {
           "values of the residual and jacobian.")
       .def(
           "linearized_factor",
-          [](const sym::Factord& factor, const sym::Valuesd& values) {
+          [](const FactorT& factor, const sym::Values<Scalar>& values) {
             return factor.Linearize(values);
           },
           py::arg("values"), R"(
@@ -220,10 +238,24 @@ void AddFactorWrapper(pybind11::module_ module) {
 
              This can only be called if is_sparse is false; otherwise, it will throw.
            )")
-      .def("optimized_keys", &sym::Factord::OptimizedKeys,
-           "Get the optimized keys for this factor.")
-      .def("all_keys", &sym::Factord::AllKeys, "Get all keys required to evaluate this factor.")
-      .def("__repr__", [](const sym::Factord& factor) { return fmt::format("{}", factor); });
+      .def("optimized_keys", &FactorT::OptimizedKeys, "Get the optimized keys for this factor.")
+      .def("all_keys", &FactorT::AllKeys, "Get all keys required to evaluate this factor.")
+      .def("__repr__", [](const FactorT& factor) { return fmt::format("{}", factor); });
+}
+
+void AddFactorWrapper(pybind11::module_ module) {
+  AddFactorClass<double>(module, "Factor", R"(
+      A residual term for optimization.
+
+      Created from a function and a set of Keys that act as inputs. Given a Values as an evaluation
+      point, generates a linear approximation to the residual function.
+  )");
+  AddFactorClass<float>(module, "Factorf", R"(
+      A residual term for optimization in single precision, for use with Optimizerf.
+
+      Functions passed from Python are called with a Valuesf, and their outputs are converted to
+      single precision.  Otherwise the same as Factor.
+  )");
 }
 
 }  // namespace sym
@@ -5,8 +5,15 @@
 
 #include "./cc_linearization.h"
 
+#include <string>
+#include <tuple>
+
+#include <fmt/format.h>
 #include <pybind11/eigen.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
 
+#include <sym/util/type_ops.h>
 #include <symforce/opt/linearization.h>
 
 #include "./sym_type_casters.h"
@@ -15,43 +22,154 @@ namespace py = pybind11;
 
 namespace sym {
 
-void AddLinearizationWrapper(pybind11::module_ module) {
-  py::class_<sym::SparseLinearizationd>(
-      module, "Linearization",
-      "Class for storing a problem linearization evaluated at a Values "
-      "(i.e. a residual, jacobian, hessian, and rhs).")
-      .def(py::init<>())
-      .def_readwrite("residual", &sym::SparseLinearizationd::residual)
-      .def_readwrite("hessian_lower", &sym::SparseLinearizationd::hessian_lower)
-      .def_readwrite("jacobian", &sym::SparseLinearizationd::jacobian)
-      .def_readwrite("rhs", &sym::SparseLinearizationd::rhs)
-      .def("reset", &sym::SparseLinearizationd::Reset, "Set to invalid.")
-      .def("is_initialized", &sym::SparseLinearizationd::IsInitialized,
+namespace {
+
+template <typename Scalar>
+using CscBuffers =
+    std::tuple<py::array_t<Scalar>, py::array_t<typename Eigen::SparseMatrix<Scalar>::StorageIndex>,
+               py::array_t<typename Eigen::SparseMatrix<Scalar>::StorageIndex>>;
+
+/**
+ * The (data, indices, indptr) arrays of the compressed storage of matrix, as NumPy arrays viewing
+ * its memory and keeping base alive.  The data is writable, and the indices and indptr are
+ * read-only, since changing them would change the sparsity pattern out from under the optimizer.
+ */
+template <typename Scalar>
+CscBuffers<Scalar> GetCscBuffers(Eigen::SparseMatrix<Scalar>& matrix, py::handle base) {
+  using StorageIndex = typename Eigen::SparseMatrix<Scalar>::StorageIndex;
+
+  matrix.makeCompressed();
+  py::array_t<Scalar> data(matrix.nonZeros(), matrix.valuePtr(), base);
+  py::array_t<StorageIndex> indices(matrix.nonZeros(), matrix.innerIndexPtr(), base);
+  py::array_t<StorageIndex> indptr(matrix.outerSize() + 1, matrix.outerIndexPtr(), base);
+  indices.attr("setflags")(py::arg("write") = false);
+  indptr.attr("setflags")(py::arg("write") = false);
+  return {data, indices, indptr};
+}
+
+/**
+ * A scipy.sparse.csc_matrix which shares the storage of matrix, keeping base alive
+ */
+template <typename Scalar>
+py::object GetCscView(Eigen::SparseMatrix<Scalar>& matrix, py::handle base) {
+  const auto buffers = GetCscBuffers(matrix, base);
+  return py::module_::import("scipy.sparse")
+      .attr("csc_matrix")(py::cast(buffers),
+                          py::arg("shape") = py::make_tuple(matrix.rows(), matrix.cols()),
+                          py::arg("copy") = false);
+}
+
+}  // namespace
+
+/**
+ * Add the Python class for Linearization<MatrixType>, with the given name and docstring
+ */
+template <typename MatrixType>
+void AddLinearizationClass(pybind11::module_ module, const char* const name,
+                           const char* const doc) {
+  using LinearizationT = sym::Linearization<MatrixType>;
+
+  py::class_<LinearizationT> linearization_class(module, name, doc);
+  linearization_class.def(py::init<>())
+      .def_readwrite("residual", &LinearizationT::residual)
+      .def_readwrite("hessian_lower", &LinearizationT::hessian_lower)
+      .def_readwrite("jacobian", &LinearizationT::jacobian)
+      .def_readwrite("rhs", &LinearizationT::rhs)
+      .def("reset", &LinearizationT::Reset, "Set to invalid.")
+      .def("is_initialized", &LinearizationT::IsInitialized,
            "Returns whether the linearization is currently valid for the corresponding values. "
            "Accessing any of the members when this is false could result in unexpected behavior.")
-      .def("set_initialized", &sym::SparseLinearizationd::SetInitialized,
-           py::arg("initialized") = true)
-      .def("error", &sym::SparseLinearizationd::Error)
-      .def("linear_delta_error", &sym::SparseLinearizationd::LinearDeltaError, py::arg("x_update"),
+      .def("set_initialized", &LinearizationT::SetInitialized, py::arg("initialized") = true)
+      .def("error", &LinearizationT::Error)
+      .def("linear_delta_error", &LinearizationT::LinearDeltaError, py::arg("x_update"),
            py::arg("damping_vector"))
       .def(py::pickle(
-          [](const sym::SparseLinearizationd& linearization) {  //  __getstate__
+          [](const LinearizationT& linearization) {  //  __getstate__
             return py::make_tuple(linearization.residual, linearization.hessian_lower,
                                   linearization.jacobian, linearization.rhs,
                                   linearization.IsInitialized());
           },
-          [](py::tuple state) {  // __setstate__
+          [name = std::string(name)](py::tuple state) {  // __setstate__
             if (state.size() != 5) {
-              throw py::value_error("Linearization.__setstate__ expected tuple of size 5.");
+              throw py::value_error(fmt::format("{}.__setstate__ expected tuple of size 5.", name));
             }
-            sym::SparseLinearizationd linearization;
-            linearization.residual = state[0].cast<SparseLinearizationd::Vector>();
-            linearization.hessian_lower = state[1].cast<SparseLinearizationd::Matrix>();
-            linearization.jacobian = state[2].cast<SparseLinearizationd::Matrix>();
-            linearization.rhs = state[3].cast<SparseLinearizationd::Vector>();
+            LinearizationT linearization;
+            linearization.residual = state[0].cast<typename LinearizationT::Vector>();
+            linearization.hessian_lower = state[1].cast<typename LinearizationT::Matrix>();
+            linearization.jacobian = state[2].cast<typename LinearizationT::Matrix>();
+            linearization.rhs = state[3].cast<typename LinearizationT::Vector>();
             linearization.SetInitialized(state[4].cast<bool>());
             return linearization;
           }));
+
+  if constexpr (kIsSparseEigenType<MatrixType>) {
+    // The residual and rhs are returned as read-only views of the linearization already, but the
+    // sparse matrices are copied into new scipy matrices by the pybind11 type caster
+    linearization_class
+        .def(
+            "jacobian_csc_buffers",
+            [](LinearizationT& linearization) {
+              return GetCscBuffers(linearization.jacobian,
+                                   py::cast(linearization, py::return_value_policy::reference));
+            },
+            R"(
+            The (data, indices, indptr) arrays of the compressed sparse column storage of the
+            jacobian, without copying.
+
+            The arrays view the memory of this linearization and keep it alive.  They stay valid,
+            and see the new values, when this linearization is relinearized in place by
+            Optimizer.linearize(values, linearization) for a problem with the same structure.  They
+            are invalidated if the structure of the linearization changes, e.g. if the jacobian is
+            assigned or the problem gains factors.  The data is writable, the indices and indptr are
+            read-only.
+            )")
+        .def(
+            "hessian_lower_csc_buffers",
+            [](LinearizationT& linearization) {
+              return GetCscBuffers(linearization.hessian_lower,
+                                   py::cast(linearization, py::return_value_policy::reference));
+            },
+            "The (data, indices, indptr) arrays of the compressed sparse column storage of the "
+            "lower "
+            "triangle of the hessian, without copying.  See jacobian_csc_buffers.")
+        .def(
+            "jacobian_csc_view",
+            [](LinearizationT& linearization) {
+              return GetCscView(linearization.jacobian,
+                                py::cast(linearization, py::return_value_policy::reference));
+            },
+            "The jacobian as a scipy.sparse.csc_matrix which shares the memory of this "
+            "linearization, unlike the copy returned by the jacobian attribute.  See "
+            "jacobian_csc_buffers.")
+        .def(
+            "hessian_lower_csc_view",
+            [](LinearizationT& linearization) {
+              return GetCscView(linearization.hessian_lower,
+                                py::cast(linearization, py::return_value_policy::reference));
+            },
+            "The lower triangle of the hessian as a scipy.sparse.csc_matrix which shares the "
+            "memory of this linearization, unlike the copy returned by the hessian_lower "
+            "attribute.  See jacobian_csc_buffers.");
+  }
+}
+
+void AddLinearizationWrapper(pybind11::module_ module) {
+  AddLinearizationClass<Eigen::SparseMatrix<double>>(
+      module, "Linearization",
+      "Class for storing a problem linearization evaluated at a Values (i.e. a residual, jacobian, "
+      "hessian, and rhs).");
+  AddLinearizationClass<Eigen::SparseMatrix<float>>(
+      module, "Linearizationf",
+      "Class for storing a problem linearization evaluated at a Valuesf, in single precision.  "
+      "Otherwise the same as Linearization.");
+  AddLinearizationClass<MatrixX<double>>(
+      module, "DenseLinearization",
+      "Linearization of a DenseOptimizer, whose jacobian and hessian are dense matrices.  "
+      "Otherwise the same as Linearization.");
+  AddLinearizationClass<MatrixX<float>>(
+      module, "DenseLinearizationf",
+      "Linearization of a DenseOptimizerf, whose jacobian and hessian are dense matrices, in "
+      "single precision.  Otherwise the same as Linearization.");
 }
 
 }  // namespace sym
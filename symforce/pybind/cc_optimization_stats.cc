@@ -5,6 +5,9 @@
 
 #include "./cc_optimization_stats.h"
 
+#include <string>
+
+#include <fmt/format.h>
 #include <pybind11/eigen.h>
 #include <pybind11/stl.h>
 
@@ -17,37 +20,43 @@
 
 namespace sym {
 
-void AddOptimizationStatsWrapper(pybind11::module_ module) {
-  py::class_<sym::OptimizationStatsd>(module, "OptimizationStats",
-                                      "Debug stats for a full optimization run.")
+/**
+ * Add the Python class for OptimizationStats<MatrixType>, with the given name and docstring
+ */
+template <typename MatrixType>
+void AddOptimizationStatsClass(pybind11::module_ module, const char* const name,
+                               const char* const doc) {
+  using OptimizationStatsT = sym::OptimizationStats<MatrixType>;
+  using LinearizationT = sym::Linearization<MatrixType>;
+
+  py::class_<OptimizationStatsT>(module, name, doc)
       .def(py::init<>())
-      .def_readwrite("iterations", &sym::OptimizationStatsd::iterations)
-      .def_readwrite("best_index", &sym::OptimizationStatsd::best_index,
+      .def_readwrite("iterations", &OptimizationStatsT::iterations)
+      .def_readwrite("best_index", &OptimizationStatsT::best_index,
                      "Index into iterations of the best iteration (containing the optimal Values).")
-      .def_readwrite("status", &sym::OptimizationStatsd::status,
+      .def_readwrite("status", &OptimizationStatsT::status,
                      "What was the result of the optimization? (did it converge, fail, etc.)")
-      .def_readwrite("failure_reason", &sym::OptimizationStatsd::failure_reason,
+      .def_readwrite("failure_reason", &OptimizationStatsT::failure_reason,
                      "If status == FAILED, why?  This should be cast to the "
                      "NonlinearSolver::FailureReason enum for the nonlinear solver you used.")
-      .def_readwrite("jacobian_sparsity", &sym::OptimizationStatsd::jacobian_sparsity,
+      .def_readwrite("jacobian_sparsity", &OptimizationStatsT::jacobian_sparsity,
                      "Sparsity pattern of the problem jacobian (filled out if debug_stats=True and "
                      "include_jacobians=True)")
-      .def_readwrite("linear_solver_ordering", &sym::OptimizationStatsd::linear_solver_ordering,
+      .def_readwrite("linear_solver_ordering", &OptimizationStatsT::linear_solver_ordering,
                      "Ordering used by the linear solver (filled out if debug_stats=True)")
-      .def_readwrite("cholesky_factor_sparsity", &sym::OptimizationStatsd::cholesky_factor_sparsity,
+      .def_readwrite("cholesky_factor_sparsity", &OptimizationStatsT::cholesky_factor_sparsity,
                      "Sparsity pattern of the cholesky factor L (filled out if debug_stats=True)")
       .def_property(
           "best_linearization",
           /* getter */
-          [](const sym::OptimizationStatsd& stats) -> py::object {
+          [](const OptimizationStatsT& stats) -> py::object {
             if (stats.best_linearization) {
               return py::cast(stats.best_linearization.value());
             }
             return py::none();
           },
           /* setter */
-          [](sym::OptimizationStatsd& stats,
-             const sym::SparseLinearizationd* const best_linearization) {
+          [](OptimizationStatsT& stats, const LinearizationT* const best_linearization) {
             if (best_linearization == nullptr) {
               stats.best_linearization = {};
             } else {
@@ -56,24 +65,23 @@ void AddOptimizationStatsWrapper(pybind11::module_ module) {
           },
           "The linearization at best_index (at optimized_values), filled out if "
           "populate_best_linearization=True")
-      .def("get_lcm_type", &sym::OptimizationStatsd::GetLcmType)
+      .def("get_lcm_type", &OptimizationStatsT::GetLcmType)
       .def(py::pickle(
-          [](const sym::OptimizationStatsd& stats) {  //  __getstate__
+          [](const OptimizationStatsT& stats) {  //  __getstate__
             return py::make_tuple(
                 stats.iterations, stats.best_index, stats.status, stats.failure_reason,
                 stats.best_linearization ? py::cast(stats.best_linearization.value()) : py::none());
           },
-          [](py::tuple state) {  // __setstate__
+          [name = std::string(name)](py::tuple state) {  // __setstate__
             if (state.size() != 5) {
-              throw py::value_error("OptimizationStats.__setstate__ expected tuple of size 4.");
+              throw py::value_error(fmt::format("{}.__setstate__ expected tuple of size 5.", name));
             }
-            sym::OptimizationStatsd stats;
+            OptimizationStatsT stats;
             stats.iterations = state[0].cast<std::vector<optimization_iteration_t>>();
             stats.best_index = state[1].cast<int32_t>();
             stats.status = state[2].cast<optimization_status_t>();
             stats.failure_reason = state[3].cast<int32_t>();
-            const sym::SparseLinearizationd* best_linearization =
-                state[4].cast<sym::SparseLinearizationd*>();
+            const LinearizationT* best_linearization = state[4].cast<LinearizationT*>();
             if (best_linearization == nullptr) {
               stats.best_linearization = {};
             } else {
@@ -83,4 +91,19 @@ void AddOptimizationStatsWrapper(pybind11::module_ module) {
           }));
 }
 
+void AddOptimizationStatsWrapper(pybind11::module_ module) {
+  AddOptimizationStatsClass<Eigen::SparseMatrix<double>>(
+      module, "OptimizationStats", "Debug stats for a full optimization run.");
+  AddOptimizationStatsClass<Eigen::SparseMatrix<float>>(
+      module, "OptimizationStatsf", "Debug stats for a full optimization run of an Optimizerf.");
+  AddOptimizationStatsClass<MatrixX<double>>(
+      module, "DenseOptimizationStats",
+      "Debug stats for a full optimization run of a DenseOptimizer.  Only the shape of the "
+      "jacobian sparsity is filled out.");
+  AddOptimizationStatsClass<MatrixX<float>>(
+      module, "DenseOptimizationStatsf",
+      "Debug stats for a full optimization run of a DenseOptimizerf.  Only the shape of the "
+      "jacobian sparsity is filled out.");
+}
+
 }  // namespace sym
@@ -5,6 +5,12 @@
 
 #include "./cc_optimizer.h"
 
+#include <algorithm>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <optional>
+#include <thread>
 #include <vector>
 
 #include <pybind11/eigen.h>
@@ -13,11 +19,18 @@
 #include <lcmtypes/sym/optimizer_params_t.hpp>
 
 #include <sym/util/epsilon.h>
+#include <sym/util/type_ops.h>
+#include <symforce/opt/assert.h>
+#include <symforce/opt/cancellation_token.h>
+#include <symforce/opt/dogleg_optimizer.h>
 #include <symforce/opt/factor.h>
+#include <symforce/opt/fixed_lag_smoother.h>
+#include <symforce/opt/internal/parallel_for.h>
 #include <symforce/opt/key.h>
 #include <symforce/opt/linearization.h>
 #include <symforce/opt/optimization_stats.h>
 #include <symforce/opt/optimizer.h>
+#include <symforce/opt/sparse_cholesky/symbolic_factorization_cache.h>
 #include <symforce/opt/values.h>
 
 #include "./lcm_type_casters.h"
@@ -25,19 +38,230 @@
 
 namespace sym {
 
-void AddOptimizerWrapper(pybind11::module_ module) {
-  py::class_<Optimizerd>(module, "Optimizer",
-                         "Class for optimizing a nonlinear least-squares problem specified as a "
-                         "list of Factors. For efficient use, create once and call Optimize() "
-                         "multiple times with different initial guesses, as long as the factors "
-                         "remain constant and the structure of the Values is identical.")
-      .def(py::init<const optimizer_params_t&, const std::vector<Factord>&, const std::string&,
-                    const std::vector<Key>&, const double>(),
+namespace {
+
+/**
+ * An Optimizer created from Python, which can optimize many values in parallel
+ */
+template <typename BaseOptimizer>
+class PyOptimizer : public BaseOptimizer {
+ public:
+  using Scalar = typename BaseOptimizer::Scalar;
+  using Stats = typename BaseOptimizer::Stats;
+
+  // Whether the linear solver is sparse, and so has orderings and a symbolic factorization cache
+  static constexpr bool kIsSparse = kIsSparseEigenType<typename BaseOptimizer::MatrixType>;
+
+  PyOptimizer(const optimizer_params_t& params, const std::vector<Factor<Scalar>>& factors,
+              const std::string& name, const std::vector<Key>& keys, const Scalar epsilon)
+      : BaseOptimizer(params, factors, name, keys, epsilon) {}
+
+  /**
+   * Update the cached state of this optimizer after factors or keys were added or removed
+   */
+  void OnProblemChanged() {
+    copies_.clear();
+  }
+
+  /**
+   * Set the ordering of the linear solver with set_ordering, for this optimizer and for the copies
+   * used by OptimizeMany
+   */
+  void SetLinearSolverOrdering(std::function<void(BaseOptimizer&)> set_ordering) {
+    set_ordering(*this);
+    set_linear_solver_ordering_ = std::move(set_ordering);
+    copies_.clear();
+  }
+
+  /**
+   * Optimize each of the values in place, using up to num_threads threads (or one per core if
+   * num_threads is 0), and return the stats for each
+   *
+   * Each thread runs its own copy of this optimizer, so the linearizer setup and symbolic
+   * factorization are done once per thread and reused for each problem that thread optimizes.  The
+   * copies are kept for later calls.  Must be called with the GIL held, which is released while
+   * optimizing.
+   */
+  std::vector<Stats> OptimizeMany(const std::vector<Values<Scalar>*>& values, const int num_threads,
+                                  const int num_iterations,
+                                  const bool populate_best_linearization) {
+    SYM_ASSERT(num_threads >= 0);
+    const int num_workers = std::min(
+        num_threads > 0 ? num_threads
+                        : std::max(static_cast<int>(std::thread::hardware_concurrency()), 1),
+        static_cast<int>(values.size()));
+
+    // Copying the factors may copy Python objects, so this needs the GIL
+    while (static_cast<int>(copies_.size()) < num_workers - 1) {
+      copies_.push_back(std::make_unique<BaseOptimizer>(this->Params(), this->factors_, this->name_,
+                                                        this->keys_, this->epsilon_));
+      if (set_linear_solver_ordering_) {
+        set_linear_solver_ordering_(*copies_.back());
+      }
+    }
+
+    std::vector<BaseOptimizer*> available_optimizers = {this};
+    for (int i = 0; i < num_workers - 1; i++) {
+      if (!(copies_[i]->Params() == this->Params())) {
+        copies_[i]->UpdateParams(this->Params());
+      }
+      if constexpr (kIsSparse) {
+        copies_[i]->NonlinearSolver().LinearSolver().SetSymbolicFactorizationCache(
+            this->NonlinearSolver().LinearSolver().GetSymbolicFactorizationCache());
+      }
+      available_optimizers.push_back(copies_[i].get());
+    }
+    std::mutex available_optimizers_mutex;
+
+    std::vector<Stats> stats(values.size());
+
+    py::gil_scoped_release release;
+    internal::ParallelFor(static_cast<int>(values.size()), num_workers, [&](const int i) {
+      BaseOptimizer* optimizer;
+      {
+        std::lock_guard<std::mutex> lock(available_optimizers_mutex);
+        optimizer = available_optimizers.back();
+        available_optimizers.pop_back();
+      }
+
+      try {
+        optimizer->Optimize(*values[i], num_iterations, populate_best_linearization, stats[i]);
+      } catch (...) {
+        std::lock_guard<std::mutex> lock(available_optimizers_mutex);
+        available_optimizers.push_back(optimizer);
+        throw;
+      }
+
+      std::lock_guard<std::mutex> lock(available_optimizers_mutex);
+      available_optimizers.push_back(optimizer);
+    });
+
+    return stats;
+  }
+
+ private:
+  // Sets the ordering of the linear solver of a copy, if one was set on this optimizer
+  std::function<void(BaseOptimizer&)> set_linear_solver_ordering_;
+
+  // Copies of this optimizer used by OptimizeMany, created when first needed
+  std::vector<std::unique_ptr<BaseOptimizer>> copies_;
+};
+
+template <typename OptimizerT>
+void OnProblemChanged(OptimizerT& opt) {
+  auto* const py_opt = dynamic_cast<PyOptimizer<OptimizerT>*>(&opt);
+  if (py_opt != nullptr) {
+    py_opt->OnProblemChanged();
+  }
+}
+
+template <typename OptimizerT>
+void SetLinearSolverOrdering(OptimizerT& opt, std::function<void(OptimizerT&)> set_ordering) {
+  auto* const py_opt = dynamic_cast<PyOptimizer<OptimizerT>*>(&opt);
+  if (py_opt != nullptr) {
+    py_opt->SetLinearSolverOrdering(std::move(set_ordering));
+  } else {
+    set_ordering(opt);
+  }
+}
+
+/**
+ * The information about an iteration passed to an iteration callback set from Python
+ *
+ * The iteration stats are copied, but the best values and linearization are only copied when
+ * they're requested, and raise an error if requested after the callback returned, when the
+ * references into the optimizer are no longer valid.
+ */
+template <typename MatrixType>
+class PyOptimizationIterationInfo {
+ public:
+  using Scalar = typename MatrixType::Scalar;
+  using IterationInfo = OptimizationIterationInfo<Values<Scalar>, Linearization<MatrixType>>;
+
+  explicit PyOptimizationIterationInfo(const IterationInfo& info)
+      : iteration(info.iteration),
+        iteration_seconds(info.iteration_seconds),
+        total_seconds(info.total_seconds),
+        info_(&info) {}
+
+  const Values<Scalar>& BestValues() const {
+    return Info().best_values;
+  }
+
+  const Linearization<MatrixType>& BestLinearization() const {
+    return Info().best_linearization;
+  }
+
+  void Invalidate() {
+    info_ = nullptr;
+  }
+
+  optimization_iteration_t iteration;
+  double iteration_seconds;
+  double total_seconds;
+
+ private:
+  const IterationInfo& Info() const {
+    if (info_ == nullptr) {
+      throw std::runtime_error(
+          "The best values and linearization can only be accessed during the iteration callback");
+    }
+    return *info_;
+  }
+
+  const IterationInfo* info_;
+};
+
+/**
+ * Add the Python class for PyOptimizationIterationInfo<MatrixType>, with the given name and
+ * docstring
+ */
+template <typename MatrixType>
+void AddOptimizationIterationInfoClass(pybind11::module_ module, const char* const name,
+                                       const char* const doc) {
+  using PyInfo = PyOptimizationIterationInfo<MatrixType>;
+
+  py::class_<PyInfo, std::shared_ptr<PyInfo>>(module, name, doc)
+      .def_readonly("iteration", &PyInfo::iteration,
+                    "The stats for this iteration, such as the error, lambda, and update norm.")
+      .def_readonly("iteration_seconds", &PyInfo::iteration_seconds,
+                    "The wall time spent in this iteration, in seconds.")
+      .def_readonly("total_seconds", &PyInfo::total_seconds,
+                    "The wall time spent in all of the iterations so far, in seconds.")
+      .def("best_values", &PyInfo::BestValues,
+           "Get a copy of the best values found so far.  Only valid during the callback.")
+      .def("best_linearization", &PyInfo::BestLinearization,
+           "Get a copy of the linearization at the best values.  Only valid during the callback.");
+}
+
+/**
+ * Add the Python class for the Optimizer type OptimizerT, with the given name and docstring
+ */
+template <typename OptimizerT>
+void AddOptimizerClass(pybind11::module_ module, const char* const name, const char* const doc) {
+  using Scalar = typename OptimizerT::Scalar;
+  using MatrixType = typename OptimizerT::MatrixType;
+  using Stats = typename OptimizerT::Stats;
+  using SymbolicFactorizationCachei = SymbolicFactorizationCache<int>;
+
+  py::class_<OptimizerT> optimizer_class(module, name, doc);
+  optimizer_class
+      .def(py::init([](const optimizer_params_t& params, const std::vector<Factor<Scalar>>& factors,
+                       const std::string& name, const std::vector<Key>& keys,
+                       const Scalar epsilon) -> std::unique_ptr<OptimizerT> {
+             return std::make_unique<PyOptimizer<OptimizerT>>(params, factors, name, keys, epsilon);
+           }),
            py::arg("params"), py::arg("factors"), py::arg("name") = "sym::Optimize",
-           py::arg("keys") = std::vector<Key>(), py::arg("epsilon") = kDefaultEpsilond)
-      .def("optimize", py::overload_cast<Valuesd&, int, bool>(&Optimizerd::Optimize),
-           py::arg("values"), py::arg("num_iterations") = -1,
-           py::arg("populate_best_linearization") = false, R"(
+           py::arg("keys") = std::vector<Key>(), py::arg("epsilon") = kDefaultEpsilon<Scalar>)
+      .def(
+          "optimize",
+          [](OptimizerT& opt, Values<Scalar>& values, int num_iterations,
+             bool populate_best_linearization) {
+            return opt.Optimize(values, num_iterations, populate_best_linearization);
+          },
+          py::arg("values"), py::arg("num_iterations") = -1,
+          py::arg("populate_best_linearization") = false,
+          py::call_guard<py::gil_scoped_release>(), R"(
            Optimize the given values in-place
 
            Args:
@@ -48,10 +272,14 @@ void AddOptimizerWrapper(pybind11::module_ module) {
            Returns:
                The optimization stats
            )")
-      .def("optimize",
-           py::overload_cast<Valuesd&, int, bool, OptimizationStatsd&>(&Optimizerd::Optimize),
-           py::arg("values"), py::arg("num_iterations"), py::arg("populate_best_linearization"),
-           py::arg("stats"), R"(
+      .def(
+          "optimize",
+          [](OptimizerT& opt, Values<Scalar>& values, int num_iterations,
+             bool populate_best_linearization, Stats& stats) {
+            opt.Optimize(values, num_iterations, populate_best_linearization, stats);
+          },
+          py::arg("values"), py::arg("num_iterations"), py::arg("populate_best_linearization"),
+          py::arg("stats"), py::call_guard<py::gil_scoped_release>(), R"(
            Optimize the given values in-place
 
            This overload takes the stats as an argument, and stores into there.  This allows users to
@@ -65,8 +293,13 @@ void AddOptimizerWrapper(pybind11::module_ module) {
 
              stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
            )")
-      .def("optimize", py::overload_cast<Valuesd&, int, OptimizationStatsd&>(&Optimizerd::Optimize),
-           py::arg("values"), py::arg("num_iterations"), py::arg("stats"), R"(
+      .def(
+          "optimize",
+          [](OptimizerT& opt, Values<Scalar>& values, int num_iterations, Stats& stats) {
+            opt.Optimize(values, num_iterations, stats);
+          },
+          py::arg("values"), py::arg("num_iterations"), py::arg("stats"),
+          py::call_guard<py::gil_scoped_release>(), R"(
            Optimize the given values in-place
 
            This overload takes the stats as an argument, and stores into there.  This allows users to
@@ -78,8 +311,12 @@ void AddOptimizerWrapper(pybind11::module_ module) {
 
              stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
            )")
-      .def("optimize", py::overload_cast<Valuesd&, OptimizationStatsd&>(&Optimizerd::Optimize),
-           py::arg("values"), py::arg("stats"), R"(
+      .def(
+          "optimize",
+          [](OptimizerT& opt, Values<Scalar>& values, Stats& stats) {
+            opt.Optimize(values, stats);
+          },
+          py::arg("values"), py::arg("stats"), py::call_guard<py::gil_scoped_release>(), R"(
            Optimize the given values in-place
 
            This overload takes the stats as an argument, and stores into there.  This allows users to
@@ -89,49 +326,127 @@ void AddOptimizerWrapper(pybind11::module_ module) {
            Args:
              stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
            )")
-      .def("linearize", &Optimizerd::Linearize, py::arg("values"),
-           "Linearize the problem around the given values.")
+      .def(
+          "optimize_many",
+          [](OptimizerT& opt, const std::vector<Values<Scalar>*>& values, const int num_threads,
+             const int num_iterations, const bool populate_best_linearization) {
+            auto* const py_opt = dynamic_cast<PyOptimizer<OptimizerT>*>(&opt);
+            if (py_opt == nullptr) {
+              throw std::invalid_argument(
+                  "optimize_many is only supported for Optimizers created from Python");
+            }
+            return py_opt->OptimizeMany(values, num_threads, num_iterations,
+                                        populate_best_linearization);
+          },
+          py::arg("values"), py::arg("num_threads") = 0, py::arg("num_iterations") = -1,
+          py::arg("populate_best_linearization") = false, R"(
+           Optimize each of the given values in-place, in parallel
+
+           All of the values must have the same structure, and must be distinct objects.  The
+           problems are spread over a pool of threads, each of which optimizes with its own copy of
+           this optimizer, so the setup and symbolic factorization are done once per thread rather
+           than once per problem.  The GIL is released while optimizing; factors created from
+           Python functions take turns holding it.
+
+           Args:
+             values: The values to optimize
+
+             num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+             num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+             populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+           Returns:
+               The optimization stats for each of the values
+           )")
+      .def(
+          "linearize",
+          [](OptimizerT& opt, const Values<Scalar>& values) {
+            return opt.Linearize(values);
+          },
+          py::arg("values"), py::call_guard<py::gil_scoped_release>(),
+          "Linearize the problem around the given values.")
+      .def(
+          "linearize",
+          [](OptimizerT& opt, const Values<Scalar>& values,
+             Linearization<MatrixType>& linearization) {
+            opt.Linearize(values, linearization);
+          },
+          py::arg("values"), py::arg("linearization"), py::call_guard<py::gil_scoped_release>(),
+          R"(
+          Linearize the problem around the given values, into the given linearization in place.
+
+          Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+          was returned by a previous call to linearize), so that views of its arrays, like those
+          returned by its csc_buffers methods, see the new linearization.
+          )")
       .def(
           "compute_all_covariances",
-          [](Optimizerd& opt, const SparseLinearizationd& linearization) {
-            std::unordered_map<Key, Eigen::MatrixXd> covariances_by_key;
+          [](OptimizerT& opt, const Linearization<MatrixType>& linearization) {
+            std::unordered_map<Key, MatrixX<Scalar>> covariances_by_key;
             opt.ComputeAllCovariances(linearization, covariances_by_key);
             return covariances_by_key;
           },
-          py::arg("linearization"), R"(
+          py::arg("linearization"), py::call_guard<py::gil_scoped_release>(), R"(
           Get covariances for each optimized key at the given linearization
 
           May not be called before either optimize or linearize has been called.
           )")
       .def(
           "compute_covariances",
-          [](Optimizerd& opt, const SparseLinearizationd& linearization,
+          [](OptimizerT& opt, const Linearization<MatrixType>& linearization,
              const std::vector<Key>& keys) {
-            std::unordered_map<Key, Eigen::MatrixXd> covariances_by_key;
+            std::unordered_map<Key, MatrixX<Scalar>> covariances_by_key;
             opt.ComputeCovariances(linearization, keys, covariances_by_key);
             return covariances_by_key;
           },
-          py::arg("linearization"), py::arg("keys"), R"(
+          py::arg("linearization"), py::arg("keys"), py::call_guard<py::gil_scoped_release>(), R"(
           Get covariances for the given subset of keys at the given linearization
 
           This version is potentially much more efficient than computing the covariances for all
           keys in the problem.
 
-          Currently requires that `keys` corresponds to a set of keys at the start of the list of keys
-          for the full problem, and in the same order.  It uses the Schur complement trick, so will be
-          most efficient if the hessian is of the following form, with C block diagonal::
+          If `keys` corresponds to a set of keys at the start of the list of keys for the full
+          problem, and in the same order, this uses the Schur complement trick, so will be most
+          efficient if the hessian is of the following form, with C block diagonal::
 
               A = ( B    E )
                   ( E^T  C )
+
+          Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+          covariance needed for their blocks are computed, see compute_cross_covariances.
+          )")
+      .def(
+          "compute_cross_covariances",
+          [](OptimizerT& opt, const Linearization<MatrixType>& linearization,
+             const std::vector<std::pair<Key, Key>>& key_pairs) {
+            std::vector<MatrixX<Scalar>> cross_covariances;
+            opt.ComputeCrossCovariances(linearization, key_pairs, cross_covariances);
+            return cross_covariances;
+          },
+          py::arg("linearization"), py::arg("key_pairs"), py::call_guard<py::gil_scoped_release>(),
+          R"(
+          Get the cross-covariances between the given pairs of keys at the given linearization
+
+          The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+          the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+          may be any of the optimized keys, in any order.
+
+          Only the entries of the covariance needed for the requested blocks are computed, from the
+          sparse Cholesky factorization of the hessian, so this is much more efficient than
+          compute_full_covariance for a small number of keys in a large problem.
+
+          May not be called before either optimize or linearize has been called.
           )")
       .def(
           "compute_full_covariance",
-          [](Optimizerd& opt, const SparseLinearizationd& linearization) {
-            Eigen::MatrixXd covariance;
+          [](OptimizerT& opt, const Linearization<MatrixType>& linearization) {
+            MatrixX<Scalar> covariance;
             opt.ComputeFullCovariance(linearization, covariance);
             return covariance;
           },
-          py::arg("linearization"), R"(
+          py::arg("linearization"), py::call_guard<py::gil_scoped_release>(), R"(
           Get the full problem covariance at the given linearization
 
           Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
@@ -142,12 +457,106 @@ void AddOptimizerWrapper(pybind11::module_ module) {
 
           May not be called before either optimize or linearize has been called.
           )")
-      .def("keys", &Optimizerd::Keys, "Get the optimized keys.")
-      .def("factors", &Optimizerd::Factors, "Get the factors.")
-      .def("update_params", &Optimizerd::UpdateParams, py::arg("params"),
+      .def(
+          "add_factors",
+          [](OptimizerT& opt, std::vector<Factor<Scalar>> factors) {
+            opt.AddFactors(std::move(factors));
+            OnProblemChanged(opt);
+          },
+          py::arg("factors"), R"(
+          Add factors to the problem
+
+          The structure already computed for the existing factors is kept; on the next
+          linearization only the new factors are indexed, and their entries are added to the
+          sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+          linear solver if it changed.
+
+          Keys optimized by the new factors which are not optimized yet stay constant, unless they
+          are added with add_keys.
+          )")
+      .def(
+          "add_keys",
+          [](OptimizerT& opt, const std::vector<Key>& keys) {
+            opt.AddKeys(keys);
+            OnProblemChanged(opt);
+          },
+          py::arg("keys"), R"(
+          Add keys, which are not in the state vector yet, to the end of it
+
+          Each key must be optimized by at least one factor, and be in the values passed to the
+          next call to optimize or linearize.  The other entries of those values must keep the same
+          layout as before.
+          )")
+      .def(
+          "remove_factors",
+          [](OptimizerT& opt, const std::vector<int>& indices) {
+            opt.RemoveFactors(indices);
+            OnProblemChanged(opt);
+          },
+          py::arg("indices"), R"(
+          Remove the factors at the given indices into factors()
+
+          The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+          again.  Keys which are no longer optimized by any factor are removed from the state
+          vector, in which case the linearizer is rebuilt.
+          )")
+      .def(
+          "set_iteration_callback",
+          [](OptimizerT& opt, std::optional<py::function> callback) {
+            if (!callback) {
+              opt.SetIterationCallback({});
+              return;
+            }
+
+            // Hold the callback by a shared_ptr, so it's only destroyed (with the GIL held) when
+            // the Optimizer no longer refers to it
+            auto callback_ptr = std::shared_ptr<py::function>(
+                new py::function(std::move(*callback)), [](py::function* const ptr) {
+                  py::gil_scoped_acquire acquire;
+                  delete ptr;
+                });
+
+            opt.SetIterationCallback([callback_ptr](
+                                         const typename OptimizerT::IterationInfo& info) -> bool {
+              py::gil_scoped_acquire acquire;
+              const auto py_info = std::make_shared<PyOptimizationIterationInfo<MatrixType>>(info);
+              py::object result;
+              try {
+                result = (*callback_ptr)(py_info);
+              } catch (...) {
+                py_info->Invalidate();
+                throw;
+              }
+              py_info->Invalidate();
+              return py::cast<bool>(py::bool_(result));
+            });
+          },
+          py::arg("callback"), R"(
+          Set a function to call after each iteration of optimize, or remove it if None
+
+          The callback is called with an OptimizationIterationInfo, which has the stats for the
+          iteration and gives the best values and linearization so far on demand, so this gives
+          per-iteration information without setting debug_stats.  If it returns True, the
+          optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+          )")
+      .def(
+          "set_cancellation_token",
+          [](OptimizerT& opt, std::shared_ptr<CancellationToken> cancellation_token) {
+            opt.SetCancellationToken(std::move(cancellation_token));
+          },
+          py::arg("cancellation_token"), R"(
+          Set a token which cancels optimize from another thread, or remove it if None
+
+          The token is checked after each iteration, and once it's cancelled the optimization stops
+          with status CANCELLED, and the values are set to the best values found so far.  Not
+          checked by optimize_many.
+          )")
+      .def("keys", &OptimizerT::Keys, "Get the optimized keys.")
+      .def("factors", &OptimizerT::Factors, "Get the factors.")
+      .def("update_params", &OptimizerT::UpdateParams, py::arg("params"),
            "Update the optimizer params.")
       .def("linearization_index",
-           [](const Optimizerd& opt) -> py::dict {
+           [](const OptimizerT& opt) -> py::dict {
              // Convert to cc_sym.Key, which is hashable
              py::dict py_index;
              for (const auto& [key, entry] : opt.Linearizer().StateIndex()) {
@@ -157,15 +566,247 @@ void AddOptimizerWrapper(pybind11::module_ module) {
            })
       .def(
           "linearization_index_entry",
-          [](const Optimizerd& opt, const Key& key) -> index_entry_t {
+          [](const OptimizerT& opt, const Key& key) -> index_entry_t {
             return opt.Linearizer().StateIndex().at(key.GetLcmType());
           },
           py::arg("key"));
 
+  // The orderings and Schur complement only apply to the sparse linear solvers
+  if constexpr (kIsSparseEigenType<MatrixType>) {
+    optimizer_class
+        .def(
+            "set_symbolic_factorization_cache",
+            [](OptimizerT& opt, std::shared_ptr<SymbolicFactorizationCachei> cache) {
+              opt.NonlinearSolver().LinearSolver().SetSymbolicFactorizationCache(std::move(cache));
+            },
+            py::arg("cache"), R"(
+          Share the symbolic factorizations of the linear solver with other optimizers using the
+          same cache, or stop using a cache if None
+
+          The sparsity pattern of the hessian is analyzed on the first optimization, so this should
+          be called before that to reuse an existing analysis.
+          )")
+        .def(
+            "symbolic_factorization_cache",
+            [](const OptimizerT& opt) {
+              return opt.NonlinearSolver().LinearSolver().GetSymbolicFactorizationCache();
+            },
+            "Get the symbolic factorization cache used by the linear solver, if any.")
+        .def(
+            "set_linear_solver_ordering",
+            [](OptimizerT& opt, const Eigen::VectorXi& ordering) {
+              SetLinearSolverOrdering<OptimizerT>(
+                  opt, [ordering](OptimizerT& o) { o.SetLinearSolverOrdering(ordering); });
+            },
+            py::arg("ordering"), R"(
+          Use a precomputed ordering for the sparse linear solver instead of computing one, such as
+          the ordering from linear_solver_ordering() for a previous problem with the same structure
+
+          Args:
+            ordering: The permutation of the columns of the hessian, in the format of
+              OptimizationStats.linear_solver_ordering, i.e. ordering[i] is the position of column
+              i in the factorization
+          )")
+        .def(
+            "set_linear_solver_ordering_groups",
+            [](OptimizerT& opt, const std::vector<std::vector<Key>>& key_groups) {
+              SetLinearSolverOrdering<OptimizerT>(opt, [key_groups](OptimizerT& o) {
+                o.SetLinearSolverOrderingGroups(key_groups);
+              });
+            },
+            py::arg("key_groups"), R"(
+          Order the sparse linear solver with a constrained approximate minimum degree ordering,
+          which eliminates all of the keys in each group before the keys in the next group, e.g.
+          the landmarks before the cameras for bundle adjustment.  Optimized keys which aren't in
+          any of the groups are eliminated last.
+          )")
+        .def("linear_solver_ordering", &OptimizerT::LinearSolverOrdering, R"(
+          The ordering computed by the sparse linear solver for the last hessian it analyzed, in
+          the format of OptimizationStats.linear_solver_ordering, which can be passed to
+          set_linear_solver_ordering.  Empty if no hessian has been analyzed yet.
+          )")
+        .def(
+            "set_schur_complement_keys",
+            [](OptimizerT& opt, const std::vector<Key>& keys) {
+              opt.SetSchurComplementKeys(keys);
+              OnProblemChanged(opt);
+            },
+            py::arg("keys"), R"(
+          Move the given keys after the other optimized keys, so that the SCHUR linear solver type
+          eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only
+          the trailing keys which are not optimized together by any factor are eliminated, so the
+          given keys should not be coupled to each other.
+          )");
+  }
+}
+
+}  // namespace
+
+void AddOptimizerWrapper(pybind11::module_ module) {
+  using SymbolicFactorizationCachei = SymbolicFactorizationCache<int>;
+  py::class_<SymbolicFactorizationCachei, std::shared_ptr<SymbolicFactorizationCachei>>(
+      module, "SymbolicFactorizationCache",
+      "A bounded cache of the symbolic factorizations (orderings and elimination trees) computed "
+      "by the sparse linear solver of an Optimizer, keyed by the sparsity pattern of the "
+      "hessian.\n\n"
+      "Optimizers sharing a cache skip the symbolic analysis for problems with the same structure "
+      "as one analyzed before.  When the cache is full, the least recently used entry is "
+      "evicted.  Can be shared by optimizers on different threads.")
+      .def(py::init<size_t>(), py::arg("capacity") = 16, R"(
+          Args:
+            capacity: The maximum number of symbolic factorizations to keep
+          )")
+      .def("size", &SymbolicFactorizationCachei::Size, "The number of entries in the cache.")
+      .def("capacity", &SymbolicFactorizationCachei::Capacity,
+           "The maximum number of entries in the cache.")
+      .def("hits", &SymbolicFactorizationCachei::Hits,
+           "The number of lookups which found the sparsity pattern.")
+      .def("misses", &SymbolicFactorizationCachei::Misses,
+           "The number of lookups which did not find the sparsity pattern.")
+      .def("clear", &SymbolicFactorizationCachei::Clear, "Remove all of the entries.");
+
+  py::class_<CancellationToken, std::shared_ptr<CancellationToken>>(
+      module, "CancellationToken",
+      "A flag for cancelling an optimization from another thread, see "
+      "Optimizer.set_cancellation_token.")
+      .def(py::init<>())
+      .def("cancel", &CancellationToken::Cancel,
+           "Request that the optimization stop after its current iteration.  Safe to call from "
+           "any thread.")
+      .def("is_cancelled", &CancellationToken::IsCancelled);
+
+  AddOptimizationIterationInfoClass<Eigen::SparseMatrix<double>>(
+      module, "OptimizationIterationInfo",
+      "Information about the latest iteration of an optimization, passed to the iteration "
+      "callback of an Optimizer as the optimization runs.");
+  AddOptimizationIterationInfoClass<Eigen::SparseMatrix<float>>(
+      module, "OptimizationIterationInfof",
+      "Information about the latest iteration of an optimization, passed to the iteration "
+      "callback of an Optimizerf as the optimization runs.");
+  AddOptimizationIterationInfoClass<MatrixX<double>>(
+      module, "DenseOptimizationIterationInfo",
+      "Information about the latest iteration of an optimization, passed to the iteration "
+      "callback of a DenseOptimizer as the optimization runs.");
+  AddOptimizationIterationInfoClass<MatrixX<float>>(
+      module, "DenseOptimizationIterationInfof",
+      "Information about the latest iteration of an optimization, passed to the iteration "
+      "callback of a DenseOptimizerf as the optimization runs.");
+
+  AddOptimizerClass<Optimizerd>(
+      module, "Optimizer",
+      "Class for optimizing a nonlinear least-squares problem specified as a list of Factors. For "
+      "efficient use, create once and call Optimize() multiple times with different initial "
+      "guesses, as long as the factors remain constant and the structure of the Values is "
+      "identical.\n\n"
+      "The GIL is released while optimizing, linearizing, and computing covariances, so separate "
+      "Optimizers can run concurrently on Python threads.  Factors created from Python functions "
+      "reacquire it while they're linearized.");
+
+  AddOptimizerClass<DoglegOptimizerd>(
+      module, "DoglegOptimizer",
+      "Optimizer which uses Powell's dogleg trust-region method instead of Levenberg-Marquardt.\n\n"
+      "The hessian is factorized once per linearization, and steps which are rejected only shrink "
+      "the trust region, so they don't factorize it again.  The FailureReason of the stats is a "
+      "dogleg_solver_failure_reason_t.  Otherwise the same as Optimizer.");
+
+  AddOptimizerClass<Optimizerf>(
+      module, "Optimizerf",
+      "Optimizer in single precision, which optimizes a Valuesf with a list of Factorfs.\n\n"
+      "The linearization, hessian, and factorization are stored in single precision, which "
+      "halves the memory traffic of each iteration compared to Optimizer, at the cost of "
+      "precision.  The stats are an OptimizationStatsf, and linearizations are Linearizationfs.  "
+      "Otherwise the same as Optimizer.");
+
+  AddOptimizerClass<DoglegOptimizerf>(
+      module, "DoglegOptimizerf",
+      "DoglegOptimizer in single precision, see Optimizerf.  Otherwise the same as "
+      "DoglegOptimizer.");
+
+  AddOptimizerClass<DenseOptimizerd>(
+      module, "DenseOptimizer",
+      "Optimizer which linearizes into dense matrices and solves with a dense Cholesky "
+      "factorization.\n\n"
+      "For small problems (tens of tangent dimensions) or problems whose hessian is mostly full, "
+      "this is faster than Optimizer, which spends most of its time on sparse bookkeeping for "
+      "them.  Only the DIRECT linear solver type is supported, and the linear solver orderings "
+      "and symbolic factorization cache don't apply.  The stats are a DenseOptimizationStats, "
+      "and linearizations are DenseLinearizations.  Otherwise the same as Optimizer.");
+
+  AddOptimizerClass<DenseOptimizerf>(
+      module, "DenseOptimizerf",
+      "DenseOptimizer in single precision, see Optimizerf.  Otherwise the same as "
+      "DenseOptimizer.");
+
   // Wrapping free functions
   module.def("optimize", &Optimize<double>, py::arg("params"), py::arg("factors"),
              py::arg("values"), py::arg("epsilon") = kDefaultEpsilond,
+             py::call_guard<py::gil_scoped_release>(),
              "Simple wrapper to make optimization one function call.");
+
+  py::class_<FixedLagSmootherd>(
+      module, "FixedLagSmoother",
+      "Fixed-lag smoother for problems that grow over time, such as sliding-window VIO or "
+      "localization.\n\n"
+      "Each call to update() adds new keys and factors to the window and optimizes it.  Once the "
+      "window holds more than lag updates, the keys added by the oldest update are marginalized: "
+      "the factors touching them are replaced by a single dense prior factor on the keys they "
+      "shared with the rest of the window, computed with a Schur complement at the current "
+      "estimate.  The cost of each update is bounded by the size of the window, not by the length "
+      "of the history.\n\n"
+      "The GIL is released while optimizing and marginalizing.  Factors created from Python "
+      "functions reacquire it while they're linearized.")
+      .def(py::init<const optimizer_params_t&, int, const std::string&, double>(),
+           py::arg("params"), py::arg("lag"), py::arg("name") = "sym::FixedLagSmoother",
+           py::arg("epsilon") = kDefaultEpsilond, R"(
+          Args:
+            params: The params to use for the optimizer
+            lag: The number of updates whose keys are kept in the window.  If 0, keys are only marginalized by calling marginalize()
+            name: The name of this smoother to be used for printing debug information
+            epsilon: Epsilon for numerical stability
+          )")
+      .def(
+          "update",
+          [](FixedLagSmootherd& smoother, const Valuesd& new_values,
+             const std::vector<Factord>& new_factors, const int num_iterations) {
+            return smoother.Update(new_values, new_factors, num_iterations);
+          },
+          py::arg("new_values"), py::arg("new_factors"), py::arg("num_iterations") = -1,
+          py::call_guard<py::gil_scoped_release>(), R"(
+          Add new keys and factors to the window, optimize it, then marginalize the keys of the
+          updates which have fallen out of the window
+
+          Args:
+            new_values: Initial guesses for the keys added in this update, along with any new constant inputs to the factors.  None of these keys may already be in the window
+            new_factors: The new factors.  These may touch any keys in the window
+            num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          Returns:
+            The stats of optimizing the window, before marginalizing
+          )")
+      .def(
+          "marginalize",
+          [](FixedLagSmootherd& smoother, const std::vector<Key>& keys) {
+            smoother.Marginalize(keys);
+          },
+          py::arg("keys"), py::call_guard<py::gil_scoped_release>(), R"(
+          Marginalize the given keys out of the window, at the current estimate
+
+          The factors touching the keys are replaced by a single dense prior factor on the other
+          keys they optimize.  Constant inputs to those factors that are no longer used by any
+          factor are also removed.
+          )")
+      .def("estimate", &FixedLagSmootherd::Estimate,
+           "The current estimate of the keys in the window, including constant inputs to the "
+           "factors.")
+      .def("factors", &FixedLagSmootherd::Factors,
+           "The factors in the window, including the prior factor from previous marginalizations, "
+           "if there is one.")
+      .def("keys", &FixedLagSmootherd::Keys, "The keys optimized by the factors in the window.")
+      .def("lag", &FixedLagSmootherd::Lag,
+           "The number of updates whose keys are kept in the window.")
+      .def("update_params", &FixedLagSmootherd::UpdateParams, py::arg("params"),
+           "Update the optimizer params.")
+      .def("params", &FixedLagSmootherd::Params, "Get the params used by the optimizer.");
   module.def("default_optimizer_params", &DefaultOptimizerParams,
              "Sensible default parameters for Optimizer.");
 }
@@ -7,6 +7,9 @@
 
 #include <pybind11/eigen.h>
 
+#include <symforce/opt/factor.h>
+#include <symforce/opt/key.h>
+#include <symforce/slam/imu_preintegration/imu_factor.h>
 #include <symforce/slam/imu_preintegration/imu_preintegrator.h>
 #include <symforce/slam/imu_preintegration/preintegrated_imu_measurements.h>
 
@@ -17,6 +20,23 @@ namespace py = pybind11;
 
 namespace sym {
 
+namespace {
+
+/**
+ * Wrap one of the IMU factor classes, which all have the same interface
+ */
+template <typename ImuFactorType>
+void AddImuFactorWrapper(pybind11::module_ module, const char* const name, const char* const doc,
+                         const char* const factor_doc) {
+  py::class_<ImuFactorType>(module, name, doc)
+      .def(py::init<const sym::ImuPreintegratord&>(), py::arg("preintegrator"))
+      .def(py::init<const sym::PreintegratedImuMeasurementsd&, const sym::Matrix99d&>(),
+           py::arg("measurement"), py::arg("sqrt_information"))
+      .def("factor", &ImuFactorType::Factor, py::arg("keys_to_func"), factor_doc);
+}
+
+}  // namespace
+
 void AddSlamWrapper(pybind11::module_ module) {
   auto pim = py::class_<sym::PreintegratedImuMeasurementsd>(
       module, "PreintegratedImuMeasurements",
@@ -60,6 +80,36 @@ void AddSlamWrapper(pybind11::module_ module) {
            py::arg("gyro_cov"), py::arg("dt"), py::arg("epsilon") = kDefaultEpsilond)
       .def("preintegrated_measurements", &sym::ImuPreintegratord::PreintegratedMeasurements)
       .def("covariance", &sym::ImuPreintegratord::Covariance);
+
+  AddImuFactorWrapper<sym::ImuFactord>(
+      module, "ImuFactor",
+      "A factor for using on-manifold IMU preintegration in a SymForce optimization problem.",
+      R"(
+      Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+      pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity, and epsilon.
+
+      The factor is evaluated entirely in C++, without calling into Python.
+      )");
+  AddImuFactorWrapper<sym::ImuWithGravityFactord>(
+      module, "ImuWithGravityFactor",
+      "A factor for using on-manifold IMU preintegration in a SymForce optimization problem, with "
+      "the ability to optimize the gravity vector.",
+      R"(
+      Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+      pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity, and epsilon.
+
+      The factor is evaluated entirely in C++, without calling into Python.
+      )");
+  AddImuFactorWrapper<sym::ImuWithGravityDirectionFactord>(
+      module, "ImuWithGravityDirectionFactor",
+      "A factor for using on-manifold IMU preintegration in a SymForce optimization problem, with "
+      "the ability to optimize the gravity vector direction.",
+      R"(
+      Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+      pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity_direction, gravity_norm, and epsilon.
+
+      The factor is evaluated entirely in C++, without calling into Python.
+      )");
 }
 
 }  // namespace sym
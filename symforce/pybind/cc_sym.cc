@@ -12,6 +12,7 @@
 #include "./cc_optimization_stats.h"
 #include "./cc_optimizer.h"
 #include "./cc_slam.h"
+#include "./cc_tic_toc.h"
 #include "./cc_values.h"
 
 PYBIND11_MODULE(cc_sym, generated_module) {
@@ -27,4 +28,5 @@ PYBIND11_MODULE(cc_sym, generated_module) {
   sym::AddOptimizerWrapper(generated_module);
   sym::AddSlamWrapper(generated_module);
   sym::AddLoggerWrapper(generated_module);
+  sym::AddTicTocWrapper(generated_module);
 }
@@ -21,249 +21,179 @@ import lcmtypes.sym._index_entry_t
 import lcmtypes.sym._index_t
 import lcmtypes.sym._key_t
 import lcmtypes.sym._linearized_dense_factor_t
+import lcmtypes.sym._linearized_dense_factorf_t
 import lcmtypes.sym._optimization_iteration_t
 import lcmtypes.sym._optimization_stats_t
 import lcmtypes.sym._optimization_status_t
 import lcmtypes.sym._optimizer_params_t
 import lcmtypes.sym._sparse_matrix_structure_t
 import lcmtypes.sym._values_t
+import lcmtypes.sym._valuesf_t
 
 import sym
 
 __all__ = [
+    "CancellationToken",
+    "DenseLinearization",
+    "DenseLinearizationf",
+    "DenseOptimizationIterationInfo",
+    "DenseOptimizationIterationInfof",
+    "DenseOptimizationStats",
+    "DenseOptimizationStatsf",
+    "DenseOptimizer",
+    "DenseOptimizerf",
+    "DoglegOptimizer",
+    "DoglegOptimizerf",
     "Factor",
+    "Factorf",
+    "FixedLagSmoother",
+    "ImuFactor",
     "ImuPreintegrator",
+    "ImuWithGravityDirectionFactor",
+    "ImuWithGravityFactor",
     "Key",
     "Linearization",
+    "Linearizationf",
+    "OptimizationIterationInfo",
+    "OptimizationIterationInfof",
     "OptimizationStats",
+    "OptimizationStatsf",
     "Optimizer",
+    "Optimizerf",
     "PreintegratedImuMeasurements",
+    "SymbolicFactorizationCache",
+    "TicTocEvent",
+    "TicTocRecorder",
+    "TicTocStats",
     "Values",
+    "Valuesf",
     "default_optimizer_params",
     "optimize",
     "set_log_level",
 ]
 
-class Factor:
+class CancellationToken:
     """
-    A residual term for optimization.
-
-    Created from a function and a set of Keys that act as inputs. Given a Values as an evaluation
-    point, generates a linear approximation to the residual function.
+    A flag for cancelling an optimization from another thread, see Optimizer.set_cancellation_token.
     """
-    @staticmethod
-    @typing.overload
-    def jacobian(
-        jacobian_func: typing.Callable[
-            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
-        ],
-        keys: list[Key],
-        sparse: bool = False,
-    ) -> Factor:
-        """
-        Create from a function that computes the jacobian. The hessian will be computed using the
-        Gauss Newton approximation::
-
-            H   = J.T * J
-            rhs = J.T * b
-
-        Args:
-          keys: The set of input arguments, in order, accepted by func.
-          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
-
-        Precondition:
-          The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
-        """
-    @staticmethod
-    @typing.overload
-    def jacobian(
-        jacobian_func: typing.Callable[
-            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
-        ],
-        keys_to_func: list[Key],
-        keys_to_optimize: list[Key],
-        sparse: bool = False,
-    ) -> Factor:
-        """
-        Create from a function that computes the jacobian. The hessian will be computed using the
-        Gauss Newton approximation::
-
-            H   = J.T * J
-            rhs = J.T * b
-
-        Args:
-          keys_to_func: The set of input arguments, in order, accepted by func.
-          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
-          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
-
-          Precondition:
-            The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
-        """
-    @typing.overload
-    def __init__(
-        self,
-        hessian_func: typing.Callable[
-            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
-        ],
-        keys: list[Key],
-        sparse: bool = False,
-    ) -> None:
-        """
-        Create directly from a hessian functor. This is the lowest-level constructor.
-
-        Args:
-          keys: The set of input arguments, in order, accepted by func.
-          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
-
-        Precondition:
-          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
+    def __init__(self) -> None: ...
+    def cancel(self) -> None:
         """
-    @typing.overload
-    def __init__(
-        self,
-        hessian_func: typing.Callable[
-            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
-        ],
-        keys_to_func: list[Key],
-        keys_to_optimize: list[Key],
-        sparse: bool = False,
-    ) -> None:
+        Request that the optimization stop after its current iteration.  Safe to call from any thread.
         """
-        Create directly from a hessian functor. This is the lowest-level constructor.
+    def is_cancelled(self) -> bool: ...
 
-        Args:
-          keys_to_func: The set of input arguments, in order, accepted by func.
-          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
-          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+class DenseLinearization:
+    """
+    Linearization of a DenseOptimizer, whose jacobian and hessian are dense matrices.  Otherwise the same as Linearization.
+    """
 
-        Precondition:
-          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
-        """
-    def __repr__(self) -> str: ...
-    def all_keys(self) -> list[Key]:
-        """
-        Get all keys required to evaluate this factor.
-        """
-    def is_sparse(self) -> bool:
-        """
-        Does this factor use a sparse jacobian/hessian matrix?
-        """
-    def linearize(self, arg0: Values) -> tuple:
-        """
-        Evaluate the factor at the given linearization point and output just the numerical values of the residual and jacobian.
-        """
-    def linearized_factor(
-        self, values: Values
-    ) -> lcmtypes.sym._linearized_dense_factor_t.linearized_dense_factor_t:
+    hessian_lower: numpy.ndarray
+    jacobian: numpy.ndarray
+    residual: numpy.ndarray
+    rhs: numpy.ndarray
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def error(self) -> float: ...
+    def is_initialized(self) -> bool:
         """
-        Evaluate the factor at the given linearization point and output a LinearizedDenseFactor that
-        contains the numerical values of the residual, jacobian, hessian, and right-hand-side.
-
-        This can only be called if is_sparse is false; otherwise, it will throw.
+        Returns whether the linearization is currently valid for the corresponding values. Accessing any of the members when this is false could result in unexpected behavior.
         """
-    def optimized_keys(self) -> list[Key]:
+    def linear_delta_error(
+        self, x_update: numpy.ndarray, damping_vector: numpy.ndarray
+    ) -> float: ...
+    def reset(self) -> None:
         """
-        Get the optimized keys for this factor.
+        Set to invalid.
         """
+    def set_initialized(self, initialized: bool = True) -> None: ...
 
-class ImuPreintegrator:
-    """
-    Class to on-manifold preintegrate IMU measurements for usage in a SymForce optimization problem.
-    """
-    def __init__(self, accel_bias: numpy.ndarray, gyro_bias: numpy.ndarray) -> None: ...
-    def covariance(self) -> numpy.ndarray: ...
-    def integrate_measurement(
-        self,
-        measured_accel: numpy.ndarray,
-        measured_gyro: numpy.ndarray,
-        accel_cov: numpy.ndarray,
-        gyro_cov: numpy.ndarray,
-        dt: float,
-        epsilon: float = 2.220446049250313e-15,
-    ) -> None: ...
-    def preintegrated_measurements(self) -> PreintegratedImuMeasurements: ...
-
-class Key:
+class DenseLinearizationf:
     """
-    Key type for Values. Contains a letter plus an integral subscript and superscript. Can construct with a letter, a letter + sub, or a letter + sub + super, but not a letter + super.
+    Linearization of a DenseOptimizerf, whose jacobian and hessian are dense matrices, in single precision.  Otherwise the same as Linearization.
     """
 
-    INVALID_LETTER: typing.ClassVar[str] = "\x00"
-    INVALID_SUB: typing.ClassVar[int] = -9223372036854775808
-    INVALID_SUPER: typing.ClassVar[int] = -9223372036854775808
-    def __eq__(self, arg0: typing.Any) -> bool: ...
+    hessian_lower: numpy.ndarray
+    jacobian: numpy.ndarray
+    residual: numpy.ndarray
+    rhs: numpy.ndarray
     def __getstate__(self) -> tuple: ...
-    def __hash__(self) -> int: ...
-    @typing.overload
-    def __init__(self, letter: str) -> None: ...
-    @typing.overload
-    def __init__(self, letter: str, sub: int) -> None: ...
-    @typing.overload
-    def __init__(self, letter: str, sub: int, super: int) -> None: ...
-    def __repr__(self) -> str: ...
+    def __init__(self) -> None: ...
     def __setstate__(self, arg0: tuple) -> None: ...
-    def get_lcm_type(self) -> lcmtypes.sym._key_t.key_t: ...
-    def lexical_less_than(self, arg0: Key) -> bool:
+    def error(self) -> float: ...
+    def is_initialized(self) -> bool:
         """
-        Return true if a is LESS than b, in dictionary order of the tuple (letter, sub, super).
+        Returns whether the linearization is currently valid for the corresponding values. Accessing any of the members when this is false could result in unexpected behavior.
         """
-    def with_letter(self, letter: str) -> Key:
+    def linear_delta_error(
+        self, x_update: numpy.ndarray, damping_vector: numpy.ndarray
+    ) -> float: ...
+    def reset(self) -> None:
         """
-        Creates a new key with a modified letter from an existing one.
+        Set to invalid.
         """
-    def with_sub(self, sub: int) -> Key:
+    def set_initialized(self, initialized: bool = True) -> None: ...
+
+class DenseOptimizationIterationInfo:
+    """
+    Information about the latest iteration of an optimization, passed to the iteration callback of a DenseOptimizer as the optimization runs.
+    """
+    def best_linearization(self) -> DenseLinearization:
         """
-        Creates a new key with a modified subscript from an existing one.
+        Get a copy of the linearization at the best values.  Only valid during the callback.
         """
-    def with_super(self, super: int) -> Key:
+    def best_values(self) -> Values:
         """
-        Creates a new key with a modified superscript from an existing one.
+        Get a copy of the best values found so far.  Only valid during the callback.
         """
     @property
-    def letter(self) -> str:
+    def iteration(self) -> lcmtypes.sym._optimization_iteration_t.optimization_iteration_t:
         """
-        The letter value of the key.
+        The stats for this iteration, such as the error, lambda, and update norm.
         """
     @property
-    def sub(self) -> int:
+    def iteration_seconds(self) -> float:
         """
-        The subscript value of the key (INVALID_SUB if not set).
+        The wall time spent in this iteration, in seconds.
         """
     @property
-    def super(self) -> int:
+    def total_seconds(self) -> float:
         """
-        The superscript value of the key (INVALID_SUPER if not set).
+        The wall time spent in all of the iterations so far, in seconds.
         """
 
-class Linearization:
+class DenseOptimizationIterationInfof:
     """
-    Class for storing a problem linearization evaluated at a Values (i.e. a residual, jacobian, hessian, and rhs).
+    Information about the latest iteration of an optimization, passed to the iteration callback of a DenseOptimizerf as the optimization runs.
     """
-
-    hessian_lower: scipy.sparse.csc_matrix
-    jacobian: scipy.sparse.csc_matrix
-    residual: numpy.ndarray
-    rhs: numpy.ndarray
-    def __getstate__(self) -> tuple: ...
-    def __init__(self) -> None: ...
-    def __setstate__(self, arg0: tuple) -> None: ...
-    def error(self) -> float: ...
-    def is_initialized(self) -> bool:
+    def best_linearization(self) -> DenseLinearizationf:
         """
-        Returns whether the linearization is currently valid for the corresponding values. Accessing any of the members when this is false could result in unexpected behavior.
+        Get a copy of the linearization at the best values.  Only valid during the callback.
         """
-    def linear_delta_error(
-        self, x_update: numpy.ndarray, damping_vector: numpy.ndarray
-    ) -> float: ...
-    def reset(self) -> None:
+    def best_values(self) -> Valuesf:
         """
-        Set to invalid.
+        Get a copy of the best values found so far.  Only valid during the callback.
+        """
+    @property
+    def iteration(self) -> lcmtypes.sym._optimization_iteration_t.optimization_iteration_t:
+        """
+        The stats for this iteration, such as the error, lambda, and update norm.
+        """
+    @property
+    def iteration_seconds(self) -> float:
+        """
+        The wall time spent in this iteration, in seconds.
+        """
+    @property
+    def total_seconds(self) -> float:
+        """
+        The wall time spent in all of the iterations so far, in seconds.
         """
-    def set_initialized(self, initialized: bool = True) -> None: ...
 
-class OptimizationStats:
+class DenseOptimizationStats:
     """
-    Debug stats for a full optimization run.
+    Debug stats for a full optimization run of a DenseOptimizer.  Only the shape of the jacobian sparsity is filled out.
     """
 
     iterations: list[lcmtypes.sym._optimization_iteration_t.optimization_iteration_t]
@@ -284,7 +214,7 @@ class OptimizationStats:
         The linearization at best_index (at optimized_values), filled out if populate_best_linearization=True
         """
     @best_linearization.setter
-    def best_linearization(self, arg1: Linearization) -> None: ...
+    def best_linearization(self, arg1: DenseLinearization) -> None: ...
     @property
     def cholesky_factor_sparsity(
         self,
@@ -299,217 +229,2879 @@ class OptimizationStats:
     @property
     def failure_reason(self) -> int:
         """
-        If status == FAILED, why?  This should be cast to the NonlinearSolver::FailureReason enum for the nonlinear solver you used.
+        If status == FAILED, why?  This should be cast to the NonlinearSolver::FailureReason enum for the nonlinear solver you used.
+        """
+    @failure_reason.setter
+    def failure_reason(self, arg0: int) -> None: ...
+    @property
+    def jacobian_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the problem jacobian (filled out if debug_stats=True and include_jacobians=True)
+        """
+    @jacobian_sparsity.setter
+    def jacobian_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        Ordering used by the linear solver (filled out if debug_stats=True)
+        """
+    @linear_solver_ordering.setter
+    def linear_solver_ordering(self, arg0: numpy.ndarray) -> None: ...
+    @property
+    def status(self) -> lcmtypes.sym._optimization_status_t.optimization_status_t:
+        """
+        What was the result of the optimization? (did it converge, fail, etc.)
+        """
+    @status.setter
+    def status(self, arg0: lcmtypes.sym._optimization_status_t.optimization_status_t) -> None: ...
+
+class DenseOptimizationStatsf:
+    """
+    Debug stats for a full optimization run of a DenseOptimizerf.  Only the shape of the jacobian sparsity is filled out.
+    """
+
+    iterations: list[lcmtypes.sym._optimization_iteration_t.optimization_iteration_t]
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def get_lcm_type(self) -> lcmtypes.sym._optimization_stats_t.optimization_stats_t: ...
+    @property
+    def best_index(self) -> int:
+        """
+        Index into iterations of the best iteration (containing the optimal Values).
+        """
+    @best_index.setter
+    def best_index(self, arg0: int) -> None: ...
+    @property
+    def best_linearization(self) -> typing.Optional[Linearization]:
+        """
+        The linearization at best_index (at optimized_values), filled out if populate_best_linearization=True
+        """
+    @best_linearization.setter
+    def best_linearization(self, arg1: DenseLinearizationf) -> None: ...
+    @property
+    def cholesky_factor_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the cholesky factor L (filled out if debug_stats=True)
+        """
+    @cholesky_factor_sparsity.setter
+    def cholesky_factor_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def failure_reason(self) -> int:
+        """
+        If status == FAILED, why?  This should be cast to the NonlinearSolver::FailureReason enum for the nonlinear solver you used.
+        """
+    @failure_reason.setter
+    def failure_reason(self, arg0: int) -> None: ...
+    @property
+    def jacobian_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the problem jacobian (filled out if debug_stats=True and include_jacobians=True)
+        """
+    @jacobian_sparsity.setter
+    def jacobian_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        Ordering used by the linear solver (filled out if debug_stats=True)
+        """
+    @linear_solver_ordering.setter
+    def linear_solver_ordering(self, arg0: numpy.ndarray) -> None: ...
+    @property
+    def status(self) -> lcmtypes.sym._optimization_status_t.optimization_status_t:
+        """
+        What was the result of the optimization? (did it converge, fail, etc.)
+        """
+    @status.setter
+    def status(self, arg0: lcmtypes.sym._optimization_status_t.optimization_status_t) -> None: ...
+
+class DenseOptimizer:
+    """
+    Optimizer which linearizes into dense matrices and solves with a dense Cholesky factorization.
+
+    For small problems (tens of tangent dimensions) or problems whose hessian is mostly full, this is faster than Optimizer, which spends most of its time on sparse bookkeeping for them.  Only the DIRECT linear solver type is supported, and the linear solver orderings and symbolic factorization cache don't apply.  The stats are a DenseOptimizationStats, and linearizations are DenseLinearizations.  Otherwise the same as Optimizer.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factor],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 2.220446049250313e-15,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factor]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(
+        self, linearization: DenseLinearization
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: DenseLinearization, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: DenseLinearization, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: DenseLinearization) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factor]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Values) -> DenseLinearization:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Values, linearization: DenseLinearization) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Values, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> DenseOptimizationStats:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Values,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: DenseOptimizationStats,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, num_iterations: int, stats: DenseOptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, stats: DenseOptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Values],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[DenseOptimizationStats]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class DenseOptimizerf:
+    """
+    DenseOptimizer in single precision, see Optimizerf.  Otherwise the same as DenseOptimizer.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factorf],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 1.1920928955078125e-06,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factorf]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(
+        self, linearization: DenseLinearizationf
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: DenseLinearizationf, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: DenseLinearizationf, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: DenseLinearizationf) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factorf]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Valuesf) -> DenseLinearizationf:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Valuesf, linearization: DenseLinearizationf) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Valuesf, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> DenseOptimizationStatsf:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Valuesf,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: DenseOptimizationStatsf,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(
+        self, values: Valuesf, num_iterations: int, stats: DenseOptimizationStatsf
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Valuesf, stats: DenseOptimizationStatsf) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Valuesf],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[DenseOptimizationStatsf]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class DoglegOptimizer:
+    """
+    Optimizer which uses Powell's dogleg trust-region method instead of Levenberg-Marquardt.
+
+    The hessian is factorized once per linearization, and steps which are rejected only shrink the trust region, so they don't factorize it again.  The FailureReason of the stats is a dogleg_solver_failure_reason_t.  Otherwise the same as Optimizer.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factor],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 2.220446049250313e-15,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factor]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(self, linearization: Linearization) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: Linearization, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: Linearization, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: Linearization) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factor]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        The ordering computed by the sparse linear solver for the last hessian it analyzed, in
+        the format of OptimizationStats.linear_solver_ordering, which can be passed to
+        set_linear_solver_ordering.  Empty if no hessian has been analyzed yet.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Values) -> Linearization:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Values, linearization: Linearization) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Values, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> OptimizationStats:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Values,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: OptimizationStats,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, num_iterations: int, stats: OptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, stats: OptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Values],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[OptimizationStats]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def set_linear_solver_ordering(self, ordering: numpy.ndarray) -> None:
+        """
+        Use a precomputed ordering for the sparse linear solver instead of computing one, such as
+        the ordering from linear_solver_ordering() for a previous problem with the same structure
+
+        Args:
+          ordering: The permutation of the columns of the hessian, in the format of
+            OptimizationStats.linear_solver_ordering, i.e. ordering[i] is the position of column
+            i in the factorization
+        """
+    def set_linear_solver_ordering_groups(self, key_groups: list[list[Key]]) -> None:
+        """
+        Order the sparse linear solver with a constrained approximate minimum degree ordering,
+        which eliminates all of the keys in each group before the keys in the next group, e.g.
+        the landmarks before the cameras for bundle adjustment.  Optimized keys which aren't in
+        any of the groups are eliminated last.
+        """
+    def set_schur_complement_keys(self, keys: list[Key]) -> None:
+        """
+        Move the given keys after the other optimized keys, so that the SCHUR linear solver type
+        eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only
+        the trailing keys which are not optimized together by any factor are eliminated, so the
+        given keys should not be coupled to each other.
+        """
+    def set_symbolic_factorization_cache(self, cache: SymbolicFactorizationCache) -> None:
+        """
+        Share the symbolic factorizations of the linear solver with other optimizers using the
+        same cache, or stop using a cache if None
+
+        The sparsity pattern of the hessian is analyzed on the first optimization, so this should
+        be called before that to reuse an existing analysis.
+        """
+    def symbolic_factorization_cache(self) -> SymbolicFactorizationCache:
+        """
+        Get the symbolic factorization cache used by the linear solver, if any.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class DoglegOptimizerf:
+    """
+    DoglegOptimizer in single precision, see Optimizerf.  Otherwise the same as DoglegOptimizer.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factorf],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 1.1920928955078125e-06,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factorf]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(self, linearization: Linearizationf) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: Linearizationf, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: Linearizationf, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: Linearizationf) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factorf]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        The ordering computed by the sparse linear solver for the last hessian it analyzed, in
+        the format of OptimizationStats.linear_solver_ordering, which can be passed to
+        set_linear_solver_ordering.  Empty if no hessian has been analyzed yet.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Valuesf) -> Linearizationf:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Valuesf, linearization: Linearizationf) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Valuesf, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> OptimizationStatsf:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Valuesf,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: OptimizationStatsf,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Valuesf, num_iterations: int, stats: OptimizationStatsf) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Valuesf, stats: OptimizationStatsf) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Valuesf],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[OptimizationStatsf]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def set_linear_solver_ordering(self, ordering: numpy.ndarray) -> None:
+        """
+        Use a precomputed ordering for the sparse linear solver instead of computing one, such as
+        the ordering from linear_solver_ordering() for a previous problem with the same structure
+
+        Args:
+          ordering: The permutation of the columns of the hessian, in the format of
+            OptimizationStats.linear_solver_ordering, i.e. ordering[i] is the position of column
+            i in the factorization
+        """
+    def set_linear_solver_ordering_groups(self, key_groups: list[list[Key]]) -> None:
+        """
+        Order the sparse linear solver with a constrained approximate minimum degree ordering,
+        which eliminates all of the keys in each group before the keys in the next group, e.g.
+        the landmarks before the cameras for bundle adjustment.  Optimized keys which aren't in
+        any of the groups are eliminated last.
+        """
+    def set_schur_complement_keys(self, keys: list[Key]) -> None:
+        """
+        Move the given keys after the other optimized keys, so that the SCHUR linear solver type
+        eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only
+        the trailing keys which are not optimized together by any factor are eliminated, so the
+        given keys should not be coupled to each other.
+        """
+    def set_symbolic_factorization_cache(self, cache: SymbolicFactorizationCache) -> None:
+        """
+        Share the symbolic factorizations of the linear solver with other optimizers using the
+        same cache, or stop using a cache if None
+
+        The sparsity pattern of the hessian is analyzed on the first optimization, so this should
+        be called before that to reuse an existing analysis.
+        """
+    def symbolic_factorization_cache(self) -> SymbolicFactorizationCache:
+        """
+        Get the symbolic factorization cache used by the linear solver, if any.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class Factor:
+    """
+    A residual term for optimization.
+
+    Created from a function and a set of Keys that act as inputs. Given a Values as an evaluation
+    point, generates a linear approximation to the residual function.
+    """
+    @staticmethod
+    @typing.overload
+    def jacobian(
+        jacobian_func: typing.Callable[
+            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys: list[Key],
+        sparse: bool = False,
+    ) -> Factor:
+        """
+        Create from a function that computes the jacobian. The hessian will be computed using the
+        Gauss Newton approximation::
+
+            H   = J.T * J
+            rhs = J.T * b
+
+        Args:
+          keys: The set of input arguments, in order, accepted by func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @staticmethod
+    @typing.overload
+    def jacobian(
+        jacobian_func: typing.Callable[
+            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys_to_func: list[Key],
+        keys_to_optimize: list[Key],
+        sparse: bool = False,
+    ) -> Factor:
+        """
+        Create from a function that computes the jacobian. The hessian will be computed using the
+        Gauss Newton approximation::
+
+            H   = J.T * J
+            rhs = J.T * b
+
+        Args:
+          keys_to_func: The set of input arguments, in order, accepted by func.
+          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+          Precondition:
+            The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @typing.overload
+    def __init__(
+        self,
+        hessian_func: typing.Callable[
+            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys: list[Key],
+        sparse: bool = False,
+    ) -> None:
+        """
+        Create directly from a hessian functor. This is the lowest-level constructor.
+
+        Args:
+          keys: The set of input arguments, in order, accepted by func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @typing.overload
+    def __init__(
+        self,
+        hessian_func: typing.Callable[
+            [Values, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys_to_func: list[Key],
+        keys_to_optimize: list[Key],
+        sparse: bool = False,
+    ) -> None:
+        """
+        Create directly from a hessian functor. This is the lowest-level constructor.
+
+        Args:
+          keys_to_func: The set of input arguments, in order, accepted by func.
+          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    def __repr__(self) -> str: ...
+    def all_keys(self) -> list[Key]:
+        """
+        Get all keys required to evaluate this factor.
+        """
+    def is_sparse(self) -> bool:
+        """
+        Does this factor use a sparse jacobian/hessian matrix?
+        """
+    def linearize(self, arg0: Values) -> tuple:
+        """
+        Evaluate the factor at the given linearization point and output just the numerical values of the residual and jacobian.
+        """
+    def linearized_factor(
+        self, values: Values
+    ) -> lcmtypes.sym._linearized_dense_factor_t.linearized_dense_factor_t:
+        """
+        Evaluate the factor at the given linearization point and output a LinearizedDenseFactor that
+        contains the numerical values of the residual, jacobian, hessian, and right-hand-side.
+
+        This can only be called if is_sparse is false; otherwise, it will throw.
+        """
+    def optimized_keys(self) -> list[Key]:
+        """
+        Get the optimized keys for this factor.
+        """
+
+class Factorf:
+    """
+    A residual term for optimization in single precision, for use with Optimizerf.
+
+    Functions passed from Python are called with a Valuesf, and their outputs are converted to
+    single precision.  Otherwise the same as Factor.
+    """
+    @staticmethod
+    @typing.overload
+    def jacobian(
+        jacobian_func: typing.Callable[
+            [Valuesf, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys: list[Key],
+        sparse: bool = False,
+    ) -> Factorf:
+        """
+        Create from a function that computes the jacobian. The hessian will be computed using the
+        Gauss Newton approximation::
+
+            H   = J.T * J
+            rhs = J.T * b
+
+        Args:
+          keys: The set of input arguments, in order, accepted by func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @staticmethod
+    @typing.overload
+    def jacobian(
+        jacobian_func: typing.Callable[
+            [Valuesf, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys_to_func: list[Key],
+        keys_to_optimize: list[Key],
+        sparse: bool = False,
+    ) -> Factorf:
+        """
+        Create from a function that computes the jacobian. The hessian will be computed using the
+        Gauss Newton approximation::
+
+            H   = J.T * J
+            rhs = J.T * b
+
+        Args:
+          keys_to_func: The set of input arguments, in order, accepted by func.
+          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+          Precondition:
+            The jacobian returned by jacobian_func has type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @typing.overload
+    def __init__(
+        self,
+        hessian_func: typing.Callable[
+            [Valuesf, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys: list[Key],
+        sparse: bool = False,
+    ) -> None:
+        """
+        Create directly from a hessian functor. This is the lowest-level constructor.
+
+        Args:
+          keys: The set of input arguments, in order, accepted by func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    @typing.overload
+    def __init__(
+        self,
+        hessian_func: typing.Callable[
+            [Valuesf, list[lcmtypes.sym._index_entry_t.index_entry_t]], tuple
+        ],
+        keys_to_func: list[Key],
+        keys_to_optimize: list[Key],
+        sparse: bool = False,
+    ) -> None:
+        """
+        Create directly from a hessian functor. This is the lowest-level constructor.
+
+        Args:
+          keys_to_func: The set of input arguments, in order, accepted by func.
+          keys_to_optimize: The set of input arguments that correspond to the derivative in func. Must be a subset of keys_to_func.
+          sparse: Create a sparse factor if True, dense factor if false. Defaults to dense.
+
+        Precondition:
+          The jacobian and hessian returned by hessian_func have type scipy.sparse.csc_matrix if and only if sparse = True.
+        """
+    def __repr__(self) -> str: ...
+    def all_keys(self) -> list[Key]:
+        """
+        Get all keys required to evaluate this factor.
+        """
+    def is_sparse(self) -> bool:
+        """
+        Does this factor use a sparse jacobian/hessian matrix?
+        """
+    def linearize(self, arg0: Valuesf) -> tuple:
+        """
+        Evaluate the factor at the given linearization point and output just the numerical values of the residual and jacobian.
+        """
+    def linearized_factor(
+        self, values: Valuesf
+    ) -> lcmtypes.sym._linearized_dense_factorf_t.linearized_dense_factorf_t:
+        """
+        Evaluate the factor at the given linearization point and output a LinearizedDenseFactor that
+        contains the numerical values of the residual, jacobian, hessian, and right-hand-side.
+
+        This can only be called if is_sparse is false; otherwise, it will throw.
+        """
+    def optimized_keys(self) -> list[Key]:
+        """
+        Get the optimized keys for this factor.
+        """
+
+class FixedLagSmoother:
+    """
+    Fixed-lag smoother for problems that grow over time, such as sliding-window VIO or localization.
+
+    Each call to update() adds new keys and factors to the window and optimizes it.  Once the window holds more than lag updates, the keys added by the oldest update are marginalized: the factors touching them are replaced by a single dense prior factor on the keys they shared with the rest of the window, computed with a Schur complement at the current estimate.  The cost of each update is bounded by the size of the window, not by the length of the history.
+
+    The GIL is released while optimizing and marginalizing.  Factors created from Python functions reacquire it while they're linearized.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        lag: int,
+        name: str = "sym::FixedLagSmoother",
+        epsilon: float = 2.220446049250313e-15,
+    ) -> None:
+        """
+        Args:
+          params: The params to use for the optimizer
+          lag: The number of updates whose keys are kept in the window.  If 0, keys are only marginalized by calling marginalize()
+          name: The name of this smoother to be used for printing debug information
+          epsilon: Epsilon for numerical stability
+        """
+    def estimate(self) -> Values:
+        """
+        The current estimate of the keys in the window, including constant inputs to the factors.
+        """
+    def factors(self) -> list[Factor]:
+        """
+        The factors in the window, including the prior factor from previous marginalizations, if there is one.
+        """
+    def keys(self) -> list[Key]:
+        """
+        The keys optimized by the factors in the window.
+        """
+    def lag(self) -> int:
+        """
+        The number of updates whose keys are kept in the window.
+        """
+    def marginalize(self, keys: list[Key]) -> None:
+        """
+        Marginalize the given keys out of the window, at the current estimate
+
+        The factors touching the keys are replaced by a single dense prior factor on the other
+        keys they optimize.  Constant inputs to those factors that are no longer used by any
+        factor are also removed.
+        """
+    def params(self) -> lcmtypes.sym._optimizer_params_t.optimizer_params_t:
+        """
+        Get the params used by the optimizer.
+        """
+    def update(
+        self, new_values: Values, new_factors: list[Factor], num_iterations: int = -1
+    ) -> OptimizationStats:
+        """
+        Add new keys and factors to the window, optimize it, then marginalize the keys of the
+        updates which have fallen out of the window
+
+        Args:
+          new_values: Initial guesses for the keys added in this update, along with any new constant inputs to the factors.  None of these keys may already be in the window
+          new_factors: The new factors.  These may touch any keys in the window
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+        Returns:
+          The stats of optimizing the window, before marginalizing
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class ImuFactor:
+    """
+    A factor for using on-manifold IMU preintegration in a SymForce optimization problem.
+    """
+    @typing.overload
+    def __init__(self, preintegrator: ImuPreintegrator) -> None: ...
+    @typing.overload
+    def __init__(
+        self, measurement: PreintegratedImuMeasurements, sqrt_information: numpy.ndarray
+    ) -> None: ...
+    def factor(self, keys_to_func: list[Key]) -> Factor:
+        """
+        Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+        pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity, and epsilon.
+
+        The factor is evaluated entirely in C++, without calling into Python.
+        """
+
+class ImuPreintegrator:
+    """
+    Class to on-manifold preintegrate IMU measurements for usage in a SymForce optimization problem.
+    """
+    def __init__(self, accel_bias: numpy.ndarray, gyro_bias: numpy.ndarray) -> None: ...
+    def covariance(self) -> numpy.ndarray: ...
+    def integrate_measurement(
+        self,
+        measured_accel: numpy.ndarray,
+        measured_gyro: numpy.ndarray,
+        accel_cov: numpy.ndarray,
+        gyro_cov: numpy.ndarray,
+        dt: float,
+        epsilon: float = 2.220446049250313e-15,
+    ) -> None: ...
+    def preintegrated_measurements(self) -> PreintegratedImuMeasurements: ...
+
+class ImuWithGravityDirectionFactor:
+    """
+    A factor for using on-manifold IMU preintegration in a SymForce optimization problem, with the ability to optimize the gravity vector direction.
+    """
+    @typing.overload
+    def __init__(self, preintegrator: ImuPreintegrator) -> None: ...
+    @typing.overload
+    def __init__(
+        self, measurement: PreintegratedImuMeasurements, sqrt_information: numpy.ndarray
+    ) -> None: ...
+    def factor(self, keys_to_func: list[Key]) -> Factor:
+        """
+        Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+        pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity_direction, gravity_norm, and epsilon.
+
+        The factor is evaluated entirely in C++, without calling into Python.
+        """
+
+class ImuWithGravityFactor:
+    """
+    A factor for using on-manifold IMU preintegration in a SymForce optimization problem, with the ability to optimize the gravity vector.
+    """
+    @typing.overload
+    def __init__(self, preintegrator: ImuPreintegrator) -> None: ...
+    @typing.overload
+    def __init__(
+        self, measurement: PreintegratedImuMeasurements, sqrt_information: numpy.ndarray
+    ) -> None: ...
+    def factor(self, keys_to_func: list[Key]) -> Factor:
+        """
+        Construct a Factor that can be passed to an Optimizer, given the keys of pose_i, vel_i,
+        pose_j, vel_j, accel_bias_i, gyro_bias_i, gravity, and epsilon.
+
+        The factor is evaluated entirely in C++, without calling into Python.
+        """
+
+class Key:
+    """
+    Key type for Values. Contains a letter plus an integral subscript and superscript. Can construct with a letter, a letter + sub, or a letter + sub + super, but not a letter + super.
+    """
+
+    INVALID_LETTER: typing.ClassVar[str] = "\x00"
+    INVALID_SUB: typing.ClassVar[int] = -9223372036854775808
+    INVALID_SUPER: typing.ClassVar[int] = -9223372036854775808
+    def __eq__(self, arg0: typing.Any) -> bool: ...
+    def __getstate__(self) -> tuple: ...
+    def __hash__(self) -> int: ...
+    @typing.overload
+    def __init__(self, letter: str) -> None: ...
+    @typing.overload
+    def __init__(self, letter: str, sub: int) -> None: ...
+    @typing.overload
+    def __init__(self, letter: str, sub: int, super: int) -> None: ...
+    def __repr__(self) -> str: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def get_lcm_type(self) -> lcmtypes.sym._key_t.key_t: ...
+    def lexical_less_than(self, arg0: Key) -> bool:
+        """
+        Return true if a is LESS than b, in dictionary order of the tuple (letter, sub, super).
+        """
+    def with_letter(self, letter: str) -> Key:
+        """
+        Creates a new key with a modified letter from an existing one.
+        """
+    def with_sub(self, sub: int) -> Key:
+        """
+        Creates a new key with a modified subscript from an existing one.
+        """
+    def with_super(self, super: int) -> Key:
+        """
+        Creates a new key with a modified superscript from an existing one.
+        """
+    @property
+    def letter(self) -> str:
+        """
+        The letter value of the key.
+        """
+    @property
+    def sub(self) -> int:
+        """
+        The subscript value of the key (INVALID_SUB if not set).
+        """
+    @property
+    def super(self) -> int:
+        """
+        The superscript value of the key (INVALID_SUPER if not set).
+        """
+
+class Linearization:
+    """
+    Class for storing a problem linearization evaluated at a Values (i.e. a residual, jacobian, hessian, and rhs).
+    """
+
+    hessian_lower: scipy.sparse.csc_matrix
+    jacobian: scipy.sparse.csc_matrix
+    residual: numpy.ndarray
+    rhs: numpy.ndarray
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def error(self) -> float: ...
+    def hessian_lower_csc_buffers(self) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        The (data, indices, indptr) arrays of the compressed sparse column storage of the lower triangle of the hessian, without copying.  See jacobian_csc_buffers.
+        """
+    def hessian_lower_csc_view(self) -> typing.Any:
+        """
+        The lower triangle of the hessian as a scipy.sparse.csc_matrix which shares the memory of this linearization, unlike the copy returned by the hessian_lower attribute.  See jacobian_csc_buffers.
+        """
+    def is_initialized(self) -> bool:
+        """
+        Returns whether the linearization is currently valid for the corresponding values. Accessing any of the members when this is false could result in unexpected behavior.
+        """
+    def jacobian_csc_buffers(self) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        The (data, indices, indptr) arrays of the compressed sparse column storage of the
+        jacobian, without copying.
+
+        The arrays view the memory of this linearization and keep it alive.  They stay valid,
+        and see the new values, when this linearization is relinearized in place by
+        Optimizer.linearize(values, linearization) for a problem with the same structure.  They
+        are invalidated if the structure of the linearization changes, e.g. if the jacobian is
+        assigned or the problem gains factors.  The data is writable, the indices and indptr are
+        read-only.
+        """
+    def jacobian_csc_view(self) -> typing.Any:
+        """
+        The jacobian as a scipy.sparse.csc_matrix which shares the memory of this linearization, unlike the copy returned by the jacobian attribute.  See jacobian_csc_buffers.
+        """
+    def linear_delta_error(
+        self, x_update: numpy.ndarray, damping_vector: numpy.ndarray
+    ) -> float: ...
+    def reset(self) -> None:
+        """
+        Set to invalid.
+        """
+    def set_initialized(self, initialized: bool = True) -> None: ...
+
+class Linearizationf:
+    """
+    Class for storing a problem linearization evaluated at a Valuesf, in single precision.  Otherwise the same as Linearization.
+    """
+
+    hessian_lower: scipy.sparse.csc_matrix
+    jacobian: scipy.sparse.csc_matrix
+    residual: numpy.ndarray
+    rhs: numpy.ndarray
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def error(self) -> float: ...
+    def hessian_lower_csc_buffers(self) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        The (data, indices, indptr) arrays of the compressed sparse column storage of the lower triangle of the hessian, without copying.  See jacobian_csc_buffers.
+        """
+    def hessian_lower_csc_view(self) -> typing.Any:
+        """
+        The lower triangle of the hessian as a scipy.sparse.csc_matrix which shares the memory of this linearization, unlike the copy returned by the hessian_lower attribute.  See jacobian_csc_buffers.
+        """
+    def is_initialized(self) -> bool:
+        """
+        Returns whether the linearization is currently valid for the corresponding values. Accessing any of the members when this is false could result in unexpected behavior.
+        """
+    def jacobian_csc_buffers(self) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        The (data, indices, indptr) arrays of the compressed sparse column storage of the
+        jacobian, without copying.
+
+        The arrays view the memory of this linearization and keep it alive.  They stay valid,
+        and see the new values, when this linearization is relinearized in place by
+        Optimizer.linearize(values, linearization) for a problem with the same structure.  They
+        are invalidated if the structure of the linearization changes, e.g. if the jacobian is
+        assigned or the problem gains factors.  The data is writable, the indices and indptr are
+        read-only.
+        """
+    def jacobian_csc_view(self) -> typing.Any:
+        """
+        The jacobian as a scipy.sparse.csc_matrix which shares the memory of this linearization, unlike the copy returned by the jacobian attribute.  See jacobian_csc_buffers.
+        """
+    def linear_delta_error(
+        self, x_update: numpy.ndarray, damping_vector: numpy.ndarray
+    ) -> float: ...
+    def reset(self) -> None:
+        """
+        Set to invalid.
+        """
+    def set_initialized(self, initialized: bool = True) -> None: ...
+
+class OptimizationIterationInfo:
+    """
+    Information about the latest iteration of an optimization, passed to the iteration callback of an Optimizer as the optimization runs.
+    """
+    def best_linearization(self) -> Linearization:
+        """
+        Get a copy of the linearization at the best values.  Only valid during the callback.
+        """
+    def best_values(self) -> Values:
+        """
+        Get a copy of the best values found so far.  Only valid during the callback.
+        """
+    @property
+    def iteration(self) -> lcmtypes.sym._optimization_iteration_t.optimization_iteration_t:
+        """
+        The stats for this iteration, such as the error, lambda, and update norm.
+        """
+    @property
+    def iteration_seconds(self) -> float:
+        """
+        The wall time spent in this iteration, in seconds.
+        """
+    @property
+    def total_seconds(self) -> float:
+        """
+        The wall time spent in all of the iterations so far, in seconds.
+        """
+
+class OptimizationIterationInfof:
+    """
+    Information about the latest iteration of an optimization, passed to the iteration callback of an Optimizerf as the optimization runs.
+    """
+    def best_linearization(self) -> Linearizationf:
+        """
+        Get a copy of the linearization at the best values.  Only valid during the callback.
+        """
+    def best_values(self) -> Valuesf:
+        """
+        Get a copy of the best values found so far.  Only valid during the callback.
+        """
+    @property
+    def iteration(self) -> lcmtypes.sym._optimization_iteration_t.optimization_iteration_t:
+        """
+        The stats for this iteration, such as the error, lambda, and update norm.
+        """
+    @property
+    def iteration_seconds(self) -> float:
+        """
+        The wall time spent in this iteration, in seconds.
+        """
+    @property
+    def total_seconds(self) -> float:
+        """
+        The wall time spent in all of the iterations so far, in seconds.
+        """
+
+class OptimizationStats:
+    """
+    Debug stats for a full optimization run.
+    """
+
+    iterations: list[lcmtypes.sym._optimization_iteration_t.optimization_iteration_t]
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def get_lcm_type(self) -> lcmtypes.sym._optimization_stats_t.optimization_stats_t: ...
+    @property
+    def best_index(self) -> int:
+        """
+        Index into iterations of the best iteration (containing the optimal Values).
+        """
+    @best_index.setter
+    def best_index(self, arg0: int) -> None: ...
+    @property
+    def best_linearization(self) -> typing.Optional[Linearization]:
+        """
+        The linearization at best_index (at optimized_values), filled out if populate_best_linearization=True
+        """
+    @best_linearization.setter
+    def best_linearization(self, arg1: Linearization) -> None: ...
+    @property
+    def cholesky_factor_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the cholesky factor L (filled out if debug_stats=True)
+        """
+    @cholesky_factor_sparsity.setter
+    def cholesky_factor_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def failure_reason(self) -> int:
+        """
+        If status == FAILED, why?  This should be cast to the NonlinearSolver::FailureReason enum for the nonlinear solver you used.
+        """
+    @failure_reason.setter
+    def failure_reason(self, arg0: int) -> None: ...
+    @property
+    def jacobian_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the problem jacobian (filled out if debug_stats=True and include_jacobians=True)
+        """
+    @jacobian_sparsity.setter
+    def jacobian_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        Ordering used by the linear solver (filled out if debug_stats=True)
+        """
+    @linear_solver_ordering.setter
+    def linear_solver_ordering(self, arg0: numpy.ndarray) -> None: ...
+    @property
+    def status(self) -> lcmtypes.sym._optimization_status_t.optimization_status_t:
+        """
+        What was the result of the optimization? (did it converge, fail, etc.)
+        """
+    @status.setter
+    def status(self, arg0: lcmtypes.sym._optimization_status_t.optimization_status_t) -> None: ...
+
+class OptimizationStatsf:
+    """
+    Debug stats for a full optimization run of an Optimizerf.
+    """
+
+    iterations: list[lcmtypes.sym._optimization_iteration_t.optimization_iteration_t]
+    def __getstate__(self) -> tuple: ...
+    def __init__(self) -> None: ...
+    def __setstate__(self, arg0: tuple) -> None: ...
+    def get_lcm_type(self) -> lcmtypes.sym._optimization_stats_t.optimization_stats_t: ...
+    @property
+    def best_index(self) -> int:
+        """
+        Index into iterations of the best iteration (containing the optimal Values).
+        """
+    @best_index.setter
+    def best_index(self, arg0: int) -> None: ...
+    @property
+    def best_linearization(self) -> typing.Optional[Linearization]:
+        """
+        The linearization at best_index (at optimized_values), filled out if populate_best_linearization=True
+        """
+    @best_linearization.setter
+    def best_linearization(self, arg1: Linearizationf) -> None: ...
+    @property
+    def cholesky_factor_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the cholesky factor L (filled out if debug_stats=True)
+        """
+    @cholesky_factor_sparsity.setter
+    def cholesky_factor_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def failure_reason(self) -> int:
+        """
+        If status == FAILED, why?  This should be cast to the NonlinearSolver::FailureReason enum for the nonlinear solver you used.
+        """
+    @failure_reason.setter
+    def failure_reason(self, arg0: int) -> None: ...
+    @property
+    def jacobian_sparsity(
+        self,
+    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        """
+        Sparsity pattern of the problem jacobian (filled out if debug_stats=True and include_jacobians=True)
+        """
+    @jacobian_sparsity.setter
+    def jacobian_sparsity(
+        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
+    ) -> None: ...
+    @property
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        Ordering used by the linear solver (filled out if debug_stats=True)
+        """
+    @linear_solver_ordering.setter
+    def linear_solver_ordering(self, arg0: numpy.ndarray) -> None: ...
+    @property
+    def status(self) -> lcmtypes.sym._optimization_status_t.optimization_status_t:
+        """
+        What was the result of the optimization? (did it converge, fail, etc.)
+        """
+    @status.setter
+    def status(self, arg0: lcmtypes.sym._optimization_status_t.optimization_status_t) -> None: ...
+
+class Optimizer:
+    """
+    Class for optimizing a nonlinear least-squares problem specified as a list of Factors. For efficient use, create once and call Optimize() multiple times with different initial guesses, as long as the factors remain constant and the structure of the Values is identical.
+
+    The GIL is released while optimizing, linearizing, and computing covariances, so separate Optimizers can run concurrently on Python threads.  Factors created from Python functions reacquire it while they're linearized.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factor],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 2.220446049250313e-15,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factor]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(self, linearization: Linearization) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: Linearization, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: Linearization, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: Linearization) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factor]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        The ordering computed by the sparse linear solver for the last hessian it analyzed, in
+        the format of OptimizationStats.linear_solver_ordering, which can be passed to
+        set_linear_solver_ordering.  Empty if no hessian has been analyzed yet.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Values) -> Linearization:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Values, linearization: Linearization) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Values, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> OptimizationStats:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Values,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: OptimizationStats,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, num_iterations: int, stats: OptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Values, stats: OptimizationStats) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Values],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[OptimizationStats]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def set_linear_solver_ordering(self, ordering: numpy.ndarray) -> None:
+        """
+        Use a precomputed ordering for the sparse linear solver instead of computing one, such as
+        the ordering from linear_solver_ordering() for a previous problem with the same structure
+
+        Args:
+          ordering: The permutation of the columns of the hessian, in the format of
+            OptimizationStats.linear_solver_ordering, i.e. ordering[i] is the position of column
+            i in the factorization
+        """
+    def set_linear_solver_ordering_groups(self, key_groups: list[list[Key]]) -> None:
+        """
+        Order the sparse linear solver with a constrained approximate minimum degree ordering,
+        which eliminates all of the keys in each group before the keys in the next group, e.g.
+        the landmarks before the cameras for bundle adjustment.  Optimized keys which aren't in
+        any of the groups are eliminated last.
+        """
+    def set_schur_complement_keys(self, keys: list[Key]) -> None:
+        """
+        Move the given keys after the other optimized keys, so that the SCHUR linear solver type
+        eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only
+        the trailing keys which are not optimized together by any factor are eliminated, so the
+        given keys should not be coupled to each other.
+        """
+    def set_symbolic_factorization_cache(self, cache: SymbolicFactorizationCache) -> None:
+        """
+        Share the symbolic factorizations of the linear solver with other optimizers using the
+        same cache, or stop using a cache if None
+
+        The sparsity pattern of the hessian is analyzed on the first optimization, so this should
+        be called before that to reuse an existing analysis.
+        """
+    def symbolic_factorization_cache(self) -> SymbolicFactorizationCache:
+        """
+        Get the symbolic factorization cache used by the linear solver, if any.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class Optimizerf:
+    """
+    Optimizer in single precision, which optimizes a Valuesf with a list of Factorfs.
+
+    The linearization, hessian, and factorization are stored in single precision, which halves the memory traffic of each iteration compared to Optimizer, at the cost of precision.  The stats are an OptimizationStatsf, and linearizations are Linearizationfs.  Otherwise the same as Optimizer.
+    """
+    def __init__(
+        self,
+        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
+        factors: list[Factorf],
+        name: str = "sym::Optimize",
+        keys: list[Key] = [],
+        epsilon: float = 1.1920928955078125e-06,
+    ) -> None: ...
+    def add_factors(self, factors: list[Factorf]) -> None:
+        """
+        Add factors to the problem
+
+        The structure already computed for the existing factors is kept; on the next
+        linearization only the new factors are indexed, and their entries are added to the
+        sparsity pattern of the problem.  The sparsity pattern is only analyzed again by the
+        linear solver if it changed.
+
+        Keys optimized by the new factors which are not optimized yet stay constant, unless they
+        are added with add_keys.
+        """
+    def add_keys(self, keys: list[Key]) -> None:
+        """
+        Add keys, which are not in the state vector yet, to the end of it
+
+        Each key must be optimized by at least one factor, and be in the values passed to the
+        next call to optimize or linearize.  The other entries of those values must keep the same
+        layout as before.
+        """
+    def compute_all_covariances(self, linearization: Linearizationf) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for each optimized key at the given linearization
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_covariances(
+        self, linearization: Linearizationf, keys: list[Key]
+    ) -> dict[Key, numpy.ndarray]:
+        """
+        Get covariances for the given subset of keys at the given linearization
+
+        This version is potentially much more efficient than computing the covariances for all
+        keys in the problem.
+
+        If `keys` corresponds to a set of keys at the start of the list of keys for the full
+        problem, and in the same order, this uses the Schur complement trick, so will be most
+        efficient if the hessian is of the following form, with C block diagonal::
+
+            A = ( B    E )
+                ( E^T  C )
+
+        Otherwise, `keys` may be any subset of the optimized keys, and only the entries of the
+        covariance needed for their blocks are computed, see compute_cross_covariances.
+        """
+    def compute_cross_covariances(
+        self, linearization: Linearizationf, key_pairs: list[tuple[Key, Key]]
+    ) -> list[numpy.ndarray]:
+        """
+        Get the cross-covariances between the given pairs of keys at the given linearization
+
+        The cross-covariance for the pair (a, b) is the block of the full problem covariance with
+        the rows of a and the columns of b, so the pair (a, a) gives the covariance of a.  The keys
+        may be any of the optimized keys, in any order.
+
+        Only the entries of the covariance needed for the requested blocks are computed, from the
+        sparse Cholesky factorization of the hessian, so this is much more efficient than
+        compute_full_covariance for a small number of keys in a large problem.
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def compute_full_covariance(self, linearization: Linearizationf) -> numpy.ndarray:
+        """
+        Get the full problem covariance at the given linearization
+
+        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
+        blocks, i.e. the cross-covariances between different keys.
+
+        The ordering of entries here is the same as the ordering of the keys in the linearization,
+        which can be accessed via linearization_index().
+
+        May not be called before either optimize or linearize has been called.
+        """
+    def factors(self) -> list[Factorf]:
+        """
+        Get the factors.
+        """
+    def keys(self) -> list[Key]:
+        """
+        Get the optimized keys.
+        """
+    def linear_solver_ordering(self) -> numpy.ndarray:
+        """
+        The ordering computed by the sparse linear solver for the last hessian it analyzed, in
+        the format of OptimizationStats.linear_solver_ordering, which can be passed to
+        set_linear_solver_ordering.  Empty if no hessian has been analyzed yet.
+        """
+    def linearization_index(self) -> dict: ...
+    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
+    @typing.overload
+    def linearize(self, values: Valuesf) -> Linearizationf:
+        """
+        Linearize the problem around the given values.
+        """
+    @typing.overload
+    def linearize(self, values: Valuesf, linearization: Linearizationf) -> None:
+        """
+        Linearize the problem around the given values, into the given linearization in place.
+
+        Reuses the storage of the linearization if it has the structure of this problem (e.g. if it
+        was returned by a previous call to linearize), so that views of its arrays, like those
+        returned by its csc_buffers methods, see the new linearization.
+        """
+    @typing.overload
+    def optimize(
+        self, values: Valuesf, num_iterations: int = -1, populate_best_linearization: bool = False
+    ) -> OptimizationStatsf:
+        """
+        Optimize the given values in-place
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats
+        """
+    @typing.overload
+    def optimize(
+        self,
+        values: Valuesf,
+        num_iterations: int,
+        populate_best_linearization: bool,
+        stats: OptimizationStatsf,
+    ) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Valuesf, num_iterations: int, stats: OptimizationStatsf) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
+
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    @typing.overload
+    def optimize(self, values: Valuesf, stats: OptimizationStatsf) -> None:
+        """
+        Optimize the given values in-place
+
+        This overload takes the stats as an argument, and stores into there.  This allows users to
+        avoid reallocating memory for any of the entries in the stats, for use cases where that's
+        important.  If passed, stats must not be None.
+
+        Args:
+          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        """
+    def optimize_many(
+        self,
+        values: list[Valuesf],
+        num_threads: int = 0,
+        num_iterations: int = -1,
+        populate_best_linearization: bool = False,
+    ) -> list[OptimizationStatsf]:
+        """
+        Optimize each of the given values in-place, in parallel
+
+        All of the values must have the same structure, and must be distinct objects.  The
+        problems are spread over a pool of threads, each of which optimizes with its own copy of
+        this optimizer, so the setup and symbolic factorization are done once per thread rather
+        than once per problem.  The GIL is released while optimizing; factors created from
+        Python functions take turns holding it.
+
+        Args:
+          values: The values to optimize
+
+          num_threads: The maximum number of threads to use.  If 0 (the default), uses one per core.
+
+          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
+
+          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
+
+        Returns:
+            The optimization stats for each of the values
+        """
+    def remove_factors(self, indices: list[int]) -> None:
+        """
+        Remove the factors at the given indices into factors()
+
+        The hessian keeps its sparsity pattern, so the linear solver does not need to analyze it
+        again.  Keys which are no longer optimized by any factor are removed from the state
+        vector, in which case the linearizer is rebuilt.
+        """
+    def set_cancellation_token(self, cancellation_token: CancellationToken) -> None:
+        """
+        Set a token which cancels optimize from another thread, or remove it if None
+
+        The token is checked after each iteration, and once it's cancelled the optimization stops
+        with status CANCELLED, and the values are set to the best values found so far.  Not
+        checked by optimize_many.
+        """
+    def set_iteration_callback(self, callback: typing.Callable | None) -> None:
+        """
+        Set a function to call after each iteration of optimize, or remove it if None
+
+        The callback is called with an OptimizationIterationInfo, which has the stats for the
+        iteration and gives the best values and linearization so far on demand, so this gives
+        per-iteration information without setting debug_stats.  If it returns True, the
+        optimization stops with status STOPPED_BY_CALLBACK.  Not called by optimize_many.
+        """
+    def set_linear_solver_ordering(self, ordering: numpy.ndarray) -> None:
+        """
+        Use a precomputed ordering for the sparse linear solver instead of computing one, such as
+        the ordering from linear_solver_ordering() for a previous problem with the same structure
+
+        Args:
+          ordering: The permutation of the columns of the hessian, in the format of
+            OptimizationStats.linear_solver_ordering, i.e. ordering[i] is the position of column
+            i in the factorization
+        """
+    def set_linear_solver_ordering_groups(self, key_groups: list[list[Key]]) -> None:
+        """
+        Order the sparse linear solver with a constrained approximate minimum degree ordering,
+        which eliminates all of the keys in each group before the keys in the next group, e.g.
+        the landmarks before the cameras for bundle adjustment.  Optimized keys which aren't in
+        any of the groups are eliminated last.
+        """
+    def set_schur_complement_keys(self, keys: list[Key]) -> None:
+        """
+        Move the given keys after the other optimized keys, so that the SCHUR linear solver type
+        eliminates them with a Schur complement, e.g. the landmarks for bundle adjustment.  Only
+        the trailing keys which are not optimized together by any factor are eliminated, so the
+        given keys should not be coupled to each other.
+        """
+    def set_symbolic_factorization_cache(self, cache: SymbolicFactorizationCache) -> None:
+        """
+        Share the symbolic factorizations of the linear solver with other optimizers using the
+        same cache, or stop using a cache if None
+
+        The sparsity pattern of the hessian is analyzed on the first optimization, so this should
+        be called before that to reuse an existing analysis.
+        """
+    def symbolic_factorization_cache(self) -> SymbolicFactorizationCache:
+        """
+        Get the symbolic factorization cache used by the linear solver, if any.
+        """
+    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+        """
+        Update the optimizer params.
+        """
+
+class PreintegratedImuMeasurements:
+    """
+    Struct of Preintegrated IMU Measurements (not including the covariance of change in orientation, velocity, and position).
+    """
+    class Delta:
+        """
+        A convenient struct that holds the Preintegrated delta.
+        """
+
+        DR: sym.Rot3
+        Dp: numpy.ndarray
+        Dt: float
+        Dv: numpy.ndarray
+        @staticmethod
+        def from_lcm(
+            arg0: lcmtypes.sym._imu_integrated_measurement_delta_t.imu_integrated_measurement_delta_t,
+        ) -> PreintegratedImuMeasurements.Delta: ...
+        def get_lcm_type(
+            self,
+        ) -> (
+            lcmtypes.sym._imu_integrated_measurement_delta_t.imu_integrated_measurement_delta_t
+        ): ...
+        def roll_forward_state(
+            self, pose_i: sym.Pose3, vel_i: numpy.ndarray, gravity: numpy.ndarray
+        ) -> tuple[sym.Pose3, numpy.ndarray]: ...
+
+    DR_D_gyro_bias: numpy.ndarray
+    Dp_D_accel_bias: numpy.ndarray
+    Dp_D_gyro_bias: numpy.ndarray
+    Dv_D_accel_bias: numpy.ndarray
+    Dv_D_gyro_bias: numpy.ndarray
+    accel_bias: numpy.ndarray
+    delta: PreintegratedImuMeasurements.Delta
+    gyro_bias: numpy.ndarray
+    @staticmethod
+    def from_lcm(
+        arg0: lcmtypes.sym._imu_integrated_measurement_t.imu_integrated_measurement_t,
+    ) -> PreintegratedImuMeasurements: ...
+    def __init__(self, accel_bias: numpy.ndarray, gyro_bias: numpy.ndarray) -> None: ...
+    def get_bias_corrected_delta(
+        self, new_accel_bias: numpy.ndarray, new_gyro_bias: numpy.ndarray
+    ) -> PreintegratedImuMeasurements.Delta: ...
+    def get_lcm_type(
+        self,
+    ) -> lcmtypes.sym._imu_integrated_measurement_t.imu_integrated_measurement_t: ...
+
+class SymbolicFactorizationCache:
+    """
+    A bounded cache of the symbolic factorizations (orderings and elimination trees) computed by the sparse linear solver of an Optimizer, keyed by the sparsity pattern of the hessian.
+
+    Optimizers sharing a cache skip the symbolic analysis for problems with the same structure as one analyzed before.  When the cache is full, the least recently used entry is evicted.  Can be shared by optimizers on different threads.
+    """
+    def __init__(self, capacity: int = 16) -> None:
+        """
+        Args:
+          capacity: The maximum number of symbolic factorizations to keep
+        """
+    def capacity(self) -> int:
+        """
+        The maximum number of entries in the cache.
+        """
+    def clear(self) -> None:
+        """
+        Remove all of the entries.
+        """
+    def hits(self) -> int:
+        """
+        The number of lookups which found the sparsity pattern.
+        """
+    def misses(self) -> int:
+        """
+        The number of lookups which did not find the sparsity pattern.
+        """
+    def size(self) -> int:
+        """
+        The number of entries in the cache.
+        """
+
+class TicTocEvent:
+    """
+    One call to a timed scope.
+    """
+    @property
+    def duration(self) -> float:
+        """
+        The duration of the call, in seconds.
+        """
+    @property
+    def name(self) -> str:
+        """
+        The name of the scope.
+        """
+    @property
+    def start(self) -> float:
+        """
+        The start of the call, in seconds since the recorder started.
+        """
+
+class TicTocRecorder:
+    """
+    Records the timed scopes of the C++ code which end on one thread between calls to start() and stop().  Recorders may be nested, but must be stopped in the reverse order they were started.
+    """
+    def __init__(self, record_timeline: bool = False) -> None:
+        """
+        If record_timeline is True, also records every call to each scope, see timeline().
+        """
+    def blocks(self) -> dict[str, TicTocStats]:
+        """
+        Get a copy of the stats of each scope which ended while recording.
+        """
+    def is_recording(self) -> bool: ...
+    def start(self) -> None:
+        """
+        Start recording on the calling thread, clearing anything recorded before.
+        """
+    def stop(self) -> None:
+        """
+        Stop recording.  Must be called on the thread which called start().
+        """
+    def timeline(self) -> list[TicTocEvent]:
+        """
+        Get a copy of every call to a scope which ended while recording, in the order they ended, if record_timeline is True.
+        """
+
+class TicTocStats:
+    """
+    Accumulated timings of the calls to a timed scope.
+    """
+    @property
+    def count(self) -> int:
+        """
+        The number of calls.
+        """
+    @property
+    def max_time(self) -> float:
+        """
+        The longest time of a call, in seconds.
+        """
+    @property
+    def mean_time(self) -> float:
+        """
+        The mean time of a call, in seconds.
+        """
+    @property
+    def min_time(self) -> float:
+        """
+        The shortest time of a call, in seconds.
+        """
+    @property
+    def total_time(self) -> float:
+        """
+        The total time of all the calls, in seconds.
+        """
+
+class Values:
+    """
+    Efficient polymorphic data structure to store named types with a dict-like interface and
+    support efficient repeated operations using a key index. Supports on-manifold optimization.
+
+    Compatible types are given by the type_t enum. All types implement the StorageOps and
+    LieGroupOps concepts, which are the core operating mechanisms in this class.
+    """
+    def __getstate__(self) -> bytes: ...
+    @typing.overload
+    def __init__(self) -> None:
+        """
+        Default construct as empty.
+        """
+    @typing.overload
+    def __init__(self, msg: lcmtypes.sym._values_t.values_t) -> None:
+        """
+        Construct from serialized form.
+        """
+    @typing.overload
+    def __init__(self, other: Values) -> None:
+        """
+        Construct as a copy of other.
+        """
+    def __repr__(self) -> str: ...
+    def __setstate__(self, arg0: bytes) -> None: ...
+    @typing.overload
+    def at(self, key: Key) -> typing.Any:
+        """
+        Retrieve a value by key.
+        """
+    @typing.overload
+    def at(self, entry: lcmtypes.sym._index_entry_t.index_entry_t) -> typing.Any:
+        """
+        Retrieve a value by index entry. This avoids a map lookup compared to at(key).
+        """
+    def cleanup(self) -> int:
+        """
+        Repack the data array to get rid of empty space from removed keys. If regularly removing
+        keys, it's up to the user to call this appropriately to avoid storage growth. Returns the
+        number of Scalar elements cleaned up from the data array.
+
+        It will INVALIDATE all indices, offset increments, and pointers.
+        Re-create an index with create_index().
+        """
+    @typing.overload
+    def create_index(self, sort_by_offset: bool) -> lcmtypes.sym._index_t.index_t:
+        """
+        Create an index for all keys in this Values. This object can then be used
+        for repeated efficient operations.
+
+        If sort_by_offset is true, the index will be sorted by offset.  Otherwise, the ordering is
+        not specified.
+
+        An index will be INVALIDATED if the following happens:
+          1) Remove() is called with a contained key, or RemoveAll() is called
+          2) Cleanup() is called to re-pack the data array
+        """
+    @typing.overload
+    def create_index(self, keys: list[Key]) -> lcmtypes.sym._index_t.index_t:
+        """
+        Create an index from the given ordered subset of keys. This object can then be used
+        for repeated efficient operations on that subset of keys.
+
+        If you want an index of all the keys, call `values.create_index(values.keys())`.
+
+        An index will be INVALIDATED if the following happens:
+          1) remove() is called with a contained key, or remove_all() is called
+          2) cleanup() is called to re-pack the data array
+        """
+    def data(self) -> list[float]:
+        """
+        Raw data buffer.
+        """
+    def data_view(self) -> numpy.ndarray:
+        """
+        Raw data buffer, as a numpy array viewing the storage of this Values (no copy).
+
+        Writing to the array updates the stored values in place.  The array keeps this Values
+        alive, but is INVALIDATED if a key is added, or if remove_all() or cleanup() is called.
+        """
+    def empty(self) -> bool:
+        """
+        Has zero keys.
+        """
+    def get_lcm_type(self, sort_keys: bool = False) -> lcmtypes.sym._values_t.values_t:
+        """
+        Serialize to LCM.
+        """
+    def has(self, key: Key) -> bool:
+        """
+        Return whether the key exists.
+        """
+    def items(self) -> dict[Key, lcmtypes.sym._index_entry_t.index_entry_t]:
+        """
+        Expose map type to allow iteration.
+        """
+    def keys(self, sort_by_offset: bool = True) -> list[Key]:
+        """
+        Get all keys.
+
+        Args:
+            sort_by_offset: Sorts by storage order to make iteration safer and more memory efficient
+        """
+    def local_coordinates(
+        self, others: Values, index: lcmtypes.sym._index_t.index_t, epsilon: float
+    ) -> numpy.ndarray:
+        """
+        Express this Values in the local coordinate of others Values, i.e., this \\ominus others
+
+        Args:
+            others: The other Values that the local coordinate is relative to
+            index: Ordered list of keys to include (MUST be valid for both this and others Values)
+            epsilon: Small constant to avoid singularities (do not use zero)
+        """
+    def num_entries(self) -> int:
+        """
+        Number of keys.
+        """
+    def remove(self, key: Key) -> bool:
+        """
+        Remove the given key. Only removes the index entry, does not change the data array.
+        Returns true if removed, false if already not present.
+
+        Call cleanup() to re-pack the data array.
+        """
+    def remove_all(self) -> None:
+        """
+        Remove all keys and empty out the storage.
+        """
+    def retract(
+        self, index: lcmtypes.sym._index_t.index_t, delta: list[float], epsilon: float
+    ) -> None:
+        """
+        Perform a retraction from an update vector.
+
+        Args:
+            index: Ordered list of keys in the delta vector
+            delta: Update vector - MUST be the size of index.tangent_dim!
+            epsilon: Small constant to avoid singularities (do not use zero)
+        """
+    @typing.overload
+    def set(self, key: Key, value: float) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: float) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.Rot2) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.Rot2) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.Rot3) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.Rot3) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.Pose2) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.Pose2) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.Pose3) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.Pose3) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.Unit3) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.Unit3) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.ATANCameraCal) -> bool:
+        """
+        Add or update a value by key. Returns true if added, false if updated.
+        """
+    @typing.overload
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.ATANCameraCal) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    @typing.overload
+    def set(self, key: Key, value: sym.DoubleSphereCameraCal) -> bool:
         """
-    @failure_reason.setter
-    def failure_reason(self, arg0: int) -> None: ...
-    @property
-    def jacobian_sparsity(
-        self,
-    ) -> lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t:
+        Add or update a value by key. Returns true if added, false if updated.
         """
-        Sparsity pattern of the problem jacobian (filled out if debug_stats=True and include_jacobians=True)
+    @typing.overload
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.DoubleSphereCameraCal
+    ) -> None:
         """
-    @jacobian_sparsity.setter
-    def jacobian_sparsity(
-        self, arg0: lcmtypes.sym._sparse_matrix_structure_t.sparse_matrix_structure_t
-    ) -> None: ...
-    @property
-    def linear_solver_ordering(self) -> numpy.ndarray:
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
-        Ordering used by the linear solver (filled out if debug_stats=True)
+    @typing.overload
+    def set(self, key: Key, value: sym.EquirectangularCameraCal) -> bool:
         """
-    @linear_solver_ordering.setter
-    def linear_solver_ordering(self, arg0: numpy.ndarray) -> None: ...
-    @property
-    def status(self) -> lcmtypes.sym._optimization_status_t.optimization_status_t:
+        Add or update a value by key. Returns true if added, false if updated.
         """
-        What was the result of the optimization? (did it converge, fail, etc.)
+    @typing.overload
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.EquirectangularCameraCal
+    ) -> None:
         """
-    @status.setter
-    def status(self, arg0: lcmtypes.sym._optimization_status_t.optimization_status_t) -> None: ...
-
-class Optimizer:
-    """
-    Class for optimizing a nonlinear least-squares problem specified as a list of Factors. For efficient use, create once and call Optimize() multiple times with different initial guesses, as long as the factors remain constant and the structure of the Values is identical.
-    """
-    def __init__(
-        self,
-        params: lcmtypes.sym._optimizer_params_t.optimizer_params_t,
-        factors: list[Factor],
-        name: str = "sym::Optimize",
-        keys: list[Key] = [],
-        epsilon: float = 2.220446049250313e-15,
-    ) -> None: ...
-    def compute_all_covariances(self, linearization: Linearization) -> dict[Key, numpy.ndarray]:
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
-        Get covariances for each optimized key at the given linearization
-
-        May not be called before either optimize or linearize has been called.
+    @typing.overload
+    def set(self, key: Key, value: sym.LinearCameraCal) -> bool:
         """
-    def compute_covariances(
-        self, linearization: Linearization, keys: list[Key]
-    ) -> dict[Key, numpy.ndarray]:
+        Add or update a value by key. Returns true if added, false if updated.
         """
-        Get covariances for the given subset of keys at the given linearization
-
-        This version is potentially much more efficient than computing the covariances for all
-        keys in the problem.
-
-        Currently requires that `keys` corresponds to a set of keys at the start of the list of keys
-        for the full problem, and in the same order.  It uses the Schur complement trick, so will be
-        most efficient if the hessian is of the following form, with C block diagonal::
-
-            A = ( B    E )
-                ( E^T  C )
+    @typing.overload
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.LinearCameraCal
+    ) -> None:
         """
-    def compute_full_covariance(self, linearization: Linearization) -> numpy.ndarray:
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
-        Get the full problem covariance at the given linearization
-
-        Unlike compute_covariance and compute_all_covariances, this includes the off-diagonal
-        blocks, i.e. the cross-covariances between different keys.
-
-        The ordering of entries here is the same as the ordering of the keys in the linearization,
-        which can be accessed via linearization_index().
-
-        May not be called before either optimize or linearize has been called.
+    @typing.overload
+    def set(self, key: Key, value: sym.PolynomialCameraCal) -> bool:
         """
-    def factors(self) -> list[Factor]:
+        Add or update a value by key. Returns true if added, false if updated.
         """
-        Get the factors.
+    @typing.overload
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.PolynomialCameraCal
+    ) -> None:
         """
-    def keys(self) -> list[Key]:
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
-        Get the optimized keys.
+    @typing.overload
+    def set(self, key: Key, value: sym.SphericalCameraCal) -> bool:
         """
-    def linearization_index(self) -> dict: ...
-    def linearization_index_entry(self, key: Key) -> lcmtypes.sym._index_entry_t.index_entry_t: ...
-    def linearize(self, values: Values) -> Linearization:
+        Add or update a value by key. Returns true if added, false if updated.
         """
-        Linearize the problem around the given values.
+    @typing.overload
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.SphericalCameraCal
+    ) -> None:
+        """
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
     @typing.overload
-    def optimize(
-        self, values: Values, num_iterations: int = -1, populate_best_linearization: bool = False
-    ) -> OptimizationStats:
+    def set(self, key: Key, value: sym.OrthographicCameraCal) -> bool:
         """
-        Optimize the given values in-place
-
-        Args:
-          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction.
-
-          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats.
-
-        Returns:
-            The optimization stats
+        Add or update a value by key. Returns true if added, false if updated.
         """
     @typing.overload
-    def optimize(
-        self,
-        values: Values,
-        num_iterations: int,
-        populate_best_linearization: bool,
-        stats: OptimizationStats,
+    def set(
+        self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: sym.OrthographicCameraCal
     ) -> None:
         """
-        Optimize the given values in-place
-
-        This overload takes the stats as an argument, and stores into there.  This allows users to
-        avoid reallocating memory for any of the entries in the stats, for use cases where that's
-        important.  If passed, stats must not be None.
-
-        Args:
-          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
-
-          populate_best_linearization: If true, the linearization at the best values will be filled out in the stats
-
-          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
     @typing.overload
-    def optimize(self, values: Values, num_iterations: int, stats: OptimizationStats) -> None:
+    def set(self, key: Key, value: numpy.ndarray) -> bool:
         """
-        Optimize the given values in-place
-
-        This overload takes the stats as an argument, and stores into there.  This allows users to
-        avoid reallocating memory for any of the entries in the stats, for use cases where that's
-        important.  If passed, stats must not be None.
-
-        Args:
-          num_iterations: If < 0 (the default), uses the number of iterations specified by the params at construction
-
-          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+        Add or update a value by key. Returns true if added, false if updated.
         """
     @typing.overload
-    def optimize(self, values: Values, stats: OptimizationStats) -> None:
+    def set(self, key: lcmtypes.sym._index_entry_t.index_entry_t, value: numpy.ndarray) -> None:
         """
-        Optimize the given values in-place
-
-        This overload takes the stats as an argument, and stores into there.  This allows users to
-        avoid reallocating memory for any of the entries in the stats, for use cases where that's
-        important.  If passed, stats must not be None.
+        Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
+        """
+    def set_data(self, data: numpy.ndarray) -> None:
+        """
+        Overwrite the raw data buffer with data, updating all stored values in one call.
 
         Args:
-          stats: An OptimizationStats to fill out with the result - if filling out dynamically allocated fields here, will not reallocate if memory is already allocated in the required shape (e.g. for repeated calls to Optimize)
+            data: New contents of the data buffer - MUST be the same length as data()
         """
-    def update_params(self, params: lcmtypes.sym._optimizer_params_t.optimizer_params_t) -> None:
+    def to_float32(self) -> Valuesf:
         """
-        Update the optimizer params.
+        Cast to a Valuesf, with single precision storage (returns a copy).
         """
-
-class PreintegratedImuMeasurements:
-    """
-    Struct of Preintegrated IMU Measurements (not including the covariance of change in orientation, velocity, and position).
-    """
-    class Delta:
+    @typing.overload
+    def update(self, index: lcmtypes.sym._index_t.index_t, other: Values) -> None:
         """
-        A convenient struct that holds the Preintegrated delta.
+        Efficiently update the keys given by this index from other into this. This purely copies slices of the data arrays, the index MUST be valid for both objects!
         """
-
-        DR: sym.Rot3
-        Dp: numpy.ndarray
-        Dt: float
-        Dv: numpy.ndarray
-        @staticmethod
-        def from_lcm(
-            arg0: lcmtypes.sym._imu_integrated_measurement_delta_t.imu_integrated_measurement_delta_t,
-        ) -> PreintegratedImuMeasurements.Delta: ...
-        def get_lcm_type(
-            self,
-        ) -> (
-            lcmtypes.sym._imu_integrated_measurement_delta_t.imu_integrated_measurement_delta_t
-        ): ...
-        def roll_forward_state(
-            self, pose_i: sym.Pose3, vel_i: numpy.ndarray, gravity: numpy.ndarray
-        ) -> tuple[sym.Pose3, numpy.ndarray]: ...
-
-    DR_D_gyro_bias: numpy.ndarray
-    Dp_D_accel_bias: numpy.ndarray
-    Dp_D_gyro_bias: numpy.ndarray
-    Dv_D_accel_bias: numpy.ndarray
-    Dv_D_gyro_bias: numpy.ndarray
-    accel_bias: numpy.ndarray
-    delta: PreintegratedImuMeasurements.Delta
-    gyro_bias: numpy.ndarray
-    @staticmethod
-    def from_lcm(
-        arg0: lcmtypes.sym._imu_integrated_measurement_t.imu_integrated_measurement_t,
-    ) -> PreintegratedImuMeasurements: ...
-    def __init__(self, accel_bias: numpy.ndarray, gyro_bias: numpy.ndarray) -> None: ...
-    def get_bias_corrected_delta(
-        self, new_accel_bias: numpy.ndarray, new_gyro_bias: numpy.ndarray
-    ) -> PreintegratedImuMeasurements.Delta: ...
-    def get_lcm_type(
+    @typing.overload
+    def update(
         self,
-    ) -> lcmtypes.sym._imu_integrated_measurement_t.imu_integrated_measurement_t: ...
+        index_this: lcmtypes.sym._index_t.index_t,
+        index_other: lcmtypes.sym._index_t.index_t,
+        other: Values,
+    ) -> None:
+        """
+        Efficiently update the keys from a different structured Values, given by this index and other index. This purely copies slices of the data arrays. index_this MUST be valid for this object; index_other MUST be valid for other object.
+        """
+    def update_or_set(self, index: lcmtypes.sym._index_t.index_t, other: Values) -> None:
+        """
+        Update or add keys to this Values base on other Values of different structure.
+        index MUST be valid for other.
 
-class Values:
-    """
-    Efficient polymorphic data structure to store named types with a dict-like interface and
-    support efficient repeated operations using a key index. Supports on-manifold optimization.
+        NOTE(alvin): it is less efficient than the Update methods below if index objects are created and cached. This method performs map lookup for each key of the index
+        """
 
-    Compatible types are given by the type_t enum. All types implement the StorageOps and
-    LieGroupOps concepts, which are the core operating mechanisms in this class.
+class Valuesf:
+    """
+    Values with single precision storage, for use with Optimizerf.  Otherwise the same as Values.
     """
     def __getstate__(self) -> bytes: ...
     @typing.overload
@@ -518,10 +3110,15 @@ class Values:
         Default construct as empty.
         """
     @typing.overload
-    def __init__(self, msg: lcmtypes.sym._values_t.values_t) -> None:
+    def __init__(self, msg: lcmtypes.sym._valuesf_t.valuesf_t) -> None:
         """
         Construct from serialized form.
         """
+    @typing.overload
+    def __init__(self, other: Valuesf) -> None:
+        """
+        Construct as a copy of other.
+        """
     def __repr__(self) -> str: ...
     def __setstate__(self, arg0: bytes) -> None: ...
     @typing.overload
@@ -572,11 +3169,18 @@ class Values:
         """
         Raw data buffer.
         """
+    def data_view(self) -> numpy.ndarray:
+        """
+        Raw data buffer, as a numpy array viewing the storage of this Values (no copy).
+
+        Writing to the array updates the stored values in place.  The array keeps this Values
+        alive, but is INVALIDATED if a key is added, or if remove_all() or cleanup() is called.
+        """
     def empty(self) -> bool:
         """
         Has zero keys.
         """
-    def get_lcm_type(self, sort_keys: bool = False) -> lcmtypes.sym._values_t.values_t:
+    def get_lcm_type(self, sort_keys: bool = False) -> lcmtypes.sym._valuesf_t.valuesf_t:
         """
         Serialize to LCM.
         """
@@ -596,7 +3200,7 @@ class Values:
             sort_by_offset: Sorts by storage order to make iteration safer and more memory efficient
         """
     def local_coordinates(
-        self, others: Values, index: lcmtypes.sym._index_t.index_t, epsilon: float
+        self, others: Valuesf, index: lcmtypes.sym._index_t.index_t, epsilon: float
     ) -> numpy.ndarray:
         """
         Express this Values in the local coordinate of others Values, i.e., this \\ominus others
@@ -784,8 +3388,19 @@ class Values:
         """
         Update a value by index entry with no map lookup (compared to Set(key)). This does NOT add new values and assumes the key exists already.
         """
+    def set_data(self, data: numpy.ndarray) -> None:
+        """
+        Overwrite the raw data buffer with data, updating all stored values in one call.
+
+        Args:
+            data: New contents of the data buffer - MUST be the same length as data()
+        """
+    def to_float64(self) -> Values:
+        """
+        Cast to a Values, with double precision storage (returns a copy).
+        """
     @typing.overload
-    def update(self, index: lcmtypes.sym._index_t.index_t, other: Values) -> None:
+    def update(self, index: lcmtypes.sym._index_t.index_t, other: Valuesf) -> None:
         """
         Efficiently update the keys given by this index from other into this. This purely copies slices of the data arrays, the index MUST be valid for both objects!
         """
@@ -794,12 +3409,12 @@ class Values:
         self,
         index_this: lcmtypes.sym._index_t.index_t,
         index_other: lcmtypes.sym._index_t.index_t,
-        other: Values,
+        other: Valuesf,
     ) -> None:
         """
         Efficiently update the keys from a different structured Values, given by this index and other index. This purely copies slices of the data arrays. index_this MUST be valid for this object; index_other MUST be valid for other object.
         """
-    def update_or_set(self, index: lcmtypes.sym._index_t.index_t, other: Values) -> None:
+    def update_or_set(self, index: lcmtypes.sym._index_t.index_t, other: Valuesf) -> None:
         """
         Update or add keys to this Values base on other Values of different structure.
         index MUST be valid for other.
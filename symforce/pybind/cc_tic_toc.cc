@@ -0,0 +1,55 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include "./cc_tic_toc.h"
+
+#include <pybind11/stl.h>
+
+#include <symforce/opt/internal/tic_toc.h>
+
+namespace py = pybind11;
+
+namespace sym {
+
+void AddTicTocWrapper(pybind11::module_ module) {
+  py::class_<internal::TicTocStats>(module, "TicTocStats",
+                                    "Accumulated timings of the calls to a timed scope.")
+      .def_property_readonly("count", &internal::TicTocStats::Count, "The number of calls.")
+      .def_property_readonly("total_time", &internal::TicTocStats::TotalTime,
+                             "The total time of all the calls, in seconds.")
+      .def_property_readonly("mean_time", &internal::TicTocStats::AverageTime,
+                             "The mean time of a call, in seconds.")
+      .def_property_readonly("min_time", &internal::TicTocStats::MinTime,
+                             "The shortest time of a call, in seconds.")
+      .def_property_readonly("max_time", &internal::TicTocStats::MaxTime,
+                             "The longest time of a call, in seconds.");
+
+  py::class_<internal::TicTocEvent>(module, "TicTocEvent", "One call to a timed scope.")
+      .def_readonly("name", &internal::TicTocEvent::name, "The name of the scope.")
+      .def_readonly("start", &internal::TicTocEvent::start,
+                    "The start of the call, in seconds since the recorder started.")
+      .def_readonly("duration", &internal::TicTocEvent::duration,
+                    "The duration of the call, in seconds.");
+
+  py::class_<internal::TicTocRecorder>(
+      module, "TicTocRecorder",
+      "Records the timed scopes of the C++ code which end on one thread between calls to start() "
+      "and stop().  Recorders may be nested, but must be stopped in the reverse order they were "
+      "started.")
+      .def(py::init<bool>(), py::arg("record_timeline") = false,
+           "If record_timeline is True, also records every call to each scope, see timeline().")
+      .def("start", &internal::TicTocRecorder::Start,
+           "Start recording on the calling thread, clearing anything recorded before.")
+      .def("stop", &internal::TicTocRecorder::Stop,
+           "Stop recording.  Must be called on the thread which called start().")
+      .def("is_recording", &internal::TicTocRecorder::IsRecording)
+      .def("blocks", &internal::TicTocRecorder::Blocks,
+           "Get a copy of the stats of each scope which ended while recording.")
+      .def("timeline", &internal::TicTocRecorder::Timeline,
+           "Get a copy of every call to a scope which ended while recording, in the order they "
+           "ended, if record_timeline is True.");
+}
+
+}  // namespace sym
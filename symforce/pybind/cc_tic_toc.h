@@ -0,0 +1,14 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#pragma once
+
+#include <pybind11/pybind11.h>
+
+namespace sym {
+
+void AddTicTocWrapper(pybind11::module_ module);
+
+}
@@ -13,6 +13,7 @@
 #include <fmt/format.h>
 #include <fmt/ostream.h>
 #include <pybind11/eigen.h>
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -35,30 +36,30 @@ namespace py = pybind11;
 namespace sym {
 
 //================================================================================================//
-//---------------------------- Helpers for wrapping sym::Valuesd ---------------------------------//
+//------------------------ Helpers for wrapping sym::Values<Scalar> ------------------------------//
 //================================================================================================//
 
 /**
  * Calls v.At<T>(index_entry) and casts the return value to a py::object.
  *
- * This function exists so that all template specializations of Valuesd::At<T>
+ * This function exists so that all template specializations of Values<Scalar>::At<T>
  * can be referenced with a common signature (to ease python wrapping).
  */
-template <typename T>
-py::object PyAt(const sym::Valuesd& v, const sym::index_entry_t& index_entry) {
-  return py::cast(v.At<T>(index_entry));
+template <typename T, typename Scalar = typename sym::StorageOps<T>::Scalar>
+py::object PyAt(const sym::Values<Scalar>& v, const sym::index_entry_t& index_entry) {
+  return py::cast(v.template At<T>(index_entry));
 }
 
 template <typename Scalar>
-py::object PyAtMatrix(const sym::Valuesd& v, const sym::index_entry_t& index_entry) {
+py::object PyAtMatrix(const sym::Values<Scalar>& v, const sym::index_entry_t& index_entry) {
   const auto [rows, cols] = EigenTypeShape(index_entry.type);
   if (rows == 1 || cols == 1) {
     return py::cast(
-        Eigen::Map<const Eigen::VectorXd>(v.Data().data() + index_entry.offset, rows * cols),
+        Eigen::Map<const VectorX<Scalar>>(v.Data().data() + index_entry.offset, rows * cols),
         py::return_value_policy::copy);
   } else {
     return py::cast(
-        Eigen::Map<const Eigen::MatrixXd>(v.Data().data() + index_entry.offset, rows, cols),
+        Eigen::Map<const MatrixX<Scalar>>(v.Data().data() + index_entry.offset, rows, cols),
         py::return_value_policy::copy);
   }
 }
@@ -66,7 +67,8 @@ py::object PyAtMatrix(const sym::Valuesd& v, const sym::index_entry_t& index_ent
 /**
  * Has signature
  * template <typename Scalar>
- * py::object DynamicPyAt(const type_t type, const Valuesd& v, const index_entry_t& index_entry);
+ * py::object DynamicPyAt(const type_t type, const Values<Scalar>& v,
+ *                        const index_entry_t& index_entry);
  *
  * For supported types (see macro definition), identifies the type T represented by type, then
  * returns PyAt<T>(v, index_entry).
@@ -79,8 +81,9 @@ BY_TYPE_HELPER(DynamicPyAt, PyAt, PyAtMatrix)
  * Dynamically identifies the type T stored in v at index_entry, then returns
  * v.At<T>(index_entry) casted to a py::object.
  */
-py::object ValuesAtIndexEntry(const sym::Valuesd& v, const sym::index_entry_t& index_entry) {
-  return DynamicPyAt<double>(index_entry.type, v, index_entry);
+template <typename Scalar>
+py::object ValuesAtIndexEntry(const sym::Values<Scalar>& v, const sym::index_entry_t& index_entry) {
+  return DynamicPyAt<Scalar>(index_entry.type, v, index_entry);
 }
 
 /**
@@ -91,125 +94,161 @@ py::object ValuesAtIndexEntry(const sym::Valuesd& v, const sym::index_entry_t& i
  * Precondition:
  * A value in v has Key key
  */
-py::object ValuesAt(const sym::Valuesd& v, const sym::Key& key) {
+template <typename Scalar>
+py::object ValuesAt(const sym::Values<Scalar>& v, const sym::Key& key) {
   sym::index_entry_t index_entry = v.IndexEntryAt(key);
   return ValuesAtIndexEntry(v, index_entry);
 }
 
 /**
- * Registers the set methods of Valuesd with a python wrapper of the class for the template
+ * Registers the set methods of Values<Scalar> with a python wrapper of the class for the template
  * specializations of T.
  *
- * This function enables v.set(ob) to work for v an instance of a wrapped Valuesd class, and ob
+ * This function enables v.set(ob) to work for v an instance of a wrapped Values class, and ob
  * an instance of a class which can be casted to a T by pybind11.
  */
-template <typename T>
-void RegisterTypeWithValues(py::class_<sym::Valuesd> cls) {
-  cls.def("set", py::overload_cast<const sym::Key&, const T&>(&sym::Valuesd::Set<T>),
+template <typename T, typename Scalar>
+void RegisterTypeWithValues(py::class_<sym::Values<Scalar>> cls) {
+  cls.def("set",
+          py::overload_cast<const sym::Key&, const T&>(&sym::Values<Scalar>::template Set<T>),
           py::arg("key"), py::arg("value"),
           "Add or update a value by key. Returns true if added, false if updated.");
-  cls.def("set", py::overload_cast<const sym::index_entry_t&, const T&>(&sym::Valuesd::Set<T>),
-          py::arg("key"), py::arg("value"),
-          "Update a value by index entry with no map lookup (compared to Set(key)). This does NOT "
-          "add new values and assumes the key exists already.");
+  cls.def(
+      "set",
+      py::overload_cast<const sym::index_entry_t&, const T&>(&sym::Values<Scalar>::template Set<T>),
+      py::arg("key"), py::arg("value"),
+      "Update a value by index entry with no map lookup (compared to Set(key)). This does NOT "
+      "add new values and assumes the key exists already.");
 }
 
-template <typename Tuple>
-void RegisterTupleTypesWithValuesHelperImpl(py::class_<sym::Valuesd> /* cls */) {}
+template <typename Tuple, typename Scalar>
+void RegisterTupleTypesWithValuesHelperImpl(py::class_<sym::Values<Scalar>> /* cls */) {}
 
-template <typename Tuple, std::size_t First, std::size_t... Rest>
-void RegisterTupleTypesWithValuesHelperImpl(py::class_<sym::Valuesd> cls) {
+template <typename Tuple, std::size_t First, std::size_t... Rest, typename Scalar>
+void RegisterTupleTypesWithValuesHelperImpl(py::class_<sym::Values<Scalar>> cls) {
   RegisterTypeWithValues<typename std::tuple_element<First, Tuple>::type>(cls);
   RegisterTupleTypesWithValuesHelperImpl<Tuple, Rest...>(cls);
 }
 
-template <typename Tuple, std::size_t... Is>
-void RegisterTupleTypesWithValuesHelper(py::class_<sym::Valuesd> cls, std::index_sequence<Is...>) {
+template <typename Tuple, typename Scalar, std::size_t... Is>
+void RegisterTupleTypesWithValuesHelper(py::class_<sym::Values<Scalar>> cls,
+                                        std::index_sequence<Is...>) {
   RegisterTupleTypesWithValuesHelperImpl<Tuple, Is...>(cls);
 }
 
-template <typename Tuple>
-void RegisterTupleTypesWithValues(py::class_<sym::Valuesd> cls) {
+template <typename Tuple, typename Scalar>
+void RegisterTupleTypesWithValues(py::class_<sym::Values<Scalar>> cls) {
   RegisterTupleTypesWithValuesHelper<Tuple>(
       cls, std::make_index_sequence<std::tuple_size<Tuple>::value>{});
 }
 
 /**
- * Calls RegisterTypeWithValues<Eigen::Matrix<double, n, m>>(cls) for
+ * Calls RegisterTypeWithValues<Eigen::Matrix<Scalar, n, m>>(cls) for
  * all n in [1, N] and m in [1, M]
  */
-template <int N, int M>
+template <typename Scalar, int N, int M>
 struct RegisterMatricesHelper {
-  static void Register(py::class_<sym::Valuesd> cls) {
-    RegisterTypeWithValues<Eigen::Matrix<double, N, M>>(cls);
+  static void Register(py::class_<sym::Values<Scalar>> cls) {
+    RegisterTypeWithValues<Eigen::Matrix<Scalar, N, M>>(cls);
     if (N != M) {
-      RegisterTypeWithValues<Eigen::Matrix<double, M, N>>(cls);
+      RegisterTypeWithValues<Eigen::Matrix<Scalar, M, N>>(cls);
     }
-    RegisterMatricesHelper<N - 1, M>::Register(cls);
+    RegisterMatricesHelper<Scalar, N - 1, M>::Register(cls);
   }
 };
 
-template <int M>
-struct RegisterMatricesHelper<0, M> {
-  static void Register(py::class_<sym::Valuesd> cls) {
-    RegisterMatricesHelper<M - 1, M - 1>::Register(cls);
+template <typename Scalar, int M>
+struct RegisterMatricesHelper<Scalar, 0, M> {
+  static void Register(py::class_<sym::Values<Scalar>> cls) {
+    RegisterMatricesHelper<Scalar, M - 1, M - 1>::Register(cls);
   }
 };
 
-template <>
-struct RegisterMatricesHelper<0, 1> {
-  static void Register(py::class_<sym::Valuesd> /* cls */) {}
+template <typename Scalar>
+struct RegisterMatricesHelper<Scalar, 0, 1> {
+  static void Register(py::class_<sym::Values<Scalar>> /* cls */) {}
 };
 
 /**
- * Calls RegisterTypeWithValues<Eigen::Matrix<double< n, m>>(cls) for all
+ * Calls RegisterTypeWithValues<Eigen::Matrix<Scalar, n, m>>(cls) for all
  * n, m in [1, SquareSize]
  */
-template <int SquareSize>
-constexpr void RegisterMatrices(py::class_<sym::Valuesd>& cls) {
-  RegisterMatricesHelper<SquareSize, SquareSize>::Register(cls);
+template <int SquareSize, typename Scalar>
+constexpr void RegisterMatrices(py::class_<sym::Values<Scalar>>& cls) {
+  RegisterMatricesHelper<Scalar, SquareSize, SquareSize>::Register(cls);
 }
 
 //================================================================================================//
 //-------------------------------- The Public Values Wrapper -------------------------------------//
 //================================================================================================//
 
-void AddValuesWrapper(pybind11::module_ module) {
-  auto values_class = py::class_<sym::Valuesd>(module, "Values", R"(
-    Efficient polymorphic data structure to store named types with a dict-like interface and
-    support efficient repeated operations using a key index. Supports on-manifold optimization.
+/**
+ * Add the Python class for Values<Scalar>, with the given name and docstring
+ */
+template <typename Scalar>
+py::class_<sym::Values<Scalar>> AddValuesClass(pybind11::module_ module, const char* const name,
+                                               const char* const doc) {
+  using ValuesT = sym::Values<Scalar>;
 
-    Compatible types are given by the type_t enum. All types implement the StorageOps and
-    LieGroupOps concepts, which are the core operating mechanisms in this class.
-  )");
+  auto values_class = py::class_<ValuesT>(module, name, doc);
   values_class.def(py::init<>(), "Default construct as empty.")
-      .def(py::init<const sym::values_t&>(), py::arg("msg"), "Construct from serialized form.")
-      .def("has", &sym::Valuesd::Has, py::arg("key"), "Return whether the key exists.")
-      .def("at", &ValuesAt, py::arg("key"), "Retrieve a value by key.")
-      .def("update_or_set", &sym::Valuesd::UpdateOrSet, py::arg("index"), py::arg("other"), R"(
+      .def(py::init<const typename ValuesT::LcmType&>(), py::arg("msg"),
+           "Construct from serialized form.")
+      .def(py::init<const ValuesT&>(), py::arg("other"), "Construct as a copy of other.")
+      .def("has", &ValuesT::Has, py::arg("key"), "Return whether the key exists.")
+      .def("at", &ValuesAt<Scalar>, py::arg("key"), "Retrieve a value by key.")
+      .def("update_or_set", &ValuesT::UpdateOrSet, py::arg("index"), py::arg("other"), R"(
           Update or add keys to this Values base on other Values of different structure.
           index MUST be valid for other.
 
           NOTE(alvin): it is less efficient than the Update methods below if index objects are created and cached. This method performs map lookup for each key of the index
       )")
-      .def("num_entries", &sym::Valuesd::NumEntries, "Number of keys.")
-      .def("empty", &sym::Valuesd::Empty, "Has zero keys.")
-      .def("keys", &sym::Valuesd::Keys, py::arg("sort_by_offset") = true, R"(
+      .def("num_entries", &ValuesT::NumEntries, "Number of keys.")
+      .def("empty", &ValuesT::Empty, "Has zero keys.")
+      .def("keys", &ValuesT::Keys, py::arg("sort_by_offset") = true, R"(
           Get all keys.
 
           Args:
               sort_by_offset: Sorts by storage order to make iteration safer and more memory efficient
       )")
-      .def("items", &sym::Valuesd::Items, "Expose map type to allow iteration.")
-      .def("data", py::overload_cast<>(&sym::Valuesd::Data, py::const_), "Raw data buffer.")
-      .def("remove", &sym::Valuesd::Remove, py::arg("key"), R"(
+      .def("items", &ValuesT::Items, "Expose map type to allow iteration.")
+      .def("data", py::overload_cast<>(&ValuesT::Data, py::const_), "Raw data buffer.")
+      .def(
+          "data_view",
+          [](py::object self) {
+            ValuesT& v = self.cast<ValuesT&>();
+            return py::array_t<Scalar>(v.Data().size(), v.Data().data(), self);
+          },
+          R"(
+          Raw data buffer, as a numpy array viewing the storage of this Values (no copy).
+
+          Writing to the array updates the stored values in place.  The array keeps this Values
+          alive, but is INVALIDATED if a key is added, or if remove_all() or cleanup() is called.
+      )")
+      .def(
+          "set_data",
+          [](ValuesT& v, const Eigen::Ref<const VectorX<Scalar>>& data) {
+            if (data.size() != static_cast<Eigen::Index>(v.Data().size())) {
+              throw std::runtime_error(fmt::format(
+                  "The length of data [{}] must match the length of the data buffer [{}]",
+                  data.size(), v.Data().size()));
+            }
+            std::copy(data.data(), data.data() + data.size(), v.Data().begin());
+          },
+          py::arg("data"), R"(
+          Overwrite the raw data buffer with data, updating all stored values in one call.
+
+          Args:
+              data: New contents of the data buffer - MUST be the same length as data()
+      )")
+      .def("remove", &ValuesT::Remove, py::arg("key"), R"(
           Remove the given key. Only removes the index entry, does not change the data array.
           Returns true if removed, false if already not present.
 
           Call cleanup() to re-pack the data array.
       )")
-      .def("remove_all", &sym::Valuesd::RemoveAll, "Remove all keys and empty out the storage.")
-      .def("cleanup", &sym::Valuesd::Cleanup, R"(
+      .def("remove_all", &ValuesT::RemoveAll, "Remove all keys and empty out the storage.")
+      .def("cleanup", &ValuesT::Cleanup, R"(
           Repack the data array to get rid of empty space from removed keys. If regularly removing
           keys, it's up to the user to call this appropriately to avoid storage growth. Returns the
           number of Scalar elements cleaned up from the data array.
@@ -217,7 +256,7 @@ void AddValuesWrapper(pybind11::module_ module) {
           It will INVALIDATE all indices, offset increments, and pointers.
           Re-create an index with create_index().
       )")
-      .def("create_index", py::overload_cast<bool>(&sym::Valuesd::CreateIndex, py::const_),
+      .def("create_index", py::overload_cast<bool>(&ValuesT::CreateIndex, py::const_),
            py::arg("sort_by_offset"), R"(
           Create an index for all keys in this Values. This object can then be used
           for repeated efficient operations.
@@ -230,7 +269,7 @@ void AddValuesWrapper(pybind11::module_ module) {
             2) Cleanup() is called to re-pack the data array
       )")
       .def("create_index",
-           py::overload_cast<const std::vector<Key>&>(&sym::Valuesd::CreateIndex, py::const_),
+           py::overload_cast<const std::vector<Key>&>(&ValuesT::CreateIndex, py::const_),
            py::arg("keys"), R"(
           Create an index from the given ordered subset of keys. This object can then be used
           for repeated efficient operations on that subset of keys.
@@ -241,24 +280,23 @@ void AddValuesWrapper(pybind11::module_ module) {
             1) remove() is called with a contained key, or remove_all() is called
             2) cleanup() is called to re-pack the data array
       )")
-      .def("at", &ValuesAtIndexEntry, py::arg("entry"),
+      .def("at", &ValuesAtIndexEntry<Scalar>, py::arg("entry"),
            "Retrieve a value by index entry. This avoids a map lookup compared to at(key).")
-      .def("update",
-           py::overload_cast<const sym::index_t&, const sym::Valuesd&>(&sym::Valuesd::Update),
+      .def("update", py::overload_cast<const sym::index_t&, const ValuesT&>(&ValuesT::Update),
            py::arg("index"), py::arg("other"),
            "Efficiently update the keys given by this index from other into this. This purely "
            "copies slices of the data arrays, the index MUST be valid for both objects!")
       .def("update",
-           py::overload_cast<const sym::index_t&, const sym::index_t&, const sym::Valuesd&>(
-               &sym::Valuesd::Update),
+           py::overload_cast<const sym::index_t&, const sym::index_t&, const ValuesT&>(
+               &ValuesT::Update),
            py::arg("index_this"), py::arg("index_other"), py::arg("other"),
            "Efficiently update the keys from a different structured Values, given by this index "
            "and other index. This purely copies slices of the data arrays. index_this MUST be "
            "valid for this object; index_other MUST be valid for other object.")
       .def(
           "retract",
-          [](sym::Valuesd& v, const sym::index_t& index, const std::vector<double>& delta,
-             const double epsilon) {
+          [](ValuesT& v, const sym::index_t& index, const std::vector<Scalar>& delta,
+             const Scalar epsilon) {
             if (index.tangent_dim != static_cast<int>(delta.size())) {
               throw std::runtime_error(
                   fmt::format("The length of delta [{}] must match index.tangent_dim [{}]",
@@ -274,8 +312,8 @@ void AddValuesWrapper(pybind11::module_ module) {
                   delta: Update vector - MUST be the size of index.tangent_dim!
                   epsilon: Small constant to avoid singularities (do not use zero)
           )")
-      .def("local_coordinates", &sym::Valuesd::LocalCoordinates, py::arg("others"),
-           py::arg("index"), py::arg("epsilon"), R"(
+      .def("local_coordinates", &ValuesT::LocalCoordinates, py::arg("others"), py::arg("index"),
+           py::arg("epsilon"), R"(
           Express this Values in the local coordinate of others Values, i.e., this \ominus others
 
           Args:
@@ -283,12 +321,11 @@ void AddValuesWrapper(pybind11::module_ module) {
               index: Ordered list of keys to include (MUST be valid for both this and others Values)
               epsilon: Small constant to avoid singularities (do not use zero)
            )")
-      .def("get_lcm_type", &sym::Valuesd::GetLcmType, py::arg("sort_keys") = false,
-           "Serialize to LCM.")
-      .def("__repr__", [](const sym::Valuesd& values) { return fmt::format("{}", values); })
+      .def("get_lcm_type", &ValuesT::GetLcmType, py::arg("sort_keys") = false, "Serialize to LCM.")
+      .def("__repr__", [](const ValuesT& values) { return fmt::format("{}", values); })
       .def(py::pickle(
-          [](const sym::Valuesd& values) {  //  __getstate__
-            const sym::values_t lcm_values = values.GetLcmType();
+          [](const ValuesT& values) {  //  __getstate__
+            const typename ValuesT::LcmType lcm_values = values.GetLcmType();
             const auto encoded_size = lcm_values.getEncodedSize();
             std::vector<char> buffer(encoded_size);
             const auto encoded_bytes = lcm_values.encode(buffer.data(), 0, encoded_size);
@@ -299,19 +336,38 @@ void AddValuesWrapper(pybind11::module_ module) {
           },
           [](py::bytes state) {  // __setstate__
             const std::string buffer = state.cast<std::string>();
-            sym::values_t lcm_values;
+            typename ValuesT::LcmType lcm_values;
             const auto decoded_bytes = lcm_values.decode(buffer.data(), 0, buffer.size());
             if (decoded_bytes < 0) {
               throw std::runtime_error("An error occured while decoding a Values object.");
             }
-            return sym::Valuesd(lcm_values);
+            return ValuesT(lcm_values);
           }));
-  RegisterTypeWithValues<double>(values_class);
-  RegisterTupleTypesWithValues<AllGeoTypes<double>>(values_class);
-  RegisterTupleTypesWithValues<AllCamTypes<double>>(values_class);
+  RegisterTypeWithValues<Scalar>(values_class);
+  RegisterTupleTypesWithValues<AllGeoTypes<Scalar>>(values_class);
+  RegisterTupleTypesWithValues<AllCamTypes<Scalar>>(values_class);
   // The template paramater below is 9 because all (and only) matrices up to size 9x9 are supported
   // by sym::Values.
   RegisterMatrices<9>(values_class);
+  return values_class;
+}
+
+void AddValuesWrapper(pybind11::module_ module) {
+  auto values_class = AddValuesClass<double>(module, "Values", R"(
+    Efficient polymorphic data structure to store named types with a dict-like interface and
+    support efficient repeated operations using a key index. Supports on-manifold optimization.
+
+    Compatible types are given by the type_t enum. All types implement the StorageOps and
+    LieGroupOps concepts, which are the core operating mechanisms in this class.
+  )");
+  auto valuesf_class = AddValuesClass<float>(module, "Valuesf", R"(
+    Values with single precision storage, for use with Optimizerf.  Otherwise the same as Values.
+  )");
+
+  values_class.def("to_float32", &sym::Valuesd::Cast<float>,
+                   "Cast to a Valuesf, with single precision storage (returns a copy).");
+  valuesf_class.def("to_float64", &sym::Valuesf::Cast<double>,
+                    "Cast to a Values, with double precision storage (returns a copy).");
 }
 
 }  // namespace sym
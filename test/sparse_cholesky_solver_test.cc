@@ -6,6 +6,8 @@
 // Enable Eigen LGPL code only here, for comparison.
 #undef EIGEN_MPL2_ONLY
 
+#include <array>
+
 // Required by MetisSupport
 #include <iostream>
 
@@ -18,6 +20,8 @@
 #include <catch2/catch_test_macros.hpp>
 
 #include <sym/ops/storage_ops.h>
+#include <symforce/opt/internal/selected_inverse.h>
+#include <symforce/opt/sparse_cholesky/orderings.h>
 #include <symforce/opt/sparse_cholesky/sparse_cholesky_solver.h>
 #include <symforce/opt/tic_toc.h>
 
@@ -183,3 +187,196 @@ TEST_CASE("Make sure solving in place works", "[sparse_cholesky]") {
   CHECK(x_ac.cols() == x_eigen.cols());
   CHECK(x_ac.isApprox(x_eigen, 1e-6));
 }
+
+TEST_CASE("Symbolic factorizations are reused from the cache", "[sparse_cholesky]") {
+  constexpr int dim = 100;
+  std::mt19937 gen(42);
+
+  const SparseMatrix A = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const SparseMatrix B = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const SparseMatrix C = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const Eigen::VectorXd b = sym::Random<Eigen::Matrix<double, dim, 1>>(gen);
+
+  using Solver = sym::SparseCholeskySolver<SparseMatrix>;
+  auto cache = std::make_shared<Solver::SymbolicFactorizationCacheType>(2);
+
+  int num_orderings = 0;
+  const Solver::Ordering ordering = [&num_orderings](const SparseMatrix& mat,
+                                                     Solver::PermutationMatrixType& permutation) {
+    num_orderings++;
+    Eigen::MetisOrdering<SparseMatrix::StorageIndex>()(mat, permutation);
+  };
+
+  Solver first_solver(ordering);
+  first_solver.SetSymbolicFactorizationCache(cache);
+  first_solver.ComputeSymbolicSparsity(A);
+  CHECK(num_orderings == 1);
+  CHECK(cache->Size() == 1);
+  CHECK(cache->Misses() == 1);
+
+  // A matrix with the same sparsity pattern and different values
+  const SparseMatrix A2 = 2.0 * A;
+  Solver second_solver(ordering);
+  second_solver.SetSymbolicFactorizationCache(cache);
+  second_solver.ComputeSymbolicSparsity(A2);
+  CHECK(num_orderings == 1);
+  CHECK(cache->Hits() == 1);
+  CHECK(second_solver.Permutation().indices() == first_solver.Permutation().indices());
+
+  second_solver.Factorize(A2);
+  const Solver uncached_solver(A2);
+  CHECK(second_solver.Solve(b).isApprox(uncached_solver.Solve(b), 1e-10));
+  CHECK(second_solver.L().isApprox(uncached_solver.L()));
+
+  // Analyzing more patterns than the capacity evicts the least recently used one
+  second_solver.ComputeSymbolicSparsity(B);
+  second_solver.ComputeSymbolicSparsity(C);
+  CHECK(num_orderings == 3);
+  CHECK(cache->Size() == 2);
+
+  second_solver.ComputeSymbolicSparsity(B);
+  CHECK(num_orderings == 3);
+  second_solver.ComputeSymbolicSparsity(A);
+  CHECK(num_orderings == 4);
+
+  // Solvers without a cache always compute the ordering
+  second_solver.SetSymbolicFactorizationCache(nullptr);
+  second_solver.ComputeSymbolicSparsity(A);
+  CHECK(num_orderings == 5);
+  CHECK(cache->Hits() == 2);
+  CHECK(cache->Misses() == 4);
+}
+
+TEST_CASE("Selected entries of the inverse match the dense inverse", "[sparse_cholesky]") {
+  constexpr int dim = 100;
+  std::mt19937 gen(42);
+
+  const SparseMatrix A = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const sym::SparseCholeskySolver<SparseMatrix> solver(A);
+  const Eigen::MatrixXd A_inv =
+      Eigen::MatrixXd(A).ldlt().solve(Eigen::MatrixXd::Identity(dim, dim));
+
+  // Diagonal blocks, blocks far off the diagonal, and a block overlapping the diagonal
+  const std::vector<std::array<int, 4>> blocks = {
+      {0, 3, 0, 3}, {40, 6, 40, 6}, {97, 3, 0, 2}, {10, 1, 80, 5}, {50, 10, 45, 10}};
+
+  sym::internal::SelectedInverse<double, SparseMatrix::StorageIndex> selected_inverse;
+  for (const auto& [row_offset, rows, col_offset, cols] : blocks) {
+    selected_inverse.AddBlock(row_offset, rows, col_offset, cols);
+  }
+  selected_inverse.Compute(solver.L(), solver.D(), solver.Permutation());
+
+  for (const auto& [row_offset, rows, col_offset, cols] : blocks) {
+    CHECK(selected_inverse.Block(row_offset, rows, col_offset, cols)
+              .isApprox(A_inv.block(row_offset, col_offset, rows, cols), 1e-6));
+  }
+}
+
+TEST_CASE("Selected inverse only computes the entries it needs", "[sparse_cholesky]") {
+  // A tridiagonal matrix, whose factorization with the natural ordering has no fill-in
+  constexpr int dim = 1000;
+  SparseMatrix A(dim, dim);
+  for (int i = 0; i < dim; ++i) {
+    A.insert(i, i) = 4.0;
+    if (i + 1 < dim) {
+      A.insert(i + 1, i) = -1.0;
+    }
+  }
+  A.makeCompressed();
+
+  const sym::SparseCholeskySolver<SparseMatrix> solver(
+      A, Eigen::NaturalOrdering<SparseMatrix::StorageIndex>());
+
+  sym::internal::SelectedInverse<double, SparseMatrix::StorageIndex> selected_inverse;
+  selected_inverse.AddBlock(500, 2, 500, 2);
+  selected_inverse.Compute(solver.L(), solver.D(), solver.Permutation());
+
+  // Only the diagonal and subdiagonal from the requested block to the end are needed
+  CHECK(selected_inverse.NumComputedEntries() <= 2 * (dim - 500));
+
+  const SparseMatrix A_full = A.selfadjointView<Eigen::Lower>();
+  const Eigen::MatrixXd A_inv =
+      Eigen::MatrixXd(A_full).ldlt().solve(Eigen::MatrixXd::Identity(dim, dim));
+  CHECK(selected_inverse.Block(500, 2, 500, 2).isApprox(A_inv.block(500, 500, 2, 2), 1e-10));
+}
+
+TEST_CASE("Fixed orderings reuse a computed ordering", "[sparse_cholesky]") {
+  constexpr int dim = 100;
+  std::mt19937 gen(42);
+
+  const SparseMatrix A = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const DenseVector b = sym::Random<Eigen::Matrix<double, dim, 1>>(gen);
+  const sym::SparseCholeskySolver<SparseMatrix> solver(A);
+
+  int num_orderings = 0;
+  const sym::FixedOrdering<SparseMatrix::StorageIndex> fixed_ordering(
+      solver.Permutation().indices());
+  const sym::SparseCholeskySolver<SparseMatrix> fixed_solver(
+      A, [&](const SparseMatrix& A_full, auto& inv_permutation) {
+        num_orderings++;
+        fixed_ordering(A_full, inv_permutation);
+      });
+
+  CHECK(num_orderings == 1);
+  CHECK(fixed_solver.Permutation().indices() == solver.Permutation().indices());
+  CHECK(fixed_solver.Solve(b) == solver.Solve(b));
+
+  // The ordering must be a permutation, for a matrix of the same dimension
+  Eigen::VectorXi not_a_permutation = solver.Permutation().indices();
+  not_a_permutation[0] = not_a_permutation[1];
+  CHECK_THROWS_AS(sym::FixedOrdering<SparseMatrix::StorageIndex>(not_a_permutation),
+                  std::runtime_error);
+  CHECK_THROWS_AS(sym::SparseCholeskySolver<SparseMatrix>(
+                      MakeRandomSymmetricSparseMatrix(dim + 1, gen), fixed_ordering),
+                  std::runtime_error);
+}
+
+TEST_CASE("Constrained AMD orderings eliminate the groups in order", "[sparse_cholesky]") {
+  constexpr int dim = 100;
+  std::mt19937 gen(42);
+
+  const SparseMatrix A = MakeRandomSymmetricSparseMatrix(dim, gen);
+  const DenseVector b = sym::Random<Eigen::Matrix<double, dim, 1>>(gen);
+
+  // Groups interleaved across the columns, eliminated in decreasing column order mod 3
+  std::vector<SparseMatrix::StorageIndex> column_groups(dim);
+  for (int col = 0; col < dim; ++col) {
+    column_groups[col] = 2 - col % 3;
+  }
+
+  sym::SparseCholeskySolver<SparseMatrix> solver(
+      A, sym::ConstrainedAmdOrdering<SparseMatrix::StorageIndex>(column_groups));
+
+  const Eigen::VectorXi inv_permutation = solver.InversePermutation().indices();
+  for (int i = 1; i < dim; ++i) {
+    CHECK(column_groups[inv_permutation[i - 1]] <= column_groups[inv_permutation[i]]);
+  }
+
+  const SparseMatrix A_full = A.selfadjointView<Eigen::Lower>();
+  CHECK((A_full * solver.Solve(b)).isApprox(b, 1e-6));
+
+  // Eliminating the points of a bundle adjustment-like problem first leaves the reduced camera
+  // system, with no fill in the columns of the points
+  constexpr int num_cameras = 4;
+  constexpr int num_points = 20;
+  SparseMatrix H(num_cameras + num_points, num_cameras + num_points);
+  std::vector<SparseMatrix::StorageIndex> point_groups(num_cameras + num_points, 1);
+  for (int i = 0; i < num_cameras + num_points; ++i) {
+    H.insert(i, i) = 10.0;
+  }
+  for (int point = num_cameras; point < num_cameras + num_points; ++point) {
+    point_groups[point] = 0;
+    H.insert(point, point % num_cameras) = 1.0;
+    H.insert(point, (point + 1) % num_cameras) = 1.0;
+  }
+  H.makeCompressed();
+
+  const sym::SparseCholeskySolver<SparseMatrix> point_solver(
+      H, sym::ConstrainedAmdOrdering<SparseMatrix::StorageIndex>(point_groups));
+  const Eigen::VectorXi point_inv_permutation = point_solver.InversePermutation().indices();
+  for (int i = 0; i < num_points; ++i) {
+    CHECK(point_inv_permutation[i] >= num_cameras);
+  }
+  const int max_cameras_nonzeros = num_cameras * (num_cameras - 1) / 2;
+  CHECK(point_solver.L().nonZeros() <= 2 * num_points + max_cameras_nonzeros);
+}
@@ -248,3 +248,33 @@ TEMPLATE_TEST_CASE("Test Schur complement with real matrix", "[schur_solver]", f
   std::tie(landmarks_dim, A) = LoadMatrix();
   TestSchur<Scalar>(A.cast<Scalar>(), landmarks_dim);
 }
+
+TEST_CASE("The Schur complement solver can analyze a new sparsity pattern", "[schur_solver]") {
+  int landmarks_dim;
+  Eigen::SparseMatrix<double> A;
+  std::tie(landmarks_dim, A) = BuildSmallMatrix();
+
+  // Make A well conditioned, so the solutions can be compared
+  Eigen::SparseMatrix<double> identity(A.rows(), A.cols());
+  identity.setIdentity();
+  A += identity;
+
+  const Eigen::MatrixXd rhs = Eigen::MatrixXd::Random(A.rows(), 1);
+
+  sym::SparseCholeskySolver<Eigen::SparseMatrix<double>> sparse_solver;
+  sparse_solver.AnalyzeSparsityPattern(A);
+  REQUIRE(sparse_solver.Factorize(A));
+  const Eigen::MatrixXd x_sparse = sparse_solver.Solve(rhs);
+
+  sym::SparseSchurSolver<Eigen::SparseMatrix<double>> schur_solver;
+  CHECK(!schur_solver.IsInitialized());
+
+  // Eliminate fewer of the landmarks each time, which changes the size and pattern of S
+  for (const int C_dim : {landmarks_dim, landmarks_dim - 2, 0}) {
+    CAPTURE(C_dim);
+    schur_solver.ComputeSymbolicSparsity(A, C_dim);
+    CHECK(schur_solver.IsInitialized());
+    REQUIRE(schur_solver.Factorize(A));
+    CHECK(schur_solver.Solve(rhs).isApprox(x_sparse, 1e-4));
+  }
+}
@@ -5,6 +5,8 @@
 
 import math
 import pickle
+import sys
+import threading
 
 import numpy as np
 from scipy import sparse
@@ -251,6 +253,32 @@ class SymforceCCSymTest(TestCase):
             values.set(cc_sym.Key("b"), 2)
             self.assertEqual(values.data(), [1, 2])
 
+        with self.subTest("Values.data_view views the data buffer without copying"):
+            values = cc_sym.Values()
+            values.set(cc_sym.Key("a"), 1)
+            values.set(cc_sym.Key("b"), sym.Rot2.from_angle(0.5))
+            view = values.data_view()
+            self.assertEqual(view.tolist(), values.data())
+            view[0] = 3
+            self.assertEqual(values.at(cc_sym.Key("a")), 3)
+
+        with self.subTest("Values.set_data overwrites the data buffer"):
+            values = cc_sym.Values()
+            values.set(cc_sym.Key("a"), 1)
+            values.set(cc_sym.Key("b"), 2)
+            values.set_data(np.array([3.0, 4.0]))
+            self.assertEqual(values.data(), [3, 4])
+            with self.assertRaises(RuntimeError):
+                values.set_data(np.array([1.0]))
+
+        with self.subTest(msg="Values can be copy constructed"):
+            values = cc_sym.Values()
+            values.set(cc_sym.Key("a"), 1)
+            values_copy = cc_sym.Values(values)
+            values_copy.set(cc_sym.Key("a"), 2)
+            self.assertEqual(values.at(cc_sym.Key("a")), 1)
+            self.assertEqual(values_copy.at(cc_sym.Key("a")), 2)
+
         with self.subTest(msg="Values.create_index returns an index_t"):
             values = cc_sym.Values()
             keys = [cc_sym.Key("a", i) for i in range(10)]
@@ -838,6 +866,317 @@ class SymforceCCSymTest(TestCase):
                 params=cc_sym.default_optimizer_params(), factors=[pi_factor], values=values
             )
 
+    @staticmethod
+    def imu_chain(
+        num_frames: int,
+    ) -> T.Tuple[T.List[cc_sym.Factor], cc_sym.Values, T.List[cc_sym.Key]]:
+        """
+        Build a chain of num_frames states connected by ImuFactors, which are evaluated entirely in
+        C++, and return the factors, initial values, and optimized keys
+        """
+        factors = []
+        values = cc_sym.Values()
+        keys = []
+        for i in range(num_frames):
+            values.set(cc_sym.Key("p", i), sym.Pose3())
+            values.set(cc_sym.Key("v", i), np.zeros((3, 1)))
+            keys.extend([cc_sym.Key("p", i), cc_sym.Key("v", i)])
+        for i in range(num_frames - 1):
+            integrator = cc_sym.ImuPreintegrator(accel_bias=np.zeros(3), gyro_bias=np.zeros(3))
+            for _ in range(10):
+                integrator.integrate_measurement(
+                    measured_accel=np.array([0.1 * i, 0.0, 9.81]),
+                    measured_gyro=np.array([0.0, 0.01 * i, 0.0]),
+                    accel_cov=np.full(3, 1e-4),
+                    gyro_cov=np.full(3, 1e-4),
+                    dt=0.01,
+                )
+            factors.append(
+                cc_sym.ImuFactor(integrator).factor(
+                    keys_to_func=[
+                        cc_sym.Key("p", i),
+                        cc_sym.Key("v", i),
+                        cc_sym.Key("p", i + 1),
+                        cc_sym.Key("v", i + 1),
+                        cc_sym.Key("a", i),
+                        cc_sym.Key("g", i),
+                        cc_sym.Key("G"),
+                        cc_sym.Key("e"),
+                    ]
+                )
+            )
+            values.set(cc_sym.Key("a", i), np.zeros((3, 1)))
+            values.set(cc_sym.Key("g", i), np.zeros((3, 1)))
+            keys.extend([cc_sym.Key("a", i), cc_sym.Key("g", i)])
+        values.set(cc_sym.Key("G"), np.array([[0.0], [0.0], [-9.81]]))
+        values.set(cc_sym.Key("e"), sf.numeric_epsilon)
+        return factors, values, keys
+
+    def test_imu_factor(self) -> None:
+        """
+        Tests:
+            cc_sym.ImuFactor
+            cc_sym.Optimizer.optimize
+
+        ImuFactors can be optimized from Python, including from several Python threads at once
+        """
+        factors, initial_values, keys = self.imu_chain(10)
+        params = cc_sym.default_optimizer_params()
+
+        expected = []
+        for _ in range(4):
+            values = cc_sym.Values(initial_values)
+            stats = cc_sym.Optimizer(params, factors, keys=keys).optimize(values)
+            self.assertEqual(stats.status, optimization_status_t.SUCCESS)
+            expected.append(values)
+
+        results = [cc_sym.Values(initial_values) for _ in range(4)]
+        threads = [
+            threading.Thread(
+                target=lambda values: cc_sym.Optimizer(params, factors, keys=keys).optimize(values),
+                args=(values,),
+            )
+            for values in results
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for result, expected_values in zip(results, expected):
+            np.testing.assert_array_equal(result.data(), expected_values.data())
+
+    def test_optimizer_releases_gil(self) -> None:
+        """
+        Tests:
+            cc_sym.Optimizer.optimize
+
+        The GIL is released while optimizing, whether or not some of the factors were created from
+        Python functions, which reacquire it while they're linearized
+        """
+        factors, initial_values, keys = self.imu_chain(20)
+        python_factor_key = cc_sym.Key("s")
+        initial_values.set(python_factor_key, 0.0)
+
+        for name, optimizer_factors, optimizer_keys in (
+            ("C++ factors", factors, keys),
+            (
+                "C++ and Python factors",
+                factors + [self.scalar_factor([python_factor_key], [1.0], 2.0)],
+                keys + [python_factor_key],
+            ),
+        ):
+            with self.subTest(msg=name):
+                optimizer = cc_sym.Optimizer(
+                    cc_sym.default_optimizer_params(), optimizer_factors, keys=optimizer_keys
+                )
+
+                go = threading.Event()
+                ran = threading.Event()
+
+                def other_thread(go: threading.Event = go, ran: threading.Event = ran) -> None:
+                    go.wait()
+                    ran.set()
+
+                thread = threading.Thread(target=other_thread)
+                thread.start()
+
+                switch_interval = sys.getswitchinterval()
+                # Don't let this thread give up the GIL to the other thread unless it releases it
+                sys.setswitchinterval(1000)
+                try:
+                    go.set()
+                    for _ in range(100):
+                        optimizer.optimize(cc_sym.Values(initial_values))
+                        if ran.is_set():
+                            break
+                    ran_during_optimize = ran.is_set()
+                finally:
+                    sys.setswitchinterval(switch_interval)
+                    thread.join()
+
+                self.assertTrue(ran_during_optimize)
+
+    @staticmethod
+    def scalar_factor(
+        keys: T.Sequence[cc_sym.Key], coefficients: T.Sequence[float], offset: float
+    ) -> cc_sym.Factor:
+        """
+        A factor on scalar keys with the linear residual dot(coefficients, values) - offset
+        """
+        jacobian: np.ndarray = np.array([coefficients], dtype=float)
+
+        def hessian_func(
+            values: cc_sym.Values, index_entries: T.List[index_entry_t]
+        ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            x = np.array([values.at(entry) for entry in index_entries])
+            residual = jacobian @ x - offset
+            return residual, jacobian, jacobian.T @ jacobian, jacobian.T @ residual
+
+        return cc_sym.Factor(hessian_func=hessian_func, keys=list(keys))
+
+    def test_fixed_lag_smoother(self) -> None:  # noqa: PLR0915
+        """
+        Tests:
+            cc_sym.FixedLagSmoother
+
+        For a linear problem, marginalization is exact, so the estimate of the keys in the window
+        matches optimizing the whole history; the size of the window stays bounded
+        """
+        params = cc_sym.default_optimizer_params()
+        params.early_exit_min_reduction = 1e-12
+
+        lag = 3
+        smoother = cc_sym.FixedLagSmoother(params, lag=lag)
+        self.assertEqual(smoother.lag(), lag)
+
+        all_factors = []
+        all_values = cc_sym.Values()
+        for i in range(10):
+            key = cc_sym.Key("x", i)
+            new_values = cc_sym.Values()
+            new_values.set(key, 0.0)
+
+            new_factors = [self.scalar_factor([key], [1.0], 0.1 * i**2)]
+            if i == 0:
+                new_factors.append(self.scalar_factor([key], [10.0], 0.0))
+            else:
+                new_factors.append(
+                    self.scalar_factor([cc_sym.Key("x", i - 1), key], [-2.0, 2.0], 0.3)
+                )
+            if i >= 2:
+                new_factors.append(
+                    self.scalar_factor([cc_sym.Key("x", i - 2), key], [-0.5, 0.5], 0.5)
+                )
+
+            stats = smoother.update(new_values, new_factors)
+            self.assertEqual(stats.status, optimization_status_t.SUCCESS)
+
+            all_factors.extend(new_factors)
+            all_values.set(key, 0.0)
+            expected = cc_sym.Values(all_values)
+            cc_sym.Optimizer(params, all_factors).optimize(expected)
+
+            window = [cc_sym.Key("x", j) for j in range(max(i - lag + 1, 0), i + 1)]
+            self.assertEqual(set(smoother.keys()), set(window))
+            self.assertEqual(smoother.estimate().num_entries(), len(window))
+            for window_key in window:
+                self.assertAlmostEqual(
+                    smoother.estimate().at(window_key), expected.at(window_key), places=8
+                )
+
+        with self.subTest(msg="The old keys are replaced by a single prior factor"):
+            # The factors in the window, plus the prior
+            self.assertEqual(len(smoother.factors()), 3 + 2 + 1 + 1)
+
+        with self.subTest(msg="Can marginalize keys explicitly"):
+            smoother.marginalize([cc_sym.Key("x", 7)])
+            self.assertEqual(set(smoother.keys()), {cc_sym.Key("x", 8), cc_sym.Key("x", 9)})
+            with self.assertRaises(RuntimeError):
+                smoother.marginalize([cc_sym.Key("x", 7)])
+
+        with self.subTest(msg="Works for nonlinear factors evaluated in C++"):
+            factors, initial_values, _ = self.imu_chain(8)
+            smoother = cc_sym.FixedLagSmoother(cc_sym.default_optimizer_params(), lag=3)
+            for i in range(8):
+                new_keys = [cc_sym.Key("p", i), cc_sym.Key("v", i)]
+                if i < 7:
+                    new_keys += [cc_sym.Key("a", i), cc_sym.Key("g", i)]
+                if i == 0:
+                    new_keys += [cc_sym.Key("G"), cc_sym.Key("e")]
+                new_values = cc_sym.Values()
+                new_values.update_or_set(initial_values.create_index(new_keys), initial_values)
+
+                stats = smoother.update(new_values, [factors[i - 1]] if i > 0 else [])
+                if i > 0:
+                    self.assertEqual(stats.status, optimization_status_t.SUCCESS)
+                self.assertLessEqual(len(smoother.keys()), 4 * 3)
+
+            self.assertTrue(smoother.estimate().has(cc_sym.Key("G")))
+            self.assertFalse(smoother.estimate().has(cc_sym.Key("p", 0)))
+
+    def test_optimizer_incremental_updates(self) -> None:
+        """
+        Tests:
+            cc_sym.Optimizer.add_factors
+            cc_sym.Optimizer.add_keys
+            cc_sym.Optimizer.remove_factors
+
+        After each change, optimizing and linearizing match a new optimizer with the same factors
+        """
+        params = cc_sym.default_optimizer_params()
+        params.early_exit_min_reduction = 1e-12
+        params.include_jacobians = True
+
+        x = [cc_sym.Key("x", i) for i in range(5)]
+        values = cc_sym.Values()
+        for key in x:
+            values.set(key, 0.0)
+
+        factors = [
+            self.scalar_factor([x[0]], [3.0], 1.0),
+            self.scalar_factor([x[0], x[1]], [-1.0, 1.0], 0.5),
+            self.scalar_factor([x[1], x[2]], [-1.0, 2.0], 0.2),
+        ]
+        opt = cc_sym.Optimizer(params, factors)
+
+        def check_matches_new_optimizer() -> None:
+            self.assertEqual(len(opt.factors()), len(factors))
+
+            expected_opt = cc_sym.Optimizer(params, factors, keys=opt.keys())
+            expected = cc_sym.Values(values)
+            expected_opt.optimize(expected)
+            actual = cc_sym.Values(values)
+            stats = opt.optimize(actual)
+            self.assertEqual(stats.status, optimization_status_t.SUCCESS)
+            for key in opt.keys():
+                self.assertAlmostEqual(actual.at(key), expected.at(key), places=8)
+
+            expected_linearization = expected_opt.linearize(values)
+            linearization = opt.linearize(values)
+            np.testing.assert_allclose(linearization.residual, expected_linearization.residual)
+            np.testing.assert_allclose(
+                linearization.jacobian.toarray(), expected_linearization.jacobian.toarray()
+            )
+            np.testing.assert_allclose(
+                linearization.hessian_lower.toarray(),
+                expected_linearization.hessian_lower.toarray(),
+            )
+            np.testing.assert_allclose(linearization.rhs, expected_linearization.rhs)
+
+        check_matches_new_optimizer()
+
+        with self.subTest(msg="Adding factors between existing keys"):
+            new_factors = [self.scalar_factor([x[0], x[2]], [1.0, 1.0], 2.0)]
+            opt.add_factors(new_factors)
+            factors.extend(new_factors)
+            check_matches_new_optimizer()
+
+        with self.subTest(msg="Adding keys"):
+            opt.add_keys([x[3], x[4]])
+            new_factors = [
+                self.scalar_factor([x[2], x[3]], [-1.0, 1.0], 0.1),
+                self.scalar_factor([x[3], x[4]], [-1.0, 1.0], 0.4),
+                self.scalar_factor([x[4], x[1]], [2.0, 1.0], -0.3),
+            ]
+            opt.add_factors(new_factors)
+            factors.extend(new_factors)
+            self.assertEqual(opt.keys(), x)
+            check_matches_new_optimizer()
+
+        with self.subTest(msg="Removing factors"):
+            opt.remove_factors([5, 3])
+            del factors[5]
+            del factors[3]
+            self.assertEqual(opt.keys(), x)
+            check_matches_new_optimizer()
+
+        with self.subTest(msg="Removing the last factor optimizing a key"):
+            opt.remove_factors([len(factors) - 1])
+            del factors[-1]
+            self.assertEqual(opt.keys(), x[:4])
+            check_matches_new_optimizer()
+
     def test_default_params_match(self) -> None:
         """
         Check that the default params in C++ and Python are the same
@@ -17,6 +17,7 @@ import symforce
 
 symforce.set_epsilon_to_symbol()
 
+import sym
 import symforce.symbolic as sf
 from symforce import codegen
 from symforce import ops
@@ -566,6 +567,111 @@ class SymforceCodegenTest(TestCase):
             self.assertEqual((4,), col.shape)
             self.assertEqual((2, 2), mat.shape)
 
+    def test_python_config_batched(self) -> None:
+        """
+        Tests that functions generated with PythonConfig(batched=True) give the same results as
+        the unbatched functions for each element of the batch
+        """
+
+        def batched_test_func(
+            rot: sf.Rot3, t: sf.V3, scale: sf.Scalar, epsilon: sf.Scalar
+        ) -> T.Tuple[sf.V3, sf.Rot3, sf.Scalar, sf.M22]:
+            point = scale * (rot * t)
+            res = sf.V3(
+                sf.atan2(point[1], point[0], epsilon=epsilon),
+                sf.Max(point[2], 0) + sf.sign_no_zero(point[0]),
+                sf.Min(point[1], point[2]) * sf.sqrt(point.squared_norm() + epsilon),
+            )
+            return res, rot.inverse(), point.norm(epsilon=epsilon), sf.M22.eye()
+
+        def residual_test_func(
+            rot: sf.Rot3, t: sf.V3, scale: sf.Scalar, epsilon: sf.Scalar
+        ) -> sf.V3:
+            return batched_test_func(rot, t, scale, epsilon)[0]
+
+        def generated_functions(with_linearization: bool) -> T.Tuple[T.Callable, T.Callable]:
+            functions = []
+            for batched in (False, True):
+                config = codegen.PythonConfig(batched=batched)
+                if with_linearization:
+                    codegen_obj = codegen.Codegen.function(
+                        func=residual_test_func, config=config
+                    ).with_linearization(which_args=["rot", "t"])
+                else:
+                    codegen_obj = codegen.Codegen.function(
+                        func=batched_test_func,
+                        config=config,
+                        output_names=["res", "rot_inv", "norm", "eye"],
+                    )
+                assert codegen_obj.name is not None
+                namespace = f"python_config_batched_{with_linearization}_{batched}"
+                codegen_data = codegen_obj.generate_function(
+                    namespace=namespace, output_dir=self.make_output_dir(f"sf_{namespace}")
+                )
+                functions.append(
+                    codegen_util.load_generated_function(
+                        codegen_obj.name, codegen_data.function_dir
+                    )
+                )
+            return functions[0], functions[1]
+
+        rng = np.random.default_rng(42)
+        N = 20
+        rots_storage = np.array(
+            [
+                sym.Rot3.random_from_uniform_samples(*rng.uniform(size=3)).to_storage()
+                for _ in range(N)
+            ]
+        )
+        ts = rng.normal(size=(N, 3))
+        scales = rng.normal(size=N)
+        epsilon = sf.numeric_epsilon
+
+        for with_linearization in (False, True):
+            with self.subTest(with_linearization=with_linearization):
+                func, batched_func = generated_functions(with_linearization)
+                batched_outputs = batched_func(rots_storage, ts, scales, epsilon)
+
+                expected_outputs = [
+                    func(sym.Rot3.from_storage(rot), t, scale, epsilon)
+                    for rot, t, scale in zip(rots_storage, ts, scales)
+                ]
+                for i, batched_output in enumerate(batched_outputs):
+                    expected = np.stack(
+                        [
+                            np.asarray(
+                                output[i].to_storage()
+                                if isinstance(output[i], sym.Rot3)
+                                else output[i]
+                            )
+                            for output in expected_outputs
+                        ]
+                    )
+                    self.assertEqual(expected.shape, batched_output.shape)
+                    np.testing.assert_allclose(expected, batched_output, rtol=1e-10, atol=1e-12)
+
+        with self.subTest(msg="Batch dimensions are broadcast"):
+            _, batched_func = generated_functions(with_linearization=False)
+            res, rot_inv, norm, eye = batched_func(
+                rots_storage[:, np.newaxis], ts[:3], 1.0, epsilon
+            )
+            self.assertEqual((N, 3, 3), res.shape)
+            self.assertEqual((N, 3, 4), rot_inv.shape)
+            self.assertEqual((N, 3), norm.shape)
+            self.assertEqual((N, 3, 2, 2), eye.shape)
+
+        with self.subTest(msg="Inputs with the wrong shape are rejected"):
+            with self.assertRaises(IndexError):
+                batched_func(rots_storage[:, :3], ts, scales, epsilon)
+
+        with self.subTest(msg="Sparse outputs are rejected"):
+            with self.assertRaises(codegen.CodeGenerationException):
+                codegen.Codegen.function(
+                    func=residual_test_func, config=codegen.PythonConfig(batched=True)
+                ).with_linearization(
+                    which_args=["rot"], sparse_linearization=True
+                ).generate_function(output_dir=self.make_output_dir("sf_python_config_batched"))
+
     def test_sparse_output_python(self) -> None:
         """
         Tests that sparse matrices are correctly generated in python when sparse_matrices
@@ -129,6 +129,52 @@ TEST_CASE("Residual, jacobian, hessian, and rhs are all consistent", "[dense-lin
   CHECK((rhs - linearization.rhs).cwiseAbs().maxCoeff() < 1e-15);
 }
 
+TEST_CASE("Relinearizing reuses the structure, and allocates new linearizations",
+          "[dense-linearizer]") {
+  using M23 = Eigen::Matrix<double, 2, 3>;
+  using V2 = Eigen::Vector2d;
+  using V3 = Eigen::Vector3d;
+
+  std::mt19937 gen(7919);
+
+  const M23 J = sym::StorageOps<M23>::Random(gen);
+  const std::vector<sym::Factord> factors = {sym::Factord::Jacobian(
+      [J](const double a, const V2& b, V2* const res, M23* const jac) {
+        if (res != nullptr) {
+          *res = J * V3(a, b(0), b(1));
+        }
+        if (jac != nullptr) {
+          *jac = J;
+        }
+      },
+      {'x', 'y'})};
+
+  sym::Valuesd values;
+  values.Set<double>('x', 2.0);
+  values.Set<V2>('y', V2(3, 5));
+
+  sym::DenseLinearizer<double> linearizer("linearizer", factors, {'y', 'x'},
+                                          true /* include_jacobians */);
+  sym::DenseLinearization<double> linearization;
+  linearizer.Relinearize(values, linearization);
+  CHECK(linearizer.IsInitialized());
+
+  // The strict upper triangle of the hessian is zero, rather than uninitialized
+  CHECK(linearization.hessian_lower.template triangularView<Eigen::StrictlyUpper>()
+            .toDenseMatrix()
+            .isZero());
+
+  // A linearization which wasn't passed to the first call is allocated
+  sym::DenseLinearization<double> other_linearization;
+  linearizer.Relinearize(values, other_linearization);
+  CHECK(linearizer.IsInitialized());
+  CHECK(other_linearization.IsInitialized());
+  CHECK(other_linearization.residual == linearization.residual);
+  CHECK(other_linearization.jacobian == linearization.jacobian);
+  CHECK(other_linearization.hessian_lower == linearization.hessian_lower);
+  CHECK(other_linearization.rhs == linearization.rhs);
+}
+
 TEST_CASE("Jacobian is not allocated if include_jacobians is false", "[dense-linearizer]") {
   using M3 = Eigen::Matrix3d;
   using V3 = Eigen::Vector3d;
@@ -157,3 +203,68 @@ TEST_CASE("Jacobian is not allocated if include_jacobians is false", "[dense-lin
 
   CHECK(linearization.jacobian.size() == 0);
 }
+
+TEST_CASE("Multithreaded relinearization matches single threaded relinearization",
+          "[dense-linearizer]") {
+  using M23 = Eigen::Matrix<double, 2, 3>;
+  using V2 = Eigen::Vector2d;
+  using V3 = Eigen::Vector3d;
+
+  std::mt19937 gen(7919);
+
+  // A chain of factors, long enough to be split across threads
+  const int num_keys = 30;
+  std::vector<sym::Key> keys;
+  sym::Valuesd values;
+  for (int i = 0; i < num_keys; i++) {
+    keys.emplace_back('x', i);
+    values.Set<double>(keys.back(), 0.5 * i - 7.0);
+  }
+  std::vector<sym::Factord> factors;
+  for (int i = 0; i < num_keys - 2; i++) {
+    const M23 J = sym::StorageOps<M23>::Random(gen);
+    factors.push_back(sym::Factord::Jacobian(
+        [J](const double a, const double b, const double c, V2* const res, M23* const jac) {
+          if (res != nullptr) {
+            *res = J * V3(a, b, c);
+          }
+          if (jac != nullptr) {
+            *jac = J;
+          }
+        },
+        {keys[i], keys[i + 1], keys[i + 2]}));
+  }
+
+  sym::DenseLinearizer<double> single_threaded("single_threaded", factors, keys,
+                                               true /* include_jacobians */);
+  sym::DenseLinearization<double> expected;
+  single_threaded.Relinearize(values, expected);
+  single_threaded.Relinearize(values, expected);
+  const Eigen::MatrixXd expected_hessian =
+      expected.hessian_lower.template selfadjointView<Eigen::Lower>();
+
+  for (const int num_threads : {2, 3, 8}) {
+    sym::DenseLinearizer<double> linearizer("multithreaded", factors, keys,
+                                            true /* include_jacobians */, false /* debug_checks */,
+                                            num_threads);
+    CHECK(linearizer.NumThreads() == num_threads);
+
+    sym::DenseLinearization<double> linearization;
+    linearizer.Relinearize(values, linearization);
+    // The first linearization is single threaded, the second is not
+    linearizer.Relinearize(values, linearization);
+
+    const Eigen::MatrixXd hessian =
+        linearization.hessian_lower.template selfadjointView<Eigen::Lower>();
+    CHECK(linearization.residual == expected.residual);
+    CHECK(linearization.jacobian == expected.jacobian);
+    CHECK((hessian - expected_hessian).cwiseAbs().maxCoeff() < 1e-12);
+    CHECK((linearization.rhs - expected.rhs).cwiseAbs().maxCoeff() < 1e-12);
+  }
+
+  // A zero-initialized optimizer_params_t has num_threads == 0, which is treated as 1
+  sym::DenseLinearizer<double> zero_threads("zero_threads", factors, keys,
+                                            true /* include_jacobians */, false /* debug_checks */,
+                                            0 /* num_threads */);
+  CHECK(zero_threads.NumThreads() == 1);
+}
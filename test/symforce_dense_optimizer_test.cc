@@ -10,17 +10,11 @@
 #include <catch2/catch_test_macros.hpp>
 
 #include <sym/util/epsilon.h>
-#include <symforce/opt/dense_cholesky_solver.h>
 #include <symforce/opt/factor.h>
-#include <symforce/opt/levenberg_marquardt_solver.h>
 #include <symforce/opt/optimizer.h>
 #include <symforce/opt/values.h>
 #include <symforce/test_util/check_linear_error.h>
 
-template <typename Scalar>
-using DenseOptimizer =
-    sym::Optimizer<Scalar, sym::LevenbergMarquardtSolver<Scalar, sym::DenseCholeskySolver<Scalar>>>;
-
 TEST_CASE("Optimizer can be used with dense cholesky solver", "[dense-optimizer]") {
   std::vector<sym::Factord> factors;
 
@@ -40,12 +34,12 @@ TEST_CASE("Optimizer can be used with dense cholesky solver", "[dense-optimizer]
   params.check_derivatives = true;
   params.include_jacobians = true;
 
-  DenseOptimizer<double> optimizer(params, factors, "optimizer_name", {'x'});
+  sym::DenseOptimizerd optimizer(params, factors, "optimizer_name", {'x'});
 
   sym::Valuesd values;
   values.Set('x', 2.0);
 
-  DenseOptimizer<double>::Stats stats = optimizer.Optimize(values, -1, true);
+  sym::DenseOptimizerd::Stats stats = optimizer.Optimize(values, -1, true);
 
   CheckLinearError(stats);
 
@@ -0,0 +1,180 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include <cmath>
+#include <limits>
+#include <random>
+
+#include <catch2/catch_test_macros.hpp>
+
+#include <sym/factors/between_factor_rot3.h>
+#include <sym/factors/prior_factor_rot3.h>
+#include <sym/rot3.h>
+#include <symforce/opt/dogleg_optimizer.h>
+#include <symforce/opt/optimizer.h>
+
+namespace {
+
+/**
+ * The Rosenbrock function as a least squares problem, with residuals 10 * (y - x^2) and 1 - x and
+ * the minimum at (1, 1)
+ */
+std::vector<sym::Factord> BuildRosenbrockFactors() {
+  return {sym::Factord::Jacobian(
+      [](const double x, const double y, Eigen::Vector2d* const residual,
+         Eigen::Matrix2d* const jacobian) {
+        *residual << 10 * (y - x * x), 1 - x;
+        if (jacobian != nullptr) {
+          *jacobian << -20 * x, 10, -1, 0;
+        }
+      },
+      {'x', 'y'})};
+}
+
+/**
+ * A chain of rotations with a prior on each one and between factors connecting neighbors
+ */
+std::vector<sym::Factord> BuildRotationChainFactors(const int num_keys, std::mt19937& gen) {
+  std::vector<sym::Factord> factors;
+  const Eigen::Matrix3d sqrt_info = Eigen::Matrix3d::Identity();
+  for (int i = 0; i < num_keys; i++) {
+    const sym::Rot3d prior = sym::Rot3d::Random(gen);
+    factors.push_back(sym::Factord::Jacobian(
+        [prior, sqrt_info](const sym::Rot3d& rot, Eigen::Vector3d* const res,
+                           Eigen::Matrix3d* const jac) {
+          sym::PriorFactorRot3<double>(rot, prior, sqrt_info, sym::kDefaultEpsilond, res, jac);
+        },
+        {{'R', i}}));
+  }
+  for (int i = 0; i < num_keys - 1; i++) {
+    const sym::Rot3d a_T_b = sym::Rot3d::Random(gen);
+    factors.push_back(sym::Factord::Jacobian(
+        [a_T_b, sqrt_info](const sym::Rot3d& a, const sym::Rot3d& b, Eigen::Vector3d* const res,
+                           Eigen::Matrix<double, 3, 6>* const jac) {
+          sym::BetweenFactorRot3<double>(a, b, a_T_b, sqrt_info, sym::kDefaultEpsilond, res, jac);
+        },
+        {{'R', i}, {'R', i + 1}}));
+  }
+  return factors;
+}
+
+}  // namespace
+
+TEST_CASE("Dogleg converges on the Rosenbrock function", "[dogleg]") {
+  sym::Valuesd values;
+  values.Set<double>('x', -1.2);
+  values.Set<double>('y', 1.0);
+
+  sym::optimizer_params_t params = sym::DefaultOptimizerParams();
+  params.dogleg_initial_radius = 1.0;
+  params.early_exit_min_reduction = 1e-12;
+  params.iterations = 100;
+
+  sym::DoglegOptimizerd optimizer(params, BuildRosenbrockFactors());
+  const auto stats = optimizer.Optimize(values);
+
+  CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+  CHECK(std::abs(values.At<double>('x') - 1.0) < 1e-6);
+  CHECK(std::abs(values.At<double>('y') - 1.0) < 1e-6);
+
+  // The hessian is only factorized after accepted steps, not after rejected ones
+  int num_accepted = 0;
+  int num_rejected = 0;
+  for (size_t i = 1; i < stats.iterations.size(); i++) {
+    if (stats.iterations[i].update_accepted) {
+      num_accepted++;
+    } else {
+      num_rejected++;
+    }
+  }
+  CHECK(num_rejected > 0);
+  CHECK(optimizer.NonlinearSolver().NumFactorizations() <= num_accepted + 1);
+  CHECK(optimizer.NonlinearSolver().NumFactorizations() <
+        static_cast<int>(stats.iterations.size()) - 1);
+}
+
+TEST_CASE("Dogleg matches Levenberg-Marquardt", "[dogleg]") {
+  std::mt19937 gen(42);
+  constexpr int kNumKeys = 10;
+  const std::vector<sym::Factord> factors = BuildRotationChainFactors(kNumKeys, gen);
+
+  sym::Valuesd initial_values;
+  for (int i = 0; i < kNumKeys; i++) {
+    initial_values.Set({'R', i}, sym::Rot3d::Identity());
+  }
+
+  sym::optimizer_params_t params = sym::DefaultOptimizerParams();
+  params.early_exit_min_reduction = 1e-12;
+  params.iterations = 100;
+
+  sym::Valuesd lm_values = initial_values;
+  sym::Optimizerd lm_optimizer(params, factors);
+  const auto lm_stats = lm_optimizer.Optimize(lm_values);
+  CHECK(lm_stats.status == sym::optimization_status_t::SUCCESS);
+
+  sym::Valuesd dogleg_values = initial_values;
+  sym::DoglegOptimizerd dogleg_optimizer(params, factors);
+  const auto dogleg_stats = dogleg_optimizer.Optimize(dogleg_values);
+  CHECK(dogleg_stats.status == sym::optimization_status_t::SUCCESS);
+  CHECK(dogleg_stats.failure_reason == sym::dogleg_solver_failure_reason_t::INVALID);
+
+  for (int i = 0; i < kNumKeys; i++) {
+    CHECK(sym::IsClose(lm_values.At<sym::Rot3d>({'R', i}), dogleg_values.At<sym::Rot3d>({'R', i}),
+                       1e-5));
+  }
+
+  // Covariances don't depend on the nonlinear solver
+  std::unordered_map<sym::Key, Eigen::MatrixXd> lm_covariances;
+  lm_optimizer.ComputeAllCovariances(lm_optimizer.Linearize(lm_values), lm_covariances);
+  std::unordered_map<sym::Key, Eigen::MatrixXd> dogleg_covariances;
+  dogleg_optimizer.ComputeAllCovariances(dogleg_optimizer.Linearize(lm_values), dogleg_covariances);
+  for (const auto& [key, covariance] : lm_covariances) {
+    CHECK(dogleg_covariances.at(key).isApprox(covariance, 1e-9));
+  }
+
+  // Reoptimizing from the optimum converges immediately
+  const auto reoptimize_stats = dogleg_optimizer.Optimize(dogleg_values);
+  CHECK(reoptimize_stats.status == sym::optimization_status_t::SUCCESS);
+  CHECK(dogleg_optimizer.NonlinearSolver().NumFactorizations() == 1);
+}
+
+TEST_CASE("Dogleg fails on a non-finite initial error", "[dogleg]") {
+  sym::Valuesd values;
+  values.Set<double>('x', std::numeric_limits<double>::quiet_NaN());
+  values.Set<double>('y', 1.0);
+
+  sym::DoglegOptimizerd optimizer(sym::DefaultOptimizerParams(), BuildRosenbrockFactors());
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::FAILED);
+  CHECK(stats.failure_reason == sym::dogleg_solver_failure_reason_t::INITIAL_ERROR_NOT_FINITE);
+}
+
+TEST_CASE("Dogleg fails once the trust region is too small", "[dogleg]") {
+  // A residual whose jacobian is wrong, so no step along it reduces the error
+  const std::vector<sym::Factord> factors = {sym::Factord::Jacobian(
+      [](const double x, sym::Vector1d* const residual,
+         Eigen::Matrix<double, 1, 1>* const jacobian) {
+        (*residual)(0) = x;
+        if (jacobian != nullptr) {
+          (*jacobian)(0, 0) = -1;
+        }
+      },
+      {'x'})};
+
+  sym::Valuesd values;
+  values.Set<double>('x', 1.0);
+
+  sym::optimizer_params_t params = sym::DefaultOptimizerParams();
+  params.dogleg_min_radius = 1e-3;
+  params.iterations = 100;
+
+  sym::DoglegOptimizerd optimizer(params, factors);
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::FAILED);
+  CHECK(stats.failure_reason ==
+        sym::dogleg_solver_failure_reason_t::TRUST_REGION_RADIUS_OUT_OF_BOUNDS);
+  CHECK(values.At<double>('x') == 1.0);
+  CHECK(optimizer.NonlinearSolver().NumFactorizations() == 1);
+}
@@ -0,0 +1,167 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include <random>
+
+#include <catch2/catch_test_macros.hpp>
+
+#include <sym/factors/between_factor_pose3.h>
+#include <sym/factors/prior_factor_pose3.h>
+#include <symforce/opt/fixed_lag_smoother.h>
+#include <symforce/opt/optimizer.h>
+
+namespace {
+
+sym::optimizer_params_t SmootherParams() {
+  auto params = sym::DefaultOptimizerParams();
+  params.early_exit_min_reduction = 1e-12;
+  return params;
+}
+
+/**
+ * A factor on Vector3 keys a and b with the linear residual weight * (b - a - offset)
+ */
+sym::Factord LinearBetweenFactor(const sym::Key& a_key, const sym::Key& b_key,
+                                 const Eigen::Vector3d& offset, const double weight) {
+  return sym::Factord::Jacobian(
+      [offset, weight](const Eigen::Vector3d& a, const Eigen::Vector3d& b,
+                       Eigen::Vector3d* const res, Eigen::Matrix<double, 3, 6>* const jac) {
+        *res = weight * (b - a - offset);
+        if (jac != nullptr) {
+          jac->leftCols<3>() = -weight * Eigen::Matrix3d::Identity();
+          jac->rightCols<3>() = weight * Eigen::Matrix3d::Identity();
+        }
+      },
+      {a_key, b_key});
+}
+
+/**
+ * A factor on a Vector3 key x with the linear residual weight * (x - target)
+ */
+sym::Factord LinearPriorFactor(const sym::Key& key, const Eigen::Vector3d& target,
+                               const double weight) {
+  return sym::Factord::Jacobian(
+      [target, weight](const Eigen::Vector3d& x, Eigen::Vector3d* const res,
+                       Eigen::Matrix3d* const jac) {
+        *res = weight * (x - target);
+        if (jac != nullptr) {
+          *jac = weight * Eigen::Matrix3d::Identity();
+        }
+      },
+      {key});
+}
+
+}  // namespace
+
+TEST_CASE("Fixed-lag smoothing matches batch optimization for linear problems",
+          "[fixed_lag_smoother]") {
+  const int num_updates = 12;
+  const int lag = 4;
+
+  std::mt19937 gen(42);
+  std::normal_distribution<double> noise;
+  const auto random_vector = [&]() { return Eigen::Vector3d(noise(gen), noise(gen), noise(gen)); };
+
+  sym::FixedLagSmootherd smoother(SmootherParams(), lag);
+  CHECK(smoother.Lag() == lag);
+
+  std::vector<sym::Factord> all_factors;
+  sym::Valuesd all_values;
+  for (int i = 0; i < num_updates; i++) {
+    const sym::Key key('x', i);
+
+    sym::Valuesd new_values;
+    new_values.Set(key, random_vector());
+
+    std::vector<sym::Factord> new_factors;
+    new_factors.push_back(LinearPriorFactor(key, random_vector(), 0.5));
+    if (i > 0) {
+      new_factors.push_back(LinearBetweenFactor({'x', i - 1}, key, random_vector(), 2.0));
+    }
+    if (i > 1) {
+      new_factors.push_back(LinearBetweenFactor({'x', i - 2}, key, random_vector(), 1.0));
+    }
+
+    const auto stats = smoother.Update(new_values, new_factors);
+    CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+
+    all_factors.insert(all_factors.end(), new_factors.begin(), new_factors.end());
+    all_values.Set(key, new_values.At<Eigen::Vector3d>(key));
+    sym::Valuesd expected = all_values;
+    sym::Optimizerd(SmootherParams(), all_factors).Optimize(expected);
+
+    // Only the keys from the last lag updates are left
+    const int window_size = std::min(i + 1, lag);
+    CHECK(smoother.Keys().size() == static_cast<size_t>(window_size));
+    CHECK(smoother.Estimate().NumEntries() == static_cast<size_t>(window_size));
+
+    // Marginalization is exact for linear problems
+    for (int j = i - window_size + 1; j <= i; j++) {
+      const Eigen::Vector3d actual = smoother.Estimate().At<Eigen::Vector3d>({'x', j});
+      INFO("Update " << i << ", key " << j);
+      CHECK((actual - expected.At<Eigen::Vector3d>({'x', j})).norm() < 1e-6);
+    }
+  }
+
+  // The factors inside the window, and a single prior
+  CHECK(smoother.Factors().size() == static_cast<size_t>(lag + (lag - 1) + (lag - 2) + 1));
+}
+
+TEST_CASE("Fixed-lag smoothing of a Pose3 chain", "[fixed_lag_smoother]") {
+  const double epsilon = 1e-10;
+  const int num_updates = 15;
+  const int lag = 3;
+
+  // Constant velocity motion, observed by consistent between factors and a single prior on the
+  // first pose, so the optimum is exactly the true trajectory
+  const sym::Pose3d step(sym::Rot3d::FromYawPitchRoll(0.1, 0.02, -0.03),
+                         Eigen::Vector3d(1.0, 0.2, 0.0));
+  std::vector<sym::Pose3d> poses = {sym::Pose3d::Identity()};
+  for (int i = 1; i < num_updates; i++) {
+    poses.push_back(poses.back() * step);
+  }
+
+  const sym::Matrix66d sqrt_info = sym::Matrix66d::Identity();
+  std::mt19937 gen(42);
+
+  sym::FixedLagSmootherd smoother(SmootherParams(), lag, "pose_smoother", epsilon);
+  for (int i = 0; i < num_updates; i++) {
+    const sym::Key key('P', i);
+
+    sym::Valuesd new_values;
+    new_values.Set(key, poses[i].Retract(0.1 * sym::Random<sym::Vector6d>(gen)));
+
+    std::vector<sym::Factord> new_factors;
+    if (i == 0) {
+      new_factors.push_back(sym::Factord::Jacobian(
+          [&](const sym::Pose3d& pose, sym::Vector6d* const res, sym::Matrix66d* const jac) {
+            sym::PriorFactorPose3<double>(pose, poses[0], sqrt_info, epsilon, res, jac);
+          },
+          {key}));
+    } else {
+      new_factors.push_back(sym::Factord::Jacobian(
+          [&](const sym::Pose3d& a, const sym::Pose3d& b, sym::Vector6d* const res,
+              Eigen::Matrix<double, 6, 12>* const jac) {
+            sym::BetweenFactorPose3<double>(a, b, step, sqrt_info, epsilon, res, jac);
+          },
+          {{'P', i - 1}, key}));
+    }
+
+    const auto stats = smoother.Update(new_values, new_factors);
+    CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+    CHECK(smoother.Keys().size() <= static_cast<size_t>(lag));
+
+    const sym::Pose3d estimate = smoother.Estimate().At<sym::Pose3d>(key);
+    INFO("Update " << i);
+    CHECK(estimate.LocalCoordinates(poses[i]).norm() < 1e-6);
+  }
+
+  SECTION("Keys can be marginalized explicitly") {
+    smoother.Marginalize({{'P', num_updates - 3}});
+    CHECK(smoother.Keys().size() == 2);
+    CHECK(!smoother.Estimate().Has({'P', num_updates - 3}));
+    CHECK_THROWS(smoother.Marginalize({{'P', num_updates - 3}}));
+  }
+}
@@ -0,0 +1,169 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+import os
+import subprocess
+import sys
+
+import symforce
+
+symforce.set_epsilon_to_symbol()
+
+import sym
+import symforce.symbolic as sf
+from symforce import codegen
+from symforce import typing as T
+from symforce.codegen.similarity_index import SimilarityIndex
+from symforce.opt._internal.generated_residual_disk_cache import GeneratedResidualDiskCache
+from symforce.test_util import TestCase
+from symforce.values import Values
+
+
+class GeneratedResidualDiskCacheTest(TestCase):
+    """
+    Tests symforce.opt._internal.generated_residual_disk_cache.GeneratedResidualDiskCache.
+    """
+
+    def generate_example(self, name: str) -> T.Tuple[SimilarityIndex, T.Dict[str, T.Any]]:
+        """
+        Generates a python function called name, and returns its SimilarityIndex and the arguments
+        to cache_residual describing where it was generated
+        """
+        codegen_obj = codegen.Codegen(
+            inputs=Values(rot=sf.Rot3.symbolic("a")),
+            outputs=Values(out=sf.Rot3.symbolic("a").inverse()),
+            config=codegen.PythonConfig(),
+            name=name,
+            return_key="out",
+        )
+        namespace = f"ns_{name}"
+        output_data = codegen_obj.generate_function(
+            output_dir=self.make_output_dir(), namespace=namespace
+        )
+        return SimilarityIndex.from_codegen(codegen_obj), dict(
+            output_dir=output_data.output_dir, generated_namespace=namespace, name=name
+        )
+
+    def test_residual_can_be_retrieved(self) -> None:
+        """
+        Tests:
+            GeneratedResidualDiskCache.cache_residual
+            GeneratedResidualDiskCache.get_residual
+
+        Residuals stored with cache_residual can be loaded with get_residual, including from a new
+        cache object pointed at the same directory
+        """
+        index, generated = self.generate_example("invert")
+        cache_dir = self.make_output_dir()
+        key_args: T.Dict[str, T.Any] = dict(
+            optimized_keys=["rot"], namespace=None, sparse_linearization=False
+        )
+
+        cache = GeneratedResidualDiskCache(cache_dir)
+
+        with self.subTest(msg="Returns None if not cached"):
+            self.assertIsNone(cache.get_residual(index, **key_args))
+
+        cache.cache_residual(index, **key_args, **generated)
+        self.assertEqual(len(cache), 1)
+
+        with self.subTest(msg="Returns cached residual if cached"):
+            residual = GeneratedResidualDiskCache(cache_dir).get_residual(index, **key_args)
+            assert residual is not None
+            rot = sym.Rot3.from_yaw_pitch_roll(0.1, 0.2, 0.3)
+            self.assertStorageNear(residual(rot), rot.inverse())
+
+        with self.subTest(msg="Returns None for different optimized keys"):
+            self.assertIsNone(
+                cache.get_residual(
+                    index, optimized_keys=[], namespace=None, sparse_linearization=False
+                )
+            )
+
+        with self.subTest(msg="Returns None for different sparse_linearization"):
+            self.assertIsNone(
+                cache.get_residual(
+                    index, optimized_keys=["rot"], namespace=None, sparse_linearization=True
+                )
+            )
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get_residual(index, **key_args))
+
+    def test_key_digest_is_stable_across_processes(self) -> None:
+        """
+        Tests:
+            GeneratedResidualDiskCache.key_digest
+
+        The digest does not depend on the hash seed of the process
+        """
+        script = """
+import symforce.symbolic as sf
+from symforce import codegen
+from symforce.codegen.similarity_index import SimilarityIndex
+from symforce.opt._internal.generated_residual_disk_cache import GeneratedResidualDiskCache
+from symforce.values import Values
+
+index = SimilarityIndex(
+    inputs=Values(rot=sf.Rot3.symbolic("a"), x=sf.Symbol("x")),
+    outputs=Values(out=sf.Rot3.symbolic("a").inverse().to_tangent()[0] * sf.Symbol("x")),
+    config=codegen.PythonConfig(),
+    return_key="out",
+    sparse_matrices=[],
+)
+print(GeneratedResidualDiskCache.key_digest(index, ["rot"], None, False))
+"""
+        digests = {
+            subprocess.run(
+                [sys.executable, "-c", script],
+                env=dict(os.environ, PYTHONHASHSEED=seed),
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+            for seed in ("1", "2")
+        }
+        self.assertEqual(len(digests), 1)
+
+    def test_evicts_least_recently_used(self) -> None:
+        """
+        Tests:
+            GeneratedResidualDiskCache.cache_residual
+
+        When the cache is over its size limit, the least recently used entries are evicted
+        """
+        index_a, generated_a = self.generate_example("invert_a")
+        index_b, generated_b = self.generate_example("invert_b")
+        index_c, generated_c = self.generate_example("invert_c")
+        key_args: T.Dict[str, T.Any] = dict(namespace=None, sparse_linearization=False)
+
+        cache = GeneratedResidualDiskCache(self.make_output_dir())
+        cache.cache_residual(index_a, optimized_keys=["a"], **key_args, **generated_a)
+        # Loading may add bytecode to the entry, which counts towards its size
+        self.assertIsNotNone(cache.get_residual(index_a, optimized_keys=["a"], **key_args))
+        entry_size = sum(
+            f.stat().st_size for f in (cache.directory / "entries").rglob("*") if f.is_file()
+        )
+
+        # Room for two entries, plus some slack for differences in metadata size
+        cache.max_size_bytes = 2 * entry_size + entry_size // 2
+        cache.cache_residual(index_b, optimized_keys=["b"], **key_args, **generated_b)
+
+        # Use a, so that b is the least recently used
+        for entry in (cache.directory / "entries").iterdir():
+            os.utime(entry / GeneratedResidualDiskCache.METADATA_FILENAME, (0, 0))
+        self.assertIsNotNone(cache.get_residual(index_a, optimized_keys=["a"], **key_args))
+
+        cache.cache_residual(index_c, optimized_keys=["c"], **key_args, **generated_c)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get_residual(index_a, optimized_keys=["a"], **key_args))
+        self.assertIsNone(cache.get_residual(index_b, optimized_keys=["b"], **key_args))
+        self.assertIsNotNone(cache.get_residual(index_c, optimized_keys=["c"], **key_args))
+
+
+if __name__ == "__main__":
+    TestCase.main()
@@ -40,6 +40,7 @@ TEMPLATE_TEST_CASE("Converges for a linear problem in one iteration", "[levenber
   params.iterations = 1;
   params.use_diagonal_damping = false;
   params.use_unit_damping = false;
+  params.linear_solver_type = sym::linear_solver_type_t::DIRECT;
   sym::LevenbergMarquardtSolver<Scalar> solver(params, "", kEpsilon);
 
   using StateVector = Eigen::Matrix<Scalar, N, 1>;
@@ -7,6 +7,7 @@
 #include <Eigen/SparseCore>
 #include <catch2/catch_test_macros.hpp>
 
+#include <sym/util/epsilon.h>
 #include <symforce/opt/assert.h>
 #include <symforce/opt/factor.h>
 #include <symforce/opt/key.h>
@@ -125,3 +126,220 @@ TEST_CASE("Relinearization is consistent w/ respect to factor order", "[lineariz
     CHECK(linearization.rhs == rhs);
   }
 }
+
+TEST_CASE("Multithreaded relinearization matches single threaded relinearization", "[linearizer]") {
+  const Eigen::Matrix2d J1 = (Eigen::Matrix2d() << 1, 2, 0, 3).finished();
+  const Eigen::Matrix2d J2 = (Eigen::Matrix2d() << 4, 0, 5, 6).finished();
+
+  // A chain of alternating dense and sparse factors, long enough to be split across threads
+  const int num_keys = 50;
+  std::vector<sym::Key> keys;
+  sym::Valuesd values;
+  for (int i = 0; i < num_keys; i++) {
+    keys.emplace_back('x', i);
+    values.Set<double>(keys.back(), 0.5 * i - 7.0);
+  }
+  std::vector<sym::Factord> factors;
+  for (int i = 0; i < num_keys - 1; i++) {
+    const std::vector<sym::Key> factor_keys = {keys[i], keys[i + 1]};
+    factors.push_back(i % 2 == 0 ? GetDenseFactor(J1, factor_keys)
+                                 : GetSparseFactor(J2, factor_keys));
+  }
+
+  sym::Linearizer<double> single_threaded("single_threaded", factors, keys,
+                                          true /* include_jacobians */);
+  sym::SparseLinearizationd expected;
+  single_threaded.Relinearize(values, expected);
+  single_threaded.Relinearize(values, expected);
+
+  for (const int num_threads : {2, 3, 8}) {
+    sym::Linearizer<double> linearizer("multithreaded", factors, keys, true /* include_jacobians */,
+                                       false /* debug_checks */, num_threads);
+    CHECK(linearizer.NumThreads() == num_threads);
+
+    sym::SparseLinearizationd linearization;
+    linearizer.Relinearize(values, linearization);
+    // The first linearization is single threaded, the second is not
+    linearizer.Relinearize(values, linearization);
+
+    CHECK(linearization.residual == expected.residual);
+    CHECK(Eigen::MatrixXd(linearization.jacobian) == Eigen::MatrixXd(expected.jacobian));
+    CHECK((Eigen::MatrixXd(linearization.hessian_lower) - Eigen::MatrixXd(expected.hessian_lower))
+              .cwiseAbs()
+              .maxCoeff() < 1e-12);
+    CHECK((linearization.rhs - expected.rhs).cwiseAbs().maxCoeff() < 1e-12);
+  }
+
+  // A zero-initialized optimizer_params_t has num_threads == 0, which is treated as 1
+  sym::Linearizer<double> zero_threads("zero_threads", factors, keys, true /* include_jacobians */,
+                                       false /* debug_checks */, 0 /* num_threads */);
+  CHECK(zero_threads.NumThreads() == 1);
+}
+
+TEST_CASE("Adding and removing factors and keys matches a new linearizer", "[linearizer]") {
+  const Eigen::Matrix2d J1 = (Eigen::Matrix2d() << 1, 2, 0, 3).finished();
+  const Eigen::Matrix2d J2 = (Eigen::Matrix2d() << 4, 0, 5, 6).finished();
+
+  const auto check_matches_new_linearizer = [](const std::vector<sym::Factord>& factors,
+                                               const std::vector<sym::Key>& keys,
+                                               const sym::Valuesd& values,
+                                               const sym::SparseLinearizationd& linearization) {
+    sym::SparseLinearizationd expected;
+    sym::Linearizer<double>("expected", factors, keys, true /* include_jacobians */)
+        .Relinearize(values, expected);
+
+    CHECK(linearization.residual == expected.residual);
+    CHECK(Eigen::MatrixXd(linearization.jacobian) == Eigen::MatrixXd(expected.jacobian));
+    CHECK((Eigen::MatrixXd(linearization.hessian_lower) - Eigen::MatrixXd(expected.hessian_lower))
+              .cwiseAbs()
+              .maxCoeff() < 1e-12);
+    CHECK((linearization.rhs - expected.rhs).cwiseAbs().maxCoeff() < 1e-12);
+  };
+
+  for (const int num_threads : {1, 3}) {
+    // All of the keys are in the values from the start, but only the first ten are optimized
+    std::vector<sym::Key> all_keys;
+    sym::Valuesd values;
+    for (int i = 0; i < 15; i++) {
+      all_keys.emplace_back('x', i);
+      values.Set<double>(all_keys.back(), 0.5 * i - 3.0);
+    }
+    std::vector<sym::Key> keys(all_keys.begin(), all_keys.begin() + 10);
+
+    // A chain of alternating dense and sparse factors
+    std::vector<sym::Factord> factors;
+    for (int i = 0; i < 9; i++) {
+      const std::vector<sym::Key> factor_keys = {keys[i], keys[i + 1]};
+      factors.push_back(i % 2 == 0 ? GetDenseFactor(J1, factor_keys)
+                                   : GetSparseFactor(J2, factor_keys));
+    }
+
+    sym::Linearizer<double> linearizer("incremental", factors, keys, true /* include_jacobians */,
+                                       false /* debug_checks */, num_threads);
+    sym::SparseLinearizationd linearization;
+    linearizer.Relinearize(values, linearization);
+
+    SECTION("Adding factors between existing keys") {
+      factors.push_back(GetSparseFactor(J2, {keys[0], keys[5]}));
+      factors.push_back(GetDenseFactor(J1, {keys[3], keys[2]}));
+      linearizer.Relinearize(values, linearization);
+      check_matches_new_linearizer(factors, keys, values, linearization);
+    }
+
+    SECTION("Adding keys") {
+      const std::vector<sym::Key> new_keys(all_keys.begin() + 10, all_keys.end());
+      linearizer.AddKeys(new_keys);
+      keys.insert(keys.end(), new_keys.begin(), new_keys.end());
+      for (int i = 9; i < 14; i++) {
+        const std::vector<sym::Key> factor_keys = {keys[i], keys[i + 1]};
+        factors.push_back(i % 2 == 0 ? GetDenseFactor(J1, factor_keys)
+                                     : GetSparseFactor(J2, factor_keys));
+      }
+      factors.push_back(GetDenseFactor(J2, {keys[12], keys[1]}));
+      linearizer.Relinearize(values, linearization);
+      check_matches_new_linearizer(factors, keys, values, linearization);
+
+      // Removing factors after adding keys
+      const std::vector<int> removed = {1, 4, static_cast<int>(factors.size()) - 1};
+      for (auto it = removed.rbegin(); it != removed.rend(); ++it) {
+        factors.erase(factors.begin() + *it);
+      }
+      linearizer.RemoveFactors(removed);
+      linearizer.Relinearize(values, linearization);
+      check_matches_new_linearizer(factors, keys, values, linearization);
+    }
+
+    SECTION("Adding keys optimized by existing factors") {
+      // The first factor optimizes keys[0], which is not in the state of this linearizer at first
+      std::vector<sym::Factord> dense_factors;
+      for (int i = 0; i < 9; i++) {
+        dense_factors.push_back(GetDenseFactor(J1, {keys[i], keys[i + 1]}));
+      }
+      std::vector<sym::Key> partial_keys(keys.begin() + 1, keys.begin() + 10);
+      sym::Linearizer<double> partial("partial", dense_factors, partial_keys,
+                                      true /* include_jacobians */, false /* debug_checks */,
+                                      num_threads);
+      partial.Relinearize(values, linearization);
+      partial.AddKeys({keys[0]});
+      partial_keys.push_back(keys[0]);
+      partial.Relinearize(values, linearization);
+      check_matches_new_linearizer(dense_factors, partial_keys, values, linearization);
+    }
+
+    SECTION("Keys must be optimized by a factor") {
+      sym::Valuesd values_with_unused_key = values;
+      values_with_unused_key.Set<double>({'y'}, 1.0);
+      linearizer.AddKeys({{'y'}});
+      CHECK_THROWS(linearizer.Relinearize(values_with_unused_key, linearization));
+    }
+  }
+}
+
+TEST_CASE("Factors whose keys barely moved reuse their linearization", "[linearizer]") {
+  const Eigen::Matrix2d J1 = (Eigen::Matrix2d() << 1, 2, 0, 3).finished();
+  const Eigen::Matrix2d J2 = (Eigen::Matrix2d() << 4, 0, 5, 6).finished();
+
+  // A chain of alternating dense and sparse factors.  They're linear, so updating their previous
+  // linearizations to first order is exact
+  const int num_keys = 20;
+  std::vector<sym::Key> keys;
+  sym::Valuesd values;
+  for (int i = 0; i < num_keys; i++) {
+    keys.emplace_back('x', i);
+    values.Set<double>(keys.back(), 0.5 * i - 3.0);
+  }
+  std::vector<sym::Factord> factors;
+  for (int i = 0; i < num_keys - 1; i++) {
+    const std::vector<sym::Key> factor_keys = {keys[i], keys[i + 1]};
+    factors.push_back(i % 2 == 0 ? GetDenseFactor(J1, factor_keys)
+                                 : GetSparseFactor(J2, factor_keys));
+  }
+
+  for (const int num_threads : {1, 3}) {
+    sym::Linearizer<double> linearizer("relinearization_threshold", factors, keys,
+                                       true /* include_jacobians */, false /* debug_checks */,
+                                       num_threads);
+    linearizer.SetRelinearizationThreshold(1.0, sym::kDefaultEpsilond);
+
+    sym::SparseLinearizationd linearization;
+    linearizer.Relinearize(values, linearization);
+    linearizer.Relinearize(values, linearization);
+    CHECK(linearizer.NumFactorsSkipped() == 0);
+
+    // Move every key by less than the threshold, except for one which is touched by two factors
+    sym::Valuesd moved_values = values;
+    for (int i = 0; i < num_keys; i++) {
+      moved_values.Set<double>(keys[i], values.At<double>(keys[i]) + (i == 7 ? 2.0 : 0.1 * i / 3));
+    }
+
+    for (int step = 0; step < 2; step++) {
+      linearizer.Relinearize(moved_values, linearization);
+      // The moved key is relinearized the first time, but not the second
+      CHECK(linearizer.NumFactorsSkipped() == num_keys - 1 - (step == 0 ? 2 : 0));
+
+      sym::SparseLinearizationd expected;
+      sym::Linearizer<double>("expected", factors, keys, true /* include_jacobians */)
+          .Relinearize(moved_values, expected);
+      CHECK((linearization.residual - expected.residual).cwiseAbs().maxCoeff() < 1e-12);
+      CHECK(Eigen::MatrixXd(linearization.jacobian) == Eigen::MatrixXd(expected.jacobian));
+      CHECK((Eigen::MatrixXd(linearization.hessian_lower) - Eigen::MatrixXd(expected.hessian_lower))
+                .cwiseAbs()
+                .maxCoeff() < 1e-12);
+      CHECK((linearization.rhs - expected.rhs).cwiseAbs().maxCoeff() < 1e-12);
+    }
+
+    // Every factor is evaluated after the structure changes
+    std::vector<sym::Factord> more_factors = factors;
+    more_factors.push_back(GetDenseFactor(J2, {keys[0], keys[num_keys - 1]}));
+    sym::Linearizer<double> extended("extended", more_factors, keys, true /* include_jacobians */,
+                                     false /* debug_checks */, num_threads);
+    extended.SetRelinearizationThreshold(1.0, sym::kDefaultEpsilond);
+    extended.Relinearize(values, linearization);
+    extended.Relinearize(values, linearization);
+    more_factors.push_back(GetSparseFactor(J1, {keys[3], keys[9]}));
+    extended.Relinearize(values, linearization);
+    CHECK(extended.NumFactorsSkipped() == 0);
+    extended.Relinearize(moved_values, linearization);
+    CHECK(extended.NumFactorsSkipped() == static_cast<int>(more_factors.size()) - 2);
+  }
+}
@@ -3,6 +3,10 @@
  * This source code is under the Apache 2.0 license found in the LICENSE file.
  * ---------------------------------------------------------------------------- */
 
+#include <memory>
+#include <random>
+#include <thread>
+
 #include <Eigen/OrderingMethods>
 #include <catch2/catch_approx.hpp>
 #include <catch2/catch_test_macros.hpp>
@@ -504,3 +508,407 @@ TEST_CASE("The best linearization can be filled out without debug_stats", "[opti
   CHECK(stats.best_linearization->rhs.size() == 60);
   CHECK(stats.best_linearization->rhs.array().isFinite().all());
 }
+
+TEST_CASE("Covariances can be computed for any subset of keys", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.iterations = 50;
+  params.early_exit_min_reduction = 0.0001;
+
+  sym::Optimizer<double> optimizer(params, factors);
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+
+  const sym::SparseLinearizationd linearization = optimizer.Linearize(values);
+  Eigen::MatrixXd full_covariance;
+  optimizer.ComputeFullCovariance(linearization, full_covariance);
+
+  const auto& state_index = optimizer.Linearizer().StateIndex();
+  const auto covariance_block = [&](const sym::Key& a, const sym::Key& b) -> Eigen::MatrixXd {
+    const auto& entry_a = state_index.at(a.GetLcmType());
+    const auto& entry_b = state_index.at(b.GetLcmType());
+    return full_covariance.block(entry_a.offset, entry_b.offset, entry_a.tangent_dim,
+                                 entry_b.tangent_dim);
+  };
+
+  // Keys that are not at the start of the problem, and not in order
+  const std::vector<sym::Key> keys = {{'P', 7}, {'P', 2}, {'P', 5}};
+  std::unordered_map<sym::Key, Eigen::MatrixXd> covariances_by_key;
+  optimizer.ComputeCovariances(linearization, keys, covariances_by_key);
+  CHECK(covariances_by_key.size() == keys.size());
+  for (const sym::Key& key : keys) {
+    CHECK(covariances_by_key.at(key).isApprox(covariance_block(key, key), 1e-8));
+  }
+
+  // Cross-covariances between neighbors, distant keys, and a key and itself
+  const std::vector<std::pair<sym::Key, sym::Key>> key_pairs = {
+      {{'P', 3}, {'P', 4}}, {{'P', 9}, {'P', 0}}, {{'P', 1}, {'P', 8}}, {{'P', 6}, {'P', 6}}};
+  std::vector<Eigen::MatrixXd> cross_covariances;
+  optimizer.ComputeCrossCovariances(linearization, key_pairs, cross_covariances);
+  REQUIRE(cross_covariances.size() == key_pairs.size());
+  for (size_t i = 0; i < key_pairs.size(); i++) {
+    CHECK(cross_covariances[i].isApprox(covariance_block(key_pairs[i].first, key_pairs[i].second),
+                                        1e-8));
+  }
+
+  CHECK_THROWS(
+      optimizer.ComputeCrossCovariances(linearization, {{{'P', 0}, {'Q', 0}}}, cross_covariances));
+}
+
+TEST_CASE("Covariances of any subset of keys are damped like those of a prefix", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+
+  // A large epsilon, so that differences in damping are visible
+  const double epsilon = 1e-2;
+  sym::Optimizer<double> optimizer(DefaultLmParams(), factors, "sym::Optimize", {}, epsilon);
+  optimizer.Optimize(values);
+  const sym::SparseLinearizationd linearization = optimizer.Linearize(values);
+
+  // The first two keys are a prefix, so these are computed with the Schur complement
+  const std::vector<sym::Key> prefix = {optimizer.Keys().at(0), optimizer.Keys().at(1)};
+  std::unordered_map<sym::Key, Eigen::MatrixXd> covariances_by_key;
+  optimizer.ComputeCovariances(linearization, prefix, covariances_by_key);
+
+  // These are computed with the selected inverse
+  std::vector<Eigen::MatrixXd> cross_covariances;
+  optimizer.ComputeCrossCovariances(linearization, {{prefix[0], prefix[0]}, {prefix[1], prefix[1]}},
+                                    cross_covariances);
+  REQUIRE(cross_covariances.size() == 2);
+  CHECK(cross_covariances[0].isApprox(covariances_by_key.at(prefix[0]), 1e-8));
+  CHECK(cross_covariances[1].isApprox(covariances_by_key.at(prefix[1]), 1e-8));
+}
+
+TEST_CASE("Linearize reuses the storage of the given linearization", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.include_jacobians = true;
+  sym::Optimizerd optimizer(params, factors);
+
+  sym::SparseLinearizationd linearization = optimizer.Linearize(values);
+  const double* const hessian_data = linearization.hessian_lower.valuePtr();
+  const int* const hessian_indices = linearization.hessian_lower.innerIndexPtr();
+  const double* const jacobian_data = linearization.jacobian.valuePtr();
+  const double* const residual_data = linearization.residual.data();
+
+  optimizer.Optimize(values);
+  optimizer.Linearize(values, linearization);
+  CHECK(linearization.IsInitialized());
+  CHECK(linearization.hessian_lower.valuePtr() == hessian_data);
+  CHECK(linearization.hessian_lower.innerIndexPtr() == hessian_indices);
+  CHECK(linearization.jacobian.valuePtr() == jacobian_data);
+  CHECK(linearization.residual.data() == residual_data);
+
+  const sym::SparseLinearizationd expected = optimizer.Linearize(values);
+  CHECK(linearization.residual.isApprox(expected.residual));
+  CHECK(linearization.rhs.isApprox(expected.rhs));
+  CHECK(linearization.hessian_lower.isApprox(expected.hessian_lower));
+  CHECK(linearization.jacobian.isApprox(expected.jacobian));
+
+  // A linearization without the right structure is allocated
+  sym::SparseLinearizationd empty_linearization;
+  optimizer.Linearize(values, empty_linearization);
+  CHECK(empty_linearization.hessian_lower.isApprox(expected.hessian_lower));
+}
+
+TEST_CASE("The iteration callback is called after each iteration", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+  const sym::Valuesd initial_values = values;
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.iterations = 50;
+  params.early_exit_min_reduction = 0.0001;
+  CHECK(params.debug_stats == false);
+
+  sym::Optimizer<double> optimizer(params, factors);
+
+  std::vector<sym::optimization_iteration_t> iterations;
+  double total_seconds = 0;
+  optimizer.SetIterationCallback([&](const sym::Optimizerd::IterationInfo& info) {
+    iterations.push_back(info.iteration);
+    CHECK(info.iteration_seconds >= 0);
+    CHECK(info.total_seconds >= total_seconds);
+    total_seconds = info.total_seconds;
+
+    // Nothing is copied into the stats without debug_stats
+    CHECK(info.iteration.values.data.size() == 0);
+    CHECK(info.best_values.NumEntries() == initial_values.NumEntries());
+    CHECK(info.best_linearization.Error() <= info.iteration.new_error);
+    return false;
+  });
+
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+  REQUIRE(iterations.size() == stats.iterations.size() - 1);
+  for (size_t i = 0; i < iterations.size(); i++) {
+    CHECK(iterations[i].iteration == stats.iterations[i + 1].iteration);
+    CHECK(iterations[i].new_error == stats.iterations[i + 1].new_error);
+    CHECK(iterations[i].update_norm > 0);
+  }
+
+  // Stop after a few iterations, with the best values so far
+  values = initial_values;
+  int num_calls = 0;
+  optimizer.SetIterationCallback([&](const sym::Optimizerd::IterationInfo& info) {
+    num_calls++;
+    return info.iteration.iteration == 2;
+  });
+  const auto stopped_stats = optimizer.Optimize(values);
+  CHECK(stopped_stats.status == sym::optimization_status_t::STOPPED_BY_CALLBACK);
+  CHECK(num_calls == 3);
+  CHECK(stopped_stats.iterations.back().iteration == 2);
+  CHECK(stopped_stats.iterations.at(stopped_stats.best_index).new_error ==
+        Catch::Approx(sym::Linearize<double>(factors, values).Error()));
+
+  // Removing the callback
+  values = initial_values;
+  optimizer.SetIterationCallback({});
+  CHECK(optimizer.Optimize(values).status == sym::optimization_status_t::SUCCESS);
+}
+
+TEST_CASE("A cancellation token stops the optimization from another thread", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+  const sym::Valuesd initial_values = values;
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.iterations = 50;
+  params.early_exit_min_reduction = 0.0001;
+
+  sym::Optimizer<double> optimizer(params, factors);
+
+  // Cancel from another thread while the first iteration runs
+  const auto cancellation_token = std::make_shared<sym::CancellationToken>();
+  optimizer.SetCancellationToken(cancellation_token);
+  int num_calls = 0;
+  optimizer.SetIterationCallback([&](const sym::Optimizerd::IterationInfo& /* info */) {
+    num_calls++;
+    std::thread([&] { cancellation_token->Cancel(); }).join();
+    return false;
+  });
+
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::CANCELLED);
+  CHECK(num_calls == 1);
+  CHECK(stats.iterations.size() == 2);
+  CHECK(stats.iterations.at(stats.best_index).new_error ==
+        Catch::Approx(sym::Linearize<double>(factors, values).Error()));
+
+  // The token stays cancelled
+  values = initial_values;
+  optimizer.SetIterationCallback({});
+  CHECK(optimizer.Optimize(values).status == sym::optimization_status_t::CANCELLED);
+
+  // Removing the token
+  values = initial_values;
+  optimizer.SetCancellationToken(nullptr);
+  CHECK(optimizer.Optimize(values).status == sym::optimization_status_t::SUCCESS);
+}
+
+TEST_CASE("Factors whose keys barely moved are skipped with a relinearization threshold",
+          "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+  const sym::Valuesd initial_values = values;
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.iterations = 50;
+  params.early_exit_min_reduction = 1e-4;
+
+  sym::Optimizer<double> exact_optimizer(params, factors);
+  const auto exact_stats = exact_optimizer.Optimize(values);
+  REQUIRE(exact_stats.status == sym::optimization_status_t::SUCCESS);
+  for (const auto& iteration : exact_stats.iterations) {
+    CHECK(iteration.num_factors_skipped == 0);
+  }
+  const sym::Valuesd exact_values = values;
+
+  values = initial_values;
+  params.relinearization_threshold = 1e-3;
+  sym::Optimizer<double> optimizer(params, factors);
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+
+  // Every factor is evaluated until the keys have a linearization point to compare to, and then
+  // some are skipped as the optimization converges
+  CHECK(stats.iterations.at(0).num_factors_skipped == 0);
+  CHECK(stats.iterations.at(1).num_factors_skipped == 0);
+  int num_factors_skipped = 0;
+  for (const auto& iteration : stats.iterations) {
+    CHECK(iteration.num_factors_skipped <= static_cast<int>(factors.size()));
+    num_factors_skipped += iteration.num_factors_skipped;
+  }
+  CHECK(num_factors_skipped > 0);
+
+  // The optimum doesn't move by more than the threshold
+  CHECK(stats.iterations.at(stats.best_index).new_error ==
+        Catch::Approx(exact_stats.iterations.at(exact_stats.best_index).new_error).epsilon(1e-6));
+  for (const sym::Key& key : optimizer.Keys()) {
+    CHECK(values.At<sym::Pose3d>(key)
+              .LocalCoordinates(exact_values.At<sym::Pose3d>(key))
+              .cwiseAbs()
+              .maxCoeff() < 1e-3);
+  }
+}
+
+TEST_CASE("Linear solver orderings can be constrained by key groups and reused", "[optimizer]") {
+  auto [factors, values] = CreatePoseSmoothingProblem();
+  const sym::Valuesd initial_values = values;
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.early_exit_min_reduction = 1e-4;
+  params.debug_stats = true;
+
+  // Eliminate the odd poses before the even ones
+  std::vector<sym::Key> odd_keys;
+  for (int i = 1; i < 10; i += 2) {
+    odd_keys.emplace_back('P', i);
+  }
+
+  sym::Optimizer<double> optimizer(params, factors);
+  CHECK(optimizer.LinearSolverOrdering().size() == 0);
+  optimizer.SetLinearSolverOrderingGroups({odd_keys});
+  const auto stats = optimizer.Optimize(values);
+  CHECK(stats.status == sym::optimization_status_t::SUCCESS);
+
+  const Eigen::VectorXi ordering = optimizer.LinearSolverOrdering();
+  CHECK(ordering == stats.linear_solver_ordering);
+  for (const sym::Key& key : optimizer.Keys()) {
+    const auto& entry = optimizer.Linearizer().StateIndex().at(key.GetLcmType());
+    for (int col = entry.offset; col < entry.offset + entry.tangent_dim; ++col) {
+      if (key.Sub() % 2 == 1) {
+        CHECK(ordering[col] < 6 * static_cast<int>(odd_keys.size()));
+      } else {
+        CHECK(ordering[col] >= 6 * static_cast<int>(odd_keys.size()));
+      }
+    }
+  }
+
+  // Reusing the ordering gives the same result
+  sym::Valuesd reused_values = initial_values;
+  sym::Optimizer<double> reused_optimizer(params, factors);
+  reused_optimizer.SetLinearSolverOrdering(ordering);
+  const auto reused_stats = reused_optimizer.Optimize(reused_values);
+  CHECK(reused_optimizer.LinearSolverOrdering() == ordering);
+  CHECK(reused_stats.iterations.size() == stats.iterations.size());
+  CHECK(reused_stats.iterations.back().new_error == stats.iterations.back().new_error);
+
+  // Orderings which aren't permutations, or are for a different problem, are rejected
+  sym::Optimizer<double> other_optimizer(params, factors);
+  CHECK_THROWS(other_optimizer.SetLinearSolverOrdering(ordering.head(ordering.size() - 6)));
+  const int other_dim = static_cast<int>(ordering.size()) - 6;
+  other_optimizer.SetLinearSolverOrdering(Eigen::VectorXi::LinSpaced(other_dim, 0, other_dim - 1));
+  sym::Valuesd other_values = initial_values;
+  CHECK_THROWS(other_optimizer.Optimize(other_values));
+
+  sym::Optimizer<double> missing_key_optimizer(params, factors);
+  missing_key_optimizer.SetLinearSolverOrderingGroups({{{'Q', 0}}});
+  other_values = initial_values;
+  CHECK_THROWS(missing_key_optimizer.Optimize(other_values));
+}
+
+TEST_CASE("The Schur complement linear solver eliminates landmark-like keys", "[optimizer]") {
+  // A linear problem with camera-like keys 'x' and landmark-like keys 'l': each landmark is
+  // measured relative to a few cameras, and the first camera is fixed by a prior.  The landmarks
+  // are ordered first lexically, so they have to be detected and moved after the cameras.
+  constexpr int kNumCameras = 4;
+  constexpr int kNumLandmarks = 10;
+
+  std::mt19937 gen(42);
+  std::normal_distribution<double> normal;
+
+  std::vector<sym::Factord> factors;
+  factors.push_back(sym::Factord::Jacobian(
+      [](const Eigen::Vector3d& camera, Eigen::Vector3d* const residual,
+         Eigen::Matrix3d* const jacobian) {
+        *residual = camera;
+        if (jacobian != nullptr) {
+          jacobian->setIdentity();
+        }
+      },
+      {{'x', 0}}));
+  for (int landmark = 0; landmark < kNumLandmarks; landmark++) {
+    for (int camera = 0; camera < kNumCameras; camera++) {
+      if (camera % 2 != landmark % 2 && camera != 0) {
+        continue;
+      }
+
+      const Eigen::Vector3d measurement(normal(gen), normal(gen), normal(gen));
+      factors.push_back(sym::Factord::Jacobian(
+          [measurement](const Eigen::Vector3d& camera, const Eigen::Vector3d& landmark,
+                        Eigen::Vector3d* const residual,
+                        Eigen::Matrix<double, 3, 6>* const jacobian) {
+            *residual = landmark - camera - measurement;
+            if (jacobian != nullptr) {
+              jacobian->leftCols<3>() = -Eigen::Matrix3d::Identity();
+              jacobian->rightCols<3>().setIdentity();
+            }
+          },
+          {{'x', camera}, {'l', landmark}}));
+    }
+  }
+
+  sym::Valuesd values;
+  for (int camera = 0; camera < kNumCameras; camera++) {
+    values.Set({'x', camera}, Eigen::Vector3d::Zero());
+  }
+  for (int landmark = 0; landmark < kNumLandmarks; landmark++) {
+    values.Set({'l', landmark}, Eigen::Vector3d::Zero());
+  }
+
+  const std::vector<sym::Key> ordered_keys =
+      sym::OrderKeysForSchurComplement(factors, sym::ComputeKeysToOptimize(factors));
+  for (int i = 0; i < kNumCameras + kNumLandmarks; i++) {
+    CHECK(ordered_keys.at(i).Letter() == (i < kNumCameras ? 'x' : 'l'));
+  }
+
+  sym::optimizer_params_t params = DefaultLmParams();
+  params.initial_lambda = 1e-4;
+  params.early_exit_min_reduction = 1e-10;
+
+  sym::Valuesd direct_values = values;
+  sym::Optimizerd direct_optimizer(params, factors);
+  const auto direct_stats = direct_optimizer.Optimize(direct_values);
+  CHECK(direct_stats.status == sym::optimization_status_t::SUCCESS);
+
+  params.linear_solver_type = sym::linear_solver_type_t::SCHUR;
+  sym::Valuesd schur_values = values;
+  sym::Optimizerd schur_optimizer(params, factors);
+  CHECK(schur_optimizer.Keys() == ordered_keys);
+  const auto schur_stats = schur_optimizer.Optimize(schur_values);
+  CHECK(schur_stats.status == sym::optimization_status_t::SUCCESS);
+  CHECK(schur_stats.iterations.size() == direct_stats.iterations.size());
+  for (const sym::Key& key : ordered_keys) {
+    CHECK((schur_values.At<Eigen::Vector3d>(key) - direct_values.At<Eigen::Vector3d>(key)).norm() <
+          1e-6);
+  }
+
+  // The landmarks can also be given explicitly, with the keys in any order
+  std::vector<sym::Key> landmark_keys;
+  for (int landmark = 0; landmark < kNumLandmarks; landmark++) {
+    landmark_keys.emplace_back('l', landmark);
+  }
+  sym::Valuesd explicit_values = values;
+  sym::Optimizerd explicit_optimizer(params, factors, "sym::Optimize",
+                                     sym::ComputeKeysToOptimize(factors));
+  explicit_optimizer.SetSchurComplementKeys(landmark_keys);
+  CHECK(explicit_optimizer.Keys() == ordered_keys);
+  const auto explicit_stats = explicit_optimizer.Optimize(explicit_values);
+  CHECK(explicit_stats.status == sym::optimization_status_t::SUCCESS);
+  for (const sym::Key& key : ordered_keys) {
+    CHECK(
+        (explicit_values.At<Eigen::Vector3d>(key) - direct_values.At<Eigen::Vector3d>(key)).norm() <
+        1e-6);
+  }
+
+  CHECK_THROWS(explicit_optimizer.SetSchurComplementKeys({{'q', 0}}));
+
+  // Covariances are computed with the direct solver
+  std::unordered_map<sym::Key, Eigen::MatrixXd> covariances;
+  schur_optimizer.ComputeAllCovariances(schur_optimizer.Linearize(schur_values), covariances);
+  std::unordered_map<sym::Key, Eigen::MatrixXd> direct_covariances;
+  direct_optimizer.ComputeAllCovariances(direct_optimizer.Linearize(direct_values),
+                                         direct_covariances);
+  for (const sym::Key& key : ordered_keys) {
+    CHECK(covariances.at(key).isApprox(direct_covariances.at(key), 1e-6));
+  }
+}
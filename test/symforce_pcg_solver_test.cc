@@ -0,0 +1,249 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include <random>
+
+#include <Eigen/Core>
+#include <Eigen/SparseCore>
+#include <catch2/catch_test_macros.hpp>
+
+#include <symforce/opt/optimizer.h>
+#include <symforce/opt/pcg_solver.h>
+#include <symforce/opt/sparse_cholesky/sparse_cholesky_solver.h>
+
+namespace {
+
+constexpr int kNumCameras = 5;
+constexpr int kCameraDim = 6;
+constexpr int kNumPoints = 20;
+constexpr int kPointDim = 3;
+
+/**
+ * The lower triangle of a random bundle adjustment-like hessian, with the cameras first and the
+ * points last, where each point is observed by a random subset of cameras
+ */
+Eigen::SparseMatrix<double> BuildBundleAdjustmentHessian(std::mt19937& gen) {
+  const int cameras_dim = kNumCameras * kCameraDim;
+  const int total_dim = cameras_dim + kNumPoints * kPointDim;
+
+  std::normal_distribution<double> normal;
+  std::bernoulli_distribution observed(0.6);
+
+  std::vector<Eigen::Triplet<double>> triplets;
+  int row = 0;
+  for (int point = 0; point < kNumPoints; point++) {
+    for (int camera = 0; camera < kNumCameras; camera++) {
+      if (!observed(gen) && camera != point % kNumCameras) {
+        continue;
+      }
+
+      // A 2d reprojection residual
+      for (int residual = 0; residual < 2; residual++, row++) {
+        for (int i = 0; i < kCameraDim; i++) {
+          triplets.emplace_back(row, camera * kCameraDim + i, normal(gen));
+        }
+        for (int i = 0; i < kPointDim; i++) {
+          triplets.emplace_back(row, cameras_dim + point * kPointDim + i, normal(gen));
+        }
+      }
+    }
+  }
+
+  // A prior on every variable, so the problem is well conditioned
+  for (int i = 0; i < total_dim; i++, row++) {
+    triplets.emplace_back(row, i, 1.0);
+  }
+
+  Eigen::SparseMatrix<double> J(row, total_dim);
+  J.setFromTriplets(triplets.begin(), triplets.end());
+
+  return Eigen::SparseMatrix<double>(J.transpose() * J).triangularView<Eigen::Lower>();
+}
+
+std::vector<int> BundleAdjustmentBlockDims() {
+  std::vector<int> block_dims(kNumCameras, kCameraDim);
+  block_dims.insert(block_dims.end(), kNumPoints, kPointDim);
+  return block_dims;
+}
+
+}  // namespace
+
+TEST_CASE("PcgSolver matches a direct solve", "[pcg_solver]") {
+  std::mt19937 gen(42);
+  const Eigen::SparseMatrix<double> A = BuildBundleAdjustmentHessian(gen);
+  const Eigen::VectorXd b = Eigen::VectorXd::Random(A.rows());
+
+  sym::SparseCholeskySolver<Eigen::SparseMatrix<double>> direct_solver;
+  direct_solver.AnalyzeSparsityPattern(A);
+  REQUIRE(direct_solver.Factorize(A));
+  const Eigen::VectorXd x_direct = direct_solver.Solve(b);
+
+  for (const auto preconditioner :
+       {sym::pcg_preconditioner_t::JACOBI, sym::pcg_preconditioner_t::BLOCK_JACOBI}) {
+    INFO(preconditioner);
+
+    sym::PcgSolver<Eigen::SparseMatrix<double>> pcg_solver(preconditioner, 1000, 1e-12);
+    pcg_solver.SetBlockDims(BundleAdjustmentBlockDims());
+    pcg_solver.AnalyzeSparsityPattern(A);
+    REQUIRE(pcg_solver.Factorize(A));
+
+    // Only the cameras are left in the reduced system
+    CHECK(pcg_solver.ReducedDim() == kNumCameras * kCameraDim);
+
+    const Eigen::VectorXd x_pcg = pcg_solver.Solve(b);
+    CHECK(pcg_solver.LastIterations() <= pcg_solver.ReducedDim());
+    CHECK(pcg_solver.LastRelativeResidual() < 1e-10);
+    CHECK((x_pcg - x_direct).norm() < 1e-8 * x_direct.norm());
+
+    Eigen::VectorXd x_in_place = b;
+    pcg_solver.SolveInPlace(x_in_place);
+    CHECK(x_in_place.isApprox(x_pcg));
+  }
+}
+
+TEST_CASE("PcgSolver with the cameras last", "[pcg_solver]") {
+  std::mt19937 gen(42);
+  const Eigen::SparseMatrix<double> A = BuildBundleAdjustmentHessian(gen);
+  const Eigen::VectorXd b = Eigen::VectorXd::Random(A.rows());
+
+  sym::SparseCholeskySolver<Eigen::SparseMatrix<double>> direct_solver;
+  direct_solver.AnalyzeSparsityPattern(A);
+  REQUIRE(direct_solver.Factorize(A));
+  const Eigen::VectorXd x_direct = direct_solver.Solve(b);
+
+  // With the points first, the cameras are the trailing blocks.  They aren't coupled to each other
+  // either, so they're eliminated instead
+  const int cameras_dim = kNumCameras * kCameraDim;
+  const int points_dim = kNumPoints * kPointDim;
+  Eigen::VectorXi indices(A.rows());
+  indices.head(cameras_dim).setLinSpaced(points_dim, points_dim + cameras_dim - 1);
+  indices.tail(points_dim).setLinSpaced(0, points_dim - 1);
+  const Eigen::PermutationMatrix<Eigen::Dynamic> permutation(indices);
+  const Eigen::SparseMatrix<double> A_full = A.selfadjointView<Eigen::Lower>();
+  const Eigen::SparseMatrix<double> A_full_permuted = permutation * A_full * permutation.inverse();
+  const Eigen::SparseMatrix<double> A_permuted = A_full_permuted.triangularView<Eigen::Lower>();
+
+  std::vector<int> block_dims(kNumPoints, kPointDim);
+  block_dims.insert(block_dims.end(), kNumCameras, kCameraDim);
+
+  sym::PcgSolver<Eigen::SparseMatrix<double>> pcg_solver(sym::pcg_preconditioner_t::BLOCK_JACOBI,
+                                                         1000, 1e-12);
+  pcg_solver.SetBlockDims(block_dims);
+  pcg_solver.AnalyzeSparsityPattern(A_permuted);
+  REQUIRE(pcg_solver.Factorize(A_permuted));
+  CHECK(pcg_solver.ReducedDim() == points_dim);
+
+  const Eigen::VectorXd x_pcg = permutation.inverse() * pcg_solver.Solve(permutation * b);
+  CHECK((x_pcg - x_direct).norm() < 1e-8 * x_direct.norm());
+}
+
+TEST_CASE("PcgSolver stops at the forcing term", "[pcg_solver]") {
+  std::mt19937 gen(42);
+  const Eigen::SparseMatrix<double> A = BuildBundleAdjustmentHessian(gen);
+  const Eigen::VectorXd b = 100 * Eigen::VectorXd::Random(A.rows());
+
+  sym::PcgSolver<Eigen::SparseMatrix<double>> pcg_solver(sym::pcg_preconditioner_t::JACOBI, 1000,
+                                                         0.1);
+  pcg_solver.SetBlockDims(BundleAdjustmentBlockDims());
+  pcg_solver.AnalyzeSparsityPattern(A);
+  REQUIRE(pcg_solver.Factorize(A));
+  pcg_solver.Solve(b);
+  CHECK(pcg_solver.LastRelativeResidual() <= 0.1);
+
+  // The iteration limit is respected
+  pcg_solver.SetParams(sym::pcg_preconditioner_t::JACOBI, 1, 1e-12);
+  pcg_solver.Factorize(A);
+  pcg_solver.Solve(b);
+  CHECK(pcg_solver.LastIterations() == 1);
+}
+
+TEST_CASE("Optimizer with the PCG linear solver", "[pcg_solver]") {
+  // A linear problem with camera-like and point-like keys: each point is measured relative to a
+  // few cameras, and the first camera is fixed by a prior
+  std::mt19937 gen(42);
+  std::normal_distribution<double> normal;
+
+  constexpr int kNumOptimizerCameras = 4;
+  constexpr int kNumOptimizerPoints = 10;
+
+  std::vector<sym::Factord> factors;
+  factors.push_back(sym::Factord::Jacobian(
+      [](const Eigen::Vector3d& camera, Eigen::Vector3d* const residual,
+         Eigen::Matrix3d* const jacobian) {
+        *residual = camera;
+        if (jacobian != nullptr) {
+          jacobian->setIdentity();
+        }
+      },
+      {{'c', 0}}));
+  for (int point = 0; point < kNumOptimizerPoints; point++) {
+    for (int camera = 0; camera < kNumOptimizerCameras; camera++) {
+      if (camera % 2 != point % 2 && camera != 0) {
+        continue;
+      }
+
+      const Eigen::Vector3d measurement(normal(gen), normal(gen), normal(gen));
+      factors.push_back(sym::Factord::Jacobian(
+          [measurement](const Eigen::Vector3d& camera, const Eigen::Vector3d& point,
+                        Eigen::Vector3d* const residual,
+                        Eigen::Matrix<double, 3, 6>* const jacobian) {
+            *residual = point - camera - measurement;
+            if (jacobian != nullptr) {
+              jacobian->leftCols<3>() = -Eigen::Matrix3d::Identity();
+              jacobian->rightCols<3>().setIdentity();
+            }
+          },
+          {{'c', camera}, {'p', point}}));
+    }
+  }
+
+  sym::Valuesd values;
+  std::vector<sym::Key> keys;
+  for (int camera = 0; camera < kNumOptimizerCameras; camera++) {
+    values.Set({'c', camera}, Eigen::Vector3d::Zero());
+    keys.emplace_back('c', camera);
+  }
+  for (int point = 0; point < kNumOptimizerPoints; point++) {
+    values.Set({'p', point}, Eigen::Vector3d::Zero());
+    keys.emplace_back('p', point);
+  }
+
+  sym::optimizer_params_t params = sym::DefaultOptimizerParams();
+  params.initial_lambda = 1e-4;
+  params.early_exit_min_reduction = 1e-10;
+
+  sym::Valuesd direct_values = values;
+  sym::Optimizerd direct_optimizer(params, factors, "sym::Optimize", keys);
+  const auto direct_stats = direct_optimizer.Optimize(direct_values);
+  CHECK(direct_stats.status == sym::optimization_status_t::SUCCESS);
+
+  for (const auto preconditioner :
+       {sym::pcg_preconditioner_t::JACOBI, sym::pcg_preconditioner_t::BLOCK_JACOBI}) {
+    INFO(preconditioner);
+
+    params.linear_solver_type = sym::linear_solver_type_t::PCG;
+    params.pcg_preconditioner = preconditioner;
+
+    sym::Valuesd pcg_values = values;
+    sym::Optimizerd pcg_optimizer(params, factors, "sym::Optimize", keys);
+    const auto pcg_stats = pcg_optimizer.Optimize(pcg_values);
+    CHECK(pcg_stats.status == sym::optimization_status_t::SUCCESS);
+
+    for (const sym::Key& key : keys) {
+      CHECK((pcg_values.At<Eigen::Vector3d>(key) - direct_values.At<Eigen::Vector3d>(key)).norm() <
+            1e-6);
+    }
+
+    // Covariances are computed with the direct solver
+    std::unordered_map<sym::Key, Eigen::MatrixXd> covariances;
+    pcg_optimizer.ComputeAllCovariances(pcg_optimizer.Linearize(pcg_values), covariances);
+    std::unordered_map<sym::Key, Eigen::MatrixXd> direct_covariances;
+    direct_optimizer.ComputeAllCovariances(direct_optimizer.Linearize(direct_values),
+                                           direct_covariances);
+    for (const sym::Key& key : keys) {
+      CHECK(covariances.at(key).isApprox(direct_covariances.at(key), 1e-6));
+    }
+  }
+}
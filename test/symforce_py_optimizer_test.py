@@ -7,15 +7,26 @@ import symforce
 
 symforce.set_epsilon_to_symbol()
 
+import asyncio
+import json
+import threading
+
+import numpy as np
+
+from lcmtypes.sym._dogleg_solver_failure_reason_t import dogleg_solver_failure_reason_t
 from lcmtypes.sym._index_entry_t import index_entry_t
 from lcmtypes.sym._key_t import key_t
+from lcmtypes.sym._linear_solver_type_t import linear_solver_type_t
+from lcmtypes.sym._pcg_preconditioner_t import pcg_preconditioner_t
 from lcmtypes.sym._type_t import type_t
 
 import symforce.symbolic as sf
+from symforce import cc_sym
 from symforce import logger
 from symforce import typing as T
 from symforce.opt._internal.generated_residual_cache import GeneratedResidualCache
 from symforce.opt.factor import Factor
+from symforce.opt.numeric_factor import NumericFactor
 from symforce.opt.optimizer import Optimizer
 from symforce.test_util import TestCase
 from symforce.values import Values
@@ -166,6 +177,1315 @@ class SymforcePyOptimizerTest(TestCase):
             2,
         )
 
+    def test_numpy_scalar_values(self) -> None:
+        """
+        Values holding numpy scalars should be transferred to C++ like Python floats
+        """
+
+        def between(x: T.Scalar, y: T.Scalar, b: T.Scalar) -> sf.V1:
+            return sf.V1(y - x - b)
+
+        optimizer = Optimizer(
+            factors=[Factor(keys=["x0", "x1", "b"], residual=between)], optimized_keys=["x1"]
+        )
+
+        result = optimizer.optimize(Values(x0=0.0, x1=0.0, b=1.0))
+        self.assertAlmostEqual(result.optimized_values["x1"], 1.0)
+
+        result = optimizer.optimize(Values(x0=np.int64(1), x1=np.float32(0.0), b=np.float64(2.0)))
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertAlmostEqual(result.optimized_values["x1"], 3.0)
+
+    def test_batch_factors(self) -> None:
+        """
+        Tests:
+            Optimizer(batch_factors=True)
+
+        Factors sharing a linearization function give the same result when linearized as a group,
+        with and without a batched linearization function
+        """
+        num_samples = 10
+        xs, factors, initial_values = self.rotation_smoothing_problem(num_samples)
+
+        expected = Optimizer(factors=factors, optimized_keys=xs).optimize(initial_values)
+        result = Optimizer(factors=factors, optimized_keys=xs, batch_factors=True).optimize(
+            initial_values
+        )
+
+        self.assertEqual(len(result.iterations), len(expected.iterations))
+        self.assertAlmostEqual(result.error(), expected.error())
+        for x in xs:
+            self.assertStorageNear(result.optimized_values[x], expected.optimized_values[x])
+
+        with self.subTest(msg="With a batched linearization function"):
+            batched_calls = []
+
+            def linearization(
+                x: float, target: float
+            ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                return (
+                    np.array([x - target]),
+                    np.array([[1.0]]),
+                    np.array([[1.0]]),
+                    np.array([x - target]),
+                )
+
+            def batched_linearization(
+                x: np.ndarray, target: np.ndarray
+            ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                batched_calls.append(len(x))
+                ones = np.ones((len(x), 1, 1))
+                return (x - target)[:, np.newaxis], ones, ones, (x - target)[:, np.newaxis]
+
+            scalar_factors = [
+                NumericFactor(
+                    [f"y{i}", f"target{i}"], [f"y{i}"], linearization, batched_linearization
+                )
+                for i in range(num_samples)
+            ] + [NumericFactor(["y0", "y1"], ["y0", "y1"], self.scalar_between)]
+            scalar_values = Values()
+            for i in range(num_samples):
+                scalar_values[f"y{i}"] = 0.0
+                scalar_values[f"target{i}"] = float(i)
+
+            expected = Optimizer(scalar_factors).optimize(scalar_values)
+            result = Optimizer(scalar_factors, batch_factors=True).optimize(scalar_values)
+
+            self.assertEqual(set(batched_calls), {num_samples})
+            self.assertAlmostEqual(result.error(), expected.error())
+            for i in range(num_samples):
+                self.assertAlmostEqual(
+                    result.optimized_values[f"y{i}"], expected.optimized_values[f"y{i}"]
+                )
+
+    def test_num_threads(self) -> None:
+        """
+        Tests:
+            Optimizer.Params.num_threads
+
+        Relinearizing Python factors on multiple threads gives the same result as on a single
+        thread, and the same result every time
+        """
+        xs, factors, initial_values = self.rotation_smoothing_problem(num_samples=20)
+
+        expected = Optimizer(factors=factors, optimized_keys=xs).optimize(initial_values)
+
+        multithreaded_params = Optimizer.Params(num_threads=4)
+        result = Optimizer(
+            factors=factors, optimized_keys=xs, params=multithreaded_params
+        ).optimize(initial_values)
+
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(len(result.iterations), len(expected.iterations))
+        self.assertAlmostEqual(result.error(), expected.error())
+        for x in xs:
+            self.assertStorageNear(result.optimized_values[x], expected.optimized_values[x])
+
+        repeated = Optimizer(
+            factors=factors, optimized_keys=xs, params=multithreaded_params
+        ).optimize(initial_values)
+        self.assertEqual(repeated.error(), result.error())
+        for x in xs:
+            self.assertEqual(
+                repeated.optimized_values[x].to_storage(), result.optimized_values[x].to_storage()
+            )
+
+        with self.subTest(msg="Exceptions from factors are raised on the calling thread"):
+            calls = []
+
+            def failing_linearization(
+                x: float,
+            ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+                # The first linearization is single threaded, so fail on a later one
+                calls.append(x)
+                if len(calls) > 1:
+                    raise ValueError("failing factor")
+                return np.array([x]), np.array([[1.0]]), np.array([[1.0]]), np.array([x])
+
+            failing_factors = [
+                NumericFactor(["y0", "y1"], ["y0", "y1"], self.scalar_between),
+                NumericFactor(["y1"], ["y1"], failing_linearization),
+            ]
+            with self.assertRaises(ValueError):
+                Optimizer(failing_factors, params=multithreaded_params).optimize(
+                    Values(y0=0.0, y1=1.0)
+                )
+
+    def test_pcg_linear_solver(self) -> None:
+        """
+        Tests:
+            Optimizer.Params.linear_solver_type
+            Optimizer.Params.pcg_preconditioner
+
+        Solving for the steps with PCG, with the point-like keys after the camera-like keys so
+        they're eliminated, gives the same result as the direct solver
+        """
+        num_cameras = 3
+        num_points = 8
+        cameras = [f"camera{i}" for i in range(num_cameras)]
+        points = [f"point{i}" for i in range(num_points)]
+
+        def prior_residual(camera: sf.V3) -> sf.V3:
+            return camera
+
+        def measurement_residual(camera: sf.V3, point: sf.V3, measurement: sf.V3) -> sf.V3:
+            return point - camera - measurement
+
+        rng = np.random.default_rng(42)
+        factors = [Factor(keys=[cameras[0]], residual=prior_residual)]
+        initial_values = Values()
+        for i in range(num_points):
+            for j in range(num_cameras):
+                if j == 0 or j == i % num_cameras:
+                    measurement = f"measurement{i}_{j}"
+                    initial_values[measurement] = sf.V3(rng.normal(size=3))
+                    factors.append(
+                        Factor(
+                            keys=[cameras[j], points[i], measurement],
+                            residual=measurement_residual,
+                        )
+                    )
+        for key in cameras + points:
+            initial_values[key] = sf.V3.zero()
+
+        optimized_keys = cameras + points
+        expected = Optimizer(factors=factors, optimized_keys=optimized_keys).optimize(
+            initial_values
+        )
+
+        for preconditioner in (pcg_preconditioner_t.JACOBI, pcg_preconditioner_t.BLOCK_JACOBI):
+            with self.subTest(preconditioner=preconditioner):
+                params = Optimizer.Params(
+                    linear_solver_type=linear_solver_type_t.PCG,
+                    pcg_preconditioner=preconditioner,
+                )
+                result = Optimizer(
+                    factors=factors, optimized_keys=optimized_keys, params=params
+                ).optimize(initial_values)
+
+                self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+                self.assertAlmostEqual(result.error(), expected.error())
+                for key in optimized_keys:
+                    self.assertStorageNear(
+                        result.optimized_values[key], expected.optimized_values[key], places=6
+                    )
+
+    def test_schur_linear_solver(self) -> None:
+        """
+        Tests:
+            Optimizer.Params.linear_solver_type
+            Optimizer(schur_complement_keys=...)
+
+        Solving for the steps with a Schur complement gives the same result as the direct solver,
+        whether the point-like keys to eliminate are detected or given
+        """
+        num_cameras = 3
+        num_points = 8
+        cameras = [f"camera{i}" for i in range(num_cameras)]
+        points = [f"point{i}" for i in range(num_points)]
+
+        def prior_residual(camera: sf.V3) -> sf.V3:
+            return camera
+
+        def measurement_residual(camera: sf.V3, point: sf.V3, measurement: sf.V3) -> sf.V3:
+            return point - camera - measurement
+
+        rng = np.random.default_rng(42)
+        factors = [Factor(keys=[cameras[0]], residual=prior_residual)]
+        initial_values = Values()
+        for i in range(num_points):
+            for j in range(num_cameras):
+                if j == 0 or j == i % num_cameras:
+                    measurement = f"measurement{i}_{j}"
+                    initial_values[measurement] = sf.V3(rng.normal(size=3))
+                    factors.append(
+                        Factor(
+                            keys=[cameras[j], points[i], measurement],
+                            residual=measurement_residual,
+                        )
+                    )
+        for key in cameras + points:
+            initial_values[key] = sf.V3.zero()
+
+        # The points are first, so they have to be moved after the cameras to be eliminated
+        optimized_keys = points + cameras
+        expected = Optimizer(factors=factors, optimized_keys=optimized_keys).optimize(
+            initial_values
+        )
+
+        params = Optimizer.Params(linear_solver_type=linear_solver_type_t.SCHUR)
+        for schur_complement_keys in (None, points):
+            with self.subTest(schur_complement_keys=schur_complement_keys):
+                result = Optimizer(
+                    factors=factors,
+                    optimized_keys=optimized_keys,
+                    params=params,
+                    schur_complement_keys=schur_complement_keys,
+                ).optimize(initial_values)
+
+                self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+                self.assertAlmostEqual(result.error(), expected.error())
+                for key in optimized_keys:
+                    self.assertStorageNear(
+                        result.optimized_values[key], expected.optimized_values[key], places=6
+                    )
+
+        with self.assertRaises(ValueError):
+            Optimizer(
+                factors=factors,
+                optimized_keys=optimized_keys,
+                params=params,
+                schur_complement_keys=["measurement0_0"],
+            )
+
+    def test_dogleg_solver(self) -> None:
+        """
+        Tests:
+            Optimizer(solver="dogleg")
+
+        The dogleg solver converges to the same minimum as Levenberg-Marquardt on the Rosenbrock
+        function, and reports its own failure reasons
+        """
+
+        def rosenbrock_residual(x: sf.Scalar, y: sf.Scalar) -> sf.V2:
+            return sf.V2(10 * (y - x**2), 1 - x)
+
+        factors = [Factor(keys=["x", "y"], residual=rosenbrock_residual)]
+        initial_values = Values(x=-1.2, y=1.0)
+        params = Optimizer.Params(early_exit_min_reduction=1e-12, iterations=100)
+
+        expected = Optimizer(factors=factors, optimized_keys=["x", "y"], params=params).optimize(
+            initial_values
+        )
+
+        optimizer = Optimizer(
+            factors=factors, optimized_keys=["x", "y"], params=params, solver="dogleg"
+        )
+        self.assertIsInstance(optimizer._cc_optimizer, cc_sym.DoglegOptimizer)  # noqa: SLF001
+        result = optimizer.optimize(initial_values)
+
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(result.failure_reason, dogleg_solver_failure_reason_t.INVALID)
+        for key in ("x", "y"):
+            self.assertAlmostEqual(result.optimized_values[key], 1.0, places=6)
+            self.assertAlmostEqual(
+                result.optimized_values[key], expected.optimized_values[key], places=6
+            )
+
+        # Each problem is solved by a copy of the dogleg optimizer
+        for many_result in optimizer.optimize_many([initial_values] * 3, num_threads=2):
+            self.assertEqual(many_result.status, Optimizer.Status.SUCCESS)
+            self.assertAlmostEqual(many_result.error(), result.error())
+
+        with self.assertRaises(ValueError):
+            Optimizer(factors=factors, optimized_keys=["x", "y"], solver="gradient_descent")
+
+    def test_float32(self) -> None:
+        """
+        Tests:
+            Optimizer(dtype=np.float32)
+
+        Optimizing in single precision converges to the same minimum as in double precision, to
+        single precision
+        """
+        xs, factors, initial_values = self.rotation_smoothing_problem()
+
+        def offset_residual(offset: sf.V3, target: sf.V3) -> sf.V3:
+            return offset - target
+
+        factors.append(Factor(keys=["offset", "target"], residual=offset_residual))
+        optimized_keys = xs + ["offset"]
+        initial_values["offset"] = np.zeros(3)
+        initial_values["target"] = np.array([1.0, 2.0, 3.0])
+
+        params = Optimizer.Params(verbose=False)
+        expected = Optimizer(factors, optimized_keys, params=params).optimize(initial_values)
+
+        for solver in ("levenberg_marquardt", "dogleg"):
+            for batch_factors in (False, True):
+                with self.subTest(solver=solver, batch_factors=batch_factors):
+                    optimizer = Optimizer(
+                        factors,
+                        optimized_keys,
+                        params=params,
+                        solver=solver,
+                        batch_factors=batch_factors,
+                        dtype=np.float32,
+                    )
+                    result = optimizer.optimize(initial_values)
+
+                    self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+                    self.assertIsInstance(result._stats, cc_sym.OptimizationStatsf)  # noqa: SLF001
+                    self.assertLess(abs(result.error() - expected.error()), 1e-4)
+                    for x in xs:
+                        self.assertStorageNear(
+                            result.optimized_values[x], expected.optimized_values[x], places=4
+                        )
+                    self.assertEqual(result.optimized_values["offset"].dtype, np.float32)
+                    np.testing.assert_allclose(
+                        result.optimized_values["offset"], [1.0, 2.0, 3.0], rtol=1e-6
+                    )
+
+                    linearization = optimizer.linearize(result.optimized_values)
+                    self.assertIsInstance(linearization, cc_sym.Linearizationf)
+                    self.assertEqual(linearization.rhs.dtype, np.float32)
+
+        with self.assertRaises(ValueError):
+            Optimizer(factors, optimized_keys, dtype=np.float16)
+
+    def test_dense(self) -> None:
+        """
+        Tests:
+            Optimizer(dense=True)
+
+        The dense optimizer gives the same results as the sparse optimizer
+        """
+        xs, factors, initial_values = self.rotation_smoothing_problem()
+
+        params = Optimizer.Params(verbose=False)
+        sparse_optimizer = Optimizer(factors, xs, params=params, dense=False)
+        expected = sparse_optimizer.optimize(initial_values)
+        self.assertFalse(sparse_optimizer.dense)
+
+        optimizer = Optimizer(factors, xs, params=params, dense=True)
+        self.assertTrue(optimizer.dense)
+        result = optimizer.optimize(initial_values)
+        self.assertIsInstance(result._stats, cc_sym.DenseOptimizationStats)  # noqa: SLF001
+
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(len(result.iterations), len(expected.iterations))
+        self.assertAlmostEqual(result.error(), expected.error())
+        for x in xs:
+            self.assertStorageNear(result.optimized_values[x], expected.optimized_values[x])
+
+        linearization = optimizer.linearize(result.optimized_values)
+        assert isinstance(linearization, cc_sym.DenseLinearization)
+        expected_linearization = sparse_optimizer.linearize(result.optimized_values)
+        assert isinstance(expected_linearization, cc_sym.Linearization)
+        np.testing.assert_allclose(
+            linearization.hessian_lower, expected_linearization.hessian_lower.toarray()
+        )
+        np.testing.assert_allclose(linearization.rhs, expected_linearization.rhs)
+
+        np.testing.assert_allclose(
+            optimizer.compute_full_covariance(result.optimized_values),
+            sparse_optimizer.compute_full_covariance(result.optimized_values),
+            rtol=1e-6,
+            atol=1e-12,
+        )
+        key_pairs = [(xs[0], xs[3])]
+        np.testing.assert_allclose(
+            optimizer.compute_cross_covariances(result.optimized_values, key_pairs)[0],
+            sparse_optimizer.compute_cross_covariances(result.optimized_values, key_pairs)[0],
+            rtol=1e-6,
+            atol=1e-12,
+        )
+        self.assertEqual(len(optimizer.linear_solver_ordering()), 0)
+
+        with self.subTest(msg="dense=True with float32"):
+            optimizer = Optimizer(factors, xs, params=params, dtype=np.float32, dense=True)
+            result = optimizer.optimize(initial_values)
+            self.assertIsInstance(result._stats, cc_sym.DenseOptimizationStatsf)  # noqa: SLF001
+            self.assertLess(abs(result.error() - expected.error()), 1e-4)
+
+    def test_dense_auto(self) -> None:
+        """
+        Tests:
+            Optimizer(dense="auto")
+
+        The sparse optimizer is the default, and the dense optimizer is chosen automatically for
+        small problems with dense="auto" unless the problem needs the sparse optimizer
+        """
+        xs, factors, initial_values = self.rotation_smoothing_problem()
+        params = Optimizer.Params(verbose=False)
+
+        with self.subTest(msg="The sparse optimizer is the default"):
+            optimizer = Optimizer(factors, xs, params=params)
+            self.assertFalse(optimizer.dense)
+            optimizer.optimize(initial_values)
+            self.assertFalse(optimizer.dense)
+            self.assertIsInstance(optimizer.linearize(initial_values), cc_sym.Linearization)
+
+        with self.subTest(msg="Small problems are optimized densely with dense='auto'"):
+            optimizer = Optimizer(factors, xs, params=params, dense="auto")
+            self.assertIsNone(optimizer.dense)
+            result = optimizer.optimize(initial_values)
+            self.assertTrue(optimizer.dense)
+            self.assertIsInstance(result._stats, cc_sym.DenseOptimizationStats)  # noqa: SLF001
+            self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+            self.assertIsInstance(optimizer.linearize(initial_values), cc_sym.DenseLinearization)
+
+        unsupported_kwargs: T.List[T.Dict[str, T.Any]] = [
+            dict(batch_factors=True),
+            dict(solver="dogleg"),
+            dict(ordering_key_groups=[xs[::2]]),
+        ]
+        for kwargs in unsupported_kwargs:
+            with self.subTest(msg="The sparse optimizer is used when the dense one is unsupported"):
+                optimizer = Optimizer(factors, xs, params=params, dense="auto", **kwargs)
+                optimizer.optimize(initial_values)
+                self.assertFalse(optimizer.dense)
+
+    def test_dense_invalid(self) -> None:
+        """
+        Tests:
+            Optimizer(dense=...)
+
+        dense=True raises if the dense optimizer doesn't support the problem, and dense must be a
+        bool or "auto"
+        """
+        xs, factors, _ = self.rotation_smoothing_problem()
+        params = Optimizer.Params(verbose=False)
+
+        unsupported_kwargs: T.List[T.Dict[str, T.Any]] = [
+            dict(batch_factors=True),
+            dict(solver="dogleg"),
+            dict(ordering_key_groups=[xs[::2]]),
+        ]
+        for kwargs in unsupported_kwargs:
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                Optimizer(factors, xs, params=params, dense=True, **kwargs)
+
+        for dense in ("always", 1, 0, 1.0):
+            with self.subTest(dense=dense), self.assertRaises(ValueError):
+                Optimizer(factors, xs, params=params, dense=dense)  # type: ignore[arg-type]
+
+    def test_compute_cross_covariances(self) -> None:
+        """
+        Tests:
+            Optimizer.compute_covariances
+            Optimizer.compute_cross_covariances
+
+        Covariances for any subset of keys, and cross-covariances for any pairs of keys, match the
+        corresponding blocks of the full covariance
+        """
+        xs, factors, values = self.rotation_smoothing_problem()
+
+        optimizer = Optimizer(factors=factors, optimized_keys=xs)
+        full_covariance = optimizer.compute_full_covariance(values)
+        index = optimizer.linearization_index()
+
+        def covariance_block(a: str, b: str) -> np.ndarray:
+            rows = slice(index[a].offset, index[a].offset + index[a].tangent_dim)
+            cols = slice(index[b].offset, index[b].offset + index[b].tangent_dim)
+            return full_covariance[rows, cols]
+
+        keys = ["x7", "x2", "x5"]
+        covariances = optimizer.compute_covariances(values, keys)
+        self.assertEqual(set(covariances), set(keys))
+        for key in keys:
+            np.testing.assert_allclose(covariances[key], covariance_block(key, key), rtol=1e-8)
+
+        key_pairs = [("x3", "x4"), ("x9", "x0"), ("x1", "x8"), ("x6", "x6")]
+        cross_covariances = optimizer.compute_cross_covariances(values, key_pairs)
+        self.assertEqual(len(cross_covariances), len(key_pairs))
+        for (a, b), cross_covariance in zip(key_pairs, cross_covariances):
+            np.testing.assert_allclose(cross_covariance, covariance_block(a, b), atol=1e-12)
+
+    def test_linearize_in_place(self) -> None:
+        """
+        Tests:
+            Optimizer.linearize(values, linearization)
+            cc_sym.Linearization.hessian_lower_csc_buffers
+            cc_sym.Linearization.hessian_lower_csc_view
+            cc_sym.Linearization.jacobian_csc_view
+
+        The CSC buffers of a linearization are views of its storage, which see in place
+        relinearizations
+        """
+        xs, factors, values = self.rotation_smoothing_problem()
+
+        optimizer = Optimizer(
+            factors,
+            xs,
+            params=Optimizer.Params(verbose=False, include_jacobians=True),
+        )
+        linearization = optimizer.linearize(values)
+        assert isinstance(linearization, cc_sym.Linearization)
+
+        data, indices, indptr = linearization.hessian_lower_csc_buffers()
+        self.assertEqual(indices.dtype, np.int32)
+        self.assertTrue(data.flags.writeable)
+        self.assertFalse(indices.flags.writeable)
+        self.assertFalse(indptr.flags.writeable)
+
+        hessian_lower = linearization.hessian_lower_csc_view()
+        for view, buffer in zip(
+            (hessian_lower.data, hessian_lower.indices, hessian_lower.indptr),
+            (data, indices, indptr),
+        ):
+            self.assertTrue(np.shares_memory(view, buffer))
+        np.testing.assert_array_equal(
+            hessian_lower.toarray(), linearization.hessian_lower.toarray()
+        )
+        jacobian = linearization.jacobian_csc_view()
+        np.testing.assert_array_equal(jacobian.toarray(), linearization.jacobian.toarray())
+        residual = linearization.residual
+
+        # Relinearizing in place updates the views
+        for i, x in enumerate(xs):
+            values[x] = sf.Rot3.from_yaw_pitch_roll(yaw=0.0, pitch=0.2 * i, roll=0.0)
+        self.assertIs(optimizer.linearize(values, linearization), linearization)
+
+        expected = optimizer.linearize(values)
+        assert isinstance(expected, cc_sym.Linearization)
+        np.testing.assert_allclose(hessian_lower.toarray(), expected.hessian_lower.toarray())
+        np.testing.assert_allclose(jacobian.toarray(), expected.jacobian.toarray())
+        np.testing.assert_allclose(residual, expected.residual)
+        np.testing.assert_allclose(data, expected.hessian_lower.data)
+
+        # The views keep the linearization alive
+        del linearization
+        np.testing.assert_allclose(hessian_lower.toarray(), expected.hessian_lower.toarray())
+
+    def test_iteration_callback(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize(iteration_callback=...)
+
+        The callback sees each iteration as it happens, can read the best values on demand, and can
+        stop the optimization early
+        """
+
+        def rosenbrock_residual(x: sf.Scalar, y: sf.Scalar) -> sf.V2:
+            return sf.V2(10 * (y - x**2), 1 - x)
+
+        optimizer = Optimizer(
+            factors=[Factor(keys=["x", "y"], residual=rosenbrock_residual)],
+            optimized_keys=["x", "y"],
+            params=Optimizer.Params(early_exit_min_reduction=1e-12, iterations=100),
+        )
+        initial_values = Values(x=-1.2, y=1.0)
+
+        infos: T.List[Optimizer.IterationInfo] = []
+        best_errors = []
+
+        def callback(info: Optimizer.IterationInfo) -> None:
+            infos.append(info)
+            best_values = info.best_values()
+            self.assertEqual(set(best_values.keys()), {"x", "y"})
+            best_errors.append(info.best_linearization().error())
+
+        result = optimizer.optimize(initial_values, iteration_callback=callback)
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(len(infos), len(result.iterations) - 1)
+        for info, iteration in zip(infos, result.iterations[1:]):
+            self.assertEqual(info.iteration.iteration, iteration.iteration)
+            self.assertEqual(info.iteration.new_error, iteration.new_error)
+            self.assertGreater(info.iteration.update_norm, 0)
+            self.assertGreaterEqual(info.total_seconds, info.iteration_seconds)
+        self.assertAlmostEqual(best_errors[-1], result.error())
+
+        # The values are only available during the callback
+        with self.assertRaises(RuntimeError):
+            infos[-1].best_values()
+
+        stopped_result = optimizer.optimize(
+            initial_values, iteration_callback=lambda info: info.iteration.iteration == 2
+        )
+        self.assertEqual(stopped_result.status, Optimizer.Status.STOPPED_BY_CALLBACK)
+        self.assertEqual(stopped_result.iterations[-1].iteration, 2)
+
+        # The callback is removed after the optimization
+        self.assertEqual(optimizer.optimize(initial_values).status, Optimizer.Status.SUCCESS)
+
+    def test_profile(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize(profile=..., profile_timeline=...)
+
+        The profile only covers the call it was requested for, and the timeline can be exported as
+        Chrome trace JSON
+        """
+
+        def rosenbrock_residual(x: sf.Scalar, y: sf.Scalar) -> sf.V2:
+            return sf.V2(10 * (y - x**2), 1 - x)
+
+        optimizer = Optimizer(
+            factors=[Factor(keys=["x", "y"], residual=rosenbrock_residual)],
+            optimized_keys=["x", "y"],
+            params=Optimizer.Params(early_exit_min_reduction=1e-12, iterations=100),
+        )
+        initial_values = Values(x=-1.2, y=1.0)
+
+        self.assertIsNone(optimizer.optimize(initial_values).profile)
+
+        result = optimizer.optimize(initial_values, profile=True)
+        profile = result.profile
+        assert profile is not None
+        self.assertIsNone(profile.timeline)
+        with self.assertRaises(ValueError):
+            profile.to_chrome_trace()
+
+        num_iterations = len(result.iterations) - 1
+        iterate = next(name for name in profile.scopes if name.endswith("::Iterate()"))
+        self.assertEqual(profile.scopes[iterate].count, num_iterations)
+        for timing in profile.scopes.values():
+            self.assertGreater(timing.count, 0)
+            self.assertLessEqual(timing.min, timing.mean)
+            self.assertLessEqual(timing.mean, timing.max)
+            self.assertLessEqual(timing.max, timing.total)
+
+        # Each optimization gets its own profile
+        second_profile = optimizer.optimize(initial_values, profile=True).profile
+        assert second_profile is not None
+        self.assertEqual(second_profile.scopes[iterate].count, num_iterations)
+
+        timeline_profile = optimizer.optimize(initial_values, profile_timeline=True).profile
+        assert timeline_profile is not None and timeline_profile.timeline is not None
+        self.assertEqual(
+            {event.name for event in timeline_profile.timeline}, set(timeline_profile.scopes)
+        )
+        self.assertEqual(
+            sum(event.name == iterate for event in timeline_profile.timeline), num_iterations
+        )
+        starts = [event.start for event in timeline_profile.timeline]
+        self.assertEqual(starts, sorted(starts))
+
+        trace = timeline_profile.to_chrome_trace()
+        self.assertEqual(len(trace["traceEvents"]), len(timeline_profile.timeline))
+        self.assertEqual(trace["traceEvents"][0]["ph"], "X")
+
+        trace_path = self.make_output_dir("sf_optimizer_profile_") / "trace.json"
+        timeline_profile.write_chrome_trace(trace_path)
+        self.assertEqual(json.loads(trace_path.read_text()), trace)
+
+    def test_optimize_async(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize_async
+            Optimizer.linearize_async
+
+        The async methods give the same results as the synchronous ones
+        """
+        initial_values = Values(x=-1.2, y=1.0)
+        expected = self.rosenbrock_optimizer().optimize(initial_values)
+
+        async def optimize_both() -> T.List[Optimizer.Result]:
+            return list(
+                await asyncio.gather(
+                    self.rosenbrock_optimizer().optimize_async(initial_values),
+                    self.rosenbrock_optimizer().optimize_async(initial_values),
+                )
+            )
+
+        for result in asyncio.run(optimize_both()):
+            self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+            self.assertEqual(len(result.iterations), len(expected.iterations))
+            self.assertStorageNear(
+                result.optimized_values["x"], expected.optimized_values["x"], places=9
+            )
+            self.assertStorageNear(
+                result.optimized_values["y"], expected.optimized_values["y"], places=9
+            )
+
+        optimizer = self.rosenbrock_optimizer()
+        linearization = asyncio.run(optimizer.linearize_async(initial_values))
+        self.assertAlmostEqual(linearization.error(), optimizer.linearize(initial_values).error())
+
+    def test_optimize_async_cancellation(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize_async
+
+        Cancelling the awaiting task stops the optimization, and calls on the same optimizer run
+        one at a time
+        """
+        optimizer = self.rosenbrock_optimizer()
+        initial_values = Values(x=-1.2, y=1.0)
+
+        # Block the optimization in its first iteration until the task has been cancelled
+        num_calls = 0
+        task_cancelled = threading.Event()
+
+        def iteration_callback(_: Optimizer.IterationInfo) -> bool:
+            nonlocal num_calls
+            num_calls += 1
+            task_cancelled.wait(timeout=10)
+            return False
+
+        async def optimize_and_cancel() -> None:
+            task = asyncio.create_task(
+                optimizer.optimize_async(initial_values, iteration_callback=iteration_callback)
+            )
+            while num_calls == 0:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            task_cancelled.set()
+            await task
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(optimize_and_cancel())
+        self.assertEqual(num_calls, 1)
+
+        # The cancellation only applies to the cancelled call
+        result = asyncio.run(optimizer.optimize_async(initial_values))
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+
+        # Calls on the same optimizer run one at a time, and a call which is cancelled while
+        # waiting for another one never starts
+        num_calls = 0
+        task_cancelled.clear()
+        queued_calls: T.List[Optimizer.IterationInfo] = []
+
+        async def cancel_queued() -> Optimizer.Result:
+            first = asyncio.create_task(
+                optimizer.optimize_async(initial_values, iteration_callback=iteration_callback)
+            )
+            second = asyncio.create_task(
+                optimizer.optimize_async(initial_values, iteration_callback=queued_calls.append)
+            )
+            while num_calls == 0:
+                await asyncio.sleep(0.001)
+            second.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await second
+            task_cancelled.set()
+            return await first
+
+        result = asyncio.run(cancel_queued())
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(queued_calls, [])
+
+    def test_optimize_state(self) -> None:
+        """
+        Tests:
+            Optimizer.set_state
+            Optimizer.optimize_state
+            Optimizer.state_values
+
+        Optimizing the persistent state gives the same results as optimizing the full Values, and
+        only returns the entries which changed
+        """
+        xs, _, factors, values = self.pose2_chain_problem()
+        optimizer = Optimizer(
+            factors=factors, optimized_keys=xs, params=Optimizer.Params(verbose=False)
+        )
+
+        with self.assertRaises(ValueError):
+            optimizer.optimize_state()
+
+        optimizer.set_state(values)
+        result = optimizer.optimize_state()
+        expected = optimizer.optimize(values)
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertAlmostEqual(result.error(), expected.error())
+
+        # Only the optimized keys changed
+        self.assertEqual(set(result.optimized_values.keys()), set(xs))
+        self.assertEqual(set(result.initial_values.keys()), set(xs))
+        for key in xs:
+            self.assertStorageNear(result.initial_values[key], values[key])
+            self.assertStorageNear(
+                result.optimized_values[key], expected.optimized_values[key], places=9
+            )
+
+        state = optimizer.state_values()
+        self.assertEqual(state.keys_recursive(), values.keys_recursive())
+        self.assertStorageNear(state[xs[2]], expected.optimized_values[xs[2]])
+
+        with self.assertRaises(ValueError):
+            optimizer.set_state(Values(x=1.0))
+
+    def test_update_state(self) -> None:
+        """
+        Tests:
+            Optimizer.update_state
+
+        Updating entries of the persistent state and optimizing it again gives the same results as
+        optimizing the updated Values
+        """
+        xs, priors, factors, values = self.pose2_chain_problem()
+        optimizer = Optimizer(
+            factors=factors, optimized_keys=xs, params=Optimizer.Params(verbose=False)
+        )
+
+        with self.assertRaises(ValueError):
+            optimizer.update_state({priors[2]: sf.Pose2.identity()})
+
+        optimizer.set_state(values)
+        optimizer.optimize_state()
+        expected = optimizer.optimize(values)
+
+        # Move one prior, starting from the previous solution
+        new_prior = sf.Pose2(t=sf.V2(2.5, 1.0), R=sf.Rot2.from_angle(0.5))
+        optimizer.update_state({priors[2]: new_prior})
+        result = optimizer.optimize_state()
+
+        expected_values = expected.optimized_values
+        expected_values[priors[2]] = new_prior
+        expected = optimizer.optimize(expected_values)
+        self.assertEqual(set(result.optimized_values.keys()), set(xs))
+        for key in xs:
+            self.assertStorageNear(
+                result.optimized_values[key], expected.optimized_values[key], places=9
+            )
+
+        # Update from a dirty set of keys
+        optimizer.update_state(values, keys=[priors[2]])
+        self.assertStorageNear(optimizer.state_values()[priors[2]], values[priors[2]])
+        self.assertStorageNear(optimizer.state_values()[priors[3]], values[priors[3]])
+        result = optimizer.optimize_state()
+        self.assertLessEqual(set(result.optimized_values.keys()), set(xs))
+        self.assertIn(xs[2], result.optimized_values.keys())
+
+        with self.assertRaises(KeyError):
+            optimizer.update_state({"not_a_key": 1.0})
+        with self.assertRaises(ValueError):
+            optimizer.update_state({priors[0]: sf.Pose3.identity()})
+
+    def test_optimize_state_nested_keys(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize_state
+
+        Changed entries of lists and nested Values are returned by their flattened keys, even if
+        the entries before them in the list didn't change, and don't change with the state
+        """
+
+        def prior_residual(x: sf.Pose2, prior: sf.Pose2, epsilon: sf.Scalar) -> sf.V3:
+            return sf.V3(x.local_coordinates(prior, epsilon=epsilon))
+
+        def offset_residual(offset: sf.V3, target: sf.V3) -> sf.V3:
+            return offset - target
+
+        values = Values(
+            poses=[sf.Pose2.identity() for _ in range(4)],
+            landmark=Values(pose=sf.Pose2.identity(), offset=np.zeros(3)),
+            targets=[sf.Pose2(t=sf.V2(1, 2)), sf.Pose2(t=sf.V2(3, 4), R=sf.Rot2.from_angle(0.3))],
+            target_offset=np.array([1.0, 2.0, 3.0]),
+            epsilon=sf.numeric_epsilon,
+        )
+        changed_keys = {"poses[3]", "landmark.pose", "landmark.offset"}
+        optimizer = Optimizer(
+            factors=[
+                Factor(keys=["poses[3]", "targets[0]", "epsilon"], residual=prior_residual),
+                Factor(keys=["landmark.pose", "targets[1]", "epsilon"], residual=prior_residual),
+                Factor(keys=["landmark.offset", "target_offset"], residual=offset_residual),
+            ],
+            optimized_keys=sorted(changed_keys),
+            params=Optimizer.Params(verbose=False),
+        )
+        optimizer.set_state(values)
+        result = optimizer.optimize_state()
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(set(result.initial_values), changed_keys)
+        self.assertEqual(set(result.optimized_values), changed_keys)
+        self.assertStorageNear(result.initial_values["poses[3]"], sf.Pose2.identity())
+        self.assertStorageNear(result.optimized_values["poses[3]"], values["targets[0]"], places=6)
+        self.assertStorageNear(
+            result.optimized_values["landmark.pose"], values["targets[1]"], places=6
+        )
+        np.testing.assert_allclose(result.optimized_values["landmark.offset"], [1.0, 2.0, 3.0])
+
+        # The changed entries can be written back to the state, and the results don't change with
+        # it
+        optimizer.update_state(result.initial_values)
+        self.assertStorageNear(optimizer.state_values()["poses[3]"], sf.Pose2.identity())
+        np.testing.assert_array_equal(optimizer.state_values()["landmark.offset"], np.zeros(3))
+        np.testing.assert_allclose(result.optimized_values["landmark.offset"], [1.0, 2.0, 3.0])
+
+    def test_incremental_updates(self) -> None:
+        """
+        Tests:
+            Optimizer.add_factors
+            Optimizer.add_keys
+            Optimizer.remove_factors
+
+        Changing the problem in place gives the same results as a new optimizer for the changed
+        problem
+        """
+
+        def prior(x: sf.Scalar, target: sf.Scalar) -> sf.V1:
+            return sf.V1(x - target)
+
+        def between(x: sf.Scalar, y: sf.Scalar, offset: sf.Scalar) -> sf.V1:
+            return sf.V1(y - x - offset)
+
+        params = Optimizer.Params(verbose=False)
+        factors = [
+            Factor(keys=["x0", "target0"], residual=prior),
+            Factor(keys=["x0", "x1", "offset01"], residual=between),
+        ]
+        optimizer = Optimizer(factors=factors, optimized_keys=["x0", "x1"], params=params)
+        values = Values(x0=0.0, x1=0.0, target0=1.0, offset01=2.0)
+        result = optimizer.optimize(values)
+        self.assertAlmostEqual(result.optimized_values["x1"], 3.0)
+
+        with self.subTest(msg="Factors with new keys"):
+            new_factors = [Factor(keys=["x1", "x2", "offset12"], residual=between)]
+            optimizer.add_factors(new_factors, optimized_keys=["x2"])
+            self.assertEqual(optimizer.optimized_keys, ["x0", "x1", "x2"])
+
+            values = Values(x0=0.0, x1=0.0, x2=0.0, target0=1.0, offset01=2.0, offset12=3.0)
+            result = optimizer.optimize(values)
+            expected = Optimizer(
+                factors=factors + new_factors, optimized_keys=["x0", "x1", "x2"], params=params
+            ).optimize(values)
+            self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+            for key in ["x0", "x1", "x2"]:
+                self.assertAlmostEqual(result.optimized_values[key], expected.optimized_values[key])
+            self.assertEqual(set(optimizer.linearization_index()), {"x0", "x1", "x2"})
+            self.assertIsNotNone(optimizer._cc_values_layout)  # noqa: SLF001
+
+        with self.subTest(msg="Keys of new numeric factors are constant until they're added"):
+            optimizer.add_factors(
+                [
+                    Factor(keys=["x2", "x3", "offset23"], residual=between).to_numeric_factor(
+                        ["x2", "x3"]
+                    )
+                ]
+            )
+            self.assertEqual(optimizer.optimized_keys, ["x0", "x1", "x2"])
+
+            values["x3"] = 5.0
+            values["offset23"] = 1.0
+            result = optimizer.optimize(values)
+            self.assertEqual(result.optimized_values["x3"], 5.0)
+            # The residuals can't all be zero with x3 fixed, so they're all equal
+            self.assertAlmostEqual(result.optimized_values["x2"], 4.5)
+
+            optimizer.add_keys(["x3"])
+            self.assertEqual(optimizer.optimized_keys, ["x0", "x1", "x2", "x3"])
+            result = optimizer.optimize(values)
+            self.assertAlmostEqual(result.optimized_values["x2"], 6.0)
+            self.assertAlmostEqual(result.optimized_values["x3"], 7.0)
+
+            with self.assertRaises(ValueError):
+                optimizer.add_keys(["x3"])
+            with self.assertRaises(ValueError):
+                optimizer.add_keys(["target0"])
+
+        with self.subTest(msg="Removing factors removes the keys they alone optimized"):
+            optimizer.remove_factors([2, 3])
+            self.assertEqual(optimizer.optimized_keys, ["x0", "x1"])
+
+            result = optimizer.optimize(values)
+            self.assertAlmostEqual(result.optimized_values["x1"], 3.0)
+            self.assertEqual(result.optimized_values["x2"], values["x2"])
+            self.assertEqual(result.optimized_values["x3"], values["x3"])
+
+    def test_relinearization_threshold(self) -> None:
+        """
+        Tests:
+            Optimizer.Params.relinearization_threshold
+
+        Factors whose keys moved less than the threshold since they were last linearized are
+        skipped, without moving the optimum by more than the threshold
+        """
+
+        def square_residual(x: sf.Scalar, target: sf.Scalar) -> sf.V1:
+            return sf.V1(x**2 - target)
+
+        xs = [f"x{i}" for i in range(5)]
+        factors = [
+            Factor(keys=[x, f"target{i}"], residual=square_residual) for i, x in enumerate(xs)
+        ]
+        initial_values = Values()
+        for i, x in enumerate(xs):
+            # The first key starts close to its optimum, the rest further and further away
+            initial_values[x] = 1.0 + i
+            initial_values[f"target{i}"] = 1.01
+
+        params = Optimizer.Params(verbose=False, early_exit_min_reduction=1e-12, iterations=100)
+        expected = Optimizer(factors=factors, optimized_keys=xs, params=params).optimize(
+            initial_values
+        )
+        self.assertTrue(
+            all(iteration.num_factors_skipped == 0 for iteration in expected.iterations)
+        )
+
+        params.relinearization_threshold = 1e-4
+        result = Optimizer(factors=factors, optimized_keys=xs, params=params).optimize(
+            initial_values
+        )
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertGreater(sum(iteration.num_factors_skipped for iteration in result.iterations), 0)
+        for x in xs:
+            self.assertAlmostEqual(
+                result.optimized_values[x], expected.optimized_values[x], delta=1e-4
+            )
+
+    def test_linear_solver_ordering(self) -> None:
+        """
+        Tests:
+            Optimizer(ordering_key_groups=...)
+            Optimizer(linear_solver_ordering=...)
+            Optimizer.linear_solver_ordering
+
+        The ordering can be constrained by groups of keys, and saved and reused
+        """
+
+        num_samples = 10
+        xs, factors, initial_values = self.rotation_smoothing_problem(num_samples)
+
+        params = Optimizer.Params(verbose=False)
+        expected = Optimizer(factors=factors, optimized_keys=xs, params=params).optimize(
+            initial_values
+        )
+
+        # Eliminate the odd keys before the even ones
+        odd_keys = xs[1::2]
+        optimizer = Optimizer(
+            factors=factors, optimized_keys=xs, params=params, ordering_key_groups=[odd_keys]
+        )
+        self.assertEqual(len(optimizer.linear_solver_ordering()), 0)
+        result = optimizer.optimize(initial_values)
+        self.assertAlmostEqual(result.error(), expected.error())
+
+        ordering = optimizer.linear_solver_ordering()
+        self.assertEqual(sorted(ordering), list(range(3 * num_samples)))
+        for key, entry in optimizer.linearization_index().items():
+            positions = ordering[entry.offset : entry.offset + entry.tangent_dim]
+            if key in odd_keys:
+                self.assertTrue(all(positions < 3 * len(odd_keys)))
+            else:
+                self.assertTrue(all(positions >= 3 * len(odd_keys)))
+
+        # The ordering can be saved, and reused without computing it again
+        path = self.make_output_dir("sf_linear_solver_ordering") / "ordering.npy"
+        np.save(path, ordering)
+        reused_optimizer = Optimizer(
+            factors=factors,
+            optimized_keys=xs,
+            params=params,
+            linear_solver_ordering=np.load(path),
+        )
+        reused_result = reused_optimizer.optimize(initial_values)
+        np.testing.assert_array_equal(reused_optimizer.linear_solver_ordering(), ordering)
+        self.assertEqual(reused_result.error(), result.error())
+
+        # The copies used by optimize_many use the same ordering
+        for many_result in reused_optimizer.optimize_many([initial_values] * 3, num_threads=2):
+            self.assertEqual(many_result.error(), result.error())
+
+        with self.assertRaises(ValueError):
+            Optimizer(
+                factors=factors,
+                optimized_keys=xs,
+                linear_solver_ordering=ordering,
+                ordering_key_groups=[odd_keys],
+            )
+        with self.assertRaises(ValueError):
+            Optimizer(factors=factors, optimized_keys=xs, linear_solver_ordering=ordering[1:])
+        with self.assertRaises(ValueError):
+            Optimizer(factors=factors, optimized_keys=xs, ordering_key_groups=[["x_prior0"]])
+        with self.assertRaises(ValueError):
+            Optimizer(factors=factors, optimized_keys=xs, ordering_key_groups=[xs[:2], xs[1:3]])
+
+    def test_optimize_many(self) -> None:
+        """
+        Tests:
+            Optimizer.optimize_many
+
+        Optimizing a batch of problems in parallel gives the same results as optimizing each of
+        them separately
+        """
+        xs, factors, base_values = self.rotation_smoothing_problem()
+
+        initial_guesses = []
+        for problem in range(6):
+            initial_values = base_values.copy()
+            for i in range(len(xs)):
+                initial_values[f"x_prior{i}"] = sf.Rot3.from_yaw_pitch_roll(
+                    roll=0.1 * i, yaw=0.05 * problem
+                )
+            initial_guesses.append(initial_values)
+
+        params = Optimizer.Params(verbose=False)
+        expected = [
+            Optimizer(factors=factors, optimized_keys=xs, params=params).optimize(initial_values)
+            for initial_values in initial_guesses
+        ]
+
+        for batch_factors in (False, True):
+            for num_threads in (1, 3):
+                with self.subTest(batch_factors=batch_factors, num_threads=num_threads):
+                    optimizer = Optimizer(
+                        factors=factors,
+                        optimized_keys=xs,
+                        params=params,
+                        batch_factors=batch_factors,
+                    )
+                    results = optimizer.optimize_many(initial_guesses, num_threads=num_threads)
+
+                    self.assertEqual(len(results), len(initial_guesses))
+                    for result, expected_result, initial_values in zip(
+                        results, expected, initial_guesses
+                    ):
+                        self.assertIs(result.initial_values, initial_values)
+                        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+                        self.assertEqual(len(result.iterations), len(expected_result.iterations))
+                        self.assertAlmostEqual(result.error(), expected_result.error())
+                        for x in xs:
+                            self.assertStorageNear(
+                                result.optimized_values[x], expected_result.optimized_values[x]
+                            )
+
+                    # The optimizer can still be used for single problems afterwards
+                    self.assertAlmostEqual(
+                        optimizer.optimize(initial_guesses[0]).error(), expected[0].error()
+                    )
+
+        with self.subTest(msg="An empty batch gives no results"):
+            optimizer = Optimizer(factors=factors, optimized_keys=xs, params=params)
+            self.assertEqual(optimizer.optimize_many([]), [])
+
+    def test_symbolic_factorization_cache(self) -> None:
+        """
+        Tests:
+            Optimizer(symbolic_factorization_cache=...)
+
+        Optimizers sharing a cache reuse the symbolic factorization of problems with the same
+        structure, and get the same results
+        """
+
+        def prior(x: float) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            return np.array([x]), np.array([[1.0]]), np.array([[1.0]]), np.array([x])
+
+        def make_factors(num_keys: int) -> T.List[NumericFactor]:
+            return [NumericFactor(["y0"], ["y0"], prior)] + [
+                NumericFactor([f"y{i}", f"y{i + 1}"], [f"y{i}", f"y{i + 1}"], self.scalar_between)
+                for i in range(num_keys - 1)
+            ]
+
+        cache = cc_sym.SymbolicFactorizationCache(capacity=4)
+        params = Optimizer.Params(verbose=False)
+        initial_values = Values({f"y{i}": float(i * i) for i in range(6)})
+
+        expected = Optimizer(make_factors(6), params=params).optimize(initial_values)
+
+        first = Optimizer(make_factors(6), params=params, symbolic_factorization_cache=cache)
+        first.optimize(initial_values)
+        self.assertEqual(cache.size(), 1)
+        self.assertEqual(cache.misses(), 1)
+        self.assertEqual(cache.hits(), 0)
+
+        second = Optimizer(make_factors(6), params=params, symbolic_factorization_cache=cache)
+        result = second.optimize(initial_values)
+        self.assertEqual(cache.hits(), 1)
+        self.assertEqual(result.status, Optimizer.Status.SUCCESS)
+        self.assertEqual(len(result.iterations), len(expected.iterations))
+        for i in range(6):
+            self.assertAlmostEqual(
+                result.optimized_values[f"y{i}"], expected.optimized_values[f"y{i}"]
+            )
+
+        # A problem with a different structure isn't found
+        Optimizer(make_factors(4), params=params, symbolic_factorization_cache=cache).optimize(
+            Values({f"y{i}": 0.0 for i in range(4)})
+        )
+        self.assertEqual(cache.misses(), 2)
+        self.assertEqual(cache.size(), 2)
+
+        # A cache hit would replace the ordering, so orderings can't be combined with the cache
+        ordering_kwargs: T.List[T.Dict[str, T.Any]] = [
+            dict(linear_solver_ordering=np.arange(6)),
+            dict(ordering_key_groups=[["y0", "y1"]]),
+            dict(schur_complement_keys=["y0"]),
+        ]
+        for kwargs in ordering_kwargs:
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                Optimizer(
+                    make_factors(6), params=params, symbolic_factorization_cache=cache, **kwargs
+                )
+
+    @staticmethod
+    def rotation_smoothing_problem(
+        num_samples: int = 10,
+    ) -> T.Tuple[T.List[str], T.List[Factor], Values]:
+        """
+        The chain of 3D orientations with prior and between factors from test_rotation_smoothing
+
+        Returns:
+            The optimized keys, the factors, and the initial values
+        """
+        xs = [f"x{i}" for i in range(num_samples)]
+        x_priors = [f"x_prior{i}" for i in range(num_samples)]
+
+        def between(x: sf.Rot3, y: sf.Rot3, epsilon: sf.Scalar) -> sf.V3:
+            return sf.V3(x.local_coordinates(y, epsilon=epsilon))
+
+        def prior_residual(x: sf.Rot3, epsilon: sf.Scalar, x_prior: sf.Rot3) -> sf.V3:
+            return sf.V3(x.local_coordinates(x_prior, epsilon=epsilon))
+
+        factors = [
+            Factor(keys=[xs[i], xs[i + 1], "epsilon"], residual=between)
+            for i in range(num_samples - 1)
+        ] + [
+            Factor(keys=[xs[i], "epsilon", x_priors[i]], name="prior", residual=prior_residual)
+            for i in range(num_samples)
+        ]
+
+        initial_values = Values(epsilon=sf.numeric_epsilon)
+        for i in range(num_samples):
+            initial_values[xs[i]] = sf.Rot3.from_yaw_pitch_roll(yaw=0.0, pitch=0.1 * i, roll=0.0)
+        for i in range(num_samples):
+            initial_values[x_priors[i]] = sf.Rot3.from_yaw_pitch_roll(roll=0.1 * i)
+
+        return xs, factors, initial_values
+
+    @staticmethod
+    def pose2_chain_problem(
+        num_poses: int = 5,
+    ) -> T.Tuple[T.List[str], T.List[str], T.List[Factor], Values]:
+        """
+        A chain of 2D poses with between factors, and a prior on each pose
+
+        Returns:
+            The optimized keys, the keys of the priors, the factors, and the initial values
+        """
+        xs = [f"x{i}" for i in range(num_poses)]
+        priors = [f"prior{i}" for i in range(num_poses)]
+
+        def between(a: sf.Pose2, b: sf.Pose2, epsilon: sf.Scalar) -> sf.V3:
+            return sf.V3(a.local_coordinates(b, epsilon=epsilon))
+
+        def prior_residual(x: sf.Pose2, prior: sf.Pose2, epsilon: sf.Scalar) -> sf.V3:
+            return sf.V3(x.local_coordinates(prior, epsilon=epsilon))
+
+        factors = [
+            Factor(keys=[xs[i], xs[i + 1], "epsilon"], residual=between)
+            for i in range(num_poses - 1)
+        ] + [
+            Factor(keys=[xs[i], priors[i], "epsilon"], residual=prior_residual)
+            for i in range(num_poses)
+        ]
+
+        values = Values(epsilon=sf.numeric_epsilon)
+        for i in range(num_poses):
+            values[xs[i]] = sf.Pose2.identity()
+        for i in range(num_poses):
+            values[priors[i]] = sf.Pose2(t=sf.V2(i, 0.1 * i), R=sf.Rot2.from_angle(0.1 * i))
+
+        return xs, priors, factors, values
+
+    @staticmethod
+    def rosenbrock_optimizer() -> Optimizer:
+        """
+        An optimizer for the Rosenbrock function of the keys ``x`` and ``y``
+        """
+
+        def rosenbrock_residual(x: sf.Scalar, y: sf.Scalar) -> sf.V2:
+            return sf.V2(10 * (y - x**2), 1 - x)
+
+        return Optimizer(
+            factors=[Factor(keys=["x", "y"], residual=rosenbrock_residual)],
+            optimized_keys=["x", "y"],
+            params=Optimizer.Params(early_exit_min_reduction=1e-12, iterations=100),
+        )
+
+    @staticmethod
+    def scalar_between(
+        x: float, y: float
+    ) -> T.Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Linearization of the residual y - x - 1
+        """
+        jacobian = np.array([[-1.0, 1.0]])
+        residual = np.array([y - x - 1])
+        return residual, jacobian, jacobian.T @ jacobian, jacobian.T @ residual
+
 
 if __name__ == "__main__":
     TestCase.main()
@@ -0,0 +1,65 @@
+# ----------------------------------------------------------------------------
+# SymForce - Copyright 2022, Skydio, Inc.
+# This source code is under the Apache 2.0 license found in the LICENSE file.
+# ----------------------------------------------------------------------------
+
+import copy
+
+from symforce.benchmarks.python_benchmarks import python_benchmarks
+from symforce.test_util import TestCase
+
+
+class SymforcePythonBenchmarksTest(TestCase):
+    """
+    Test the Python benchmark suite
+    """
+
+    def test_run_and_compare(self) -> None:
+        """
+        Tests:
+            python_benchmarks.run_benchmarks
+            python_benchmarks.compare_results
+        """
+        results = python_benchmarks.run_benchmarks(benchmark_filter="values/to_storage", repeat=2)
+        self.assertEqual(results["version"], python_benchmarks.RESULTS_VERSION)
+        self.assertEqual(list(results["benchmarks"]), ["values/to_storage"])
+        stats = results["benchmarks"]["values/to_storage"]
+        self.assertEqual(stats["repeat"], 2)
+        self.assertLessEqual(stats["min"], stats["median"])
+        self.assertLessEqual(stats["median"], stats["max"])
+
+        self.assertEqual(python_benchmarks.compare_results(results, results, tolerance=0.1), [])
+
+        # A benchmark which is more than 10% slower than the baseline is a regression
+        faster_baseline = copy.deepcopy(results)
+        faster_baseline["benchmarks"]["values/to_storage"]["median"] = stats["median"] / 2
+        self.assertEqual(
+            python_benchmarks.compare_results(faster_baseline, results, tolerance=0.1),
+            ["values/to_storage"],
+        )
+        self.assertEqual(
+            python_benchmarks.compare_results(faster_baseline, results, tolerance=1.5), []
+        )
+
+        # Benchmarks missing from the baseline are skipped
+        self.assertEqual(
+            python_benchmarks.compare_results(dict(results, benchmarks={}), results, tolerance=0.1),
+            [],
+        )
+
+        with self.assertRaises(ValueError):
+            python_benchmarks.compare_results(dict(results, version=0), results, tolerance=0.1)
+
+    def test_benchmark_names(self) -> None:
+        """
+        Tests:
+            python_benchmarks.BENCHMARKS
+
+        Every benchmark has a unique name
+        """
+        names = [benchmark.name for benchmark in python_benchmarks.BENCHMARKS]
+        self.assertEqual(len(names), len(set(names)))
+
+
+if __name__ == "__main__":
+    TestCase.main()
@@ -111,6 +111,20 @@ class SymforceSetEpsilonTest(TestCase):
                 sf.epsilon()
                 symforce.set_epsilon_to_number()
 
+        clear_symforce()
+        with self.subTest(msg="Test setting the same symbol again after it's used"):
+            import symforce
+
+            symforce.set_epsilon_to_symbol()
+            import symforce.symbolic as sf
+
+            sf.epsilon()
+            symforce.set_epsilon_to_symbol()
+            self.assertEqual(sf.Symbol("epsilon"), sf.epsilon())
+
+            with self.assertRaises(symforce.AlreadyUsedEpsilon):
+                symforce.set_epsilon_to_symbol(name="alpha")
+
     def test_set_epsilon_to_number(self) -> None:
         """
         Tests:
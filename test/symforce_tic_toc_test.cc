@@ -0,0 +1,66 @@
+/* ----------------------------------------------------------------------------
+ * SymForce - Copyright 2022, Skydio, Inc.
+ * This source code is under the Apache 2.0 license found in the LICENSE file.
+ * ---------------------------------------------------------------------------- */
+
+#include <thread>
+
+#include <catch2/catch_test_macros.hpp>
+
+#include <symforce/opt/tic_toc.h>
+
+TEST_CASE("TicTocRecorder records the scopes on its thread while recording", "[tic_toc]") {
+  {
+    SYM_TIME_SCOPE("tic_toc_test::before");
+  }
+
+  sym::internal::TicTocRecorder outer(/* record_timeline */ true);
+  outer.Start();
+  {
+    SYM_TIME_SCOPE("tic_toc_test::outer");
+    {
+      SYM_TIME_SCOPE("tic_toc_test::inner");
+    }
+    {
+      SYM_TIME_SCOPE("tic_toc_test::inner");
+    }
+
+    sym::internal::TicTocRecorder nested;
+    nested.Start();
+    {
+      SYM_TIME_SCOPE("tic_toc_test::nested");
+    }
+    std::thread([] { SYM_TIME_SCOPE("tic_toc_test::other_thread"); }).join();
+    nested.Stop();
+
+    CHECK(nested.Blocks().size() == 1);
+    CHECK(nested.Blocks().at("tic_toc_test::nested").Count() == 1);
+    CHECK(nested.Timeline().empty());
+  }
+  outer.Stop();
+  {
+    SYM_TIME_SCOPE("tic_toc_test::after");
+  }
+
+  const auto& blocks = outer.Blocks();
+  CHECK(blocks.size() == 3);
+  CHECK(blocks.at("tic_toc_test::outer").Count() == 1);
+  CHECK(blocks.at("tic_toc_test::inner").Count() == 2);
+  CHECK(blocks.at("tic_toc_test::nested").Count() == 1);
+  CHECK(blocks.at("tic_toc_test::inner").MinTime() <= blocks.at("tic_toc_test::inner").MaxTime());
+
+  // Events are added as they end, so the outer scope is last, and contains the others
+  const auto& timeline = outer.Timeline();
+  REQUIRE(timeline.size() == 4);
+  CHECK(timeline.back().name == "tic_toc_test::outer");
+  for (const auto& event : timeline) {
+    CHECK(event.start >= timeline.back().start);
+    CHECK(event.start + event.duration <= timeline.back().start + timeline.back().duration);
+  }
+
+  // Starting again clears what was recorded before
+  outer.Start();
+  outer.Stop();
+  CHECK(outer.Blocks().empty());
+  CHECK(outer.Timeline().empty());
+}